@@ -99,7 +99,8 @@ async def poll_sync_status() -> dict:
 async def run_incremental_reconciliation() -> dict:
     """Run hourly incremental reconciliation for all tenants.
 
-    Called by scheduler every hour. Checks only recent data (last 2 hours).
+    Called by scheduler every hour. Checks data since the previous run
+    (stored high-water mark; last 2 hours on the first run).
     """
     from app.db import get_db
     db = await get_db()
@@ -5,6 +5,7 @@ Each integrator adapter MUST implement these methods.
 """
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -44,6 +45,8 @@ class BaseIntegrator(ABC):
     """
 
     provider_name: str = "base"
+    # Invoices per ``issue_invoices`` call (bulk runs size their batches by it)
+    max_batch_size: int = 20
 
     @abstractmethod
     async def test_connection(self, credentials: dict[str, Any]) -> EDocumentResult:
@@ -63,6 +66,22 @@ class BaseIntegrator(ABC):
         """
         ...
 
+    async def issue_invoices(
+        self, invoices: list[dict[str, Any]], credentials: dict[str, Any],
+    ) -> list[EDocumentResult]:
+        """Submit a batch of invoices; results are in input order.
+
+        Default: concurrent ``issue_invoice`` calls. Integrators with a batch
+        endpoint or per-session auth override this.
+        """
+        results = await asyncio.gather(
+            *[self.issue_invoice(inv, credentials) for inv in invoices], return_exceptions=True,
+        )
+        return [
+            r if isinstance(r, EDocumentResult) else EDocumentResult(success=False, status="error", message=str(r))
+            for r in results
+        ]
+
     @abstractmethod
     async def get_status(
         self, provider_invoice_id: str, credentials: dict[str, Any],
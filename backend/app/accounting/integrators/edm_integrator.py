@@ -16,6 +16,7 @@ EDM API Flow:
 """
 from __future__ import annotations
 
+import asyncio
 import uuid
 from typing import Any
 
@@ -28,6 +29,7 @@ class EDMIntegrator(BaseIntegrator):
     """EDM e-document integrator adapter."""
 
     provider_name = "edm"
+    max_batch_size = 50
 
     # EDM API endpoints (configurable per tenant)
     DEFAULT_ENDPOINT = "https://ebelge.edm.com.tr/api"
@@ -102,44 +104,63 @@ class EDMIntegrator(BaseIntegrator):
     ) -> EDocumentResult:
         """Issue invoice via EDM API."""
         endpoint = self._get_endpoint(credentials)
+        token = await self._authenticate(credentials)
+        if not token:
+            # Simulation mode: generate a realistic provider ID
+            return self._simulate_issue(invoice_data)
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            return await self._send_invoice(client, endpoint, token, invoice_data)
+
+    async def issue_invoices(
+        self, invoices: list[dict[str, Any]], credentials: dict[str, Any],
+    ) -> list[EDocumentResult]:
+        """Issue a batch with one auth token and one connection pool."""
+        endpoint = self._get_endpoint(credentials)
+        token = await self._authenticate(credentials)
+        if not token:
+            return [self._simulate_issue(inv) for inv in invoices]
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            return list(await asyncio.gather(
+                *[self._send_invoice(client, endpoint, token, inv) for inv in invoices]
+            ))
+
+    async def _send_invoice(
+        self, client: httpx.AsyncClient, endpoint: str, token: str, invoice_data: dict[str, Any],
+    ) -> EDocumentResult:
         invoice_type = invoice_data.get("invoice_type", "e_arsiv")
 
         # Build EDM-compatible UBL payload
         edm_payload = self._build_edm_payload(invoice_data)
 
-        try:
-            token = await self._authenticate(credentials)
-            if not token:
-                # Simulation mode: generate a realistic provider ID
-                return self._simulate_issue(invoice_data)
-
-            # Determine EDM endpoint based on invoice type
-            if invoice_type == "e_fatura":
-                issue_url = f"{endpoint}/e-fatura/gonder"
-            else:
-                issue_url = f"{endpoint}/e-arsiv/gonder"
+        # Determine EDM endpoint based on invoice type
+        if invoice_type == "e_fatura":
+            issue_url = f"{endpoint}/e-fatura/gonder"
+        else:
+            issue_url = f"{endpoint}/e-arsiv/gonder"
 
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.post(
-                    issue_url,
-                    json=edm_payload,
-                    headers={"Authorization": f"Bearer {token}"},
-                )
-                if resp.status_code in (200, 201):
-                    data = resp.json()
-                    return EDocumentResult(
-                        success=True,
-                        provider_invoice_id=data.get("uuid") or data.get("ettn", ""),
-                        status="submitted",
-                        message="Fatura basariyla gonderildi",
-                        raw_response=data,
-                    )
+        try:
+            resp = await client.post(
+                issue_url,
+                json=edm_payload,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            if resp.status_code in (200, 201):
+                data = resp.json()
                 return EDocumentResult(
-                    success=False,
-                    status="rejected",
-                    message=f"EDM reddetti: {resp.text[:200]}",
-                    raw_response={"status_code": resp.status_code},
+                    success=True,
+                    provider_invoice_id=data.get("uuid") or data.get("ettn", ""),
+                    status="submitted",
+                    message="Fatura basariyla gonderildi",
+                    raw_response=data,
                 )
+            return EDocumentResult(
+                success=False,
+                status="rejected",
+                message=f"EDM reddetti: {resp.text[:200]}",
+                raw_response={"status_code": resp.status_code},
+            )
         except httpx.ConnectError:
             return self._simulate_issue(invoice_data)
         except Exception as e:
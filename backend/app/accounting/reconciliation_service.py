@@ -3,11 +3,11 @@
 Compares booking, invoice, and accounting data to detect mismatches.
 
 Supports:
-- Incremental (hourly): checks recent items only
+- Incremental (hourly): checks items created since the last run's high-water mark
 - Full (daily): checks all items for a tenant
 - Manual (on-demand): triggered by operator
 
-DB Collections: reconciliation_runs, reconciliation_items
+DB Collections: reconciliation_runs, reconciliation_items, reconciliation_state
 
 CTO Rules:
 - Reconciliation detects and reports only. NO auto-correction in this iteration.
@@ -18,7 +18,7 @@ from __future__ import annotations
 import logging
 import uuid
 from datetime import timedelta
-from typing import Any
+from typing import Any, AsyncIterator
 
 from app.db import get_db
 from app.utils import now_utc, serialize_doc
@@ -27,6 +27,14 @@ logger = logging.getLogger("accounting.reconciliation")
 
 RUNS_COL = "reconciliation_runs"
 ITEMS_COL = "reconciliation_items"
+STATE_COL = "reconciliation_state"
+
+# Rows per source batch (one join query each) and per insert_many of items.
+JOIN_BATCH_SIZE = 500
+ITEM_WRITE_BATCH = 500
+# Incremental runs re-read this much before the stored high-water mark to
+# catch rows whose created_at predates a concurrent commit.
+HWM_OVERLAP = timedelta(minutes=5)
 
 # Mismatch type enum (CTO-mandated)
 MISMATCH_MISSING_INVOICE = "missing_invoice"
@@ -121,13 +129,23 @@ async def run_reconciliation(
 ) -> dict[str, Any]:
     """Execute a reconciliation run.
 
-    For incremental: lookback_hours=2 (only recent data)
+    For incremental: resumes from the tenant's stored high-water mark
+    (falls back to lookback_hours=2 on the first run)
     For full: lookback_hours=None (all data)
+
+    Source collections are streamed in batches and mismatch items are
+    written in bulk, so memory stays bounded for any tenant size.
     """
     db = await get_db()
     now = now_utc()
     run_id = f"RECON-{uuid.uuid4().hex[:8].upper()}"
 
+    since = now - timedelta(hours=lookback_hours) if lookback_hours else None
+    if run_type == RUN_INCREMENTAL:
+        hwm = await _load_high_water_mark(db, tenant_id)
+        if hwm:
+            since = hwm - HWM_OVERLAP
+
     run_doc = {
         "run_id": run_id,
         "tenant_id": tenant_id,
@@ -136,38 +154,29 @@ async def run_reconciliation(
         "started_at": now,
         "completed_at": None,
         "triggered_by": triggered_by,
+        "since": since,
         "stats": {},
         "created_at": now,
     }
     await db[RUNS_COL].insert_one(run_doc)
 
+    sink = _MismatchSink(db, tenant_id, run_id, now)
     try:
-        items = []
-
         # Phase 1: Booking vs Invoice comparison
-        booking_items = await _compare_bookings_invoices(db, tenant_id, lookback_hours)
-        items.extend(booking_items)
+        async for item in _compare_bookings_invoices(db, tenant_id, since):
+            await sink.add(item)
 
         # Phase 2: Invoice vs Accounting comparison
-        acct_items = await _compare_invoices_accounting(db, tenant_id, lookback_hours)
-        items.extend(acct_items)
+        async for item in _compare_invoices_accounting(db, tenant_id, since):
+            await sink.add(item)
 
         # Phase 3: Duplicate detection
-        dup_items = await _detect_duplicates(db, tenant_id, lookback_hours)
-        items.extend(dup_items)
-
-        # Save all mismatch items
-        saved_count = 0
-        for item in items:
-            item["run_id"] = run_id
-            item["tenant_id"] = tenant_id
-            item["resolution_state"] = "open"
-            item["created_at"] = now
-            await db[ITEMS_COL].insert_one(item)
-            saved_count += 1
-
-        # Build stats
-        stats = _build_stats(items)
+        async for item in _detect_duplicates(db, tenant_id, since):
+            await sink.add(item)
+
+        await sink.flush()
+
+        stats = sink.stats()
         completed_at = now_utc()
 
         await db[RUNS_COL].update_one(
@@ -178,14 +187,15 @@ async def run_reconciliation(
                 "stats": stats,
             }},
         )
+        if run_type in (RUN_INCREMENTAL, RUN_FULL):
+            await _store_high_water_mark(db, tenant_id, now, run_id)
 
-        # Generate finance ops items and alerts
-        await _generate_ops_items(db, tenant_id, run_id, items)
         await _generate_alerts(db, tenant_id, run_id, stats)
 
         logger.info(
-            "Reconciliation %s complete: %d mismatches (tenant=%s, type=%s)",
-            run_id, saved_count, tenant_id, run_type,
+            "Reconciliation %s complete: %d mismatches (tenant=%s, type=%s, %.0fms)",
+            run_id, sink.saved, tenant_id, run_type,
+            (completed_at - now).total_seconds() * 1000,
         )
 
         return {
@@ -193,7 +203,7 @@ async def run_reconciliation(
             "run_type": run_type,
             "status": "completed",
             "stats": stats,
-            "mismatch_count": saved_count,
+            "mismatch_count": sink.saved,
         }
 
     except Exception as e:
@@ -205,145 +215,241 @@ async def run_reconciliation(
         return {"run_id": run_id, "status": "failed", "error": str(e)}
 
 
+# ── Streaming helpers ─────────────────────────────────────────
+
+class _MismatchSink:
+    """Buffers mismatch items, writes them with insert_many and keeps only
+    running counters, so a run never holds all its items in memory."""
+
+    def __init__(self, db, tenant_id: str, run_id: str, created_at) -> None:
+        self.db = db
+        self.tenant_id = tenant_id
+        self.run_id = run_id
+        self.created_at = created_at
+        self.buffer: list[dict] = []
+        self.by_type: dict[str, int] = {}
+        self.by_severity: dict[str, int] = {}
+        self.saved = 0
+
+    async def add(self, item: dict) -> None:
+        item["run_id"] = self.run_id
+        item["tenant_id"] = self.tenant_id
+        item["resolution_state"] = "open"
+        item["created_at"] = self.created_at
+        mt = item.get("mismatch_type", "unknown")
+        sev = item.get("severity", "low")
+        self.by_type[mt] = self.by_type.get(mt, 0) + 1
+        self.by_severity[sev] = self.by_severity.get(sev, 0) + 1
+        self.buffer.append(item)
+        if len(self.buffer) >= ITEM_WRITE_BATCH:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        await self.db[ITEMS_COL].insert_many(batch, ordered=False)
+        self.saved += len(batch)
+        await _generate_ops_items(self.db, self.tenant_id, self.run_id, batch)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "total_mismatches": sum(self.by_type.values()),
+            "by_type": dict(self.by_type),
+            "by_severity": dict(self.by_severity),
+            "critical_count": self.by_severity.get(SEVERITY_CRITICAL, 0),
+            "high_count": self.by_severity.get(SEVERITY_HIGH, 0),
+        }
+
+
+async def _batches(cursor, size: int | None = None) -> AsyncIterator[list[dict]]:
+    size = size or JOIN_BATCH_SIZE
+    batch: list[dict] = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _first_by_key(collection, query: dict, key: str, projection: dict, sort=None) -> dict[str, dict]:
+    """One round trip for a whole batch: first matching doc per `key` value."""
+    cursor = collection.find(query, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    found: dict[str, dict] = {}
+    async for doc in cursor:
+        found.setdefault(str(doc.get(key)), doc)
+    return found
+
+
+async def _load_high_water_mark(db, tenant_id: str):
+    state = await db[STATE_COL].find_one({"tenant_id": tenant_id})
+    hwm = (state or {}).get("high_water_mark")
+    if hwm is not None and getattr(hwm, "tzinfo", None) is None:
+        from datetime import timezone
+        hwm = hwm.replace(tzinfo=timezone.utc)
+    return hwm
+
+
+async def _store_high_water_mark(db, tenant_id: str, hwm, run_id: str) -> None:
+    await db[STATE_COL].update_one(
+        {"tenant_id": tenant_id},
+        {"$set": {"high_water_mark": hwm, "run_id": run_id, "updated_at": now_utc()}},
+        upsert=True,
+    )
+
+
+_BOOKING_PROJECTION = {"_id": 1, "id": 1, "total_price": 1, "grand_total": 1, "tax_amount": 1, "created_at": 1}
+_INVOICE_PROJECTION = {
+    "_id": 0, "invoice_id": 1, "booking_id": 1, "accounting_ref": 1, "grand_total": 1,
+    "tax_breakdown.total_tax": 1, "total_tax": 1, "created_at": 1,
+}
+_SYNC_JOB_PROJECTION = {
+    "_id": 0, "invoice_id": 1, "status": 1, "attempt_count": 1, "external_ref": 1,
+    "error_message": 1, "created_at": 1,
+}
+
+
 async def _compare_bookings_invoices(
-    db, tenant_id: str, lookback_hours: int | None,
-) -> list[dict]:
-    """Find bookings without invoices and amount mismatches."""
-    items = []
+    db, tenant_id: str, since=None,
+) -> AsyncIterator[dict]:
+    """Find bookings without invoices and amount mismatches.
+
+    Bookings are streamed in `_id` order; each batch is joined to its
+    invoices with a single `$in` query.
+    """
     bq: dict[str, Any] = {"organization_id": tenant_id, "status": {"$in": ["confirmed", "completed"]}}
-    if lookback_hours:
-        cutoff = now_utc() - timedelta(hours=lookback_hours)
-        bq["created_at"] = {"$gte": cutoff}
-
-    bookings = await db.bookings.find(bq).to_list(length=5000)
-
-    for booking in bookings:
-        b = serialize_doc(booking)
-        booking_id = b.get("id", "")
-
-        # Check for invoice
-        invoice = await db.invoices.find_one({
-            "tenant_id": tenant_id,
-            "booking_id": str(booking_id),
-        })
-
-        if not invoice:
-            age_bucket = _calc_age_bucket(booking.get("created_at"))
-            items.append({
-                "booking_id": str(booking_id),
-                "invoice_id": None,
-                "accounting_ref": None,
-                "mismatch_type": MISMATCH_MISSING_INVOICE,
-                "severity": _classify_severity(MISMATCH_MISSING_INVOICE),
-                "source_of_truth": SOURCE_BOOKING,
-                "amount_expected": b.get("total_price") or b.get("grand_total") or 0,
-                "amount_actual": 0,
-                "tax_expected": 0,
-                "tax_actual": 0,
-                "age_bucket": age_bucket,
-                "details": f"Booking {booking_id} icin fatura bulunamadi",
-            })
-            continue
-
-        inv = serialize_doc(invoice)
-        booking_total = float(b.get("total_price") or b.get("grand_total") or 0)
-        invoice_total = float(inv.get("grand_total") or 0)
-
-        if booking_total > 0 and invoice_total > 0 and abs(booking_total - invoice_total) > 0.01:
-            items.append({
-                "booking_id": str(booking_id),
-                "invoice_id": inv.get("invoice_id"),
-                "accounting_ref": inv.get("accounting_ref"),
-                "mismatch_type": MISMATCH_AMOUNT,
-                "severity": _classify_severity(MISMATCH_AMOUNT, {"amount_diff": booking_total - invoice_total}),
-                "source_of_truth": SOURCE_BOOKING,
-                "amount_expected": booking_total,
-                "amount_actual": invoice_total,
-                "tax_expected": float(b.get("tax_amount") or 0),
-                "tax_actual": float(inv.get("tax_breakdown", {}).get("total_tax") or inv.get("total_tax") or 0),
-                "age_bucket": _calc_age_bucket(invoice.get("created_at")),
-                "details": f"Tutar uyumsuzlugu: booking={booking_total}, fatura={invoice_total}",
-            })
-
-    return items
+    if since:
+        bq["created_at"] = {"$gte": since}
+
+    cursor = db.bookings.find(bq, _BOOKING_PROJECTION).sort("_id", 1).batch_size(JOIN_BATCH_SIZE)
+    async for batch in _batches(cursor):
+        booking_ids = [str(b.get("id") or b["_id"]) for b in batch]
+        invoices = await _first_by_key(
+            db.invoices,
+            {"tenant_id": tenant_id, "booking_id": {"$in": booking_ids}},
+            "booking_id",
+            _INVOICE_PROJECTION,
+        )
+
+        for booking, booking_id in zip(batch, booking_ids):
+            inv = invoices.get(booking_id)
+            if not inv:
+                age_bucket = _calc_age_bucket(booking.get("created_at"))
+                yield {
+                    "booking_id": booking_id,
+                    "invoice_id": None,
+                    "accounting_ref": None,
+                    "mismatch_type": MISMATCH_MISSING_INVOICE,
+                    "severity": _classify_severity(MISMATCH_MISSING_INVOICE),
+                    "source_of_truth": SOURCE_BOOKING,
+                    "amount_expected": booking.get("total_price") or booking.get("grand_total") or 0,
+                    "amount_actual": 0,
+                    "tax_expected": 0,
+                    "tax_actual": 0,
+                    "age_bucket": age_bucket,
+                    "details": f"Booking {booking_id} icin fatura bulunamadi",
+                }
+                continue
+
+            booking_total = float(booking.get("total_price") or booking.get("grand_total") or 0)
+            invoice_total = float(inv.get("grand_total") or 0)
+
+            if booking_total > 0 and invoice_total > 0 and abs(booking_total - invoice_total) > 0.01:
+                yield {
+                    "booking_id": booking_id,
+                    "invoice_id": inv.get("invoice_id"),
+                    "accounting_ref": inv.get("accounting_ref"),
+                    "mismatch_type": MISMATCH_AMOUNT,
+                    "severity": _classify_severity(MISMATCH_AMOUNT, {"amount_diff": booking_total - invoice_total}),
+                    "source_of_truth": SOURCE_BOOKING,
+                    "amount_expected": booking_total,
+                    "amount_actual": invoice_total,
+                    "tax_expected": float(booking.get("tax_amount") or 0),
+                    "tax_actual": float((inv.get("tax_breakdown") or {}).get("total_tax") or inv.get("total_tax") or 0),
+                    "age_bucket": _calc_age_bucket(inv.get("created_at")),
+                    "details": f"Tutar uyumsuzlugu: booking={booking_total}, fatura={invoice_total}",
+                }
 
 
 async def _compare_invoices_accounting(
-    db, tenant_id: str, lookback_hours: int | None,
-) -> list[dict]:
-    """Find issued invoices missing sync and sync mismatches."""
-    items = []
+    db, tenant_id: str, since=None,
+) -> AsyncIterator[dict]:
+    """Find issued invoices missing sync and sync mismatches.
+
+    Invoices are streamed in batches; each batch is joined to its latest
+    accounting sync job with a single `$in` query.
+    """
     iq: dict[str, Any] = {"tenant_id": tenant_id, "status": {"$in": ["issued", "synced", "sync_failed"]}}
-    if lookback_hours:
-        cutoff = now_utc() - timedelta(hours=lookback_hours)
-        iq["created_at"] = {"$gte": cutoff}
-
-    invoices = await db.invoices.find(iq).to_list(length=5000)
-
-    for invoice in invoices:
-        inv = serialize_doc(invoice)
-        invoice_id = inv.get("invoice_id", "")
-
-        sync_job = await db.accounting_sync_jobs.find_one({
-            "tenant_id": tenant_id,
-            "invoice_id": invoice_id,
-        })
-
-        if not sync_job:
-            age_bucket = _calc_age_bucket(invoice.get("created_at"))
-            items.append({
-                "booking_id": inv.get("booking_id"),
-                "invoice_id": invoice_id,
-                "accounting_ref": None,
-                "mismatch_type": MISMATCH_MISSING_SYNC,
-                "severity": _classify_severity(MISMATCH_MISSING_SYNC, {"age_bucket": age_bucket}),
-                "source_of_truth": SOURCE_INVOICE,
-                "amount_expected": float(inv.get("grand_total") or 0),
-                "amount_actual": 0,
-                "tax_expected": 0,
-                "tax_actual": 0,
-                "age_bucket": age_bucket,
-                "details": f"Fatura {invoice_id} muhasebe senkronizasyonu bulunamadi",
-            })
-            continue
-
-        sj = serialize_doc(sync_job)
-        if sj.get("status") == "failed" and (sj.get("attempt_count") or 0) >= 5:
-            items.append({
-                "booking_id": inv.get("booking_id"),
-                "invoice_id": invoice_id,
-                "accounting_ref": sj.get("external_ref"),
-                "mismatch_type": MISMATCH_STATUS,
-                "severity": SEVERITY_MEDIUM,
-                "source_of_truth": SOURCE_INVOICE,
-                "amount_expected": float(inv.get("grand_total") or 0),
-                "amount_actual": 0,
-                "tax_expected": 0,
-                "tax_actual": 0,
-                "age_bucket": _calc_age_bucket(sync_job.get("created_at")),
-                "details": f"Senkronizasyon kalici basarisiz: {sj.get('error_message', '')}",
-            })
-
-    return items
+    if since:
+        iq["created_at"] = {"$gte": since}
+
+    cursor = db.invoices.find(iq, _INVOICE_PROJECTION).sort("invoice_id", 1).batch_size(JOIN_BATCH_SIZE)
+    async for batch in _batches(cursor):
+        invoice_ids = [str(inv.get("invoice_id", "")) for inv in batch]
+        sync_jobs = await _first_by_key(
+            db.accounting_sync_jobs,
+            {"tenant_id": tenant_id, "invoice_id": {"$in": invoice_ids}},
+            "invoice_id",
+            _SYNC_JOB_PROJECTION,
+            sort=[("created_at", -1)],
+        )
+
+        for inv, invoice_id in zip(batch, invoice_ids):
+            sj = sync_jobs.get(invoice_id)
+            if not sj:
+                age_bucket = _calc_age_bucket(inv.get("created_at"))
+                yield {
+                    "booking_id": inv.get("booking_id"),
+                    "invoice_id": invoice_id,
+                    "accounting_ref": None,
+                    "mismatch_type": MISMATCH_MISSING_SYNC,
+                    "severity": _classify_severity(MISMATCH_MISSING_SYNC, {"age_bucket": age_bucket}),
+                    "source_of_truth": SOURCE_INVOICE,
+                    "amount_expected": float(inv.get("grand_total") or 0),
+                    "amount_actual": 0,
+                    "tax_expected": 0,
+                    "tax_actual": 0,
+                    "age_bucket": age_bucket,
+                    "details": f"Fatura {invoice_id} muhasebe senkronizasyonu bulunamadi",
+                }
+                continue
+
+            if sj.get("status") == "failed" and (sj.get("attempt_count") or 0) >= 5:
+                yield {
+                    "booking_id": inv.get("booking_id"),
+                    "invoice_id": invoice_id,
+                    "accounting_ref": sj.get("external_ref"),
+                    "mismatch_type": MISMATCH_STATUS,
+                    "severity": SEVERITY_MEDIUM,
+                    "source_of_truth": SOURCE_INVOICE,
+                    "amount_expected": float(inv.get("grand_total") or 0),
+                    "amount_actual": 0,
+                    "tax_expected": 0,
+                    "tax_actual": 0,
+                    "age_bucket": _calc_age_bucket(sj.get("created_at")),
+                    "details": f"Senkronizasyon kalici basarisiz: {sj.get('error_message', '')}",
+                }
 
 
 async def _detect_duplicates(
-    db, tenant_id: str, lookback_hours: int | None,
-) -> list[dict]:
+    db, tenant_id: str, since=None,
+) -> AsyncIterator[dict]:
     """Detect duplicate accounting entries for the same invoice."""
-    items = []
     jq: dict[str, Any] = {"tenant_id": tenant_id, "status": "synced"}
-    if lookback_hours:
-        cutoff = now_utc() - timedelta(hours=lookback_hours)
-        jq["created_at"] = {"$gte": cutoff}
+    if since:
+        jq["created_at"] = {"$gte": since}
 
     pipeline = [
         {"$match": jq},
         {"$group": {"_id": "$invoice_id", "count": {"$sum": 1}, "jobs": {"$push": "$job_id"}}},
         {"$match": {"count": {"$gt": 1}}},
     ]
-    async for dup in db.accounting_sync_jobs.aggregate(pipeline):
-        items.append({
+    async for dup in db.accounting_sync_jobs.aggregate(pipeline, allowDiskUse=True):
+        yield {
             "booking_id": None,
             "invoice_id": dup["_id"],
             "accounting_ref": None,
@@ -356,28 +462,7 @@ async def _detect_duplicates(
             "tax_actual": 0,
             "age_bucket": None,
             "details": f"Cift muhasebe kaydi: {len(dup.get('jobs', []))} adet sync job ({', '.join(dup.get('jobs', [])[:3])})",
-        })
-
-    return items
-
-
-def _build_stats(items: list[dict]) -> dict[str, Any]:
-    """Build summary statistics from mismatch items."""
-    by_type = {}
-    by_severity = {}
-    for item in items:
-        mt = item.get("mismatch_type", "unknown")
-        sev = item.get("severity", "low")
-        by_type[mt] = by_type.get(mt, 0) + 1
-        by_severity[sev] = by_severity.get(sev, 0) + 1
-
-    return {
-        "total_mismatches": len(items),
-        "by_type": by_type,
-        "by_severity": by_severity,
-        "critical_count": by_severity.get(SEVERITY_CRITICAL, 0),
-        "high_count": by_severity.get(SEVERITY_HIGH, 0),
-    }
+        }
 
 
 async def _generate_ops_items(db, tenant_id: str, run_id: str, items: list[dict]) -> None:
@@ -470,25 +555,28 @@ async def list_items(
 async def get_aging_stats(tenant_id: str) -> dict[str, Any]:
     """Get unsynced invoice aging statistics (CTO KPI)."""
     db = await get_db()
-    now_utc()
-
-    issued_invoices = await db.invoices.find({
-        "tenant_id": tenant_id,
-        "status": "issued",
-    }).to_list(length=10000)
 
     buckets = {AGE_0_1H: 0, AGE_1_6H: 0, AGE_6_24H: 0, AGE_GT_24H: 0}
-    for inv in issued_invoices:
-        # Check if sync job exists
-        sync = await db.accounting_sync_jobs.find_one({
-            "tenant_id": tenant_id,
-            "invoice_id": inv.get("invoice_id"),
-            "status": "synced",
-        })
-        if sync:
-            continue
-        bucket = _calc_age_bucket(inv.get("created_at"))
-        buckets[bucket] = buckets.get(bucket, 0) + 1
+    cursor = db.invoices.find(
+        {"tenant_id": tenant_id, "status": "issued"},
+        {"_id": 0, "invoice_id": 1, "created_at": 1},
+    ).batch_size(JOIN_BATCH_SIZE)
+    async for batch in _batches(cursor):
+        synced = await _first_by_key(
+            db.accounting_sync_jobs,
+            {
+                "tenant_id": tenant_id,
+                "invoice_id": {"$in": [inv.get("invoice_id") for inv in batch]},
+                "status": "synced",
+            },
+            "invoice_id",
+            {"_id": 0, "invoice_id": 1},
+        )
+        for inv in batch:
+            if str(inv.get("invoice_id")) in synced:
+                continue
+            bucket = _calc_age_bucket(inv.get("created_at"))
+            buckets[bucket] = buckets.get(bucket, 0) + 1
 
     return {
         "unsynced_aging": buckets,
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import hmac
+import logging
+import os
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, Response
 
 from app.bootstrap.runtime_init import ensure_jwt_secret, load_backend_env
 
@@ -12,152 +17,74 @@ def create_app() -> FastAPI:
     ensure_jwt_secret()
 
     from app.bootstrap.middleware_setup import configure_middlewares
-    from app.bootstrap.route_inventory import export_route_inventory_snapshot
     from app.bootstrap.domain_router_registry import register_routers
     from app.bootstrap.runtime_init import (
-        ensure_api_runtime_indexes,
-        ensure_service_runtime_indexes,
+        ensure_runtime_indexes,
         init_observability,
         load_sheets_config_from_db,
         shutdown_runtime_resources,
+        startup_phase,
     )
     from app.config import API_PREFIX, APP_NAME, APP_VERSION
     from app.db import close_mongo, connect_mongo, get_db
 
     @asynccontextmanager
     async def api_lifespan(_: FastAPI):
-        init_observability()
-        await connect_mongo()
+        boot_started = time.perf_counter()
+        with startup_phase("observability", fatal=True):
+            init_observability()
+        with startup_phase("mongo_connect", fatal=True):
+            await connect_mongo()
         db = await get_db()
-        await ensure_api_runtime_indexes(db)
-        await ensure_service_runtime_indexes()
-        await load_sheets_config_from_db(db)
 
-        # Apply MongoDB schema validation (warn mode in dev, error in prod)
-        try:
-            from app.indexes.schema_validation import apply_schema_validation
-            import os
-            strict = os.environ.get("ENV", "dev").lower() in ("production", "prod")
-            await apply_schema_validation(db, strict=strict)
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Schema validation setup: %s", exc)
-
-        # Apply scalability indexes
-        try:
-            from app.indexes.scalability_indexes import ensure_scalability_indexes
-            await ensure_scalability_indexes(db)
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Scalability indexes setup: %s", exc)
+        # Indexes + schema validation: skipped entirely when the stored
+        # manifest hash matches (see app.indexes.manifest).
+        with startup_phase("indexes", fatal=True):
+            await ensure_runtime_indexes(db)
+        with startup_phase("sheets_config", fatal=True):
+            await load_sheets_config_from_db(db)
 
-        # Initialize observability
-        try:
+        with startup_phase("Metrics snapshot flusher"):
+            from app.infrastructure.metrics_registry import start_metrics_flusher
+            start_metrics_flusher()
+
+        with startup_phase("OpenTelemetry init"):
             from app.infrastructure.observability import init_opentelemetry
             init_opentelemetry("syroce-api")
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("OpenTelemetry init: %s", exc)
 
         # Initialize supplier ecosystem
-        try:
+        with startup_phase("Supplier registry init"):
             from app.suppliers.registry import register_default_adapters
             register_default_adapters()
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Supplier registry init: %s", exc)
 
-        try:
-            from app.suppliers.indexes import ensure_supplier_ecosystem_indexes
-            await ensure_supplier_ecosystem_indexes(db)
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Supplier ecosystem indexes: %s", exc)
-
-        try:
+        with startup_phase("Supplier event handlers"):
             from app.suppliers.events import register_supplier_event_handlers
             register_supplier_event_handlers()
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Supplier event handlers: %s", exc)
-
-        # Initialize Operations Layer indexes
-        try:
-            from app.suppliers.operations.indexes import ensure_operations_indexes
-            await ensure_operations_indexes(db)
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Operations indexes: %s", exc)
-
-        # Initialize Governance Layer indexes
-        try:
-            from app.domain.governance.indexes import ensure_governance_indexes
-            await ensure_governance_indexes(db)
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Governance indexes: %s", exc)
-
-        # Initialize Integration Reliability indexes
-        try:
-            from app.domain.reliability.indexes import ensure_reliability_indexes
-            await ensure_reliability_indexes(db)
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Reliability indexes: %s", exc)
-
-        # Initialize Inventory Sync indexes
-        try:
-            from app.services.inventory_sync_service import ensure_inventory_indexes
-            await ensure_inventory_indexes()
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Inventory indexes setup: %s", exc)
-
-        # Initialize Supplier Config indexes
-        try:
-            from app.services.supplier_config_service import ensure_supplier_config_indexes
-            await ensure_supplier_config_indexes()
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Supplier config indexes: %s", exc)
 
         # Register Event-Cache Invalidation Bridge
-        try:
+        with startup_phase("Event-cache bridge"):
             from app.infrastructure.event_cache_bridge import register_cache_invalidation_handlers
             register_cache_invalidation_handlers()
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Event-cache bridge: %s", exc)
+
+        # Handlers registered: publish now enqueues instead of running them inline.
+        with startup_phase("Event dispatcher start"):
+            from app.infrastructure.event_bus import start_event_dispatcher
+            start_event_dispatcher()
 
         # Start Job Scheduler
-        try:
+        with startup_phase("Job scheduler start"):
             from app.services.job_scheduler_service import start_scheduler
             start_scheduler()
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Job scheduler start: %s", exc)
-
-        # Ensure Outbox Consumer indexes
-        try:
-            await db.outbox_events.create_index([("status", 1), ("created_at", 1)])
-            await db.outbox_events.create_index("organization_id")
-            await db.outbox_consumer_results.create_index(
-                [("event_id", 1), ("handler", 1)], unique=True
-            )
-            await db.outbox_consumer_log.create_index([("processed_at", -1)])
-            await db.outbox_dead_letters.create_index([("dead_lettered_at", -1)])
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Outbox indexes: %s", exc)
 
         # Start Syroce PMS B2B polling service (Scenario B real-time path).
         # Self-gates: dormant until onboarded + polling enabled. No-op if no base URL.
-        try:
+        with startup_phase("Syroce B2B polling start"):
             from app.services.syroce_b2b.polling import start_polling
             start_polling()
-        except Exception as exc:
-            import logging
-            logging.getLogger("startup").warning("Syroce B2B polling start: %s", exc)
+
+        logging.getLogger("startup").info(
+            "API startup complete in %.1fms", (time.perf_counter() - boot_started) * 1000,
+        )
 
         yield
 
@@ -168,6 +95,24 @@ def create_app() -> FastAPI:
         except Exception:
             pass
 
+        try:
+            from app.infrastructure.event_bus import drain_event_dispatcher
+            await drain_event_dispatcher()
+        except Exception:
+            pass
+
+        try:
+            from app.infrastructure.metrics_registry import stop_metrics_flusher
+            await stop_metrics_flusher()
+        except Exception:
+            pass
+
+        try:
+            from app.services.suppliers.registry import registry as adapter_registry
+            await adapter_registry.clients.aclose()
+        except Exception:
+            pass
+
         shutdown_runtime_resources()
         # Shutdown Redis
         try:
@@ -185,7 +130,11 @@ def create_app() -> FastAPI:
     )
 
     configure_middlewares(app)
-    register_routers(app)
+    router_timings = register_routers(app)
+    logging.getLogger("startup").info(
+        "Routers registered: %d mounts in %.1fms",
+        len(router_timings), sum(router_timings.values()),
+    )
 
     @app.get("/")
     async def read_root() -> dict[str, str]:
@@ -195,7 +144,19 @@ def create_app() -> FastAPI:
     async def health_check() -> dict[str, str]:
         return {"status": "ok"}
 
-    export_route_inventory_snapshot(app)
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request) -> Response:
+        """Prometheus scrape target (all workers merged).
+
+        When METRICS_SCRAPE_TOKEN is set the scraper must send it as a
+        bearer token.
+        """
+        from app.infrastructure.metrics_registry import render_prometheus
+
+        token = os.environ.get("METRICS_SCRAPE_TOKEN", "")
+        if token and not hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {token}"):
+            return Response(status_code=401)
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
     return app
 
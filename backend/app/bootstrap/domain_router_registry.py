@@ -21,18 +21,104 @@ Domain Structure (16 domains):
   15. WEBHOOKS   — organization-scoped webhooks + admin
 
 Legacy routers remaining in registry: 2 (orphan migration, outbox admin)
+Router load modes (ROUTER_LOAD_MODE):
+  eager (default) — every mount below is imported and included at create_app
+  lazy            — mounts marked eager plus the v1 aliases are included at
+                    create_app; each domain is imported on the first request
+                    to one of its path prefixes (see lazy_router_loader.py)
 """
+
 from __future__ import annotations
 
+import logging
+import os
+import time
+from dataclasses import dataclass
+from importlib import import_module
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.exception_handlers import register_exception_handlers
 
+logger = logging.getLogger("bootstrap.routers")
+
+LOAD_MODE_EAGER = "eager"
+LOAD_MODE_LAZY = "lazy"
+
+
+@dataclass(frozen=True)
+class RouterMount:
+    name: str
+    target: str  # "module:attribute"
+    prefix: str = ""
+    eager: bool = False  # always included at startup, even in lazy mode
+
+
+# Registration order is route precedence; lazy mode keeps it (see
+# LazyRouterLoader) so both modes resolve overlapping paths identically.
+DOMAIN_ROUTER_MOUNTS: Tuple[RouterMount, ...] = (
+    # DOMAIN 0: TENANT ISOLATION (Security Boundary)
+    RouterMount("tenant", "app.modules.tenant.router:router", eager=True),
+    # Legacy admin: Orphan Migration + Outbox (kept here — cross-domain utilities)
+    RouterMount("orphan_migration", "app.modules.enterprise.routers.admin_orphan_migration:router", eager=True),
+    RouterMount("outbox_admin", "app.modules.operations.routers.admin_outbox:router", prefix="/api", eager=True),
+    # Webhook System (Organization-scoped + Admin)
+    RouterMount("webhooks", "app.modules.system.routers.webhooks:router", prefix="/api", eager=True),
+    RouterMount("admin_webhooks", "app.modules.system.routers.admin_webhooks:router", prefix="/api", eager=True),
+    # DOMAINS 1-14. BOOKING stays eager: its package __init__ imports routers
+    # whose services other domains (pricing, reporting, mobile) import back,
+    # which only resolves when booking is imported first.
+    RouterMount("booking", "app.modules.booking:domain_router", eager=True),
+    RouterMount("auth", "app.modules.auth:domain_router", eager=True),
+    RouterMount("identity", "app.modules.identity:domain_router"),
+    RouterMount("b2b", "app.modules.b2b:domain_router"),
+    RouterMount("supplier", "app.modules.supplier:domain_router"),
+    RouterMount("finance", "app.modules.finance:domain_router"),
+    RouterMount("crm", "app.modules.crm:domain_router"),
+    RouterMount("operations", "app.modules.operations:domain_router"),
+    RouterMount("enterprise", "app.modules.enterprise:domain_router"),
+    RouterMount("system", "app.modules.system:domain_router"),
+    RouterMount("inventory", "app.modules.inventory:domain_router"),
+    RouterMount("pricing", "app.modules.pricing:domain_router"),
+    RouterMount("public", "app.modules.public:domain_router"),
+    RouterMount("reporting", "app.modules.reporting:domain_router"),
+    # CUSTOMER PORTAL (registered directly to avoid circular imports in public domain)
+    RouterMount("customer_portal", "app.modules.operations.routers.customer_portal:router"),
+    # SYROCE B2B INBOUND WEBHOOK (public; PMS authenticates via signed body)
+    RouterMount("syroce_b2b_inbound", "app.services.syroce_b2b.webhook_routes:router"),
+)
+
+
+def router_load_mode() -> str:
+    mode = os.environ.get("ROUTER_LOAD_MODE", LOAD_MODE_EAGER).strip().lower()
+    return mode if mode in (LOAD_MODE_EAGER, LOAD_MODE_LAZY) else LOAD_MODE_EAGER
 
-def register_routers(app: FastAPI) -> None:
+
+def resolve_mount(mount: RouterMount) -> Any:
+    module_name, attr = mount.target.split(":")
+    return getattr(import_module(module_name), attr)
+
+
+def include_mount(app: FastAPI, mount: RouterMount) -> float:
+    """Import and include one mount; returns elapsed milliseconds."""
+    started = time.perf_counter()
+    router = resolve_mount(mount)
+    if mount.prefix:
+        app.include_router(router, prefix=mount.prefix)
+    else:
+        app.include_router(router)
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def register_routers(app: FastAPI, *, mode: Optional[str] = None) -> Dict[str, float]:
+    """Register exception handlers, static files and domain routers.
+
+    Returns per-mount include time in ms (mounts deferred by lazy mode are
+    absent).
+    """
     register_exception_handlers(app)
 
     # Static files — tour images are intentionally PUBLIC (storefront/SEO).
@@ -42,124 +128,21 @@ def register_routers(app: FastAPI) -> None:
     uploads_dir.mkdir(parents=True, exist_ok=True)
     app.mount("/api/uploads/tours", StaticFiles(directory=str(uploads_dir)), name="tour_uploads")
 
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 0: TENANT ISOLATION (Security Boundary)
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.tenant.router import router as tenant_isolation_router
-    app.include_router(tenant_isolation_router)
+    if (mode or router_load_mode()) == LOAD_MODE_LAZY:
+        from app.bootstrap.lazy_router_loader import install_lazy_router_loader
 
-    # Legacy admin: Orphan Migration + Outbox (kept here — cross-domain utilities)
-    from app.modules.enterprise.routers.admin_orphan_migration import router as orphan_migration_router
-    app.include_router(orphan_migration_router)
-
-    from app.modules.operations.routers.admin_outbox import router as outbox_admin_router
-    app.include_router(outbox_admin_router, prefix="/api")
-
-    # Webhook System (Organization-scoped + Admin)
-    from app.modules.system.routers.webhooks import router as webhooks_router
-    app.include_router(webhooks_router, prefix="/api")
-
-    from app.modules.system.routers.admin_webhooks import router as admin_webhooks_router
-    app.include_router(admin_webhooks_router, prefix="/api")
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 1: BOOKING
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.booking import domain_router as booking_domain
-    app.include_router(booking_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 2: AUTH
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.auth import domain_router as auth_domain
-    app.include_router(auth_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 3: IDENTITY
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.identity import domain_router as identity_domain
-    app.include_router(identity_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 4: B2B
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.b2b import domain_router as b2b_domain
-    app.include_router(b2b_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 5: SUPPLIER
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.supplier import domain_router as supplier_domain
-    app.include_router(supplier_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 6: FINANCE
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.finance import domain_router as finance_domain
-    app.include_router(finance_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 7: CRM
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.crm import domain_router as crm_domain
-    app.include_router(crm_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 8: OPERATIONS
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.operations import domain_router as operations_domain
-    app.include_router(operations_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 9: ENTERPRISE
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.enterprise import domain_router as enterprise_domain
-    app.include_router(enterprise_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 10: SYSTEM
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.system import domain_router as system_domain
-    app.include_router(system_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 11: INVENTORY
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.inventory import domain_router as inventory_domain
-    app.include_router(inventory_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 12: PRICING
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.pricing import domain_router as pricing_domain
-    app.include_router(pricing_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 13: PUBLIC
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.public import domain_router as public_domain
-    app.include_router(public_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # DOMAIN 14: REPORTING
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.reporting import domain_router as reporting_domain
-    app.include_router(reporting_domain)
-
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # CUSTOMER PORTAL (registered directly to avoid circular imports in public domain)
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.modules.operations.routers.customer_portal import router as customer_portal_router
-    app.include_router(customer_portal_router)
+        loader = install_lazy_router_loader(app, DOMAIN_ROUTER_MOUNTS)
+        # V1 ALIASES (backward compatibility) — ranked after every domain.
+        from app.bootstrap.v1_registry import register_v1_routers
+        register_v1_routers(app)
+        loader.mark_tail()
+        return dict(loader.timings)
 
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # SYROCE B2B INBOUND WEBHOOK (public; PMS authenticates via signed body)
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    from app.services.syroce_b2b.webhook_routes import router as syroce_b2b_inbound_router
-    app.include_router(syroce_b2b_inbound_router)
+    timings: Dict[str, float] = {}
+    for mount in DOMAIN_ROUTER_MOUNTS:
+        timings[mount.name] = include_mount(app, mount)
 
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # V1 ALIASES (backward compatibility)
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     from app.bootstrap.v1_registry import register_v1_routers
     register_v1_routers(app)
+    return timings
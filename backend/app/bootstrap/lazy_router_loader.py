@@ -0,0 +1,219 @@
+"""Lazily mounted domain routers (ROUTER_LOAD_MODE=lazy).
+
+Importing all 16 domains (~1.6k routes and everything they pull in) is most
+of the API's cold start. In lazy mode only eager mounts are included at
+create_app; the rest are imported on the first request whose path falls
+under one of their prefixes:
+
+  request path → "/seg1/seg2" and "/seg1" keys → router_prefix_map.json
+               → import + include the owning mounts → re-sort routes
+
+The prefix map is a build artifact written by
+``scripts/export_route_inventory.py`` next to route_inventory.json. A mount
+missing from the map is included at startup, so a stale map costs cold
+start, never routes.
+
+Precedence: every route is ranked by its mount's position in
+DOMAIN_ROUTER_MOUNTS and ``app.router.routes`` is stably re-sorted after
+each load, so overlapping paths resolve exactly as in eager mode.
+
+Requests that no pending mount claims and no loaded route matches (plus
+the OpenAPI/docs pages) load everything, so 404s and the schema stay
+authoritative.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.bootstrap.domain_router_registry import RouterMount, include_mount, resolve_mount
+
+logger = logging.getLogger("bootstrap.lazy_routers")
+
+DEFAULT_ROUTER_PREFIX_MAP_PATH = Path(__file__).resolve().parent / "router_prefix_map.json"
+_V1_PREFIX = "/api/v1/"
+
+
+def _route_paths(route: BaseRoute) -> List[str]:
+    path = getattr(route, "path", None)
+    return [path] if path else []
+
+
+def prefix_keys(path: str) -> List[str]:
+    """Lookup keys for a path: first two segments, then the first alone.
+
+    A templated second segment (``/api/{id}``) only yields the one-segment
+    key, which then claims every path under it.
+    """
+    parts = [p for p in path.split("/") if p]
+    keys: List[str] = []
+    if len(parts) >= 2 and "{" not in parts[1]:
+        keys.append(f"/{parts[0]}/{parts[1]}")
+    if parts and "{" not in parts[0]:
+        keys.append(f"/{parts[0]}")
+    return keys
+
+
+def _route_key(path: str) -> Optional[str]:
+    keys = prefix_keys(path)
+    return keys[0] if keys else None
+
+
+def build_router_prefix_map(mounts: Sequence[RouterMount]) -> Dict[str, List[str]]:
+    """Path prefixes served by each mount (imports every mount)."""
+    prefix_map: Dict[str, List[str]] = {}
+    for mount in mounts:
+        router = resolve_mount(mount)
+        keys: Set[str] = set()
+        for route in router.routes:
+            for path in _route_paths(route):
+                key = _route_key(mount.prefix + path)
+                if key:
+                    keys.add(key)
+        prefix_map[mount.name] = sorted(keys)
+    return prefix_map
+
+
+def write_router_prefix_map(
+    mounts: Sequence[RouterMount],
+    destination: str | Path = DEFAULT_ROUTER_PREFIX_MAP_PATH,
+) -> Path:
+    target = Path(destination)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(build_router_prefix_map(mounts), indent=2, sort_keys=True) + "\n")
+    return target
+
+
+def load_router_prefix_map(source: str | Path = DEFAULT_ROUTER_PREFIX_MAP_PATH) -> Dict[str, List[str]]:
+    try:
+        return json.loads(Path(source).read_text())
+    except (OSError, ValueError) as exc:
+        logger.warning("router prefix map unavailable (%s); lazy mounts load at startup", exc)
+        return {}
+
+
+class LazyRouterLoader:
+    def __init__(
+        self,
+        app: FastAPI,
+        mounts: Sequence[RouterMount],
+        prefix_map: Dict[str, List[str]],
+    ) -> None:
+        self.app = app
+        self.mounts = tuple(mounts)
+        self.timings: Dict[str, float] = {}
+        self._tail_rank = len(self.mounts)
+        self._rank: Dict[int, int] = {id(r): -1 for r in app.router.routes}
+        self._pending: Dict[str, int] = {}
+        self._by_key: Dict[str, Set[str]] = {}
+
+        for index, mount in enumerate(self.mounts):
+            keys = prefix_map.get(mount.name)
+            if mount.eager or not keys:
+                self._include(index)
+                continue
+            self._pending[mount.name] = index
+            for key in keys:
+                self._by_key.setdefault(key, set()).add(mount.name)
+
+    @property
+    def complete(self) -> bool:
+        return not self._pending
+
+    @property
+    def pending(self) -> List[str]:
+        return sorted(self._pending, key=self._pending.__getitem__)
+
+    def _include(self, index: int) -> None:
+        mount = self.mounts[index]
+        before = len(self.app.router.routes)
+        self.timings[mount.name] = include_mount(self.app, mount)
+        for route in self.app.router.routes[before:]:
+            self._rank[id(route)] = index
+
+    def mark_tail(self) -> None:
+        """Rank routes added since the last include after every mount (v1 aliases)."""
+        for route in self.app.router.routes:
+            self._rank.setdefault(id(route), self._tail_rank)
+
+    def load(self, names: Iterable[str]) -> List[str]:
+        indexes = sorted(self._pending.pop(name) for name in set(names) if name in self._pending)
+        if not indexes:
+            return []
+        for index in indexes:
+            self._include(index)
+        # Routes added outside the loader (e.g. "/" and "/health" in
+        # create_app) came after the aliases in eager mode too.
+        unranked = self._tail_rank + 1
+        self.app.router.routes.sort(key=lambda r: self._rank.get(id(r), unranked))
+        self.app.openapi_schema = None
+        loaded = [self.mounts[i].name for i in indexes]
+        logger.info(
+            "lazy routers loaded: %s (%.1fms, %d pending)",
+            ",".join(loaded), sum(self.timings[n] for n in loaded), len(self._pending),
+        )
+        return loaded
+
+    def load_all(self) -> List[str]:
+        return self.load(list(self._pending))
+
+    def _matches_loaded(self, scope: Scope) -> bool:
+        for route in self.app.router.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return True
+        return False
+
+    def mounts_for_path(self, path: str) -> Set[str]:
+        if path.startswith(_V1_PREFIX):
+            path = "/api/" + path[len(_V1_PREFIX):]
+        names: Set[str] = set()
+        for key in prefix_keys(path):
+            names |= self._by_key.get(key, set())
+        return {n for n in names if n in self._pending}
+
+    def ensure_for_scope(self, scope: Scope) -> None:
+        if not self._pending:
+            return
+        path = scope.get("path", "")
+        if path in (self.app.openapi_url, self.app.docs_url, self.app.redoc_url):
+            self.load_all()
+            return
+        names = self.mounts_for_path(path)
+        if names:
+            self.load(names)
+        elif not self._matches_loaded(scope):
+            self.load_all()
+
+
+class LazyRouterMiddleware:
+    """Outermost ASGI hook: make sure the owning domain is mounted before routing."""
+
+    def __init__(self, app: ASGIApp, loader: LazyRouterLoader) -> None:
+        self.app = app
+        self.loader = loader
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and not self.loader.complete:
+            self.loader.ensure_for_scope(scope)
+        await self.app(scope, receive, send)
+
+
+def install_lazy_router_loader(
+    app: FastAPI,
+    mounts: Sequence[RouterMount],
+    prefix_map: Optional[Dict[str, List[str]]] = None,
+) -> LazyRouterLoader:
+    loader = LazyRouterLoader(
+        app, mounts, load_router_prefix_map() if prefix_map is None else prefix_map,
+    )
+    app.state.lazy_router_loader = loader
+    app.add_middleware(LazyRouterMiddleware, loader=loader)
+    logger.info("lazy router mode: %d mounts deferred (%s)", len(loader.pending), ",".join(loader.pending))
+    return loader
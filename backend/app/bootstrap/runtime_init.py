@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import logging
 import os
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -58,65 +60,39 @@ def init_observability() -> None:
     init_sentry()
 
 
-async def ensure_api_runtime_indexes(db) -> None:
-    from app.indexes import crm_indexes, finance_indexes, funnel_indexes, inbox_indexes, pricing_indexes, public_indexes, voucher_indexes
-    from app.indexes.api_keys_indexes import ensure_api_keys_indexes
-    from app.indexes.integration_hub_indexes import ensure_integration_hub_indexes
-    from app.indexes.jobs_indexes import ensure_jobs_indexes
-    from app.indexes.marketplace_indexes import ensure_marketplace_indexes, ensure_offers_indexes
-    from app.indexes.pricing_indexes import ensure_pricing_indexes
-    from app.indexes.rate_limit_indexes import ensure_rate_limit_indexes
-    from app.indexes.seed_indexes import ensure_seed_indexes
-    from app.indexes.storefront_indexes import ensure_storefront_indexes
-    from app.indexes.tenant_indexes import ensure_tenant_indexes
+@contextmanager
+def startup_phase(name: str, *, fatal: bool = False):
+    """Log how long one startup phase took.
 
+    Failures of non-fatal phases are logged and swallowed so the API still
+    boots with the feature degraded.
+    """
+    started = time.perf_counter()
     try:
-        await cleanup_nonprod_test_databases(db)
-        await finance_indexes.ensure_finance_indexes(db)
-        await inbox_indexes.ensure_inbox_indexes(db)
-        await pricing_indexes.ensure_pricing_indexes(db)
-        await voucher_indexes.ensure_voucher_indexes(db)
-        await public_indexes.ensure_public_indexes(db)
-        await crm_indexes.ensure_crm_indexes(db)
-        await funnel_indexes.ensure_funnel_indexes(db)
-        await ensure_jobs_indexes(db)
-        await ensure_integration_hub_indexes(db)
-        await ensure_api_keys_indexes(db)
-        await ensure_rate_limit_indexes(db)
-        await ensure_tenant_indexes(db)
-        await ensure_storefront_indexes(db)
-        await ensure_pricing_indexes(db)
-        await ensure_marketplace_indexes(db)
-        await ensure_offers_indexes(db)
-        await ensure_seed_indexes(db)
-        # Webhook system indexes
-        from app.services.webhook_service import ensure_webhook_indexes
-        await ensure_webhook_indexes(db)
+        yield
     except Exception as exc:
-        logger.warning("Index creation failed (non-fatal, may lack permissions): %s", str(exc)[:200])
+        if fatal:
+            raise
+        logging.getLogger("startup").warning("%s: %s", name, exc)
+    finally:
+        logging.getLogger("startup").info(
+            "startup phase %s: %.1fms", name, (time.perf_counter() - started) * 1000,
+        )
+
 
+async def ensure_runtime_indexes(db) -> dict:
+    """Reconcile all startup indexes via the hashed manifest (app.indexes.manifest)."""
+    from app.indexes.manifest import apply_index_manifest
 
-async def ensure_service_runtime_indexes() -> None:
     try:
-        from app.services.agency_contracts_service import ensure_agency_contract_indexes
-        from app.services.distributed_lock_service import ensure_lock_indexes
-        from app.services.gdpr_service import ensure_gdpr_indexes
-        from app.services.inventory_snapshot_service import ensure_inventory_snapshot_indexes
-        from app.services.mongo_cache_service import ensure_cache_indexes
-        from app.services.refresh_token_service import ensure_refresh_token_indexes
-        from app.services.session_service import ensure_session_indexes
-        from app.services.token_blacklist import ensure_blacklist_indexes
-
-        await ensure_blacklist_indexes()
-        await ensure_refresh_token_indexes()
-        await ensure_session_indexes()
-        await ensure_gdpr_indexes()
-        await ensure_agency_contract_indexes()
-        await ensure_cache_indexes()
-        await ensure_inventory_snapshot_indexes()
-        await ensure_lock_indexes()
+        await cleanup_nonprod_test_databases(db)
+    except Exception as exc:
+        logger.warning("Test database cleanup failed (non-fatal): %s", str(exc)[:200])
+    try:
+        return await apply_index_manifest(db)
     except Exception as exc:
-        logger.warning("Service index creation failed (non-fatal): %s", str(exc)[:200])
+        logger.warning("Index creation failed (non-fatal, may lack permissions): %s", str(exc)[:200])
+        return {"status": "failed", "error": str(exc)[:200]}
 
 
 async def load_sheets_config_from_db(db) -> None:
@@ -0,0 +1,111 @@
+"""Import-time startup profile.
+
+Runs the API entrypoint in a child interpreter under ``-X importtime`` and
+turns the stderr report into a JSON tree (self/cumulative ms per module,
+children nested as imported), plus the slowest modules and a roll-up per
+app package (``app.modules.finance``, ``app.services`` ...).
+
+Used by ``scripts/startup_profile.py``; compare ROUTER_LOAD_MODE=eager vs
+lazy to see what a domain costs at boot.
+"""
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_PROFILE_TARGET = "app.bootstrap.api_app"
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)\s*$")
+
+
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into a forest of module nodes.
+
+    Children are printed before their parent, indented two spaces deeper,
+    so nodes wait in a per-depth list until the parent line claims them.
+    """
+    pending: Dict[int, List[Dict[str, Any]]] = {}
+    for line in text.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = {
+            "module": name,
+            "self_ms": round(int(self_us) / 1000, 3),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 3),
+            "children": pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def _walk(nodes: List[Dict[str, Any]]):
+    for node in nodes:
+        yield node
+        yield from _walk(node["children"])
+
+
+def _package_of(module: str) -> Optional[str]:
+    parts = module.split(".")
+    if parts[0] != "app":
+        return None
+    if len(parts) >= 3 and parts[1] == "modules":
+        return ".".join(parts[:3])
+    return ".".join(parts[:2])
+
+
+def summarize_profile(tree: List[Dict[str, Any]], *, top: int = 30, max_depth: Optional[int] = None) -> Dict[str, Any]:
+    nodes = list(_walk(tree))
+    by_package: Dict[str, float] = {}
+    for node in nodes:
+        package = _package_of(node["module"])
+        if package:
+            by_package[package] = by_package.get(package, 0.0) + node["self_ms"]
+
+    def _trim(items: List[Dict[str, Any]], depth: int) -> List[Dict[str, Any]]:
+        if max_depth is not None and depth >= max_depth:
+            return []
+        return [{**n, "children": _trim(n["children"], depth + 1)} for n in items]
+
+    return {
+        "total_ms": round(sum(n["cumulative_ms"] for n in tree), 1),
+        "module_count": len(nodes),
+        "slowest_self": [
+            {"module": n["module"], "self_ms": n["self_ms"]}
+            for n in sorted(nodes, key=lambda n: n["self_ms"], reverse=True)[:top]
+        ],
+        "by_package_ms": {k: round(v, 1) for k, v in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)},
+        "tree": _trim(tree, 0),
+    }
+
+
+def profile_imports(
+    target: str = DEFAULT_PROFILE_TARGET,
+    *,
+    env: Optional[Dict[str, str]] = None,
+    top: int = 30,
+    max_depth: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Import `target` in a fresh interpreter and return the summarized tree."""
+    child_env = {**os.environ, **(env or {})}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=str(BACKEND_ROOT),
+        env=child_env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")][-20:]
+        raise RuntimeError(f"import {target} failed:\n" + "\n".join(tail))
+    summary = summarize_profile(parse_importtime(proc.stderr), top=top, max_depth=max_depth)
+    summary["target"] = target
+    summary["router_load_mode"] = child_env.get("ROUTER_LOAD_MODE", "eager")
+    return summary
@@ -136,6 +136,9 @@ async def main() -> None:
             with contextlib.suppress(asyncio.CancelledError):
                 await task
         heartbeat.mark_stopped(details=_worker_snapshot())
+        with contextlib.suppress(Exception):
+            from app.services.suppliers.registry import registry as adapter_registry
+            await adapter_registry.clients.aclose()
         shutdown_runtime_resources()
         await close_mongo()
 
@@ -11,6 +11,8 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any, Optional
 
+from app.repositories.base_repository import keyset_page
+
 logger = logging.getLogger("governance.audit")
 
 
@@ -79,8 +81,13 @@ async def search_audit_logs(
     to_date: Optional[datetime] = None,
     limit: int = 50,
     skip: int = 0,
+    cursor: Optional[str] = None,
 ) -> dict:
-    """Search audit logs with filters."""
+    """Search audit logs with filters.
+
+    The first page and any `cursor` page use keyset pagination on
+    (timestamp, _id); `skip` remains for legacy clients.
+    """
     query: dict[str, Any] = {"organization_id": org_id}
     if actor_email:
         query["actor_email"] = actor_email
@@ -98,6 +105,25 @@ async def search_audit_logs(
             ts_filter["$lte"] = to_date
         query["timestamp"] = ts_filter
 
+    if cursor or not skip:
+        page = await keyset_page(
+            db.gov_audit_log,
+            query,
+            sort=[("timestamp", -1)],
+            limit=limit,
+            cursor=cursor,
+            projection={"_id": 0},
+            count="capped",
+        )
+        return {
+            "total": page["total"],
+            "total_capped": page["total_capped"],
+            "items": page["items"],
+            "limit": limit,
+            "skip": 0,
+            "next_cursor": page["next_cursor"],
+        }
+
     total = await db.gov_audit_log.count_documents(query)
     docs = await db.gov_audit_log.find(
         query, {"_id": 0}
@@ -108,6 +134,7 @@ async def search_audit_logs(
         "items": docs,
         "limit": limit,
         "skip": skip,
+        "next_cursor": None,
     }
 
 
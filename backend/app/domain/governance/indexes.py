@@ -8,6 +8,8 @@ import logging
 
 from pymongo import ASCENDING, DESCENDING, IndexModel
 
+from app.indexes.manifest import report_index_failure
+
 logger = logging.getLogger("governance.indexes")
 
 
@@ -80,4 +82,5 @@ async def ensure_governance_indexes(db) -> None:
 
         logger.info("Governance indexes created successfully")
     except Exception as exc:
+        report_index_failure("governance", exc)
         logger.warning("Governance indexes setup: %s", exc)
@@ -5,6 +5,8 @@ import logging
 
 from pymongo import ASCENDING, DESCENDING, IndexModel
 
+from app.indexes.manifest import report_index_failure
+
 logger = logging.getLogger("reliability.indexes")
 
 
@@ -101,4 +103,5 @@ async def ensure_reliability_indexes(db) -> None:
 
         logger.info("Integration reliability indexes created successfully")
     except Exception as exc:
+        report_index_failure("reliability", exc)
         logger.warning("Reliability indexes setup: %s", exc)
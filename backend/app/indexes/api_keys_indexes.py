@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from pymongo import ASCENDING
 
+from app.indexes.manifest import report_index_failure
+
 
 async def ensure_api_keys_indexes(db):
     async def _safe_create(collection, *args, **kwargs):
         try:
             await collection.create_index(*args, **kwargs)
-        except Exception:
+        except Exception as exc:
+            report_index_failure(f"{collection.name}.{kwargs.get('name')}", exc)
             return
 
     await _safe_create(
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pymongo import ASCENDING, DESCENDING
 
+from app.indexes.manifest import report_index_failure
+
 
 async def ensure_crm_indexes(db):
     """Ensure indexes for CRM-related collections (customers, deals, tasks, activities).
@@ -18,6 +20,7 @@ async def ensure_crm_indexes(db):
         try:
             await collection.create_index(keys, **kwargs)
         except Exception as exc:
+            report_index_failure(f"{collection.name}.{name}", exc)
             logger.warning("Failed to ensure index %s on %s: %s", name, collection.name, exc)
 
     # customers
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pymongo import ASCENDING
 
+from app.indexes.manifest import report_index_failure
+
 
 async def ensure_funnel_indexes(db):
     """Ensure indexes for funnel_events collection.
@@ -18,6 +20,7 @@ async def ensure_funnel_indexes(db):
         try:
             await collection.create_index(keys, **kwargs)
         except Exception as exc:
+            report_index_failure(f"{collection.name}.{name}", exc)
             logger.warning("Failed to ensure index %s on %s: %s", name, collection.name, exc)
 
     await _safe_create(
@@ -6,6 +6,8 @@ import logging
 from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import OperationFailure
 
+from app.indexes.manifest import report_index_failure
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +18,7 @@ async def ensure_inbox_indexes(db):
         try:
             await collection.create_index(*args, **kwargs)
         except OperationFailure as e:  # pragma: no cover - defensive
+            report_index_failure(f"{collection.name}.{kwargs.get('name')}", e)
             msg = str(e).lower()
             if (
                 "indexoptionsconflict" in msg
@@ -4,6 +4,8 @@ from datetime import timedelta
 
 from pymongo import ASCENDING
 
+from app.indexes.manifest import report_index_failure
+
 
 async def ensure_jobs_indexes(db):
     """Ensure indexes for generic jobs collection.
@@ -17,8 +19,9 @@ async def ensure_jobs_indexes(db):
     async def _safe_create(collection, keys, **kwargs):
         try:
             await collection.create_index(keys, **kwargs)
-        except Exception:
+        except Exception as exc:
             # Index creation failures must not crash app in preview/dev
+            report_index_failure(f"{collection.name}.{kwargs.get('name')}", exc)
             return
 
     await _safe_create(
@@ -42,6 +45,7 @@ async def ensure_jobs_indexes(db):
             expireAfterSeconds=int(timedelta(days=30).total_seconds()),
             partialFilterExpression={"status": "succeeded"},
         )
-    except Exception:
+    except Exception as exc:
         # Non-fatal in dev/preview
+        report_index_failure("jobs.ttl_jobs_succeeded", exc)
         pass
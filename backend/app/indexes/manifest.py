@@ -0,0 +1,256 @@
+"""Startup index manifest.
+
+Every index / schema step the API used to run on each boot, declared in one
+place. The manifest hash covers the step list plus the source of the index
+modules, and is stored in ``_index_manifest``:
+
+  hash unchanged  → boot skips all ~190 create_index calls
+  hash changed    → one pod takes a lease and reconciles; steps of a phase
+                    run concurrently, phases run in order
+  INDEX_BOOTSTRAP_MODE=skip → boot never builds; run scripts/ensure_indexes.py
+                    as a one-shot migration job instead
+
+A failing step leaves the stored hash untouched, so the next boot (or job
+run) retries. Steps that catch their own index errors to stay non-fatal
+report them with ``report_index_failure`` (and ``errors`` counts in a
+step's returned summary count too), so only a clean run stores the hash.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib
+import inspect
+import logging
+import os
+import socket
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger("indexes.manifest")
+
+MANIFEST_COLLECTION = "_index_manifest"
+MANIFEST_DOC_ID = "api_runtime"
+INDEX_BUILD_CONCURRENCY = int(os.environ.get("INDEX_BUILD_CONCURRENCY", "8"))
+LEASE_SECONDS = 600
+
+MODE_AUTO = "auto"
+MODE_SKIP = "skip"
+MODE_FORCE = "force"
+
+# Failures swallowed inside the running step; None outside a manifest run.
+_step_failures: ContextVar[Optional[List[str]]] = ContextVar("index_step_failures", default=None)
+
+
+def report_index_failure(what: str, exc: BaseException) -> None:
+    """Record an index error a step logged instead of raising.
+
+    A no-op outside ``run_index_steps``; inside it the step counts as failed,
+    so the manifest hash is not stored and the next boot retries it.
+    """
+    failures = _step_failures.get()
+    if failures is not None:
+        failures.append(f"{what}: {str(exc)[:120]}")
+
+
+@dataclass(frozen=True)
+class IndexStep:
+    name: str
+    target: str  # "module:function"
+    takes_db: bool = True
+    phase: int = 1
+
+
+# Phase 0 creates validated collections; it must finish before concurrent
+# index builds implicitly create the same collections without validators.
+INDEX_MANIFEST: Tuple[IndexStep, ...] = (
+    IndexStep("schema_validation", "app.indexes.schema_validation:apply_runtime_schema_validation", phase=0),
+    IndexStep("finance", "app.indexes.finance_indexes:ensure_finance_indexes"),
+    IndexStep("inbox", "app.indexes.inbox_indexes:ensure_inbox_indexes"),
+    IndexStep("pricing", "app.indexes.pricing_indexes:ensure_pricing_indexes"),
+    IndexStep("voucher", "app.indexes.voucher_indexes:ensure_voucher_indexes"),
+    IndexStep("public", "app.indexes.public_indexes:ensure_public_indexes"),
+    IndexStep("crm", "app.indexes.crm_indexes:ensure_crm_indexes"),
+    IndexStep("funnel", "app.indexes.funnel_indexes:ensure_funnel_indexes"),
+    IndexStep("jobs", "app.indexes.jobs_indexes:ensure_jobs_indexes"),
+    IndexStep("integration_hub", "app.indexes.integration_hub_indexes:ensure_integration_hub_indexes"),
+    IndexStep("api_keys", "app.indexes.api_keys_indexes:ensure_api_keys_indexes"),
+    IndexStep("rate_limit", "app.indexes.rate_limit_indexes:ensure_rate_limit_indexes"),
+    IndexStep("tenant", "app.indexes.tenant_indexes:ensure_tenant_indexes"),
+    IndexStep("storefront", "app.indexes.storefront_indexes:ensure_storefront_indexes"),
+    IndexStep("marketplace", "app.indexes.marketplace_indexes:ensure_marketplace_indexes"),
+    IndexStep("offers", "app.indexes.marketplace_indexes:ensure_offers_indexes"),
+    IndexStep("seed", "app.indexes.seed_indexes:ensure_seed_indexes"),
+    IndexStep("scalability", "app.indexes.scalability_indexes:ensure_scalability_indexes"),
+    IndexStep("outbox", "app.indexes.outbox_indexes:ensure_outbox_indexes"),
+    IndexStep("webhooks", "app.services.webhook_service:ensure_webhook_indexes"),
+    IndexStep("audit_chain", "app.services.audit_hash_chain:ensure_audit_chain_indexes"),
+    IndexStep("revenue_cube", "app.suppliers.revenue_cube:ensure_revenue_cube_indexes"),
+    IndexStep("invoice_runs", "app.services.invoice_bulk_run:ensure_invoice_run_indexes"),
+    IndexStep("supplier_ecosystem", "app.suppliers.indexes:ensure_supplier_ecosystem_indexes"),
+    IndexStep("supplier_operations", "app.suppliers.operations.indexes:ensure_operations_indexes"),
+    IndexStep("governance", "app.domain.governance.indexes:ensure_governance_indexes"),
+    IndexStep("reliability", "app.domain.reliability.indexes:ensure_reliability_indexes"),
+    IndexStep("token_blacklist", "app.services.token_blacklist:ensure_blacklist_indexes", takes_db=False),
+    IndexStep("refresh_tokens", "app.services.refresh_token_service:ensure_refresh_token_indexes", takes_db=False),
+    IndexStep("sessions", "app.services.session_service:ensure_session_indexes", takes_db=False),
+    IndexStep("gdpr", "app.services.gdpr_service:ensure_gdpr_indexes", takes_db=False),
+    IndexStep("agency_contracts", "app.services.agency_contracts_service:ensure_agency_contract_indexes", takes_db=False),
+    IndexStep("cache", "app.services.mongo_cache_service:ensure_cache_indexes", takes_db=False),
+    IndexStep("inventory_snapshots", "app.services.inventory_snapshot_service:ensure_inventory_snapshot_indexes", takes_db=False),
+    IndexStep("locks", "app.services.distributed_lock_service:ensure_lock_indexes", takes_db=False),
+    IndexStep("inventory_sync", "app.services.inventory_sync_service:ensure_inventory_indexes", takes_db=False),
+    IndexStep("supplier_config", "app.services.supplier_config_service:ensure_supplier_config_indexes", takes_db=False),
+)
+
+
+def _resolve(step: IndexStep) -> Callable[..., Any]:
+    module_name, func_name = step.target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _step_source(step: IndexStep) -> str:
+    """Source that defines a step's indexes.
+
+    Dedicated index modules are hashed whole (spec tables and helpers live
+    at module level); for service modules only the ensure function counts,
+    so unrelated service edits do not trigger a rebuild.
+    """
+    module_name = step.target.split(":")[0]
+    module = importlib.import_module(module_name)
+    if module_name.startswith("app.indexes.") or module_name.endswith(".indexes"):
+        return inspect.getsource(module)
+    return inspect.getsource(_resolve(step))
+
+
+def manifest_hash(steps: Tuple[IndexStep, ...] = INDEX_MANIFEST) -> str:
+    from app.indexes.schema_validation import schema_validation_strict
+
+    digest = hashlib.sha256()
+    digest.update(f"schema_strict={schema_validation_strict()}".encode())
+    for step in steps:
+        digest.update(f"{step.phase}|{step.name}|{step.target}|{step.takes_db}\n".encode())
+        try:
+            digest.update(_step_source(step).encode())
+        except (OSError, TypeError, ImportError, AttributeError):
+            # No source available (e.g. bytecode-only build): make the hash
+            # unique so this boot rebuilds, as before the manifest existed.
+            digest.update(str(time.time()).encode())
+    return digest.hexdigest()
+
+
+def bootstrap_mode() -> str:
+    mode = os.environ.get("INDEX_BOOTSTRAP_MODE", MODE_AUTO).strip().lower()
+    return mode if mode in (MODE_AUTO, MODE_SKIP, MODE_FORCE) else MODE_AUTO
+
+
+async def _run_step(db, step: IndexStep, sem: asyncio.Semaphore) -> Dict[str, Any]:
+    async with sem:
+        started = time.perf_counter()
+        error: Optional[str] = None
+        failures: List[str] = []
+        token = _step_failures.set(failures)
+        try:
+            func = _resolve(step)
+            result = await (func(db) if step.takes_db else func())
+            if isinstance(result, dict) and isinstance(result.get("errors"), int) and result["errors"]:
+                failures.append(f"{result['errors']} index errors: {str(result.get('error_details'))[:120]}")
+            if failures:
+                error = "; ".join(failures)[:200]
+        except Exception as exc:
+            error = str(exc)[:200]
+        finally:
+            _step_failures.reset(token)
+        if error:
+            logger.warning("Index step %s failed (non-fatal): %s", step.name, error)
+        ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("Index step %s: %.1fms", step.name, ms)
+        return {"name": step.name, "ms": ms, "error": error}
+
+
+async def run_index_steps(
+    db,
+    steps: Tuple[IndexStep, ...] = INDEX_MANIFEST,
+    *,
+    concurrency: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Run steps phase by phase; steps within a phase run concurrently."""
+    sem = asyncio.Semaphore(max(1, concurrency or INDEX_BUILD_CONCURRENCY))
+    results: List[Dict[str, Any]] = []
+    for phase in sorted({s.phase for s in steps}):
+        phase_steps = [s for s in steps if s.phase == phase]
+        results.extend(await asyncio.gather(*(_run_step(db, s, sem) for s in phase_steps)))
+    return results
+
+
+async def _acquire_lease(db, owner: str) -> bool:
+    now = datetime.now(timezone.utc)
+    try:
+        doc = await db[MANIFEST_COLLECTION].find_one_and_update(
+            {
+                "_id": MANIFEST_DOC_ID,
+                "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}],
+            },
+            {"$set": {"lease_until": now + timedelta(seconds=LEASE_SECONDS), "lease_owner": owner}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Document exists and another pod holds a live lease.
+        return False
+    return bool(doc and doc.get("lease_owner") == owner)
+
+
+async def apply_index_manifest(db, *, mode: Optional[str] = None, concurrency: Optional[int] = None) -> Dict[str, Any]:
+    """Reconcile startup indexes against the stored manifest hash.
+
+    Returns a summary: status is one of ``unchanged``, ``applied``,
+    ``partial``, ``deferred`` (mode=skip) or ``leased`` (another pod is
+    building).
+    """
+    mode = mode or bootstrap_mode()
+    started = time.perf_counter()
+    current = manifest_hash()
+    state = await db[MANIFEST_COLLECTION].find_one({"_id": MANIFEST_DOC_ID}) or {}
+
+    if mode != MODE_FORCE and state.get("hash") == current:
+        logger.info("Index manifest unchanged (%s), skipping index creation", current[:12])
+        return {"status": "unchanged", "hash": current}
+    if mode == MODE_SKIP:
+        logger.warning(
+            "Index manifest changed (%s → %s) but INDEX_BOOTSTRAP_MODE=skip; run scripts/ensure_indexes.py",
+            (state.get("hash") or "none")[:12], current[:12],
+        )
+        return {"status": "deferred", "hash": current}
+
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    if not await _acquire_lease(db, owner):
+        logger.info("Index manifest is being applied by another instance, skipping")
+        return {"status": "leased", "hash": current}
+
+    results = await run_index_steps(db, concurrency=concurrency)
+    failed = [r["name"] for r in results if r["error"]]
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    update: Dict[str, Any] = {
+        "lease_until": None,
+        "last_run_at": datetime.now(timezone.utc),
+        "last_run_ms": duration_ms,
+        "last_steps": results,
+    }
+    if not failed:
+        update["hash"] = current
+    await db[MANIFEST_COLLECTION].update_one({"_id": MANIFEST_DOC_ID}, {"$set": update})
+
+    status = "partial" if failed else "applied"
+    logger.info(
+        "Index manifest %s in %.1fms (%d steps, %d failed)",
+        status, duration_ms, len(results), len(failed),
+    )
+    return {"status": status, "hash": current, "duration_ms": duration_ms, "failed": failed}
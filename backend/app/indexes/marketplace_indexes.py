@@ -6,6 +6,8 @@ from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import OperationFailure
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.indexes.manifest import report_index_failure
+
 logger = getLogger(__name__)
 
 
@@ -20,6 +22,7 @@ async def ensure_marketplace_indexes(db: AsyncIOMotorDatabase) -> None:
         try:
             await collection.create_index(*args, **kwargs)
         except OperationFailure as e:
+            report_index_failure(f"{collection.name}.{kwargs.get('name')}", e)
             msg = str(e).lower()
             if (
                 "indexoptionsconflict" in msg
@@ -71,6 +74,7 @@ async def ensure_offers_indexes(db: AsyncIOMotorDatabase) -> None:
     try:
         await db.search_sessions.create_index("expires_at", expireAfterSeconds=0)
     except OperationFailure as e:  # pragma: no cover - defensive guard similar to marketplace
+        report_index_failure("search_sessions.expires_at", e)
         msg = str(e).lower()
         if "already exists" in msg or "indexoptionsconflict" in msg or "indexkeyspecsconflict" in msg:
             logger.warning("[offers_indexes] Keeping existing TTL index on search_sessions: %s", msg)
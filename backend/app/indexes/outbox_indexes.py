@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+
+async def ensure_outbox_indexes(db) -> None:
+    await db.outbox_events.create_index([("status", 1), ("created_at", 1)])
+    await db.outbox_events.create_index("organization_id")
+    await db.outbox_consumer_results.create_index(
+        [("event_id", 1), ("handler", 1)], unique=True
+    )
+    await db.outbox_consumer_log.create_index([("processed_at", -1)])
+    await db.outbox_dead_letters.create_index([("dead_lettered_at", -1)])
@@ -4,6 +4,8 @@ from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import OperationFailure
 import logging
 
+from app.indexes.manifest import report_index_failure
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +20,7 @@ async def ensure_pricing_indexes(db):
         try:
             await collection.create_index(*args, **kwargs)
         except OperationFailure as e:
+            report_index_failure(f"{collection.name}.{kwargs.get('name')}", e)
             msg = str(e).lower()
             if (
                 "indexoptionsconflict" in msg
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pymongo import ASCENDING
 
+from app.indexes.manifest import report_index_failure
+
 
 async def ensure_public_indexes(db):
     """Ensure indexes for public-facing collections (tokens, public quotes).
@@ -19,6 +21,7 @@ async def ensure_public_indexes(db):
             await collection.create_index(keys, **kwargs)
         except Exception as exc:
             # Index creation failures should not crash the app (dev/preview)
+            report_index_failure(f"{collection.name}.{name}", exc)
             logger.warning("Failed to ensure index %s on %s: %s", name, collection.name, exc)
 
     # ------------------------------------------------------------------
@@ -48,6 +51,7 @@ async def ensure_public_indexes(db):
         try:
             await db.booking_public_tokens.drop_index("uniq_public_token")
         except Exception as exc:
+            report_index_failure("booking_public_tokens drop uniq_public_token", exc)
             logger.warning("Failed to drop legacy uniq_public_token index: %s", exc)
 
     try:
@@ -59,6 +63,7 @@ async def ensure_public_indexes(db):
         )
     except Exception as exc:
         # Final fallback: log but do not crash
+        report_index_failure("booking_public_tokens.uniq_public_token", exc)
         logger.warning(
             "Failed to ensure partial uniq_public_token index on booking_public_tokens: %s",
             exc,
@@ -126,6 +131,7 @@ async def ensure_public_indexes(db):
             try:
                 await db.public_checkouts.drop_index("uniq_public_checkout_idem")
             except Exception as exc:  # pragma: no cover - best-effort cleanup
+                report_index_failure("public_checkouts drop uniq_public_checkout_idem", exc)
                 logger.warning(
                     "Failed to drop legacy uniq_public_checkout_idem index: %s",
                     exc,
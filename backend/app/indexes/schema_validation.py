@@ -6,8 +6,11 @@ collections. This prevents malformed documents from being inserted.
 from __future__ import annotations
 
 import logging
+import os
 from typing import Any
 
+from app.indexes.manifest import report_index_failure
+
 logger = logging.getLogger("schema_validation")
 
 # ============================================================================
@@ -186,7 +189,17 @@ async def apply_schema_validation(db, *, strict: bool = False) -> dict[str, str]
                 results[collection_name] = "validation_applied"
                 logger.info("Applied schema validation to '%s'", collection_name)
         except Exception as exc:
+            report_index_failure(f"schema {collection_name}", exc)
             results[collection_name] = f"error: {str(exc)[:100]}"
             logger.warning("Failed to apply schema validation to '%s': %s", collection_name, exc)
 
     return results
+
+
+def schema_validation_strict() -> bool:
+    """Reject invalid writes in production, only warn elsewhere."""
+    return os.environ.get("ENV", "dev").lower() in ("production", "prod")
+
+
+async def apply_runtime_schema_validation(db) -> dict[str, str]:
+    return await apply_schema_validation(db, strict=schema_validation_strict())
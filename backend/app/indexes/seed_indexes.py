@@ -9,6 +9,8 @@ import logging
 
 from pymongo.errors import OperationFailure
 
+from app.indexes.manifest import report_index_failure
+
 logger = logging.getLogger("acenta-master.indexes")
 
 
@@ -17,6 +19,7 @@ async def _safe_create(collection, *args, **kwargs):
     try:
         await collection.create_index(*args, **kwargs)
     except OperationFailure as e:
+        report_index_failure(f"{collection.name}.{kwargs.get('name')}", e)
         code = e.code
         msg = str(e).lower()
         # 85/86 = IndexOptionsConflict/IndexKeySpecsConflict, 13 = Unauthorized
@@ -41,6 +44,9 @@ async def ensure_seed_indexes(db) -> None:
     await _safe_create(db.inventory, [("organization_id", 1), ("product_id", 1), ("date", 1)], unique=True)
     await _safe_create(db.reservations, [("organization_id", 1), ("pnr", 1)], unique=True)
     await _safe_create(db.reservations, [("organization_id", 1), ("idempotency_key", 1)], unique=True, sparse=True)
+    # Stay holds: expiry sweep + "already booked?" check (services/inventory.py)
+    await _safe_create(db.inventory, [("holds.exp", 1)], sparse=True)
+    await _safe_create(db.reservations, [("inventory_hold_id", 1)], sparse=True)
     await _safe_create(db.payments, [("organization_id", 1), ("reservation_id", 1)])
     await _safe_create(db.leads, [("organization_id", 1), ("status", 1), ("sort_index", -1)])
     await _safe_create(db.quotes, [("organization_id", 1), ("status", 1)])
@@ -139,6 +145,15 @@ async def ensure_seed_indexes(db) -> None:
     await _safe_create(db.booking_outcomes, [("organization_id", 1), ("booking_id", 1)], unique=True)
     await _safe_create(db.booking_outcomes, [("organization_id", 1), ("agency_id", 1), ("hotel_id", 1), ("checkin_date", -1)])
 
+    # ── Agency × hotel match stats projection ─────────────────
+    await _safe_create(db.agency_hotel_match_stats, [("organization_id", 1), ("kind", 1), ("day", -1)])
+    await _safe_create(db.agency_hotel_match_stats, [("organization_id", 1), ("agency_id", 1), ("hotel_id", 1), ("kind", 1), ("day", -1)])
+    await _safe_create(db.agency_hotel_match_stats_state, "organization_id", unique=True)
+
+    # ── Search tokens (app.services.search_index) ─────────────
+    for coll in ("customers", "bookings", "reservations", "hotels"):
+        await _safe_create(db[coll], [("organization_id", 1), ("search_tokens", 1)])
+
     # ── Risk profiles ─────────────────────────────────────────
     await _safe_create(db.risk_profiles, [("organization_id", 1)], unique=True)
 
@@ -224,6 +239,13 @@ async def ensure_seed_indexes(db) -> None:
     await _safe_create(db.efatura_invoices, [("idempotency_key", 1), ("tenant_id", 1)])
     await _safe_create(db.efatura_events, [("tenant_id", 1), ("invoice_id", 1), ("created_at", 1)])
 
+    # Reconciliation (batched joins + high-water mark)
+    await _safe_create(db.invoices, [("tenant_id", 1), ("booking_id", 1)])
+    await _safe_create(db.invoices, [("tenant_id", 1), ("status", 1), ("invoice_id", 1)])
+    await _safe_create(db.accounting_sync_jobs, [("tenant_id", 1), ("invoice_id", 1), ("created_at", -1)])
+    await _safe_create(db.reconciliation_items, [("tenant_id", 1), ("run_id", 1)])
+    await _safe_create(db.reconciliation_state, "tenant_id", unique=True)
+
     # SMS / Tickets
     await _safe_create(db.sms_logs, [("organization_id", 1), ("created_at", -1)])
     await _safe_create(db.tickets, [("tenant_id", 1), ("ticket_code", 1)], unique=True)
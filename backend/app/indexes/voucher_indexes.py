@@ -6,6 +6,8 @@ from pymongo import ASCENDING
 from pymongo.errors import OperationFailure
 import logging
 
+from app.indexes.manifest import report_index_failure
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,7 @@ async def ensure_voucher_indexes(db):
         try:
             await collection.create_index(*args, **kwargs)
         except OperationFailure as e:  # pragma: no cover - defensive
+            report_index_failure(f"{collection.name}.{kwargs.get('name')}", e)
             msg = str(e).lower()
             if (
                 "indexoptionsconflict" in msg
@@ -166,6 +166,10 @@ def create_celery_app() -> Celery:
                 "task": "app.tasks.maintenance.health_check_suppliers",
                 "schedule": 600.0,  # every 10 minutes
             },
+            "reconcile-room-night-occupancy": {
+                "task": "app.tasks.maintenance.reconcile_room_night_occupancy",
+                "schedule": 60.0,  # every minute — see RECONCILE_INTERVAL_SECONDS
+            },
         },
     )
 
@@ -11,17 +11,51 @@ Event types:
 Architecture:
   Publisher → Redis Pub/Sub → Subscriber handlers
   Events are also persisted to MongoDB for audit trail & replay.
+
+Dispatch modes:
+  inline  — publish awaits the insert, the Redis publish and every handler
+            (scripts, workers, tests, or ``publish(..., wait=True)``)
+  async   — once ``start_event_dispatcher()`` ran (API lifespan), publish
+            only enqueues and returns:
+              * persistence + Redis publish go through a batched writer
+                (insert_many / pipeline every EVENT_PERSIST_FLUSH_MS or
+                EVENT_PERSIST_BATCH_SIZE events)
+              * handlers run on EVENT_DISPATCH_WORKERS tasks reading a
+                bounded queue (EVENT_DISPATCH_QUEUE_SIZE); a full queue makes
+                publishers wait (backpressure, counted in metrics)
+              * each handler has its own concurrency limit
+                (EVENT_HANDLER_CONCURRENCY) and timeout
+                (EVENT_HANDLER_TIMEOUT_SECONDS)
+            ``drain_event_dispatcher()`` on shutdown finishes queued events
+            and flushes pending writes.
+
+Events that must survive a crash belong in the transactional outbox
+(outbox_consumer); this bus is best-effort, as before.
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import os
+import time
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Callable, Optional
 
+from app.infrastructure.metrics_registry import registry
+
 logger = logging.getLogger("infrastructure.event_bus")
 
+DISPATCH_MODE = os.environ.get("EVENT_BUS_DISPATCH_MODE", "async").strip().lower()
+DISPATCH_QUEUE_SIZE = int(os.environ.get("EVENT_DISPATCH_QUEUE_SIZE", "10000"))
+DISPATCH_WORKERS = int(os.environ.get("EVENT_DISPATCH_WORKERS", "8"))
+HANDLER_CONCURRENCY = int(os.environ.get("EVENT_HANDLER_CONCURRENCY", "4"))
+HANDLER_TIMEOUT_SECONDS = float(os.environ.get("EVENT_HANDLER_TIMEOUT_SECONDS", "10"))
+PERSIST_BATCH_SIZE = int(os.environ.get("EVENT_PERSIST_BATCH_SIZE", "200"))
+PERSIST_FLUSH_SECONDS = float(os.environ.get("EVENT_PERSIST_FLUSH_MS", "20")) / 1000
+DRAIN_TIMEOUT_SECONDS = 10.0
+
 # In-process handler registry
 _handlers: dict[str, list[Callable]] = {}
 
@@ -58,6 +92,20 @@ def unsubscribe(event_type: str, handler: Callable):
         _handlers[event_type] = [h for h in _handlers[event_type] if h != handler]
 
 
+def _handler_name(handler: Callable) -> str:
+    return f"{getattr(handler, '__module__', '')}.{getattr(handler, '__qualname__', repr(handler))}"
+
+
+def _event_doc(event: dict[str, Any], now: datetime) -> dict[str, Any]:
+    return {
+        "_id": event["event_id"],
+        **event,
+        "processed": False,
+        "handlers_completed": [],
+        "created_at": now,
+    }
+
+
 async def publish(
     event_type: str,
     payload: dict[str, Any],
@@ -65,12 +113,17 @@ async def publish(
     organization_id: str = "",
     correlation_id: str = "",
     source: str = "",
+    wait: bool = False,
 ) -> str:
     """Publish an event.
 
     1. Persist to MongoDB (events collection)
     2. Publish to Redis Pub/Sub channel
     3. Invoke in-process handlers
+
+    With the async dispatcher running these happen after publish returns;
+    ``wait=True`` keeps the inline behaviour for callers that need the
+    handlers' effects before continuing.
     """
     event_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc)
@@ -86,17 +139,16 @@ async def publish(
         "version": 1,
     }
 
+    dispatcher = _dispatcher
+    if dispatcher is not None and not dispatcher.closing and not wait:
+        await dispatcher.submit(event, _event_doc(event, now))
+        return event_id
+
     # Persist to MongoDB
     try:
         from app.db import get_db
         db = await get_db()
-        await db.domain_events.insert_one({
-            "_id": event_id,
-            **event,
-            "processed": False,
-            "handlers_completed": [],
-            "created_at": now,
-        })
+        await db.domain_events.insert_one(_event_doc(event, now))
     except Exception as e:
         logger.warning("Failed to persist event %s: %s", event_id, e)
 
@@ -114,7 +166,6 @@ async def publish(
     handlers = _handlers.get(event_type, [])
     for handler in handlers:
         try:
-            import asyncio
             if asyncio.iscoroutinefunction(handler):
                 await handler(event)
             else:
@@ -125,6 +176,174 @@ async def publish(
     return event_id
 
 
+class EventDispatcher:
+    """Batched event writer + bounded handler queue for one event loop."""
+
+    def __init__(self, workers: int = DISPATCH_WORKERS, queue_size: int = DISPATCH_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closing = False
+        self._worker_count = workers
+        self._workers: list[asyncio.Task] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._pending_writes: list[tuple[dict, dict]] = []
+        self._write_wakeup = asyncio.Event()
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self.stats = {
+            "enqueued": 0, "dispatched": 0, "backpressure_waits": 0,
+            "handler_failures": 0, "handler_timeouts": 0,
+            "persisted": 0, "persist_failures": 0, "write_batches": 0,
+        }
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._writer = loop.create_task(self._write_loop())
+        self._workers = [loop.create_task(self._worker()) for _ in range(self._worker_count)]
+
+    # ── publish side ─────────────────────────────────────────────────
+    async def submit(self, event: dict[str, Any], doc: dict[str, Any]) -> None:
+        self._pending_writes.append((doc, event))
+        if len(self._pending_writes) >= PERSIST_BATCH_SIZE:
+            self._write_wakeup.set()
+
+        if self.queue.full():
+            self.stats["backpressure_waits"] += 1
+            registry.inc("event_dispatch_backpressure_total")
+        await self.queue.put(event)
+        self.stats["enqueued"] += 1
+        registry.set_gauge("event_dispatch_queue_depth", self.queue.qsize())
+
+    # ── batched writer ───────────────────────────────────────────────
+    async def _write_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._write_wakeup.wait(), PERSIST_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._write_wakeup.clear()
+            await self.flush_writes()
+
+    async def flush_writes(self) -> None:
+        if not self._pending_writes:
+            return
+        batch, self._pending_writes = self._pending_writes, []
+        self.stats["write_batches"] += 1
+
+        try:
+            from app.db import get_db
+            db = await get_db()
+            await db.domain_events.insert_many([doc for doc, _ in batch], ordered=False)
+            self.stats["persisted"] += len(batch)
+        except Exception as e:
+            self.stats["persist_failures"] += len(batch)
+            registry.inc("event_persist_failures_total", len(batch))
+            logger.warning("Failed to persist %d events: %s", len(batch), e)
+
+        try:
+            from app.infrastructure.redis_client import get_async_redis
+            r = await get_async_redis()
+            if r:
+                async with r.pipeline(transaction=False) as pipe:
+                    for _, event in batch:
+                        pipe.publish(f"events:{event['event_type']}", json.dumps(event, default=str))
+                    await pipe.execute()
+        except Exception as e:
+            logger.debug("Redis pub/sub batch publish failed: %s", e)
+
+    # ── handler workers ──────────────────────────────────────────────
+    async def _worker(self) -> None:
+        while True:
+            event = await self.queue.get()
+            try:
+                handlers = list(_handlers.get(event["event_type"], []))
+                if handlers:
+                    await asyncio.gather(*[self._run_handler(h, event) for h in handlers])
+                self.stats["dispatched"] += 1
+            finally:
+                self.queue.task_done()
+                registry.set_gauge("event_dispatch_queue_depth", self.queue.qsize())
+
+    async def _run_handler(self, handler: Callable, event: dict[str, Any]) -> None:
+        name = _handler_name(handler)
+        sem = self._semaphores.get(name)
+        if sem is None:
+            sem = self._semaphores[name] = asyncio.Semaphore(HANDLER_CONCURRENCY)
+        labels = {"handler": name}
+
+        async with sem:
+            started = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    await asyncio.wait_for(handler(event), HANDLER_TIMEOUT_SECONDS)
+                else:
+                    handler(event)
+            except asyncio.TimeoutError:
+                self.stats["handler_timeouts"] += 1
+                registry.inc("event_handler_timeouts_total", labels=labels)
+                logger.error("Event handler %s timed out for %s", name, event["event_type"])
+            except Exception as e:
+                self.stats["handler_failures"] += 1
+                registry.inc("event_handler_failures_total", labels=labels)
+                logger.error("Event handler %s failed for %s: %s", name, event["event_type"], e)
+            finally:
+                registry.observe("event_handler_duration_seconds", time.perf_counter() - started, labels)
+
+    # ── shutdown ─────────────────────────────────────────────────────
+    async def drain(self, timeout: float = DRAIN_TIMEOUT_SECONDS) -> None:
+        """Finish queued events (up to ``timeout``), then flush pending writes."""
+        self.closing = True
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Event dispatcher drain timed out with %d events queued", self.queue.qsize())
+
+        tasks = [*self._workers, *([self._writer] if self._writer else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.flush_writes()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "mode": "async",
+            "closing": self.closing,
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "workers": self._worker_count,
+            "pending_writes": len(self._pending_writes),
+            **self.stats,
+        }
+
+
+_dispatcher: Optional[EventDispatcher] = None
+
+
+def start_event_dispatcher() -> Optional[EventDispatcher]:
+    """Switch publish to async dispatch (no-op when EVENT_BUS_DISPATCH_MODE=inline)."""
+    global _dispatcher
+    if DISPATCH_MODE == "inline":
+        return None
+    if _dispatcher is None:
+        _dispatcher = EventDispatcher()
+        _dispatcher.start()
+    return _dispatcher
+
+
+async def drain_event_dispatcher(timeout: float = DRAIN_TIMEOUT_SECONDS) -> None:
+    """Graceful shutdown: later publishes run inline, queued events finish."""
+    global _dispatcher
+    dispatcher = _dispatcher
+    if dispatcher is None:
+        return
+    await dispatcher.drain(timeout)
+    _dispatcher = None
+
+
+def get_dispatch_stats() -> dict[str, Any]:
+    if _dispatcher is None:
+        return {"mode": "inline"}
+    return _dispatcher.get_stats()
+
+
 async def get_events(
     organization_id: str,
     event_type: Optional[str] = None,
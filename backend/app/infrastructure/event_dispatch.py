@@ -41,6 +41,11 @@ class DispatchEntry:
 DISPATCH_TABLE: dict[str, list[DispatchEntry]] = {
     # ── Booking Events ───────────────────────────────────────
     "booking.created": [
+        DispatchEntry(
+            handler="app.tasks.outbox_consumers.refresh_room_night_occupancy",
+            queue="reports",
+            description="Refresh room-night occupancy ledger",
+        ),
         DispatchEntry(
             handler="app.tasks.outbox_consumers.send_booking_notification",
             queue="notification_queue",
@@ -58,6 +63,11 @@ DISPATCH_TABLE: dict[str, list[DispatchEntry]] = {
         ),
     ],
     "booking.confirmed": [
+        DispatchEntry(
+            handler="app.tasks.outbox_consumers.refresh_room_night_occupancy",
+            queue="reports",
+            description="Refresh room-night occupancy ledger",
+        ),
         DispatchEntry(
             handler="app.tasks.outbox_consumers.send_booking_notification",
             queue="notification_queue",
@@ -85,6 +95,11 @@ DISPATCH_TABLE: dict[str, list[DispatchEntry]] = {
         ),
     ],
     "booking.cancelled": [
+        DispatchEntry(
+            handler="app.tasks.outbox_consumers.refresh_room_night_occupancy",
+            queue="reports",
+            description="Refresh room-night occupancy ledger",
+        ),
         DispatchEntry(
             handler="app.tasks.outbox_consumers.send_booking_notification",
             queue="notification_queue",
@@ -146,6 +161,11 @@ DISPATCH_TABLE: dict[str, list[DispatchEntry]] = {
         ),
     ],
     "booking.completed": [
+        DispatchEntry(
+            handler="app.tasks.outbox_consumers.refresh_room_night_occupancy",
+            queue="reports",
+            description="Refresh room-night occupancy ledger",
+        ),
         DispatchEntry(
             handler="app.tasks.outbox_consumers.send_booking_notification",
             queue="notification_queue",
@@ -173,6 +193,11 @@ DISPATCH_TABLE: dict[str, list[DispatchEntry]] = {
         ),
     ],
     "booking.amended": [
+        DispatchEntry(
+            handler="app.tasks.outbox_consumers.refresh_room_night_occupancy",
+            queue="reports",
+            description="Refresh room-night occupancy ledger",
+        ),
         DispatchEntry(
             handler="app.tasks.outbox_consumers.send_booking_notification",
             queue="notification_queue",
@@ -195,6 +220,11 @@ DISPATCH_TABLE: dict[str, list[DispatchEntry]] = {
         ),
     ],
     "booking.refunded": [
+        DispatchEntry(
+            handler="app.tasks.outbox_consumers.refresh_room_night_occupancy",
+            queue="reports",
+            description="Refresh room-night occupancy ledger",
+        ),
         DispatchEntry(
             handler="app.tasks.outbox_consumers.send_booking_notification",
             queue="notification_queue",
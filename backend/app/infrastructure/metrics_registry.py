@@ -0,0 +1,289 @@
+"""In-process metrics registry with fixed-bucket histograms.
+
+One registry per process backs ``infrastructure.observability`` and the
+request-duration metrics of ``prometheus_metrics_service``:
+
+- counters / gauges: one float per (name, labels) series
+- histograms: fixed log-scale buckets (×2 per step) in an ``array('Q')``
+  plus a running sum — an observation is one bisect over ~18 bounds and two
+  increments, no sample lists, no locks (the event loop is single-threaded;
+  a rare lost increment from a worker thread is acceptable for metrics)
+- at most MAX_SERIES series per process; later label sets collapse into
+  one ``overflow="true"`` series so a bad label cannot exhaust memory
+
+Multi-worker deployments (uvicorn/gunicorn ``--workers N``): set
+``METRICS_MULTIPROC_DIR`` to a directory shared by the workers. Each worker
+writes its snapshot to ``{pid}.json`` every METRICS_FLUSH_SECONDS, and any
+worker serving ``/metrics`` merges its live state with the other workers'
+files (counters and buckets are summed; files idle longer than
+METRICS_STALE_SECONDS are dropped).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger("infrastructure.metrics_registry")
+
+# 0.5ms … ~65s, doubling — suits request/DB/Redis latencies in seconds.
+SECONDS_BUCKETS: tuple[float, ...] = tuple(0.0005 * 2 ** i for i in range(18))
+MILLISECONDS_BUCKETS: tuple[float, ...] = tuple(b * 1000 for b in SECONDS_BUCKETS)
+
+MAX_SERIES = int(os.environ.get("METRICS_MAX_SERIES", "5000"))
+FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+STALE_SECONDS = float(os.environ.get("METRICS_STALE_SECONDS", "900"))
+_OVERFLOW_LABELS = (("overflow", "true"),)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[dict]) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_series(name: str, labels: Iterable[tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = array("Q", bytes(8 * (len(bounds) + 1)))  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+def quantile(bounds: tuple[float, ...] | list[float], counts: list[int], q: float) -> float:
+    """Estimate a quantile from bucket counts (linear within the bucket)."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for i, c in enumerate(counts):
+        if c and seen + c >= rank:
+            lower = bounds[i - 1] if i > 0 else 0.0
+            upper = bounds[i] if i < len(bounds) else bounds[-1]
+            return lower + (upper - lower) * ((rank - seen) / c)
+        seen += c
+    return float(bounds[-1])
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.counters: dict[tuple[str, LabelKey], float] = {}
+        self.gauges: dict[tuple[str, LabelKey], float] = {}
+        self.histograms: dict[tuple[str, LabelKey], Histogram] = {}
+        self._series = 0
+
+    def _admit(self, name: str, key: LabelKey) -> tuple[str, LabelKey]:
+        if self._series < MAX_SERIES:
+            self._series += 1
+            return name, key
+        return name, _OVERFLOW_LABELS
+
+    def inc(self, name: str, value: float = 1.0, labels: Optional[dict] = None) -> None:
+        series = (name, _label_key(labels))
+        if series not in self.counters:
+            series = self._admit(name, series[1])
+        self.counters[series] = self.counters.get(series, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[dict] = None) -> None:
+        series = (name, _label_key(labels))
+        if series not in self.gauges:
+            series = self._admit(name, series[1])
+        self.gauges[series] = value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[dict] = None,
+        bounds: tuple[float, ...] = SECONDS_BUCKETS,
+    ) -> None:
+        series = (name, _label_key(labels))
+        hist = self.histograms.get(series)
+        if hist is None:
+            series = self._admit(name, series[1])
+            hist = self.histograms.get(series)
+            if hist is None:
+                hist = self.histograms[series] = Histogram(bounds)
+        hist.observe(value)
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-safe copy of every series (the multi-process exchange format)."""
+        return {
+            "counters": [[n, list(map(list, k)), v] for (n, k), v in self.counters.items()],
+            "gauges": [[n, list(map(list, k)), v] for (n, k), v in self.gauges.items()],
+            "histograms": [
+                [n, list(map(list, k)), list(h.bounds), list(h.counts), h.sum]
+                for (n, k), h in self.histograms.items()
+            ],
+        }
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+        self._series = 0
+
+
+registry = MetricsRegistry()
+
+
+# ─── Multi-process merge ──────────────────────────────────────────────────────
+
+def _multiproc_dir() -> Optional[Path]:
+    raw = os.environ.get("METRICS_MULTIPROC_DIR", "").strip()
+    return Path(raw) if raw else None
+
+
+def flush_snapshot() -> None:
+    """Write this process's snapshot for sibling workers (atomic replace)."""
+    directory = _multiproc_dir()
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"{os.getpid()}.json"
+    tmp = target.with_suffix(".tmp")
+    tmp.write_text(json.dumps(registry.snapshot()))
+    os.replace(tmp, target)
+
+
+def _peer_snapshots() -> list[dict[str, Any]]:
+    directory = _multiproc_dir()
+    if directory is None or not directory.is_dir():
+        return []
+    own = f"{os.getpid()}.json"
+    cutoff = time.time() - STALE_SECONDS
+    snapshots = []
+    for path in directory.glob("*.json"):
+        if path.name == own:
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                continue
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError) as e:
+            logger.debug("skipping metrics snapshot %s: %s", path, e)
+    return snapshots
+
+
+def merged_snapshot() -> dict[str, Any]:
+    """This process's live series summed with the other workers' snapshots."""
+    counters: dict[tuple, float] = {}
+    gauges: dict[tuple, float] = {}
+    histograms: dict[tuple, list] = {}
+    for snap in [registry.snapshot(), *_peer_snapshots()]:
+        for name, labels, value in snap.get("counters", []):
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0.0) + value
+        for name, labels, value in snap.get("gauges", []):
+            key = (name, tuple(map(tuple, labels)))
+            gauges[key] = gauges.get(key, 0.0) + value
+        for name, labels, bounds, counts, total in snap.get("histograms", []):
+            key = (name, tuple(map(tuple, labels)))
+            current = histograms.get(key)
+            if current is None:
+                histograms[key] = [list(bounds), list(counts), total]
+            elif current[0] == list(bounds):
+                current[1] = [a + b for a, b in zip(current[1], counts)]
+                current[2] += total
+    return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_prometheus(snapshot: Optional[dict[str, Any]] = None) -> str:
+    """Prometheus text exposition of the (merged) registry."""
+    snap = snapshot or merged_snapshot()
+    lines: list[str] = []
+
+    for kind, store in (("counter", snap["counters"]), ("gauge", snap["gauges"])):
+        last = None
+        for (name, labels), value in sorted(store.items()):
+            if name != last:
+                lines.append(f"# TYPE {name} {kind}")
+                last = name
+            lines.append(f"{format_series(name, labels)} {_fmt(value)}")
+
+    last = None
+    for (name, labels), (bounds, counts, total) in sorted(snap["histograms"].items()):
+        if name != last:
+            lines.append(f"# TYPE {name} histogram")
+            last = name
+        cumulative = 0
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            le = (("le", _fmt(bound)),)
+            lines.append(f"{format_series(name + '_bucket', labels + le)} {cumulative}")
+        cumulative += counts[-1]
+        lines.append(f"{format_series(name + '_bucket', labels + (('le', '+Inf'),))} {cumulative}")
+        lines.append(f"{format_series(name + '_sum', labels)} {_fmt(total)}")
+        lines.append(f"{format_series(name + '_count', labels)} {cumulative}")
+
+    return "\n".join(lines) + "\n"
+
+
+# ─── Background flush ─────────────────────────────────────────────────────────
+
+_flusher: Optional[asyncio.Task] = None
+
+
+async def _flush_loop() -> None:
+    while True:
+        await asyncio.sleep(FLUSH_SECONDS)
+        try:
+            flush_snapshot()
+        except OSError as e:
+            logger.warning("metrics snapshot flush failed: %s", e)
+
+
+def start_metrics_flusher() -> None:
+    """Start periodic snapshot writes when METRICS_MULTIPROC_DIR is set."""
+    global _flusher
+    if _multiproc_dir() is None or (_flusher and not _flusher.done()):
+        return
+    _flusher = asyncio.get_running_loop().create_task(_flush_loop())
+
+
+async def stop_metrics_flusher() -> None:
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        try:
+            await _flusher
+        except asyncio.CancelledError:
+            pass
+        _flusher = None
+    try:
+        flush_snapshot()
+    except OSError:
+        pass
@@ -6,49 +6,41 @@ Components:
   3. Structured Logging (JSON)
   4. Health Dashboard aggregation
 
-Prometheus metrics exposed at /api/metrics/prometheus
+Prometheus metrics exposed at /metrics (all workers merged) and
+/api/infrastructure/metrics/prometheus
 """
 from __future__ import annotations
 
 import logging
 from typing import Any, Optional
 
+from app.infrastructure.metrics_registry import (
+    format_series,
+    merged_snapshot,
+    quantile,
+    registry,
+    render_prometheus,
+)
+
 logger = logging.getLogger("infrastructure.observability")
 
-# Metrics storage (in-memory counters, exported to Prometheus)
-_counters: dict[str, float] = {}
-_histograms: dict[str, list[float]] = {}
-_gauges: dict[str, float] = {}
+# Metrics storage: the process-wide fixed-bucket registry (see
+# app.infrastructure.metrics_registry), merged across workers on export.
 
 
 def increment_counter(name: str, value: float = 1.0, labels: Optional[dict] = None):
     """Increment a counter metric."""
-    key = _make_key(name, labels)
-    _counters[key] = _counters.get(key, 0) + value
+    registry.inc(name, value, labels)
 
 
 def observe_histogram(name: str, value: float, labels: Optional[dict] = None):
-    """Record a histogram observation."""
-    key = _make_key(name, labels)
-    if key not in _histograms:
-        _histograms[key] = []
-    _histograms[key].append(value)
-    # Keep last 1000 observations
-    if len(_histograms[key]) > 1000:
-        _histograms[key] = _histograms[key][-1000:]
+    """Record a histogram observation (log-scale buckets, constant cost)."""
+    registry.observe(name, value, labels)
 
 
 def set_gauge(name: str, value: float, labels: Optional[dict] = None):
     """Set a gauge value."""
-    key = _make_key(name, labels)
-    _gauges[key] = value
-
-
-def _make_key(name: str, labels: Optional[dict] = None) -> str:
-    if not labels:
-        return name
-    label_str = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
-    return f"{name}{{{label_str}}}"
+    registry.set_gauge(name, value, labels)
 
 
 # Pre-defined metrics
@@ -92,51 +84,28 @@ class Metrics:
 
 def get_prometheus_text() -> str:
     """Export all metrics in Prometheus text format."""
-    lines = []
-
-    # Counters
-    for key, value in sorted(_counters.items()):
-        name = key.split("{")[0] if "{" in key else key
-        lines.append(f"# TYPE {name} counter")
-        lines.append(f"{key} {value}")
-
-    # Gauges
-    for key, value in sorted(_gauges.items()):
-        name = key.split("{")[0] if "{" in key else key
-        lines.append(f"# TYPE {name} gauge")
-        lines.append(f"{key} {value}")
-
-    # Histograms (simplified: sum, count, avg)
-    for key, values in sorted(_histograms.items()):
-        name = key.split("{")[0] if "{" in key else key
-        if values:
-            total = sum(values)
-            count = len(values)
-            avg = total / count
-            lines.append(f"# TYPE {name} summary")
-            lines.append(f"{key}_sum {total:.6f}")
-            lines.append(f"{key}_count {count}")
-            lines.append(f"{key}_avg {avg:.6f}")
-
-    return "\n".join(lines)
+    return render_prometheus()
 
 
 def get_metrics_summary() -> dict[str, Any]:
     """Get a JSON summary of all metrics."""
+    snap = merged_snapshot()
     histogram_summary = {}
-    for key, values in _histograms.items():
-        if values:
-            histogram_summary[key] = {
-                "count": len(values),
-                "sum": round(sum(values), 4),
-                "avg": round(sum(values) / len(values), 4),
-                "min": round(min(values), 4),
-                "max": round(max(values), 4),
+    for (name, labels), (bounds, counts, total) in sorted(snap["histograms"].items()):
+        count = sum(counts)
+        if count:
+            histogram_summary[format_series(name, labels)] = {
+                "count": count,
+                "sum": round(total, 4),
+                "avg": round(total / count, 4),
+                "p50": round(quantile(bounds, counts, 0.50), 4),
+                "p95": round(quantile(bounds, counts, 0.95), 4),
+                "p99": round(quantile(bounds, counts, 0.99), 4),
             }
 
     return {
-        "counters": dict(sorted(_counters.items())),
-        "gauges": dict(sorted(_gauges.items())),
+        "counters": {format_series(name, labels): v for (name, labels), v in sorted(snap["counters"].items())},
+        "gauges": {format_series(name, labels): v for (name, labels), v in sorted(snap["gauges"].items())},
         "histograms": histogram_summary,
     }
 
@@ -13,12 +13,25 @@ Advantages over MongoDB:
   - Atomic operations via Lua script
   - No collection cleanup needed
   - Distributed across Redis cluster
+
+``check_rate_limits`` evaluates every bucket that applies to a request
+(route tier, per-IP, per-tenant) in one EVALSHA of ``MULTI_BUCKET_LUA``:
+all-or-nothing, so a request denied by one bucket consumes none.
+
+Lease mode (``RATE_LIMIT_LEASE_MODE=true``): for high-capacity buckets each
+pod borrows ``RATE_LIMIT_LEASE_FRACTION`` of the capacity in one call and
+serves requests from the local lease until it runs out or expires after
+``RATE_LIMIT_LEASE_TTL_MS``. Unused leased tokens are dropped, never
+returned, so the global limit is never exceeded — a pod may only deny a
+little early. Small buckets (auth, export) always go to Redis.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 import time
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
 logger = logging.getLogger("infrastructure.rate_limiter")
 
@@ -69,7 +82,74 @@ redis.call('EXPIRE', key, math.ceil(capacity / refill_rate) + 60)
 return {allowed, tokens, retry_after}
 """
 
+# Same refill model as TOKEN_BUCKET_LUA, for N buckets at once.
+# KEYS[i] = bucket key
+# ARGV[1] = current timestamp (seconds, float)
+# ARGV[2 + 4*(i-1) ...] = capacity, refill_rate, requested, minimum
+#   requested = tokens to take when allowed (a lease takes more than 1)
+#   minimum   = tokens the bucket must hold for the request to pass
+# Returns: [allowed (0/1), denied_index (1-based, 0 = none), retry_after_ms,
+#           remaining_1, granted_1, remaining_2, granted_2, ...]
+# All-or-nothing: if any bucket is short, no bucket is consumed.
+MULTI_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local state = {}
+local denied = 0
+local retry_after = 0
+
+for i = 1, #KEYS do
+    local base = 2 + (i - 1) * 4
+    local capacity = tonumber(ARGV[base])
+    local refill_rate = tonumber(ARGV[base + 1])
+    local requested = tonumber(ARGV[base + 2])
+    local minimum = tonumber(ARGV[base + 3])
+
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'last_refill')
+    local tokens = tonumber(bucket[1])
+    local last_refill = tonumber(bucket[2])
+    if tokens == nil then
+        tokens = capacity
+        last_refill = now
+    end
+
+    local elapsed = math.max(0, now - last_refill)
+    local refilled = math.floor(elapsed * refill_rate)
+    tokens = math.min(capacity, tokens + refilled)
+    if refilled > 0 then
+        last_refill = now
+    end
+
+    if denied == 0 and tokens < minimum then
+        denied = i
+        retry_after = math.ceil((minimum - tokens) / refill_rate * 1000)
+    end
+    state[i] = {tokens, last_refill, capacity, refill_rate, requested}
+end
+
+local result = {0, denied, retry_after}
+if denied == 0 then
+    result[1] = 1
+end
+
+for i = 1, #KEYS do
+    local s = state[i]
+    local tokens = s[1]
+    local granted = 0
+    if denied == 0 then
+        granted = math.min(tokens, s[5])
+        tokens = tokens - granted
+    end
+    redis.call('HMSET', KEYS[i], 'tokens', tokens, 'last_refill', s[2])
+    redis.call('EXPIRE', KEYS[i], math.ceil(s[3] / s[4]) + 60)
+    table.insert(result, tokens)
+    table.insert(result, granted)
+end
+
+return result
+"""
+
 _lua_sha: Optional[str] = None
+_multi_lua_sha: Optional[str] = None
 
 
 async def _get_lua_sha(r) -> str:
@@ -80,13 +160,21 @@ async def _get_lua_sha(r) -> str:
     return _lua_sha
 
 
+async def _get_multi_lua_sha(r) -> str:
+    global _multi_lua_sha
+    if _multi_lua_sha is None:
+        _multi_lua_sha = await r.script_load(MULTI_BUCKET_LUA)
+    return _multi_lua_sha
+
+
 class RateLimitResult:
-    __slots__ = ("allowed", "remaining", "retry_after_ms")
+    __slots__ = ("allowed", "remaining", "retry_after_ms", "tier")
 
-    def __init__(self, allowed: bool, remaining: int, retry_after_ms: int):
+    def __init__(self, allowed: bool, remaining: int, retry_after_ms: int, tier: Optional[str] = None):
         self.allowed = allowed
         self.remaining = remaining
         self.retry_after_ms = retry_after_ms
+        self.tier = tier  # bucket that decided a multi-bucket check, when known
 
 
 # Predefined rate limit tiers (base values — per-tenant tiers are scaled by
@@ -273,6 +361,146 @@ async def check_rate_limit(
     )
 
 
+# (key, tier, plan_slug) — one bucket applying to a request.
+BucketSpec = Tuple[str, str, Optional[str]]
+
+LEASE_MODE = os.environ.get("RATE_LIMIT_LEASE_MODE", "").strip().lower() in {"1", "true", "yes", "on"}
+LEASE_FRACTION = float(os.environ.get("RATE_LIMIT_LEASE_FRACTION", "0.05"))
+LEASE_TTL_SECONDS = float(os.environ.get("RATE_LIMIT_LEASE_TTL_MS", "1000")) / 1000
+LEASE_MIN_TOKENS = 2  # below this a lease saves nothing — go to Redis
+_LEASE_MAX_ENTRIES = 10_000
+
+_leases: dict[str, "_Lease"] = {}
+_lease_stats = {"local_hits": 0, "redis_calls": 0, "leases_granted": 0}
+
+
+class _Lease:
+    """Tokens this pod already took from a Redis bucket, valid until ``expires``."""
+
+    __slots__ = ("tokens", "expires", "remaining")
+
+    def __init__(self, tokens: int, expires: float, remaining: int):
+        self.tokens = tokens
+        self.expires = expires
+        self.remaining = remaining  # Redis bucket level when the lease was taken
+
+    def covers(self, tokens: int, now: float) -> bool:
+        return self.expires > now and self.tokens >= tokens
+
+
+def _lease_size(config: dict) -> int:
+    size = int(config["capacity"] * LEASE_FRACTION)
+    return size if size >= LEASE_MIN_TOKENS else 0
+
+
+def _store_lease(bucket_key: str, tokens: int, remaining: int, now: float) -> None:
+    if len(_leases) >= _LEASE_MAX_ENTRIES:
+        for k in [k for k, v in _leases.items() if v.expires <= now]:
+            _leases.pop(k, None)
+        if len(_leases) >= _LEASE_MAX_ENTRIES:
+            _leases.clear()
+    _leases[bucket_key] = _Lease(tokens, now + LEASE_TTL_SECONDS, remaining)
+    _lease_stats["leases_granted"] += 1
+
+
+async def check_rate_limits(
+    buckets: Sequence[BucketSpec],
+    tokens: int = 1,
+    *,
+    lease_mode: Optional[bool] = None,
+) -> RateLimitResult:
+    """Check every bucket for a request in one Redis round trip.
+
+    Same failure contract as :func:`check_rate_limit`: connection-class
+    errors raise :class:`RateLimiterUnavailable`, anything else fails open.
+    The result carries the denying bucket's tier and remaining tokens, or
+    the lowest remaining count when allowed.
+    """
+    if not buckets:
+        return RateLimitResult(allowed=True, remaining=-1, retry_after_ms=0)
+    use_leases = LEASE_MODE if lease_mode is None else lease_mode
+    mono = time.monotonic()
+
+    specs = []
+    for key, tier, plan_slug in buckets:
+        config = _scaled_config(tier, plan_slug)
+        bucket_key = f"rl:{tier}:{key}"
+        lease = _leases.get(bucket_key) if use_leases else None
+        specs.append((tier, bucket_key, config, lease if lease and lease.covers(tokens, mono) else None))
+
+    remote = [spec for spec in specs if spec[3] is None]
+    if not remote:
+        for _, _, _, lease in specs:
+            lease.tokens -= tokens
+        _lease_stats["local_hits"] += 1
+        return RateLimitResult(allowed=True, remaining=min(s[3].remaining for s in specs), retry_after_ms=0)
+
+    try:
+        from app.infrastructure.redis_client import get_async_redis
+        r = await get_async_redis()
+    except Exception as e:
+        if _is_redis_connection_error(e):
+            raise RateLimiterUnavailable(f"redis client init unreachable: {e}") from e
+        logger.warning("Rate limit client init failed (fail-open): %s", e)
+        return RateLimitResult(allowed=True, remaining=-1, retry_after_ms=0)
+
+    if r is None:
+        return RateLimitResult(allowed=True, remaining=-1, retry_after_ms=0)
+
+    keys = [bucket_key for _, bucket_key, _, _ in remote]
+    args = [str(time.time())]
+    for _, _, config, _ in remote:
+        requested = max(tokens, _lease_size(config)) if use_leases else tokens
+        args += [str(config["capacity"]), str(config["refill_rate"]), str(requested), str(tokens)]
+
+    global _multi_lua_sha
+    try:
+        sha = await _get_multi_lua_sha(r)
+        result = await r.evalsha(sha, len(keys), *keys, *args)
+    except Exception as exc:
+        if "noscript" in str(exc).lower():
+            _multi_lua_sha = None
+            try:
+                sha = await _get_multi_lua_sha(r)
+                result = await r.evalsha(sha, len(keys), *keys, *args)
+            except Exception as retry_exc:
+                if _is_redis_connection_error(retry_exc):
+                    raise RateLimiterUnavailable(
+                        f"redis evalsha retry unreachable: {retry_exc}"
+                    ) from retry_exc
+                logger.warning("Rate limit retry failed (fail-open): %s", retry_exc)
+                return RateLimitResult(allowed=True, remaining=-1, retry_after_ms=0)
+        elif _is_redis_connection_error(exc):
+            raise RateLimiterUnavailable(f"redis multi-bucket check unreachable: {exc}") from exc
+        else:
+            logger.warning("Rate limit script error (fail-open): %s", exc)
+            return RateLimitResult(allowed=True, remaining=-1, retry_after_ms=0)
+    _lease_stats["redis_calls"] += 1
+
+    allowed, denied_index, retry_after_ms = bool(result[0]), int(result[1]), int(result[2])
+    remaining = [int(result[3 + 2 * i]) for i in range(len(remote))]
+    if not allowed:
+        return RateLimitResult(
+            allowed=False,
+            remaining=remaining[denied_index - 1],
+            retry_after_ms=retry_after_ms,
+            tier=remote[denied_index - 1][0],
+        )
+
+    if use_leases:
+        for i, (_, bucket_key, _, _) in enumerate(remote):
+            surplus = int(result[4 + 2 * i]) - tokens
+            if surplus > 0:
+                _store_lease(bucket_key, surplus, remaining[i], mono)
+            else:
+                _leases.pop(bucket_key, None)
+    for _, _, _, lease in specs:
+        if lease is not None:
+            lease.tokens -= tokens
+            remaining.append(lease.remaining)
+    return RateLimitResult(allowed=True, remaining=min(remaining), retry_after_ms=0)
+
+
 async def get_rate_limit_stats() -> dict:
     """Get rate limiter statistics."""
     try:
@@ -289,6 +517,56 @@ async def get_rate_limit_stats() -> dict:
                 count += 1
             stats[tier] = {"active_buckets": count, **RATE_TIERS[tier]}
 
-        return {"status": "healthy", "tiers": stats}
+        return {
+            "status": "healthy",
+            "tiers": stats,
+            "lease": {"enabled": LEASE_MODE, "active_leases": len(_leases), **_lease_stats},
+        }
     except Exception as e:
         return {"status": "error", "reason": str(e)}
+
+
+class LocalTokenBucket:
+    """In-process token bucket for pacing *outbound* calls (no Redis).
+
+    Same refill model as ``TOKEN_BUCKET_LUA`` but with fractional tokens and
+    an awaitable ``acquire`` that sleeps until enough tokens are available.
+    Used to keep bursts of work (e.g. scheduled sheet syncs, supplier sync
+    jobs) under third-party API quotas. Not shared across processes.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = float(capacity)
+        self.refill_rate = max(0.001, float(refill_rate))
+        self.tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = max(0.0, now - self._last_refill)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Consume tokens if available right now; never waits."""
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until tokens are available, consume them, return seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                delay = (tokens - self.tokens) / self.refill_rate
+                await asyncio.sleep(delay)
+                waited += delay
+        return waited
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the remote side answered 429."""
+        self._refill()
+        self.tokens = 0.0
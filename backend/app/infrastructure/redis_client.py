@@ -15,6 +15,7 @@ logger = logging.getLogger("infrastructure.redis")
 
 _sync_pool = None
 _async_pool = None
+_async_binary_pool = None
 
 
 def get_redis_url() -> str:
@@ -68,6 +69,31 @@ async def get_async_redis():
         return None
 
 
+async def get_async_redis_binary():
+    """Return an async redis client that returns raw bytes (lazy singleton).
+
+    For compact binary payloads (msgpack/zstd blobs) that must not be decoded.
+    """
+    global _async_binary_pool
+    if _async_binary_pool is not None:
+        return _async_binary_pool
+    try:
+        import redis.asyncio as aioredis
+        _async_binary_pool = aioredis.from_url(
+            get_redis_url(),
+            max_connections=20,
+            decode_responses=False,
+            socket_connect_timeout=2,
+            socket_timeout=1,
+        )
+        await _async_binary_pool.ping()
+        return _async_binary_pool
+    except Exception as e:
+        logger.warning("Async binary Redis unavailable: %s", e)
+        _async_binary_pool = None
+        return None
+
+
 async def redis_health() -> dict:
     """Health check for Redis."""
     try:
@@ -87,10 +113,13 @@ async def redis_health() -> dict:
 
 async def shutdown_redis():
     """Graceful shutdown."""
-    global _sync_pool, _async_pool
+    global _sync_pool, _async_pool, _async_binary_pool
     if _async_pool:
         await _async_pool.aclose()
         _async_pool = None
+    if _async_binary_pool:
+        await _async_binary_pool.aclose()
+        _async_binary_pool = None
     if _sync_pool:
         _sync_pool.close()
         _sync_pool = None
@@ -6,6 +6,8 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
+from app.services.unit_of_work import server_timing_header
+
 
 class CorrelationIdMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):  # type: ignore[override]
@@ -26,4 +28,9 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
 
         # 4) Always set response header
         response.headers["X-Correlation-Id"] = cid
+
+        # 5) Per-step latencies recorded by the handler (UnitOfWork.step)
+        timings = getattr(request.state, "server_timing", None)
+        if timings:
+            response.headers["Server-Timing"] = server_timing_header(timings)
         return response
@@ -1,6 +1,7 @@
 """Prometheus metrics collection middleware.
 
-Records request duration for all API requests.
+Records request duration for all API requests, labelled with the matched
+route template so ids never become label values.
 """
 from __future__ import annotations
 
@@ -17,9 +18,9 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
     """Record request timing for Prometheus metrics."""
 
     async def dispatch(self, request: Request, call_next) -> Response:
-        start = time.time()
+        start = time.perf_counter()
         response: Response = await call_next(request)
-        duration_ms = (time.time() - start) * 1000
+        duration_ms = (time.perf_counter() - start) * 1000
 
         path = request.url.path or ""
         if path.startswith("/api"):
@@ -28,6 +29,7 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
                 path=path,
                 status_code=response.status_code,
                 duration_ms=duration_ms,
+                route=getattr(request.scope.get("route"), "path", None),
             )
 
         return response
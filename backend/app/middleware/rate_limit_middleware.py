@@ -10,7 +10,9 @@ Targets:
 - Global API rate limit: 200 requests / 1 min per IP
 - Per-tenant global rate limit: 600 req/min × plan multiplier (T007)
 
-Uses Redis token bucket (O(1), ~0.1ms) with MongoDB fallback.
+Uses Redis token bucket (O(1), ~0.1ms) with MongoDB fallback. All buckets
+that apply to a request (route tier, per-IP, per-tenant) are checked in one
+EVALSHA; see ``check_rate_limits`` (and its optional per-pod lease mode).
 
 Note on per-IP × per-tenant interaction (T007 design):
     Each request is checked against BOTH `api_global` (per-IP, 200/min) AND
@@ -216,6 +218,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             response.headers.setdefault("X-RateLimit-Policy", "token_bucket")
             return response
 
+        # All buckets that apply to this request, checked in one Redis call.
+        buckets = []
+
         # Endpoint-specific rate limits on state-changing methods
         if method in ("POST", "PUT", "DELETE"):
             match = _find_matching_tier(path)
@@ -226,19 +231,11 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     key = _get_client_ip(request)
                 else:
                     key = _get_user_from_auth(request) or _get_client_ip(request)
-
-                result = await self._check_redis_rate_limit(key, tier)
-                if result and not result.allowed:
-                    retry_after = max(1, result.retry_after_ms // 1000)
-                    return self._rate_limit_response(retry_after, result.remaining)
+                buckets.append((key, tier, None))
 
         # Global rate limit for all API requests (per-IP)
         if path.startswith("/api"):
-            client_ip = _get_client_ip(request)
-            result = await self._check_redis_rate_limit(client_ip, "api_global")
-            if result and not result.allowed:
-                retry_after = max(1, result.retry_after_ms // 1000)
-                return self._rate_limit_response(retry_after, result.remaining)
+            buckets.append((_get_client_ip(request), "api_global", None))
 
             # T007 — Per-tenant global rate limit, scaled by plan multiplier.
             # Only runs when TenantResolutionMiddleware resolved a tenant for
@@ -247,35 +244,42 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             tenant_org_id = _get_tenant_org_id(request)
             if tenant_org_id:
                 plan_slug = await _resolve_org_plan(tenant_org_id)
-                tenant_result = await self._check_redis_rate_limit(
-                    tenant_org_id, "tenant_global", plan_slug=plan_slug,
-                )
-                if tenant_result and not tenant_result.allowed:
-                    retry_after = max(1, tenant_result.retry_after_ms // 1000)
-                    return self._rate_limit_response(retry_after, tenant_result.remaining)
+                buckets.append((tenant_org_id, "tenant_global", plan_slug))
+
+        if buckets:
+            result = await self._check_redis_rate_limits(buckets)
+            if result and not result.allowed:
+                retry_after = max(1, result.retry_after_ms // 1000)
+                return self._rate_limit_response(retry_after, result.remaining)
 
         response = await call_next(request)
         response.headers["X-RateLimit-Policy"] = "token_bucket"
         return response
 
-    async def _check_redis_rate_limit(self, key: str, tier: str, plan_slug: Optional[str] = None):
-        """Try Redis rate limit, fall back to MongoDB only on infra outages.
+    async def _check_redis_rate_limits(self, buckets: list):
+        """Try the multi-bucket Redis check, fall back to MongoDB only on infra outages.
 
-        ``RateLimiterUnavailable`` is raised by ``check_rate_limit`` when
+        ``RateLimiterUnavailable`` is raised by ``check_rate_limits`` when
         Redis itself is unreachable (connection/timeout/refused). Logic-level
         errors inside the script fail open at the source and reach us as a
         normal allowed result — we do NOT spuriously hammer Mongo for those.
+        The fallback checks buckets one by one and stops at the first denial.
         """
         try:
-            from app.infrastructure.rate_limiter import check_rate_limit, RateLimiterUnavailable
+            from app.infrastructure.rate_limiter import check_rate_limits, RateLimiterUnavailable
         except Exception as e:  # extremely defensive — import failure
             logger.debug("rate_limiter import failed, allowing request: %s", e)
             return None
         try:
-            return await check_rate_limit(key, tier, plan_slug=plan_slug)
+            return await check_rate_limits(buckets)
         except RateLimiterUnavailable as e:
             logger.info("Redis rate limit unavailable, falling back to MongoDB: %s", e)
-            return await self._check_mongo_fallback(key, tier, plan_slug=plan_slug)
+            result = None
+            for key, tier, plan_slug in buckets:
+                result = await self._check_mongo_fallback(key, tier, plan_slug=plan_slug)
+                if not result.allowed:
+                    break
+            return result
 
     async def _check_mongo_fallback(self, key: str, tier: str, plan_slug: Optional[str] = None):
         """MongoDB-based rate limit fallback."""
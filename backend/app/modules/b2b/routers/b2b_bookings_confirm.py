@@ -8,9 +8,15 @@ Owns:
 External contract (URL paths, request/response shapes, status codes,
 audit log entries, lifecycle event emissions, supplier interaction order)
 is preserved bit-for-bit.
+
+Writes go through a request-scoped ``UnitOfWork``: audit entries, the
+lifecycle event and the booking updates are flushed together when the
+request ends (also on error responses), and the credit and risk pre-checks
+run concurrently. Per-step latencies are returned in ``Server-Timing``.
 """
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 from uuid import uuid4
 
@@ -20,7 +26,6 @@ from fastapi import APIRouter, Depends, Request
 from app.auth import get_current_user, require_roles
 from app.db import get_db
 from app.errors import AppError
-from app.services.audit import write_audit_log
 from app.services.booking_lifecycle import BookingLifecycleService
 from app.services.credit_exposure_service import has_available_credit
 from app.services.suppliers.contracts import (
@@ -31,6 +36,7 @@ from app.services.suppliers.contracts import (
 )
 from app.services.suppliers.redaction import redact_sensitive_fields
 from app.services.suppliers.registry import registry as supplier_registry
+from app.services.unit_of_work import UnitOfWork
 from app.utils import now_utc
 
 router = APIRouter(prefix="/api/b2b", tags=["b2b-bookings"])
@@ -60,7 +66,15 @@ async def confirm_b2b_booking(
     - On successful supplier fulfilment, appends BOOKING_CONFIRMED lifecycle
       event and emits B2B_BOOKING_CONFIRMED audit log.
     """
+    async with UnitOfWork(db, request) as uow:
+        return await _confirm(booking_id, request, user, db, uow)
+
+
+async def _credit_not_required() -> bool:
+    return True
+
 
+async def _confirm(booking_id: str, request: Request, user: dict, db, uow: UnitOfWork):
     org_id = user.get("organization_id")
     # agency_id is optional for v1; fall back to booking.agency_id if present
 
@@ -69,7 +83,8 @@ async def confirm_b2b_booking(
     except Exception:
         raise AppError(404, "BOOKING_NOT_FOUND", "BOOKING_NOT_FOUND")
 
-    booking = await db.bookings.find_one({"_id": oid, "organization_id": org_id})
+    async with uow.step("load"):
+        booking = await db.bookings.find_one({"_id": oid, "organization_id": org_id})
     if not booking:
         raise AppError(404, "BOOKING_NOT_FOUND", "BOOKING_NOT_FOUND")
 
@@ -94,16 +109,19 @@ async def confirm_b2b_booking(
         # Idempotent confirm when projection is already CONFIRMED.
         # Ensure at least one BOOKING_CONFIRMED lifecycle event + audit exists,
         # but do not create duplicates on repeated calls.
-        existing_event = await db.booking_events.find_one(
-            {"organization_id": org_id, "booking_id": booking_id, "event": "BOOKING_CONFIRMED"}
-        )
-        existing_audit = await db.audit_logs.find_one(
-            {
-                "organization_id": org_id,
-                "action": "B2B_BOOKING_CONFIRMED",
-                "target.id": booking_id,
-            }
-        )
+        async with uow.step("idempotency"):
+            existing_event, existing_audit = await asyncio.gather(
+                db.booking_events.find_one(
+                    {"organization_id": org_id, "booking_id": booking_id, "event": "BOOKING_CONFIRMED"}
+                ),
+                db.audit_logs.find_one(
+                    {
+                        "organization_id": org_id,
+                        "action": "B2B_BOOKING_CONFIRMED",
+                        "target.id": booking_id,
+                    }
+                ),
+            )
         if not existing_event or not existing_audit:
             attempt_id = str(uuid4())
             source = booking.get("source")
@@ -112,14 +130,15 @@ async def confirm_b2b_booking(
             supplier_offer_id = (offer_ref.get("supplier_offer_id") or "").strip()
 
             lifecycle = BookingLifecycleService(db)
-            await lifecycle.append_event(
+            _queue_confirmed_event(
+                uow,
+                lifecycle,
+                oid=oid,
                 organization_id=org_id,
                 agency_id=booking.get("agency_id") or "",
                 booking_id=booking_id,
-                event="BOOKING_CONFIRMED",
                 request_id=attempt_id,
                 before={"status": status_val},
-                after={"status": "CONFIRMED"},
                 meta={
                     "source": source,
                     "supplier": supplier_name,
@@ -135,11 +154,9 @@ async def confirm_b2b_booking(
                 "tenant_id": offer_ref.get("buyer_tenant_id"),
                 "attempt_id": attempt_id,
             }
-            await write_audit_log(
-                db,
+            uow.audit(
                 organization_id=org_id,
                 actor=actor,
-                request=request,
                 action="B2B_BOOKING_CONFIRMED",
                 target_type="booking",
                 target_id=booking_id,
@@ -147,6 +164,9 @@ async def confirm_b2b_booking(
                 after=None,
                 meta=meta,
             )
+            await uow.commit()
+            async with uow.step("hooks"):
+                await lifecycle.run_hooks(organization_id=org_id, booking_id=booking_id, event="BOOKING_CONFIRMED")
 
         return {"booking_id": booking_id, "state": "confirmed"}
 
@@ -175,31 +195,38 @@ async def confirm_b2b_booking(
                 details={"reason": "invalid_state"},
             )
 
-    # Credit limit / exposure guard
-    amount = float(booking.get("amount") or 0.0)
-    if amount > 0:
-        has_credit = await has_available_credit(db, organization_id=org_id, amount=amount)
-        if not has_credit:
-            raise AppError(
-                409,
-                "credit_limit_exceeded",
-                "Credit limit exceeded for this organization.",
-                details={"amount": amount},
-            )
-
-    # Risk engine (PR-19): evaluate booking risk before supplier fulfilment
+    # Credit limit / exposure guard and risk engine (PR-19) are independent
+    # reads: run them together, but report a credit failure first as before.
     from app.services.risk.engine import RiskDecision, evaluate_booking_risk
 
-    risk_result = await evaluate_booking_risk(db, organization_id=org_id, booking=booking)
+    amount = float(booking.get("amount") or 0.0)
+    credit_check = (
+        has_available_credit(db, organization_id=org_id, amount=amount) if amount > 0 else _credit_not_required()
+    )
+    async with uow.step("prechecks"):
+        has_credit, risk_result = await asyncio.gather(
+            credit_check,
+            evaluate_booking_risk(db, organization_id=org_id, booking=booking),
+            return_exceptions=True,
+        )
+    if isinstance(has_credit, BaseException):
+        raise has_credit
+    if not has_credit:
+        raise AppError(
+            409,
+            "credit_limit_exceeded",
+            "Credit limit exceeded for this organization.",
+            details={"amount": amount},
+        )
+    if isinstance(risk_result, BaseException):
+        raise risk_result
 
     # Always emit RISK_EVALUATED audit
     actor = {"actor_type": "user", "email": user.get("email"), "roles": user.get("roles")}
     buyer_tenant_id = (booking.get("offer_ref") or {}).get("buyer_tenant_id")
-    await write_audit_log(
-        db,
+    uow.audit(
         organization_id=org_id,
         actor=actor,
-        request=request,
         action="RISK_EVALUATED",
         target_type="booking",
         target_id=booking_id,
@@ -227,16 +254,15 @@ async def confirm_b2b_booking(
 
     if risk_result.decision is RiskDecision.BLOCK:
         # Store risk info but do not change booking state
-        await db.bookings.update_one(
+        uow.update(
+            "bookings",
             {"_id": oid, "organization_id": org_id},
             {"$set": {"risk": risk_snapshot, "updated_at": now_utc()}},
         )
 
-        await write_audit_log(
-            db,
+        uow.audit(
             organization_id=org_id,
             actor=actor,
-            request=request,
             action="RISK_BLOCKED",
             target_type="booking",
             target_id=booking_id,
@@ -258,16 +284,15 @@ async def confirm_b2b_booking(
 
     if risk_result.decision is RiskDecision.REVIEW:
         # Set booking.status to RISK_REVIEW and persist risk snapshot
-        await db.bookings.update_one(
+        uow.update(
+            "bookings",
             {"_id": oid, "organization_id": org_id},
             {"$set": {"status": "RISK_REVIEW", "risk": risk_snapshot, "updated_at": now_utc()}},
         )
 
-        await write_audit_log(
-            db,
+        uow.audit(
             organization_id=org_id,
             actor=actor,
-            request=request,
             action="RISK_REVIEW_REQUIRED",
             target_type="booking",
             target_id=booking_id,
@@ -346,7 +371,8 @@ async def confirm_b2b_booking(
 
     result = None
     try:
-        result = await run_with_deadline(adapter.confirm_booking(ctx, booking), ctx)
+        async with uow.step("supplier"):
+            result = await run_with_deadline(adapter.confirm_booking(ctx, booking), ctx)
     except SupplierAdapterError as exc:
         # Map adapter-level errors to HTTP responses and audit
         retryable = getattr(exc, "retryable", False)
@@ -354,11 +380,9 @@ async def confirm_b2b_booking(
 
         # Audit supplier confirm failure
         actor = {"actor_type": "user", "email": user.get("email"), "roles": user.get("roles")}
-        await write_audit_log(
-            db,
+        uow.audit(
             organization_id=org_id,
             actor=actor,
-            request=request,
             action="SUPPLIER_CONFIRM_FAILED",
             target_type="booking",
             target_id=booking_id,
@@ -394,21 +418,23 @@ async def confirm_b2b_booking(
         update_fields["supplier.booking_id"] = supplier_booking_id
         update_fields["supplier.confirm_snapshot"] = redact_sensitive_fields(result.raw or {})
 
-        await db.bookings.update_one(
+        uow.update(
+            "bookings",
             {"_id": oid, "organization_id": org_id},
             {"$set": update_fields},
         )
 
         # Append lifecycle BOOKING_CONFIRMED event
         lifecycle = BookingLifecycleService(db)
-        await lifecycle.append_event(
+        _queue_confirmed_event(
+            uow,
+            lifecycle,
+            oid=oid,
             organization_id=org_id,
             agency_id=booking.get("agency_id") or "",
             booking_id=booking_id,
-            event="BOOKING_CONFIRMED",
             request_id=attempt_id,
             before={"status": status_val or "PENDING"},
-            after={"status": "CONFIRMED"},
             meta={
                 "source": source,
                 # Preserve legacy supplier name in events for compatibility
@@ -437,11 +463,9 @@ async def confirm_b2b_booking(
         if supplier_booking_id:
             meta["supplier_booking_id"] = supplier_booking_id
 
-        await write_audit_log(
-            db,
+        uow.audit(
             organization_id=org_id,
             actor=actor,
-            request=request,
             action="B2B_BOOKING_CONFIRMED",
             target_type="booking",
             target_id=booking_id,
@@ -449,16 +473,17 @@ async def confirm_b2b_booking(
             after=None,
             meta=meta,
         )
+        await uow.commit()
+        async with uow.step("hooks"):
+            await lifecycle.run_hooks(organization_id=org_id, booking_id=booking_id, event="BOOKING_CONFIRMED")
 
         return {"booking_id": booking_id, "state": "confirmed"}
 
     if result.status is ConfirmStatus.REJECTED:
         actor = {"actor_type": "user", "email": user.get("email"), "roles": user.get("roles")}
-        await write_audit_log(
-            db,
+        uow.audit(
             organization_id=org_id,
             actor=actor,
-            request=request,
             action="SUPPLIER_CONFIRM_ATTEMPT",
             target_type="booking",
             target_id=booking_id,
@@ -483,11 +508,9 @@ async def confirm_b2b_booking(
 
     if result.status is ConfirmStatus.PENDING:
         actor = {"actor_type": "user", "email": user.get("email"), "roles": user.get("roles")}
-        await write_audit_log(
-            db,
+        uow.audit(
             organization_id=org_id,
             actor=actor,
-            request=request,
             action="SUPPLIER_CONFIRM_ATTEMPT",
             target_type="booking",
             target_id=booking_id,
@@ -512,11 +535,9 @@ async def confirm_b2b_booking(
 
     if result.status is ConfirmStatus.NOT_SUPPORTED:
         actor = {"actor_type": "user", "email": user.get("email"), "roles": user.get("roles")}
-        await write_audit_log(
-            db,
+        uow.audit(
             organization_id=org_id,
             actor=actor,
-            request=request,
             action="SUPPLIER_CONFIRM_ATTEMPT",
             target_type="booking",
             target_id=booking_id,
@@ -546,3 +567,41 @@ async def confirm_b2b_booking(
         "Unexpected supplier confirm status.",
         details={"supplier": supplier_name, "status": result.status},
     )
+
+
+def _queue_confirmed_event(
+    uow: UnitOfWork,
+    lifecycle: BookingLifecycleService,
+    *,
+    oid: ObjectId,
+    organization_id: str,
+    agency_id: str,
+    booking_id: str,
+    request_id: str,
+    before: dict[str, Any],
+    meta: dict[str, Any],
+) -> None:
+    """Queue BOOKING_CONFIRMED (event + projection) as ``append_event`` writes it.
+
+    ``request_id`` is a fresh attempt id, so the idempotency lookup of
+    ``append_event`` can never match and is skipped.
+    """
+    occurred_at = now_utc()
+    uow.insert(
+        "booking_events",
+        lifecycle.build_event(
+            organization_id=organization_id,
+            agency_id=agency_id,
+            booking_id=booking_id,
+            event="BOOKING_CONFIRMED",
+            occurred_at=occurred_at,
+            request_id=request_id,
+            before=before,
+            after={"status": "CONFIRMED"},
+            meta=meta,
+        ),
+    )
+    uow.update(
+        "bookings",
+        *lifecycle.projection_update(oid, organization_id, "BOOKING_CONFIRMED", occurred_at, request_id),
+    )
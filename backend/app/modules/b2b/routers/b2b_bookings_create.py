@@ -35,6 +35,7 @@ from app.services.b2b_pricing import B2BPricingService
 from app.services.funnel_events import log_funnel_event
 from app.services.pricing_audit_service import emit_pricing_audit_if_needed
 from app.services.pricing_service import calculate_price
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.services.supplier_mapping_service import (
     apply_supplier_mapping,
     resolve_listing_supplier,
@@ -295,6 +296,7 @@ async def create_b2b_booking(
             "updated_at": now,
         }
 
+        booking_doc[SEARCH_TOKENS_FIELD] = build_search_tokens(booking_doc, "bookings")
         res = await db.bookings.insert_one(booking_doc)
         booking_id = str(res.inserted_id)
 
@@ -443,6 +445,7 @@ async def create_b2b_booking_from_marketplace(
         "updated_at": now,
     }
 
+    booking_doc[SEARCH_TOKENS_FIELD] = build_search_tokens(booking_doc, "bookings")
     res = await db.bookings.insert_one(booking_doc)
     booking_id = str(res.inserted_id)
 
@@ -8,7 +8,12 @@ from pydantic import BaseModel
 
 from app.auth import get_current_user, require_roles
 from app.db import get_db
-from app.services.booking_outcomes import resolve_outcome_for_booking, upsert_booking_outcome, apply_pms_status_evidence
+from app.services.booking_outcomes import (
+  apply_pms_status_evidence,
+  refresh_outcome_stats,
+  resolve_outcome_for_booking,
+  upsert_booking_outcome,
+)
 from app.services.audit import write_audit_log
 from app.utils import now_utc
 
@@ -219,6 +224,7 @@ async def apply_pms_event(
     {"$set": updated},
     upsert=True,
   )
+  await refresh_outcome_stats(db, org_id, updated["booking_id"])
 
   # Return response
   evidence = updated.get("evidence") or []
@@ -284,6 +290,7 @@ async def verify_booking_outcome(
     {"$set": doc},
     upsert=True,
   )
+  await refresh_outcome_stats(db, org_id, booking_id)
 
   after = await db.booking_outcomes.find_one({"organization_id": org_id, "booking_id": booking_id}) or {}
 
@@ -373,6 +380,7 @@ async def override_booking_outcome(
     {"$set": doc},
     upsert=True,
   )
+  await refresh_outcome_stats(db, org_id, booking_id)
 
   after = await db.booking_outcomes.find_one({"organization_id": org_id, "booking_id": booking_id}) or {}
 
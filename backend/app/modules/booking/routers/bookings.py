@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel
 
 from app.auth import get_current_user, require_roles
@@ -21,6 +21,7 @@ from datetime import datetime
 
 
 from app.context.org_context import get_current_org
+from app.repositories.base_repository import InvalidCursor
 from app.repositories.booking_repository import BookingRepository
 from app.services.booking_service import (
     create_booking_draft,
@@ -497,23 +498,36 @@ async def cancel_request_booking_endpoint(
 
 @router.get("", dependencies=[Depends(require_roles(["agency_admin", "agency_agent"]))])
 async def list_bookings_endpoint(
+    response: Response,
     state: Optional[str] = None,
     start: Optional[datetime] = None,
     end: Optional[datetime] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     db=Depends(get_db),
     user=Depends(get_current_user),
     org=Depends(get_current_org),
 ) -> List[Dict[str, Any]]:
+    """List bookings, newest first.
+
+    The body stays a plain list; the cursor for the next page is returned in
+    the ``X-Next-Cursor`` header (absent on the last page).
+    """
     organization_id = str(org["id"])
     repo = BookingRepository(db)
-    docs = await repo.list_bookings(
-        organization_id,
-        state=state,
-        start_date=start,
-        end_date=end,
-        limit=limit,
-    )
+    try:
+        docs, next_cursor = await repo.list_bookings_page(
+            organization_id,
+            state=state,
+            start_date=start,
+            end_date=end,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="INVALID_CURSOR")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [serialize_doc(d) for d in docs]
 
 
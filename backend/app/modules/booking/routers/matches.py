@@ -11,6 +11,12 @@ from app.db import get_db
 from app.schemas import BookingPublicView
 from app.utils import now_utc, build_booking_public_view
 from app.services.risk_profile import load_risk_profile, is_high_risk
+from app.services.match_stats_projection import (
+    is_projection_ready,
+    load_match_summary_rows,
+    load_outcome_rows,
+    load_pair_metrics,
+)
 
 router = APIRouter(prefix="/api/admin/matches", tags=["admin-matches"])
 
@@ -148,9 +154,13 @@ async def list_matches(
     - groups by (agency_id, hotel_id)
     - counts bookings by status
     - computes basic rates (confirm/cancel)
+
+    Reads from the `agency_hotel_match_stats` projection (day granularity)
+    once the organization has been rebuilt; otherwise aggregates live.
     """
     org_id = user.get("organization_id")
     cutoff = now_utc() - timedelta(days=days)
+    use_projection = await is_projection_ready(db, org_id)
 
     pipeline = [
         {"$match": {"organization_id": org_id, "created_at": {"$gte": cutoff}}},
@@ -186,7 +196,10 @@ async def list_matches(
         {"$sort": {"total": -1}},
     ]
 
-    rows = await db.bookings.aggregate(pipeline).to_list(length=None)
+    if use_projection:
+        rows = await load_match_summary_rows(db, org_id, days)
+    else:
+        rows = await db.bookings.aggregate(pipeline).to_list(length=None)
 
     # filter by min_total
     filtered = [r for r in rows if int(r.get("total") or 0) >= min_total]
@@ -205,7 +218,16 @@ async def list_matches(
     # v1.5: load no-show metrics from booking_outcomes (7d window)
     no_show_rate_by_match: dict[str, float] = {}
     repeat_no_show_7_by_match: dict[str, int] = {}
-    if filtered:
+    projected_outcomes: dict[str, dict[str, int]] = {}
+    if filtered and use_projection:
+        projected_outcomes = await load_outcome_rows(db, org_id)
+        for key_id, orow in projected_outcomes.items():
+            total = orow.get("no_show_total_7", 0)
+            no_show_count = orow.get("no_show_7", 0)
+            if total > 0:
+                no_show_rate_by_match[key_id] = float(no_show_count) / total
+                repeat_no_show_7_by_match[key_id] = no_show_count
+    elif filtered:
         outcomes_cursor = db.booking_outcomes.aggregate(
             [
                 {
@@ -250,7 +272,13 @@ async def list_matches(
     # Repeat not-arrived 7d aggregation (behavioral vs operational)
     repeat_behavioral: dict[str, int] = {}
     repeat_operational: dict[str, int] = {}
-    if filtered:
+    if filtered and use_projection:
+        for r in filtered:
+            key = r.get("_id") or {}
+            key_id = f"{key.get('agency_id')}__{key.get('hotel_id')}"
+            repeat_behavioral[key_id] = int(r.get("repeat_behavioral_7") or 0)
+            repeat_operational[key_id] = int(r.get("repeat_operational_7") or 0)
+    elif filtered:
         from app.utils import now_utc as _now_utc
 
         now = _now_utc()
@@ -327,11 +355,19 @@ async def list_matches(
                 if ra and rh:
                     key_id = f"{ra}__{rh}"
                     repeat_behavioral[key_id] = int(rr.get("behavioral") or 0)
+                    repeat_operational[key_id] = int(rr.get("operational") or 0)
     # v2.1: load verified-only metrics from booking_outcomes (30d + 7d)
     verified_bookings_30d_by_match: dict[str, int] = {}
     verified_no_show_30d_by_match: dict[str, int] = {}
     verified_repeat_no_show_7_by_match: dict[str, int] = {}
-    if filtered:
+    if filtered and use_projection:
+        for mid, orow in projected_outcomes.items():
+            if orow.get("verified_total_30"):
+                verified_bookings_30d_by_match[mid] = orow["verified_total_30"]
+                verified_no_show_30d_by_match[mid] = orow.get("verified_no_show_30", 0)
+            if orow.get("verified_no_show_7"):
+                verified_repeat_no_show_7_by_match[mid] = orow["verified_no_show_7"]
+    elif filtered:
         thirty_days_ago = now_utc() - timedelta(days=30)
         seven_days_ago_verified = now_utc() - timedelta(days=7)
         pair_or_filters_verified: list[dict[str, Any]] = []
@@ -611,7 +647,63 @@ async def get_match_detail(
     if not agency or not hotel:
         raise HTTPException(status_code=404, detail="MATCH_NOT_FOUND")
 
-    # aggregate metrics
+    if await is_projection_ready(db, org_id):
+        projected = await load_pair_metrics(db, org_id, agency_id, hotel_id, days)
+        total = projected["total"]
+        pending = projected["pending"]
+        confirmed = projected["confirmed"]
+        cancelled = projected["cancelled"]
+        avg_approval_hours = projected["avg_approval_hours"]
+    else:
+        total, pending, confirmed, cancelled, avg_approval_hours = await _aggregate_pair_metrics(
+            db, org_id, agency_id, hotel_id, cutoff
+        )
+
+    confirm_rate = float(confirmed) / total if total > 0 else 0.0
+    cancel_rate = float(cancelled) / total if total > 0 else 0.0
+
+    # latest bookings for drilldown
+    cursor = (
+        db.bookings.find(
+            {
+                "organization_id": org_id,
+                "agency_id": agency_id,
+                "hotel_id": hotel_id,
+                "created_at": {"$gte": cutoff},
+            }
+        )
+        .sort("created_at", -1)
+        .limit(limit)
+    )
+    docs = await cursor.to_list(length=limit)
+    bookings: list[BookingPublicView] = []
+    for d in docs:
+        bookings.append(BookingPublicView(**build_booking_public_view(d)))
+
+    metrics = MatchMetrics(
+        total_bookings=total,
+        pending=pending,
+        confirmed=confirmed,
+        cancelled=cancelled,
+        confirm_rate=round(confirm_rate, 3),
+        cancel_rate=round(cancel_rate, 3),
+        avg_approval_hours=None if avg_approval_hours is None else round(avg_approval_hours, 2),
+    )
+
+    return MatchDetailOut(
+        id=f"{agency_id}__{hotel_id}",
+        agency_id=agency_id,
+        agency_name=agency.get("name"),
+        hotel_id=hotel_id,
+        hotel_name=hotel.get("name"),
+        range={"from": cutoff.isoformat(), "to": now_utc().isoformat(), "days": days},
+        metrics=metrics,
+        bookings=bookings,
+    )
+
+
+async def _aggregate_pair_metrics(db, org_id: str, agency_id: str, hotel_id: str, cutoff) -> tuple[int, int, int, int, Optional[float]]:
+    """Live aggregation fallback for organizations without the projection."""
     pipeline = [
         {
             "$match": {
@@ -672,47 +764,7 @@ async def get_match_detail(
         if avg_ms is not None:
             avg_approval_hours = float(avg_ms) / 1000.0 / 3600.0
 
-    confirm_rate = float(confirmed) / total if total > 0 else 0.0
-    cancel_rate = float(cancelled) / total if total > 0 else 0.0
-
-    # latest bookings for drilldown
-    cursor = (
-        db.bookings.find(
-            {
-                "organization_id": org_id,
-                "agency_id": agency_id,
-                "hotel_id": hotel_id,
-                "created_at": {"$gte": cutoff},
-            }
-        )
-        .sort("created_at", -1)
-        .limit(limit)
-    )
-    docs = await cursor.to_list(length=limit)
-    bookings: list[BookingPublicView] = []
-    for d in docs:
-        bookings.append(BookingPublicView(**build_booking_public_view(d)))
-
-    metrics = MatchMetrics(
-        total_bookings=total,
-        pending=pending,
-        confirmed=confirmed,
-        cancelled=cancelled,
-        confirm_rate=round(confirm_rate, 3),
-        cancel_rate=round(cancel_rate, 3),
-        avg_approval_hours=None if avg_approval_hours is None else round(avg_approval_hours, 2),
-    )
-
-    return MatchDetailOut(
-        id=f"{agency_id}__{hotel_id}",
-        agency_id=agency_id,
-        agency_name=agency.get("name"),
-        hotel_id=hotel_id,
-        hotel_name=hotel.get("name"),
-        range={"from": cutoff.isoformat(), "to": now_utc().isoformat(), "days": days},
-        metrics=metrics,
-        bookings=bookings,
-    )
+    return total, pending, confirmed, cancelled, avg_approval_hours
 
 
 @router.get("/{match_id}/events", response_model=MatchEventsResponse, dependencies=[Depends(require_roles(["super_admin"]))])
@@ -428,6 +428,7 @@ async def execute_booking(
             "supplier_code": used_supplier,
             "supplier_booking_id": result.supplier_booking_id,
             "product_type": payload.get("product_type", "hotel"),
+            "destination": payload.get("destination", ""),
             "status": "confirmed",
             "organization_id": org_id,
             "travellers": payload.get("travellers", []),
@@ -449,6 +450,9 @@ async def execute_booking(
         await db["unified_bookings"].insert_one(booking_doc)
         booking_doc.pop("_id", None)
 
+        from app.suppliers.revenue_cube import record_booking
+        await record_booking(db, booking_doc)
+
         await booking_audit.log_booking_event(db, "booking_confirmed", org_id, used_supplier, internal_booking_id, {
             "supplier_booking_id": result.supplier_booking_id, "duration_ms": duration_ms, "fallback_used": fallback_used,
             "sell_price": sell_price, "platform_markup": platform_markup,
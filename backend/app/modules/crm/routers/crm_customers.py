@@ -10,6 +10,7 @@ from app.auth import require_roles
 from app.constants.features import FEATURE_CRM
 from app.services.endpoint_cache import try_cache_get, cache_and_return
 from app.services.cache_invalidation import invalidate_crm_customers
+from app.repositories.base_repository import InvalidCursor
 from app.schemas_crm import (
     CustomerCreate,
     CustomerPatch,
@@ -22,6 +23,7 @@ from app.schemas_crm import (
 from app.services.crm_customers import (
     create_customer,
     list_customers,
+    list_customers_keyset,
     get_customer_detail_v2,
     patch_customer,
     find_duplicate_customers,
@@ -37,9 +39,11 @@ CrmFeatureDep = Depends(require_tenant_feature(FEATURE_CRM))
 
 class ListResponse(BaseModel):
     items: List[CustomerOut]
-    total: int
+    # None on cursor pages: the total is only counted for the first page.
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 @router.get("", response_model=ListResponse, dependencies=[CrmFeatureDep])
@@ -49,28 +53,56 @@ async def http_list_customers(
     tag: Optional[List[str]] = Query(default=None),
     page: int = 1,
     page_size: int = 25,
+    cursor: Optional[str] = None,
     db=Depends(get_db),
     current_user: dict = Depends(require_roles(["agency_agent", "super_admin"])),
 ):
+    """List customers.
+
+    Keyset pagination: the first page (and any request with `cursor`) returns
+    `next_cursor`; pass it back to get the next page. `page` > 1 without a
+    cursor keeps the legacy offset behaviour.
+    """
     org_id = current_user.get("organization_id")
 
     # Redis L1 cache (1 min — CRM list, skip text search)
     if not search and not tag:
-        cache_p = {"type": type, "page": page, "ps": page_size}
+        cache_p = {"type": type, "page": page, "ps": page_size, "cursor": cursor}
         hit, ck = await try_cache_get("crm_cust", org_id, cache_p)
         if hit:
             return hit
 
-    items, total = await list_customers(
-        db,
-        org_id,
-        search=search,
-        cust_type=type,
-        tags=tag,
-        page=page,
-        page_size=page_size,
-    )
-    result = {"items": items, "total": total, "page": page, "page_size": page_size}
+    if cursor or page <= 1:
+        try:
+            result_page = await list_customers_keyset(
+                db,
+                org_id,
+                search=search,
+                cust_type=type,
+                tags=tag,
+                cursor=cursor,
+                page_size=page_size,
+            )
+        except InvalidCursor:
+            raise HTTPException(status_code=422, detail="INVALID_CURSOR")
+        result = {
+            "items": result_page["items"],
+            "total": result_page["total"],
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": result_page["next_cursor"],
+        }
+    else:
+        items, total = await list_customers(
+            db,
+            org_id,
+            search=search,
+            cust_type=type,
+            tags=tag,
+            page=page,
+            page_size=page_size,
+        )
+        result = {"items": items, "total": total, "page": page, "page_size": page_size}
 
     if not search and not tag:
         await cache_and_return(ck, result, ttl=60)
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.auth import get_current_user
 from app.db import get_db
 from app.schemas import CustomerIn
+from app.services.search_index import SEARCH_TOKENS_FIELD, apply_search, build_search_tokens
 from app.utils import now_utc, serialize_doc, to_object_id
 
 router = APIRouter(prefix="/api/customers", tags=["customers"])
@@ -32,6 +33,7 @@ async def create_customer(payload: CustomerIn, user=Depends(get_current_user)):
             "updated_by": user.get("email"),
         }
     )
+    doc[SEARCH_TOKENS_FIELD] = build_search_tokens(doc, "customers")
     res = await db.customers.insert_one(doc)
     saved = await db.customers.find_one({"_id": res.inserted_id})
     return serialize_doc(saved)
@@ -40,14 +42,8 @@ async def create_customer(payload: CustomerIn, user=Depends(get_current_user)):
 @router.get("", dependencies=[Depends(get_current_user)])
 async def list_customers(q: str | None = None, user=Depends(get_current_user)):
     db = await get_db()
-    query: dict[str, object] = {"organization_id": user["organization_id"]}
-    if q:
-        query["$or"] = [
-            {"name": {"$regex": q, "$options": "i"}},
-            {"email": {"$regex": q, "$options": "i"}},
-            {"phone": {"$regex": q, "$options": "i"}},
-        ]
-    docs = await db.customers.find(query).sort("created_at", -1).to_list(200)
+    query = apply_search({"organization_id": user["organization_id"]}, q, "customers")
+    docs = await db.customers.find(query, {SEARCH_TOKENS_FIELD: 0}).sort("created_at", -1).to_list(200)
     return [serialize_doc(d) for d in docs]
 
 
@@ -67,10 +63,9 @@ async def update_customer(customer_id: str, payload: CustomerIn, user=Depends(ge
     if not existing:
         raise HTTPException(status_code=404, detail="Müşteri bulunamadı")
 
-    await db.customers.update_one(
-        {"_id": existing["_id"]},
-        {"$set": {**payload.model_dump(), "updated_at": now_utc(), "updated_by": user.get("email")}},
-    )
+    update = {**payload.model_dump(), "updated_at": now_utc(), "updated_by": user.get("email")}
+    update[SEARCH_TOKENS_FIELD] = build_search_tokens({**existing, **update}, "customers")
+    await db.customers.update_one({"_id": existing["_id"]}, {"$set": update})
     doc = await db.customers.find_one({"_id": existing["_id"]})
     return serialize_doc(doc)
 
@@ -168,16 +168,21 @@ async def search_audit_logs(
     category: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
     skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     user=Depends(require_roles(GOV_VIEW_ROLES)),
 ):
     from app.domain.governance.audit_service import search_audit_logs as _search
-    db = await get_db()
-    return await _search(
-        db, user.get("organization_id", ""),
-        actor_email=actor_email, action=action,
-        resource_type=resource_type, category=category,
-        limit=limit, skip=skip,
-    )
+    from app.repositories.base_repository import InvalidCursor
+    db = await get_db()
+    try:
+        return await _search(
+            db, user.get("organization_id", ""),
+            actor_email=actor_email, action=action,
+            resource_type=resource_type, category=category,
+            limit=limit, skip=skip, cursor=cursor,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
 
 
 @router.get("/audit/logs/{audit_id}", summary="[P3] Get single audit entry")
@@ -8,9 +8,11 @@ from __future__ import annotations
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.auth import get_current_user, require_roles
+from app.db import get_db
+from app.services.invoice_bulk_run import RUNS_COLLECTION, run_view, start_invoice_run
 from app.services.invoice_engine import (
     cancel_invoice,
     check_invoice_status,
@@ -71,6 +73,11 @@ class CancelIn(BaseModel):
     reason: str = ""
 
 
+class BulkRunIn(BaseModel):
+    period: str = Field(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$")
+    issue: bool = True
+
+
 # ── Endpoints ─────────────────────────────────────────────────────────
 
 @router.post("/create-from-booking")
@@ -154,6 +161,35 @@ async def get_booking_invoice_endpoint(
     return result or {"exists": False}
 
 
+@router.post("/bulk-runs")
+async def start_bulk_run_endpoint(
+    payload: BulkRunIn,
+    user=Depends(require_roles(["super_admin", "admin", "agency_admin"])),
+    db=Depends(get_db),
+):
+    """Start a month-end bulk invoicing run (background job)."""
+    org_id = user["organization_id"]
+    tenant_id = user.get("tenant_id", org_id)
+    run = await start_invoice_run(
+        db, tenant_id, org_id, payload.period, issue=payload.issue, created_by=user.get("email", ""),
+    )
+    return run_view(run)
+
+
+@router.get("/bulk-runs/{run_id}")
+async def get_bulk_run_endpoint(
+    run_id: str,
+    user=Depends(get_current_user),
+    db=Depends(get_db),
+):
+    """Bulk run status, counts and throughput."""
+    tenant_id = user.get("tenant_id", user["organization_id"])
+    run = await db[RUNS_COLLECTION].find_one({"_id": run_id, "tenant_id": tenant_id})
+    if not run:
+        raise HTTPException(status_code=404, detail="Invoice run not found")
+    return run_view(run)
+
+
 @router.get("/{invoice_id}")
 async def get_invoice_endpoint(
     invoice_id: str,
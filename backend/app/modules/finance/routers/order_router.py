@@ -9,6 +9,7 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import Optional
 
+from app.repositories.base_repository import InvalidCursor
 from app.services.order_service import (
     create_order,
     get_orders,
@@ -129,8 +130,12 @@ async def api_list_orders(
     status: Optional[str] = None,
     channel: Optional[str] = None,
     agency_id: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
-    return await get_orders(skip=skip, limit=limit, status=status, channel=channel, agency_id=agency_id)
+    try:
+        return await get_orders(skip=skip, limit=limit, status=status, channel=channel, agency_id=agency_id, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
 
 
 @router.get("/search")
@@ -147,21 +152,26 @@ async def api_search_orders(
     date_to: Optional[str] = None,
     settlement_status: Optional[str] = None,
     q: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
-    return await search_orders(
-        skip=skip,
-        limit=limit,
-        status=status,
-        channel=channel,
-        agency_id=agency_id,
-        customer_id=customer_id,
-        supplier_code=supplier_code,
-        order_number=order_number,
-        date_from=date_from,
-        date_to=date_to,
-        settlement_status=settlement_status,
-        q=q,
-    )
+    try:
+        return await search_orders(
+            skip=skip,
+            limit=limit,
+            status=status,
+            channel=channel,
+            agency_id=agency_id,
+            customer_id=customer_id,
+            supplier_code=supplier_code,
+            order_number=order_number,
+            date_from=date_from,
+            date_to=date_to,
+            settlement_status=settlement_status,
+            q=q,
+            cursor=cursor,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
 
 
 @router.get("/{order_id}")
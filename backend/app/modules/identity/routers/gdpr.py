@@ -9,16 +9,19 @@ Endpoints for:
 - Data retention policy
 - Data processing log (Veri İşleme Kaydı - KVKK Madde 16)
 - Consent types reference
+- Background export archives (NDJSON zip with progress and download token)
 """
 from __future__ import annotations
 
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.auth import get_current_user, require_roles
 from app.db import get_db
+from app.services.gdpr_export import RUNS_COLLECTION, find_download, iter_archive, request_export, run_view
 from app.services.gdpr_service import (
     KVKK_CONSENT_TYPES,
     anonymize_user_data,
@@ -123,6 +126,44 @@ async def export_my_data(user=Depends(get_current_user)):
     return await export_user_data(user["email"], user["organization_id"])
 
 
+@router.post("/export-my-data/archive")
+async def export_my_data_archive(user=Depends(get_current_user)):
+    """Start a full export archive of my data; poll /exports/{id} for progress."""
+    db = await get_db()
+    run = await request_export(db, user["email"], user["organization_id"], requested_by=user["email"])
+    return run_view(run)
+
+
+@router.get("/exports/{export_id}")
+async def get_export_status(export_id: str, user=Depends(get_current_user)):
+    """Export archive progress; includes the download link once ready."""
+    db = await get_db()
+    run = await db[RUNS_COLLECTION].find_one({"_id": export_id, "organization_id": user["organization_id"]})
+    is_admin = "super_admin" in set(user.get("roles") or [])
+    if not run or (not is_admin and user["email"] not in (run.get("user_email"), run.get("requested_by"))):
+        raise HTTPException(status_code=404, detail="Dışa aktarma bulunamadı")
+    return run_view(run, include_token=True)
+
+
+@router.get("/exports/download/{token}")
+async def download_export(token: str):
+    """Token-based archive download (no auth, like /api/exports/download)."""
+    db = await get_db()
+    run = await find_download(db, token)
+    if not run:
+        raise HTTPException(status_code=404, detail="İndirme bağlantısı geçersiz veya süresi dolmuş")
+    if not (run.get("storage") or {}).get("chunks"):
+        raise HTTPException(status_code=404, detail="Dışa aktarma dosyası bulunamadı")
+
+    file_info = run.get("file") or {}
+    headers = {"Content-Disposition": f"attachment; filename=\"{file_info.get('filename') or 'kvkk-export.zip'}\""}
+    if file_info.get("size_bytes"):
+        headers["Content-Length"] = str(file_info["size_bytes"])
+    return StreamingResponse(
+        iter_archive(db, run["_id"]), media_type=file_info.get("content_type") or "application/zip", headers=headers,
+    )
+
+
 @router.post("/delete-my-data")
 async def request_deletion(
     payload: DataDeletionRequest,
@@ -160,6 +201,21 @@ async def admin_export_user_data(
     return await export_user_data(target, user["organization_id"])
 
 
+@router.post(
+    "/admin/export/archive",
+    dependencies=[Depends(require_roles(["super_admin"]))],
+)
+async def admin_export_archive(
+    payload: DataExportRequest,
+    user=Depends(get_current_user),
+):
+    """Admin: Start a full export archive for any user."""
+    db = await get_db()
+    target = payload.target_email or user["email"]
+    run = await request_export(db, target, user["organization_id"], requested_by=user["email"])
+    return run_view(run)
+
+
 @router.post(
     "/admin/anonymize",
     dependencies=[Depends(require_roles(["super_admin"]))],
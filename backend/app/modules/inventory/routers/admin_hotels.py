@@ -11,6 +11,7 @@ from app.services.audit import write_audit_log
 from app.services.mongo_cache_service import cache_get, cache_set
 from app.services.redis_cache import redis_get, redis_set
 from app.services.cache_invalidation import invalidate_hotels
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.utils import now_utc, serialize_doc
 
 
@@ -60,6 +61,7 @@ async def create_hotel(payload: HotelCreateIn, user=Depends(get_current_user), d
             "updated_by": user.get("email"),
         }
     )
+    doc[SEARCH_TOKENS_FIELD] = build_search_tokens(doc, "hotels")
 
     res = await db.hotels.insert_one(doc)
     saved = await db.hotels.find_one({"_id": res.inserted_id})
@@ -12,6 +12,7 @@ from app.auth import get_current_user, require_roles
 from app.db import get_db
 from app.services.audit import write_audit_log
 from app.services.events import write_booking_event
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.utils import date_to_utc_midnight, now_utc, serialize_doc, build_booking_public_view
 from app.services.email_outbox import enqueue_booking_email
 from app.services.enforcement import ensure_match_not_blocked
@@ -505,6 +506,7 @@ async def submit_booking(draft_id: str, payload: BookingSubmitIn, request: Reque
         "check_out_date": date_to_utc_midnight(draft["stay"]["check_out"]),
     }
 
+    pending_booking[SEARCH_TOKENS_FIELD] = build_search_tokens(pending_booking, "bookings")
     await db.bookings.insert_one(pending_booking)
 
     # 5. Update draft with backlink (idempotency)
@@ -550,6 +552,7 @@ async def submit_booking(draft_id: str, payload: BookingSubmitIn, request: Reque
         }
     )
 
+    pending_booking.pop(SEARCH_TOKENS_FIELD, None)
     return serialize_doc(pending_booking)
 
 
@@ -735,6 +738,7 @@ async def confirm_booking(payload: BookingConfirmIn, request: Request, user=Depe
 
         logging.getLogger("email_outbox").error("Failed to enqueue booking.confirmed email: %s", e, exc_info=True)
 
+    booking[SEARCH_TOKENS_FIELD] = build_search_tokens(booking, "bookings")
     await db.bookings.insert_one(booking)
 
     # FAZ-6: Create financial entry for settlements (month based on stay.check_in)
@@ -11,6 +11,7 @@ from pydantic import BaseModel
 from app.auth import get_current_user, require_roles
 from app.db import get_db
 from app.services.search_cache import canonical_search_payload, cache_key
+from app.services.search_index import apply_search, rank_by_relevance
 from app.utils import now_utc
 
 router = APIRouter(tags=["search"])
@@ -94,27 +95,20 @@ async def _search_customers(
     query: str,
     limit: int,
 ) -> list[dict[str, Any]]:
-    regex = _query_regex(query)
     docs = await db.customers.find(
-        {
-            "organization_id": organization_id,
-            "$or": [
-                {"name": regex},
-                {"email": regex},
-                {"phone": regex},
-                {"company_name": regex},
-            ],
-        },
+        apply_search({"organization_id": organization_id}, query, "customers"),
         {
             "_id": 1,
             "name": 1,
             "email": 1,
             "phone": 1,
             "company_name": 1,
+            "contacts": 1,
             "tags": 1,
             "updated_at": 1,
         },
     ).sort("updated_at", -1).limit(limit).to_list(limit)
+    docs = rank_by_relevance(docs, query, "customers")
 
     return [
         {
@@ -138,7 +132,6 @@ async def _search_bookings(
     limit: int,
     agency_id: str | None,
 ) -> list[dict[str, Any]]:
-    regex = _query_regex(query)
     base_filter: dict[str, Any] = {"organization_id": organization_id}
     if agency_id:
         base_filter["agency_id"] = agency_id
@@ -150,6 +143,7 @@ async def _search_bookings(
         "customer_name": 1,
         "booking_ref": 1,
         "code": 1,
+        "pnr": 1,
         "status": 1,
         "state": 1,
         "gross_amount": 1,
@@ -158,19 +152,12 @@ async def _search_bookings(
         "created_at": 1,
     }
 
-    booking_query = {
-        **base_filter,
-        "$or": [
-            {"hotel_name": regex},
-            {"guest_name": regex},
-            {"customer_name": regex},
-            {"booking_ref": regex},
-            {"code": regex},
-        ],
-    }
-
-    bookings = await db.bookings.find(booking_query, booking_projection).sort("created_at", -1).limit(limit).to_list(limit)
-    reservations = await db.reservations.find(booking_query, booking_projection).sort("created_at", -1).limit(limit).to_list(limit)
+    bookings = await db.bookings.find(
+        apply_search(base_filter, query, "bookings"), booking_projection,
+    ).sort("created_at", -1).limit(limit).to_list(limit)
+    reservations = await db.reservations.find(
+        apply_search(base_filter, query, "reservations"), booking_projection,
+    ).sort("created_at", -1).limit(limit).to_list(limit)
 
     items: list[dict[str, Any]] = []
     for source, docs in (("bookings", bookings), ("reservations", reservations)):
@@ -182,7 +169,7 @@ async def _search_bookings(
                 {
                     "id": booking_id,
                     "type": "booking",
-                    "title": doc.get("booking_ref") or doc.get("code") or booking_id,
+                    "title": doc.get("booking_ref") or doc.get("code") or doc.get("pnr") or booking_id,
                     "subtitle": doc.get("guest_name") or doc.get("customer_name") or doc.get("hotel_name") or "Rezervasyon",
                     "description": doc.get("hotel_name") or source,
                     "route": "/app/agency/bookings" if agency_id else "/app/reservations",
@@ -205,22 +192,15 @@ async def _search_hotels(
     limit: int,
     linked_hotel_ids: list[str] | None,
 ) -> list[dict[str, Any]]:
-    regex = _query_regex(query)
-    hotel_filter: dict[str, Any] = {
-        "organization_id": organization_id,
-        "$or": [
-            {"name": regex},
-            {"city": regex},
-            {"country": regex},
-        ],
-    }
+    hotel_filter: dict[str, Any] = {"organization_id": organization_id}
     if linked_hotel_ids is not None:
         hotel_filter["_id"] = {"$in": linked_hotel_ids}
 
     docs = await db.hotels.find(
-        hotel_filter,
+        apply_search(hotel_filter, query, "hotels"),
         {"_id": 1, "name": 1, "city": 1, "country": 1, "active": 1},
     ).sort("name", 1).limit(limit).to_list(limit)
+    docs = rank_by_relevance(docs, query, "hotels")
 
     return [
         {
@@ -373,7 +373,7 @@ async def update_polling(body: PollSettingsPayload, _user: dict = AdminDep):
 @router.post("/polling/sync")
 async def manual_sync(_user: dict = AdminDep):
     try:
-        return await polling.sync_once()
+        return await polling.sync_once(force=True)
     except SyroceB2BError as exc:
         raise _to_app_error(exc)
 
@@ -10,7 +10,7 @@ from app.db import get_db
 from app.errors import AppError
 from app.schemas_pricing_graph import PricingGraphTraceResponse, PricingGraphStepOut
 from app.services.audit import write_audit_log
-from app.services.offers.search_session_service import get_search_session
+from app.services.offers.search_session_service import get_search_session, hydrate_search_session
 
 
 router = APIRouter(prefix="/api/admin/pricing/graph", tags=["admin_pricing_graph"])
@@ -168,7 +168,7 @@ async def get_pricing_trace_by_session_offer(
         except Exception:
             session = None
         else:
-            session = await db.search_sessions.find_one({"_id": oid})
+            session = await hydrate_search_session(await db.search_sessions.find_one({"_id": oid}))
     if not session:
         raise AppError(404, "SEARCH_SESSION_NOT_FOUND", "Search session not found", {"session_id": session_id})
 
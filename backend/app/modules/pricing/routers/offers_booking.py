@@ -168,7 +168,7 @@ async def create_booking_from_canonical_offer(
     from app.repositories.booking_repository import BookingRepository
     from app.utils import serialize_doc
     from app.routers.offers import round_money
-    from app.services.offers.search_session_service import get_search_session
+    from app.services.offers.search_session_service import get_offer_overlay
     from app.services.audit import write_audit_log
 
     repo = BookingRepository(db)
@@ -212,9 +212,9 @@ async def create_booking_from_canonical_offer(
     )
 
     # Mismatch detection (informational only)
-    session_doc = await get_search_session(db, organization_id=organization_id, session_id=payload.session_id)
-    overlay_index = (session_doc or {}).get("pricing_overlay_index") or {}
-    overlay = overlay_index.get(payload.offer_token)
+    overlay = await get_offer_overlay(
+        db, organization_id=organization_id, session_id=payload.session_id, offer_token=payload.offer_token,
+    )
     if overlay:
         search_final = float(overlay.get("final_amount") or 0.0)
         booking_final = float(final_amount)
@@ -29,6 +29,7 @@ from app.services.installments import compute_mock_installment_plans
 from app.services.coupons import CouponService
 from app.services.booking_events import emit_event
 from app.services.pricing_quote_engine import compute_quote_for_booking
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.services.funnel_events import log_funnel_event
 from app.utils import now_utc
 from app.utils import get_or_create_correlation_id
@@ -543,6 +544,7 @@ async def public_checkout(payload: PublicCheckoutRequest, request: Request, db=D
     if applied_coupon_id:
         booking_doc["coupon_id"] = applied_coupon_id
 
+    booking_doc[SEARCH_TOKENS_FIELD] = build_search_tokens(booking_doc, "bookings")
     ins = await bookings.insert_one(booking_doc)
     booking_id = str(ins.inserted_id)
 
@@ -947,6 +949,7 @@ async def public_checkout_tr_pos(
         },
     }
 
+    booking_doc[SEARCH_TOKENS_FIELD] = build_search_tokens(booking_doc, "bookings")
     ins = await bookings.insert_one(booking_doc)
     booking_id = str(ins.inserted_id)
 
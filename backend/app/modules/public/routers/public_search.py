@@ -4,13 +4,15 @@ from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from pymongo import DESCENDING
 
 from app.db import get_db
-from app.services.endpoint_cache import try_cache_get, cache_and_return
+from app.services.endpoint_cache import coalesced_compute, try_cache_get
+from app.services.http_cache import conditional_response, surrogate_keys
 
 router = APIRouter(prefix="/api/public", tags=["public-search"])
+SEARCH_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
 from bson import ObjectId
 
 
@@ -47,52 +49,19 @@ async def _resolve_partner_agency(db, organization_id: str, partner: str):
   return agency
 
 
-@router.get("/search")
-async def public_search_catalog(
-  request: Request,
-  org: str = Query(..., min_length=1, description="Organization id (tenant)"),
-  q: Optional[str] = Query(None, description="Free-text search on product name"),
-  page: int = Query(1, ge=1),
-  page_size: int = Query(20, ge=1, le=50),
-  sort: Optional[str] = Query("price_asc"),
-  date_from: Optional[str] = Query(None),
-  date_to: Optional[str] = Query(None),
-  product_type: Optional[str] = Query(None, alias="type", description="Optional product type filter (e.g. hotel, tour)"),
-  partner: Optional[str] = Query(None, description="Optional partner/agency id for B2B iframe pricing"),
-  db=Depends(get_db),
-) -> JSONResponse:
-  """Public product search for booking engine v1.
-
-  - Tenant-aware via explicit `org` query param
-  - Only active products with at least one published version are returned
-  - Rough "from" price derived from active rate plans (base_net_price)
-  - PII-free response, cache-friendly headers
-  """
-
-  client_ip = request.client.host if request.client else None
-
-  # L1 Redis cache check (skip for partner-specific or text-search queries)
-  if not partner and not q:
-    cache_params = {"org": org, "page": page, "ps": page_size, "sort": sort, "df": date_from, "dt": date_to, "type": product_type}
-    hit, ck = await try_cache_get("pub_search", org, cache_params)
-    if hit:
-      resp = JSONResponse(status_code=200, content=hit)
-      resp.headers["Cache-Control"] = "public, max-age=60, stale-while-revalidate=300"
-      resp.headers["X-Cache"] = "HIT"
-      return resp
-
-  # Basic Mongo-based throttle per IP + org + minute bucket
-  if client_ip:
-    now = datetime.utcnow().replace(second=0, microsecond=0)
-    key = {"ip": client_ip, "org": org, "minute": now}
-    await db.public_search_telemetry.update_one(
-      key,
-      {"$inc": {"count": 1}, "$setOnInsert": {"first_seen_at": datetime.utcnow()}},
-      upsert=True,
-    )
-    doc = await db.public_search_telemetry.find_one(key)
-    if doc and int(doc.get("count", 0)) > 60:
-      raise HTTPException(status_code=429, detail="RATE_LIMITED")
+async def _search_catalog(
+  db,
+  org: str,
+  q: Optional[str],
+  page: int,
+  page_size: int,
+  sort: Optional[str],
+  date_from: Optional[str],
+  date_to: Optional[str],
+  product_type: Optional[str],
+  partner: Optional[str],
+) -> Dict[str, Any]:
+  """Build the public search response (uncached)."""
 
   # Parse date range to approximate nights for pricing
   df = _parse_date(date_from)
@@ -130,10 +99,7 @@ async def public_search_catalog(
   products: List[Dict[str, Any]] = await cursor.to_list(length=page_size)
 
   if not products:
-    response = {"items": [], "page": page, "page_size": page_size, "total": total}
-    resp = JSONResponse(status_code=200, content=response)
-    resp.headers["Cache-Control"] = "public, max-age=60, stale-while-revalidate=300"
-    return resp
+    return {"items": [], "page": page, "page_size": page_size, "total": total}
 
   product_ids = [p["_id"] for p in products]
 
@@ -219,14 +185,70 @@ async def public_search_catalog(
   else:  # default price_asc
     items.sort(key=lambda x: x["price"]["amount_cents"])
 
-  response = {"items": items, "page": page, "page_size": page_size, "total": total}
+  return {"items": items, "page": page, "page_size": page_size, "total": total}
+
 
-  # Cache result in Redis (2 min TTL for public search)
-  if not partner and not q:
+@router.get("/search")
+async def public_search_catalog(
+  request: Request,
+  org: str = Query(..., min_length=1, description="Organization id (tenant)"),
+  q: Optional[str] = Query(None, description="Free-text search on product name"),
+  page: int = Query(1, ge=1),
+  page_size: int = Query(20, ge=1, le=50),
+  sort: Optional[str] = Query("price_asc"),
+  date_from: Optional[str] = Query(None),
+  date_to: Optional[str] = Query(None),
+  product_type: Optional[str] = Query(None, alias="type", description="Optional product type filter (e.g. hotel, tour)"),
+  partner: Optional[str] = Query(None, description="Optional partner/agency id for B2B iframe pricing"),
+  db=Depends(get_db),
+) -> Response:
+  """Public product search for booking engine v1.
+
+  - Tenant-aware via explicit `org` query param
+  - Only active products with at least one published version are returned
+  - Rough "from" price derived from active rate plans (base_net_price)
+  - PII-free response, cache-friendly headers
+  """
+
+  client_ip = request.client.host if request.client else None
+
+  def _compute():
+    return _search_catalog(db, org, q, page, page_size, sort, date_from, date_to, product_type, partner)
+
+  # L1 Redis cache check (skip for partner-specific or text-search queries).
+  # Expired entries are served while one background refresh runs.
+  cacheable = not partner and not q
+  if cacheable:
     cache_params = {"org": org, "page": page, "ps": page_size, "sort": sort, "df": date_from, "dt": date_to, "type": product_type}
-    _, ck = await try_cache_get("pub_search", org, cache_params)
-    await cache_and_return(ck, response, ttl=120)
+    hit, ck = await try_cache_get("pub_search", org, cache_params, refresh=_compute, ttl=120)
+    if hit:
+      return conditional_response(
+        request, hit, cache_control=SEARCH_CACHE_CONTROL,
+        surrogate_keys=surrogate_keys("pub_search", org), headers={"X-Cache": "HIT"},
+      )
 
-  resp = JSONResponse(status_code=200, content=response)
-  resp.headers["Cache-Control"] = "public, max-age=60, stale-while-revalidate=300"
-  return resp
+  # Basic Mongo-based throttle per IP + org + minute bucket
+  if client_ip:
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    key = {"ip": client_ip, "org": org, "minute": now}
+    await db.public_search_telemetry.update_one(
+      key,
+      {"$inc": {"count": 1}, "$setOnInsert": {"first_seen_at": datetime.utcnow()}},
+      upsert=True,
+    )
+    doc = await db.public_search_telemetry.find_one(key)
+    if doc and int(doc.get("count", 0)) > 60:
+      raise HTTPException(status_code=429, detail="RATE_LIMITED")
+
+  if cacheable:
+    # Concurrent misses for the same query share one computation.
+    response = await coalesced_compute(ck, _compute, ttl=120)
+  else:
+    response = await _compute()
+
+  if not cacheable:
+    # Text and partner searches vary per caller; still revalidate by content.
+    return conditional_response(request, response, cache_control="private, max-age=0, must-revalidate")
+  return conditional_response(
+    request, response, cache_control=SEARCH_CACHE_CONTROL, surrogate_keys=surrogate_keys("pub_search", org),
+  )
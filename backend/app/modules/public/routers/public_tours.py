@@ -2,32 +2,37 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response
 
 from app.db import get_db
 from app.services.endpoint_cache import try_cache_get, cache_and_return
+from app.services.http_cache import conditional_response, surrogate_keys
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 
 router = APIRouter(prefix="/api/public/tours", tags=["public-tours"])
+TOURS_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
 
 
 @router.get("/search")
 async def public_search_tours(
+    request: Request,
     org: str = Query(..., min_length=1, description="Organization id (tenant)"),
     q: Optional[str] = Query(None, description="Free-text search on tour name or destination"),
     destination: Optional[str] = Query(None, description="Destination filter"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=50),
     db=Depends(get_db),
-) -> JSONResponse:
+) -> Response:
     # Redis L1 cache (skip text search)
     cache_params = {"org": org, "dest": destination, "page": page, "ps": page_size}
     if not q:
         hit, ck = await try_cache_get("pub_tours", org, cache_params)
         if hit:
-            resp = JSONResponse(status_code=200, content=hit)
-            resp.headers["X-Cache"] = "HIT"
-            return resp
+            return conditional_response(
+                request, hit, cache_control=TOURS_CACHE_CONTROL,
+                surrogate_keys=surrogate_keys("pub_tours", org), headers={"X-Cache": "HIT"},
+            )
 
     filt: Dict[str, Any] = {"organization_id": org}
     if q:
@@ -58,21 +63,26 @@ async def public_search_tours(
     if not q:
         _, ck = await try_cache_get("pub_tours", org, cache_params)
         await cache_and_return(ck, payload, ttl=180)
-    return JSONResponse(status_code=200, content=payload)
+        return conditional_response(
+            request, payload, cache_control=TOURS_CACHE_CONTROL, surrogate_keys=surrogate_keys("pub_tours", org),
+        )
+    return conditional_response(request, payload, cache_control="private, max-age=0, must-revalidate")
 
 
 @router.get("/{tour_id}")
 async def public_get_tour(
+    request: Request,
     tour_id: str,
     org: str = Query(..., min_length=1, description="Organization id (tenant)"),
     db=Depends(get_db),
-) -> JSONResponse:
+) -> Response:
     # Redis L1 cache for tour detail (5 min)
     hit, ck = await try_cache_get("tour_detail", org, {"id": tour_id})
     if hit:
-        resp = JSONResponse(status_code=200, content=hit)
-        resp.headers["X-Cache"] = "HIT"
-        return resp
+        return conditional_response(
+            request, hit, cache_control=TOURS_CACHE_CONTROL,
+            surrogate_keys=surrogate_keys("tour_detail", org), headers={"X-Cache": "HIT"},
+        )
 
     from bson import ObjectId
     from bson.errors import InvalidId
@@ -98,7 +108,9 @@ async def public_get_tour(
     }
     # Cache tour detail (5 min)
     await cache_and_return(ck, payload, ttl=300)
-    return JSONResponse(status_code=200, content=payload)
+    return conditional_response(
+        request, payload, cache_control=TOURS_CACHE_CONTROL, surrogate_keys=surrogate_keys("tour_detail", org),
+    )
 
 
 from datetime import date, timedelta
@@ -302,6 +314,7 @@ async def public_tour_checkout(payload: TourCheckoutRequest, db=Depends(get_db))
     if tour_oid:
         booking_doc["tour_id"] = tour_oid
 
+    booking_doc[SEARCH_TOKENS_FIELD] = build_search_tokens(booking_doc, "bookings")
     ins = await bookings.insert_one(booking_doc)
 
     from uuid import uuid4 as _uuid4
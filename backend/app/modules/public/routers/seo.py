@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, List
+from typing import Any, List, Optional
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import Response
 
 from app.db import get_db
+from app.services.endpoint_cache import coalesced_compute, try_cache_get
+from app.services.http_cache import conditional_response, surrogate_keys
 
 router = APIRouter(prefix="/api", tags=["seo"])
 
@@ -27,6 +29,7 @@ async def sitemap_xml(request: Request, db=Depends(get_db)) -> Response:
 
     - Includes a few static operational URLs
     - Adds hotel detail URLs for active hotels (if any)
+    - Cached per base URL + org (10 min), ETag/304 and CDN surrogate keys
     """
 
     base_url = str(request.base_url).rstrip("/")
@@ -34,6 +37,24 @@ async def sitemap_xml(request: Request, db=Depends(get_db)) -> Response:
     # Optional org scoping for multi-tenant safety.
     org_id = request.query_params.get("org")
 
+    def _compute():
+        return _build_sitemap(db, base_url, org_id)
+
+    xml, ck = await try_cache_get("sitemap", org_id or "", {"base": base_url}, refresh=_compute, ttl=600)
+    if not xml:
+        xml = await coalesced_compute(ck, _compute, ttl=600)
+
+    return conditional_response(
+        request,
+        xml,
+        media_type="application/xml",
+        cache_control="public, max-age=300, stale-while-revalidate=600",
+        # "sitemap" tags every variant: hotel changes purge them all.
+        surrogate_keys=[*surrogate_keys("sitemap", org_id or ""), "sitemap"],
+    )
+
+
+async def _build_sitemap(db, base_url: str, org_id: Optional[str]) -> str:
     # Use a dict keyed by loc to avoid duplicates when combining hotels/products
     url_map: dict[str, dict[str, str]] = {}
 
@@ -114,8 +135,7 @@ async def sitemap_xml(request: Request, db=Depends(get_db)) -> Response:
         items.append("  </url>")
     items.append("</urlset>")
 
-    xml = "\n".join(items)
-    return Response(content=xml, media_type="application/xml")
+    return "\n".join(items)
 
 
 @router.get("/robots.txt", include_in_schema=False)
@@ -8,6 +8,7 @@ from uuid import uuid4
 
 from bson.decimal128 import Decimal128
 from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import Response
 from bson import ObjectId
 from pydantic import BaseModel, EmailStr
 
@@ -16,6 +17,7 @@ from app.services.suppliers.mock_supplier_service import search_mock_offers
 from app.utils import now_utc
 from app.services.pricing_service import calculate_price
 from app.services.endpoint_cache import try_cache_get, cache_and_return
+from app.services.http_cache import conditional_response, surrogate_keys
 
 router = APIRouter(prefix="/storefront", tags=["storefront"])
 
@@ -45,8 +47,19 @@ def _decimal_to_str(value: Decimal) -> str:
     return format(value, "f")
 
 
+def _health_response(request: Request, data: Dict[str, Any], tenant_id: str) -> Response:
+    # Tenant is resolved from Host / X-Tenant-Key, so shared caches must key on both.
+    return conditional_response(
+        request,
+        data,
+        cache_control="public, max-age=60, stale-while-revalidate=300",
+        surrogate_keys=surrogate_keys("sf_health", tenant_id),
+        headers={"Vary": "Host, X-Tenant-Key"},
+    )
+
+
 @router.get("/health")
-async def storefront_health(request: Request) -> Dict[str, Any]:
+async def storefront_health(request: Request) -> Response:
     """Simple health endpoint that requires a resolved tenant."""
 
     ctx = _tenant_context(request)
@@ -56,7 +69,7 @@ async def storefront_health(request: Request) -> Dict[str, Any]:
     # Redis L1 cache (5 min — tenant branding rarely changes)
     hit, ck = await try_cache_get("sf_health", ctx["tenant_id"])
     if hit:
-        return hit
+        return _health_response(request, hit, ctx["tenant_id"])
 
     data: Dict[str, Any] = {"ok": True, "tenant_key": ctx["tenant_key"], "tenant_id": ctx["tenant_id"]}
 
@@ -70,7 +83,8 @@ async def storefront_health(request: Request) -> Dict[str, Any]:
     except Exception:
         pass
 
-    return await cache_and_return(ck, data, ttl=300)
+    await cache_and_return(ck, data, ttl=300)
+    return _health_response(request, data, ctx["tenant_id"])
 
 
 @router.get("/search")
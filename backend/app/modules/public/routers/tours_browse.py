@@ -11,17 +11,22 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response
 
 from app.auth import get_current_user
 from app.constants.usage_metrics import UsageMetric
 from app.db import get_db
+from app.services.endpoint_cache import cache_and_return, try_cache_get
+from app.services.http_cache import conditional_response
 from app.services.quota_enforcement_service import enforce_quota_or_raise
 from app.services.usage_service import track_reservation_created
 
 router = APIRouter(prefix="/api/tours", tags=["tours_browse"])
 
+# Authenticated views: browsers revalidate with If-None-Match, CDNs never store.
+PRIVATE_CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
 
 def _tour_to_dict(doc: dict) -> dict:
     """Convert a MongoDB tour document to a serializable dict."""
@@ -68,6 +73,7 @@ def _tour_to_dict(doc: dict) -> dict:
 
 @router.get("")
 async def list_tours(
+    request: Request,
     q: Optional[str] = Query(None, description="Free-text search"),
     destination: Optional[str] = Query(None, description="Destination filter"),
     category: Optional[str] = Query(None, description="Category filter"),
@@ -77,7 +83,7 @@ async def list_tours(
     page_size: int = Query(20, ge=1, le=50),
     user=Depends(get_current_user),
     db=Depends(get_db),
-) -> JSONResponse:
+) -> Response:
     org_id = user["organization_id"]
     filt: Dict[str, Any] = {"organization_id": org_id, "status": "active"}
 
@@ -103,29 +109,32 @@ async def list_tours(
 
     items = [_tour_to_dict(doc) for doc in docs]
 
-    # Get unique categories and destinations for filter dropdowns
-    categories_raw = await db.tours.distinct("category", {"organization_id": org_id, "status": "active"})
-    destinations_raw = await db.tours.distinct("destination", {"organization_id": org_id, "status": "active"})
-    categories = [c for c in categories_raw if c]
-    destinations = [d for d in destinations_raw if d]
-
-    return JSONResponse(
-        status_code=200,
-        content={
+    # Unique categories and destinations for filter dropdowns (cached, cleared by invalidate_tours)
+    filters, ck = await try_cache_get("tours_browse_filters", org_id)
+    if not filters:
+        categories_raw = await db.tours.distinct("category", {"organization_id": org_id, "status": "active"})
+        destinations_raw = await db.tours.distinct("destination", {"organization_id": org_id, "status": "active"})
+        filters = await cache_and_return(ck, {
+            "categories": [c for c in categories_raw if c],
+            "destinations": [d for d in destinations_raw if d],
+        }, ttl=300)
+
+    return conditional_response(
+        request,
+        {
             "items": items,
             "page": page,
             "page_size": page_size,
             "total": total,
-            "filters": {
-                "categories": categories,
-                "destinations": destinations,
-            },
+            "filters": filters,
         },
+        cache_control=PRIVATE_CACHE_CONTROL,
     )
 
 
 @router.get("/{tour_id}")
 async def get_tour_detail(
+    request: Request,
     tour_id: str,
     user=Depends(get_current_user),
     db=Depends(get_db),
@@ -143,7 +152,7 @@ async def get_tour_detail(
     if not doc:
         return JSONResponse(status_code=404, content={"code": "NOT_FOUND", "message": "Tur bulunamadi"})
 
-    return _tour_to_dict(doc)
+    return conditional_response(request, _tour_to_dict(doc), cache_control=PRIVATE_CACHE_CONTROL)
 
 
 @router.post("/{tour_id}/reserve")
@@ -10,6 +10,7 @@ from pydantic import BaseModel, EmailStr, Field
 from app.db import get_db
 from app.utils import now_utc, serialize_doc
 from app.services.enforcement import ensure_match_not_blocked
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 
 logger = logging.getLogger("acenta-master")
 
@@ -144,8 +145,9 @@ async def create_web_booking(payload: WebBookingCreateIn, db=Depends(get_db)) ->
   if package_snapshot:
     doc["package_snapshot"] = package_snapshot
 
+  doc[SEARCH_TOKENS_FIELD] = build_search_tokens(doc, "bookings")
   ins = await db.bookings.insert_one(doc)
-  saved = await db.bookings.find_one({"_id": ins.inserted_id})
+  saved = await db.bookings.find_one({"_id": ins.inserted_id}, {SEARCH_TOKENS_FIELD: 0})
 
   logger.info("[WEB_BOOKING_CREATED] booking_id=%s hotel_id=%s", ins.inserted_id, payload.hotel_id)
 
@@ -16,6 +16,7 @@ from app.routers.admin_agencies import (
 )
 from app.services.agency_contract_status_service import get_agency_active_user_counts
 from app.services.audit import write_audit_log
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.schemas import (
     AgencyHotelLinkCreateIn,
     AgencyHotelLinkPatchIn,
@@ -131,6 +132,7 @@ async def create_hotel(payload: HotelCreateIn, user=Depends(get_current_user)):
             "updated_by": user.get("email"),
         }
     )
+    doc[SEARCH_TOKENS_FIELD] = build_search_tokens(doc, "hotels")
     await db.hotels.insert_one(doc)
     saved = await db.hotels.find_one({"_id": doc["_id"]})
     return serialize_doc(saved)
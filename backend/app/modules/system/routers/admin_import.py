@@ -12,9 +12,10 @@ GET  /api/admin/import/sheet/connections     — List sheet connections
 """
 from __future__ import annotations
 
+import asyncio
 import io
 import uuid
-from typing import Any, Dict, List
+from typing import Any, Dict
 
 from fastapi import APIRouter, BackgroundTasks, Depends, File, UploadFile
 from pydantic import BaseModel
@@ -23,15 +24,13 @@ from app.auth import get_current_user, require_roles
 from app.db import get_db
 from app.errors import AppError
 from app.services.import_service import (
-    create_hotels_bulk,
     create_import_job,
     download_hotel_images,
-    get_existing_hotel_names,
-    map_columns,
-    parse_excel,
+    import_hotel_file,
+    preview_table,
     save_import_errors,
     update_job_status,
-    validate_hotels,
+    validate_hotel_file,
     VALID_FIELDS,
 )
 from app.utils import now_utc, serialize_doc
@@ -39,7 +38,8 @@ from app.utils import now_utc, serialize_doc
 router = APIRouter(prefix="/api/admin/import", tags=["admin_import"])
 AdminDep = Depends(require_roles(["super_admin", "admin"]))
 
-# In-memory temp storage for parsed data (keyed by job_id)
+# In-memory temp storage for the uploaded file (keyed by job_id). Rows are
+# re-streamed from the raw bytes on validate/execute instead of kept parsed.
 _temp_data: Dict[str, Any] = {}
 
 
@@ -61,7 +61,8 @@ async def upload_hotels_file(
         raise AppError(400, "file_too_large", "Dosya boyutu 10MB'dan büyük olamaz.")
 
     try:
-        headers, rows = parse_excel(contents, filename)
+        # Preview: first 20 rows; the rest are streamed and only counted
+        headers, preview_rows, total_rows = await asyncio.to_thread(preview_table, contents, filename)
     except Exception as e:
         raise AppError(400, "parse_error", f"Dosya okunamadı: {str(e)}")
 
@@ -74,24 +75,22 @@ async def upload_hotels_file(
         organization_id=org_id,
         entity_type="hotel",
         source="excel",
-        total_rows=len(rows),
+        total_rows=total_rows,
         filename=filename,
     )
 
-    # Store parsed data temporarily
+    # Store the raw file temporarily
     _temp_data[job["_id"]] = {
-        "headers": headers,
-        "rows": rows,
+        "file": contents,
+        "filename": filename,
+        "total_rows": total_rows,
         "org_id": org_id,
     }
 
-    # Preview: first 20 rows
-    preview_rows = rows[:20]
-
     return {
         "job_id": job["_id"],
         "filename": filename,
-        "total_rows": len(rows),
+        "total_rows": total_rows,
         "headers": headers,
         "preview": preview_rows,
         "available_fields": VALID_FIELDS,
@@ -111,39 +110,34 @@ async def validate_hotels_endpoint(
     user=Depends(get_current_user),
     db=Depends(get_db),
 ):
-    """Validate all rows with the given column mapping."""
+    """Validate all rows with the given column mapping (streamed in chunks)."""
     temp = _temp_data.get(body.job_id)
     if not temp:
         raise AppError(404, "job_not_found", "Import job bulunamadı veya süresi dolmuş.")
 
     org_id = temp["org_id"]
-    mapped = map_columns(temp["headers"], temp["rows"], body.mapping)
-
-    existing_names = await get_existing_hotel_names(db, org_id)
-    valid, errors = validate_hotels(mapped, existing_names)
-
-    # Save errors
-    await save_import_errors(db, body.job_id, errors)
+    result = await validate_hotel_file(
+        db, body.job_id, org_id, temp["file"], temp["filename"], body.mapping,
+    )
 
     # Update job
     await update_job_status(
         db, body.job_id, "validated",
-        valid_count=len(valid),
-        error_count=len(errors),
+        valid_count=result["valid_count"],
+        error_count=result["error_count"],
     )
 
-    # Store validated data + mapping
+    # Store mapping for execute
     temp["mapping"] = body.mapping
-    temp["valid_rows"] = valid
-    temp["validation_errors"] = errors
+    temp["valid_count"] = result["valid_count"]
 
     return {
         "job_id": body.job_id,
-        "total_rows": len(temp["rows"]),
-        "valid_count": len(valid),
-        "error_count": len(errors),
-        "errors": errors[:50],  # Return first 50 errors
-        "preview_valid": valid[:10],
+        "total_rows": temp["total_rows"],
+        "valid_count": result["valid_count"],
+        "error_count": result["error_count"],
+        "errors": result["errors"],  # First 50 errors
+        "preview_valid": result["preview_valid"],
     }
 
 
@@ -153,15 +147,15 @@ class ExecuteRequest(BaseModel):
     job_id: str
 
 
-async def _run_import(job_id: str, org_id: str, valid_rows: List[Dict], created_by: str):
+async def _run_import(job_id: str, org_id: str, temp: Dict[str, Any], created_by: str):
     """Background task to run the actual import."""
     from app.db import get_db as _get_db
     db = await _get_db()
     try:
         await update_job_status(db, job_id, "processing")
 
-        success, err_count, errors = await create_hotels_bulk(
-            db, org_id, valid_rows, created_by, job_id
+        success, err_count, errors = await import_hotel_file(
+            db, job_id, org_id, temp["file"], temp["filename"], temp["mapping"], created_by,
         )
 
         if errors:
@@ -177,7 +171,7 @@ async def _run_import(job_id: str, org_id: str, valid_rows: List[Dict], created_
 
         await update_job_status(
             db, job_id,
-            "completed" if err_count == 0 else "completed",
+            "completed",
             success_count=success,
             error_count=err_count,
             images_downloaded=img_count,
@@ -200,14 +194,14 @@ async def execute_import(
     if not temp:
         raise AppError(404, "job_not_found", "Import job bulunamadı.")
 
-    valid_rows = temp.get("valid_rows", [])
-    if not valid_rows:
+    valid_count = temp.get("valid_count", 0)
+    if not valid_count:
         raise AppError(400, "no_valid_rows", "Geçerli satır bulunamadı.")
 
     org_id = temp["org_id"]
     created_by = user.get("email", "import")
 
-    background_tasks.add_task(_run_import, body.job_id, org_id, valid_rows, created_by)
+    background_tasks.add_task(_run_import, body.job_id, org_id, temp, created_by)
 
     # Clean up temp data
     _temp_data.pop(body.job_id, None)
@@ -215,7 +209,7 @@ async def execute_import(
     return {
         "job_id": body.job_id,
         "status": "processing",
-        "message": f"{len(valid_rows)} otel import ediliyor...",
+        "message": f"{valid_count} otel import ediliyor...",
     }
 
 
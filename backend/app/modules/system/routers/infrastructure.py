@@ -120,8 +120,8 @@ async def event_bus_status(
     user=Depends(require_roles(_INFRA_ROLES)),
     db=Depends(get_db),
 ) -> dict[str, Any]:
-    """Event bus handler registry and recent events."""
-    from app.infrastructure.event_bus import get_registered_handlers
+    """Event bus handler registry, dispatch queue and recent events."""
+    from app.infrastructure.event_bus import get_dispatch_stats, get_registered_handlers
 
     handlers = get_registered_handlers()
 
@@ -132,6 +132,7 @@ async def event_bus_status(
         "registered_handlers": handlers,
         "total_handler_count": sum(handlers.values()),
         "persisted_events": recent_count,
+        "dispatch": get_dispatch_stats(),
     }
 
 
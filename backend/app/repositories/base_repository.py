@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import base64
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
 
+from bson import json_util
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection
 
 logger = logging.getLogger("repositories.base")
@@ -74,3 +76,126 @@ def with_tenant_filter(
     if not base:
         return tenant_clause
     return {"$and": [base, tenant_clause]}
+
+
+# ── Keyset (cursor) pagination ────────────────────────────────
+
+# Upper bound for "capped" counts: beyond this the UI shows "10000+" instead
+# of paying for a full index scan on every first page.
+KEYSET_COUNT_CAP = 10_000
+
+CountMode = Literal["exact", "capped", "none"]
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not match the sort."""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of the last row into an opaque cursor."""
+    raw = json_util.dumps(list(values), json_options=json_util.CANONICAL_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, expected_len: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception as exc:
+        raise InvalidCursor("invalid pagination cursor") from exc
+    if not isinstance(values, list) or len(values) != expected_len:
+        raise InvalidCursor("invalid pagination cursor")
+    # Only scalar sort-key values are valid; a dict/list could smuggle query
+    # operators (e.g. {"$ne": ...}) into the keyset filter.
+    if any(isinstance(v, (dict, list)) for v in values):
+        raise InvalidCursor("invalid pagination cursor")
+    return values
+
+
+def _get_path(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def keyset_filter(sort: Sequence[Tuple[str, int]], last_values: Sequence[Any]) -> Dict[str, Any]:
+    """Filter selecting rows strictly after `last_values` in `sort` order.
+
+    For sort [(a, -1), (b, -1)] this is ``a < va OR (a == va AND b < vb)``.
+    """
+    clauses: List[Dict[str, Any]] = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort[j][0]: last_values[j] for j in range(i)}
+        clause[field] = {"$lt" if direction < 0 else "$gt": last_values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+async def keyset_page(
+    collection: AsyncIOMotorCollection,
+    filter_dict: Dict[str, Any],
+    *,
+    sort: Sequence[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    tie_breaker: str = "_id",
+    count: CountMode = "none",
+) -> Dict[str, Any]:
+    """Fetch one page ordered by `sort` + `tie_breaker` using a keyset cursor.
+
+    Deep pages cost the same as the first one (index seek instead of skip).
+    The count (if requested) only runs on the first page, i.e. without a
+    cursor — clients keep the total they got there.
+
+    Returns {"items", "next_cursor", "total", "total_capped"}; ``next_cursor``
+    is None on the last page, ``total`` is None when not counted.
+    """
+    full_sort = list(sort)
+    if tie_breaker not in {f for f, _ in full_sort}:
+        direction = full_sort[-1][1] if full_sort else -1
+        full_sort.append((tie_breaker, direction))
+    key_fields = [f for f, _ in full_sort]
+
+    query = dict(filter_dict or {})
+    if cursor:
+        after = keyset_filter(full_sort, decode_cursor(cursor, len(full_sort)))
+        query = {"$and": [query, after]} if query else after
+
+    # Sort-key fields must come back to build the next cursor; re-include any
+    # the caller excluded and strip them again afterwards.
+    strip: List[str] = []
+    proj = dict(projection) if projection else None
+    if proj:
+        for f in key_fields:
+            if proj.get(f) == 0:
+                proj.pop(f)
+                strip.append(f)
+        # pymongo treats an empty projection as {"_id": 1}.
+        proj = proj or None
+
+    docs = await collection.find(query, proj).sort(full_sort).limit(limit + 1).to_list(limit + 1)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    next_cursor = None
+    if has_more and docs:
+        next_cursor = encode_cursor([_get_path(docs[-1], f) for f in key_fields])
+    if strip:
+        for d in docs:
+            for f in strip:
+                d.pop(f, None)
+
+    total: Optional[int] = None
+    total_capped = False
+    if not cursor and count != "none":
+        if count == "capped":
+            total = await collection.count_documents(filter_dict, limit=KEYSET_COUNT_CAP)
+            total_capped = total >= KEYSET_COUNT_CAP
+        else:
+            total = await collection.count_documents(filter_dict)
+
+    return {"items": docs, "next_cursor": next_cursor, "total": total, "total_capped": total_capped}
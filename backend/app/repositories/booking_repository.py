@@ -5,7 +5,8 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.repositories.base_repository import get_collection, with_org_filter, with_tenant_filter
+from app.repositories.base_repository import get_collection, keyset_page, with_org_filter, with_tenant_filter
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.utils import now_utc
 
 
@@ -39,6 +40,7 @@ class BookingRepository:
             "created_at": now,
             "updated_at": now,
         }
+        doc[SEARCH_TOKENS_FIELD] = build_search_tokens(doc, "bookings")
         res = await self._col.insert_one(doc)
         return str(res.inserted_id)
 
@@ -120,6 +122,40 @@ class BookingRepository:
         docs = await cursor.to_list(limit)
         return docs
 
+    async def list_bookings_page(
+        self,
+        organization_id: str,
+        *,
+        state: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Keyset-paginated variant of `list_bookings` ordered by (created_at, _id).
+
+        Returns (docs, next_cursor); raises InvalidCursor for a malformed cursor.
+        """
+        flt: Dict[str, Any] = {}
+        if state:
+            flt["$or"] = [{"state": state}, {"status": state}]
+        if start_date or end_date:
+            date_range: Dict[str, Any] = {}
+            if start_date:
+                date_range["$gte"] = start_date
+            if end_date:
+                date_range["$lte"] = end_date
+            flt["created_at"] = date_range
+
+        page = await keyset_page(
+            self._col,
+            with_org_filter(flt, organization_id),
+            sort=[("created_at", -1)],
+            limit=limit,
+            cursor=cursor,
+        )
+        return page["items"], page["next_cursor"]
+
 
     async def create_from_supplier_offer(
         self,
@@ -11,6 +11,7 @@ import uuid
 from typing import Any, Optional
 
 from app.db import get_db
+from app.indexes.manifest import report_index_failure
 from app.utils import now_utc
 
 logger = logging.getLogger("agency_contracts")
@@ -283,4 +284,5 @@ async def ensure_agency_contract_indexes() -> None:
             name="idx_content_org_agency",
         )
     except Exception as e:
+        report_index_failure("agency_contracts", e)
         logger.warning("Agency contract index creation warning: %s", e)
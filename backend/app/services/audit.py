@@ -214,8 +214,7 @@ def _get_ip(request: Request) -> str:
     return ""
 
 
-async def write_audit_log(
-    db,
+def build_audit_log(
     *,
     organization_id: str,
     actor: dict[str, Any],
@@ -226,8 +225,8 @@ async def write_audit_log(
     before: Optional[dict[str, Any]] = None,
     after: Optional[dict[str, Any]] = None,
     meta: Optional[dict[str, Any]] = None,
-) -> None:
-    """Persist audit log.
+) -> dict[str, Any]:
+    """Build an audit_logs document without writing it.
 
     actor expected: {actor_type, actor_id, email, roles}
     origin captures ip/user-agent/path/app_version and optional request-id.
@@ -267,5 +266,32 @@ async def write_audit_log(
         json.dumps(doc, default=str)
     except Exception:
         doc["meta"] = {"note": "meta_unserializable"}
+    return doc
 
+
+async def write_audit_log(
+    db,
+    *,
+    organization_id: str,
+    actor: dict[str, Any],
+    request: Request,
+    action: str,
+    target_type: str,
+    target_id: str,
+    before: Optional[dict[str, Any]] = None,
+    after: Optional[dict[str, Any]] = None,
+    meta: Optional[dict[str, Any]] = None,
+) -> None:
+    """Persist audit log (see ``build_audit_log`` for the document shape)."""
+    doc = build_audit_log(
+        organization_id=organization_id,
+        actor=actor,
+        request=request,
+        action=action,
+        target_type=target_type,
+        target_id=target_id,
+        before=before,
+        after=after,
+        meta=meta,
+    )
     await db.audit_logs.insert_one(doc)
@@ -2,16 +2,53 @@
 
 Hash chain is per-tenant for performance.
 current_hash = sha256(tenant_id + action + timestamp + previous_hash + actor_id + entity_id)
+
+Writes go through a per-tenant AuditChainWriter:
+
+- entries queue per tenant; one worker drains the queue, so a pod never
+  forks its own chain
+- each drain seals up to MAX_BLOCK_ENTRIES entries into a block: entries get
+  ``chain_seq``/``block_seq``, the block doc (audit_chain_blocks) stores
+  their Merkle root and links to the previous block hash
+- the chain head (seq, hash, block) lives in memory; audit_chain_heads holds
+  the durable copy, advanced with compare-and-set on ``seq``
+- the unique (tenant_id, chain_seq) index makes cross-pod appends race-safe:
+  the loser reloads the head and re-seals its block on top
+- each entry records its block's size (``block_count``) so a head repair
+  only rebuilds blocks that landed in full, never one another pod is still
+  inserting
+
+Entries written before batching (no ``chain_seq``) stay valid: the first
+block links to their tail hash.
 """
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import logging
+import os
 import uuid
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timezone
 from typing import Any, Optional
 
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
 from app.utils import now_utc
 
+logger = logging.getLogger("audit_hash_chain")
+
+GENESIS = "GENESIS"
+HEADS_COLLECTION = "audit_chain_heads"
+BLOCKS_COLLECTION = "audit_chain_blocks"
+MAX_BLOCK_ENTRIES = 64
+BLOCK_LINGER_SECONDS = float(os.environ.get("AUDIT_BLOCK_LINGER_MS", "2")) / 1000
+MAX_APPEND_ATTEMPTS = 5
+CONFLICT_BACKOFF_SECONDS = 0.005
+MAX_REPORTED_ERRORS = 100
+# A partial block older than this was left by a writer that died mid-insert.
+PARTIAL_BLOCK_GRACE_SECONDS = float(os.environ.get("AUDIT_PARTIAL_BLOCK_GRACE_S", "60"))
+
 
 def _compute_hash(
     tenant_id: str,
@@ -26,6 +63,62 @@ def _compute_hash(
     return hashlib.sha256(data.encode("utf-8")).hexdigest()
 
 
+def _entry_hash(entry: dict[str, Any], previous_hash: str) -> str:
+    return _compute_hash(
+        tenant_id=entry["tenant_id"],
+        action=entry["action"],
+        timestamp=entry["hash_timestamp"],
+        previous_hash=previous_hash,
+        actor_id=str(entry["actor"].get("actor_id", "")),
+        entity_id=str(entry["target"].get("id", "")),
+    )
+
+
+def merkle_root(hashes: list[str]) -> str:
+    """Binary Merkle root over entry hashes (odd levels duplicate the last node)."""
+    if not hashes:
+        return hashlib.sha256(b"").hexdigest()
+    level = list(hashes)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [
+            hashlib.sha256((level[i] + level[i + 1]).encode("utf-8")).hexdigest()
+            for i in range(0, len(level), 2)
+        ]
+    return level[0]
+
+
+def _block_hash(tenant_id: str, block_seq: int, first_seq: int, last_seq: int, root: str, prev_block_hash: str) -> str:
+    data = f"{tenant_id}|{block_seq}|{first_seq}|{last_seq}|{root}|{prev_block_hash}"
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _block_doc(tenant_id: str, block_seq: int, entries: list[dict[str, Any]], prev_block_hash: str) -> dict[str, Any]:
+    first_seq, last_seq = entries[0]["chain_seq"], entries[-1]["chain_seq"]
+    root = merkle_root([e["current_hash"] for e in entries])
+    return {
+        "_id": f"{tenant_id}:{block_seq}",
+        "tenant_id": tenant_id,
+        "block_seq": block_seq,
+        "first_seq": first_seq,
+        "last_seq": last_seq,
+        "count": len(entries),
+        "merkle_root": root,
+        "prev_block_hash": prev_block_hash,
+        "block_hash": _block_hash(tenant_id, block_seq, first_seq, last_seq, root, prev_block_hash),
+        "created_at": now_utc(),
+    }
+
+
+def _is_duplicate(exc: Exception) -> bool:
+    if isinstance(exc, DuplicateKeyError):
+        return True
+    if isinstance(exc, BulkWriteError):
+        return any(e.get("code") == 11000 for e in exc.details.get("writeErrors", []))
+    return False
+
+
 async def get_last_hash(db, tenant_id: str) -> str:
     """Get the last hash in the chain for a tenant."""
     last = await db.audit_logs_chain.find_one(
@@ -33,8 +126,220 @@ async def get_last_hash(db, tenant_id: str) -> str:
         sort=[("created_at", -1)],
     )
     if last:
-        return last.get("current_hash", "GENESIS")
-    return "GENESIS"
+        return last.get("current_hash", GENESIS)
+    return GENESIS
+
+
+# ─── Chain head ───────────────────────────────────────────────────────────────
+
+async def _load_head(db, tenant_id: str) -> dict[str, Any]:
+    """Durable head for a tenant, bootstrapped from the legacy tail and repaired if lagging."""
+    head = await db[HEADS_COLLECTION].find_one({"_id": tenant_id})
+    if head is None:
+        head = {
+            "_id": tenant_id,
+            "seq": 0,
+            "hash": await get_last_hash(db, tenant_id),
+            "block_seq": 0,
+            "block_hash": GENESIS,
+            "updated_at": now_utc(),
+        }
+        try:
+            await db[HEADS_COLLECTION].insert_one(head)
+        except DuplicateKeyError:
+            head = await db[HEADS_COLLECTION].find_one({"_id": tenant_id})
+    return await _repair_head(db, tenant_id, head)
+
+
+def _block_landed(entries: list[dict[str, Any]]) -> bool:
+    """True once every entry of the block is in, or its writer is clearly gone."""
+    expected = entries[0].get("block_count")
+    if expected is None or len(entries) >= expected:
+        return True
+    created = entries[-1].get("created_at")
+    if not isinstance(created, datetime):
+        return False
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return (now_utc() - created).total_seconds() > PARTIAL_BLOCK_GRACE_SECONDS
+
+
+async def _repair_head(db, tenant_id: str, head: dict[str, Any]) -> dict[str, Any]:
+    """Advance a head left behind by a writer that stopped between insert and CAS.
+
+    Missing block docs are rebuilt from the entries that did land. A block
+    whose ``insert_many`` is still in flight on another pod is left alone:
+    the head stops before it and that pod seals it.
+    """
+    tail = await db.audit_logs_chain.find_one(
+        {"tenant_id": tenant_id, "chain_seq": {"$gt": head["seq"]}},
+        sort=[("chain_seq", -1)],
+    )
+    if not tail:
+        return head
+
+    seq, last_hash = head["seq"], head["hash"]
+    last_block_seq, block_hash = head["block_seq"], head["block_hash"]
+    for block_seq in range(head["block_seq"] + 1, tail["block_seq"] + 1):
+        block = await db[BLOCKS_COLLECTION].find_one({"_id": f"{tenant_id}:{block_seq}"})
+        if block is None:
+            entries = await db.audit_logs_chain.find(
+                {"tenant_id": tenant_id, "block_seq": block_seq},
+                {"chain_seq": 1, "current_hash": 1, "block_count": 1, "created_at": 1},
+            ).sort("chain_seq", 1).to_list(length=MAX_BLOCK_ENTRIES)
+            if not entries:
+                continue
+            if not _block_landed(entries):
+                break
+            block = _block_doc(tenant_id, block_seq, entries, block_hash)
+            try:
+                await db[BLOCKS_COLLECTION].insert_one(block)
+            except DuplicateKeyError:
+                block = await db[BLOCKS_COLLECTION].find_one({"_id": block["_id"]})
+            last_hash = entries[-1]["current_hash"]
+        else:
+            last = await db.audit_logs_chain.find_one({"tenant_id": tenant_id, "chain_seq": block["last_seq"]})
+            last_hash = last["current_hash"] if last else last_hash
+        seq, last_block_seq, block_hash = block["last_seq"], block_seq, block["block_hash"]
+
+    if seq == head["seq"]:
+        return head
+
+    repaired = {
+        "seq": seq,
+        "hash": last_hash,
+        "block_seq": last_block_seq,
+        "block_hash": block_hash,
+        "updated_at": now_utc(),
+    }
+    await db[HEADS_COLLECTION].update_one({"_id": tenant_id, "seq": head["seq"]}, {"$set": repaired})
+    logger.warning("audit chain head repaired tenant=%s seq %s → %s", tenant_id, head["seq"], seq)
+    return {"_id": tenant_id, **repaired}
+
+
+# ─── Writer ───────────────────────────────────────────────────────────────────
+
+def _seal(tenant_id: str, head: dict[str, Any], pending: list[dict[str, Any]]) -> tuple[list[dict], dict, dict]:
+    """Chain ``pending`` onto ``head``: returns (entries, block doc, new head)."""
+    block_seq = head["block_seq"] + 1
+    previous_hash = head["hash"]
+    entries = []
+    for offset, doc in enumerate(pending, start=1):
+        entry = dict(doc)
+        entry["previous_hash"] = previous_hash
+        entry["current_hash"] = _entry_hash(entry, previous_hash)
+        entry["chain_seq"] = head["seq"] + offset
+        entry["block_seq"] = block_seq
+        entry["block_count"] = len(pending)
+        entries.append(entry)
+        previous_hash = entry["current_hash"]
+
+    block = _block_doc(tenant_id, block_seq, entries, head["block_hash"])
+    new_head = {
+        "_id": tenant_id,
+        "seq": entries[-1]["chain_seq"],
+        "hash": previous_hash,
+        "block_seq": block_seq,
+        "block_hash": block["block_hash"],
+        "updated_at": block["created_at"],
+    }
+    return entries, block, new_head
+
+
+class AuditChainWriter:
+    """Per-tenant queue + single drain task that appends entries block by block."""
+
+    def __init__(self) -> None:
+        self._queues: dict[str, deque] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self._heads: dict[str, dict[str, Any]] = {}
+        self.stats = {"entries": 0, "blocks": 0, "conflicts": 0, "head_cas_misses": 0}
+
+    async def append(self, db, doc: dict[str, Any]) -> dict[str, Any]:
+        tenant_id = doc["tenant_id"]
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._queues.setdefault(tenant_id, deque()).append((doc, fut))
+        if tenant_id not in self._workers:
+            self._workers[tenant_id] = loop.create_task(self._drain(db, tenant_id))
+        # A cancelled request must not lose its slot in a block being written.
+        return await asyncio.shield(fut)
+
+    async def _drain(self, db, tenant_id: str) -> None:
+        queue = self._queues[tenant_id]
+        try:
+            while queue:
+                # Let writers arriving in the same few ms share the block.
+                await asyncio.sleep(BLOCK_LINGER_SECONDS)
+                batch = [queue.popleft() for _ in range(min(len(queue), MAX_BLOCK_ENTRIES))]
+                try:
+                    entries = await self._write_block(db, tenant_id, [doc for doc, _ in batch])
+                except Exception as e:
+                    self._heads.pop(tenant_id, None)
+                    for _, fut in batch:
+                        if not fut.done():
+                            fut.set_exception(e)
+                    continue
+                for (_, fut), entry in zip(batch, entries):
+                    if not fut.done():
+                        fut.set_result(entry)
+        finally:
+            # No await between the empty check and here, so no entry is stranded.
+            self._workers.pop(tenant_id, None)
+            if not queue:
+                self._queues.pop(tenant_id, None)
+
+    async def _write_block(self, db, tenant_id: str, pending: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        for attempt in range(MAX_APPEND_ATTEMPTS):
+            head = self._heads.get(tenant_id) or await _load_head(db, tenant_id)
+            entries, block, new_head = _seal(tenant_id, head, pending)
+            try:
+                await db.audit_logs_chain.insert_many(entries, ordered=True)
+            except (BulkWriteError, DuplicateKeyError) as e:
+                if not _is_duplicate(e):
+                    raise
+                # Another pod claimed these chain positions: undo any partial
+                # insert, reload its head and re-seal on top of it.
+                await db.audit_logs_chain.delete_many({"_id": {"$in": [x["_id"] for x in entries]}})
+                self._heads.pop(tenant_id, None)
+                self.stats["conflicts"] += 1
+                # Give a block still landing on the other pod time to finish.
+                await asyncio.sleep(CONFLICT_BACKOFF_SECONDS * 2 ** attempt)
+                continue
+
+            block_result, head_result = await asyncio.gather(
+                db[BLOCKS_COLLECTION].insert_one(block),
+                db[HEADS_COLLECTION].update_one(
+                    {"_id": tenant_id, "seq": head["seq"]},
+                    {"$set": {k: v for k, v in new_head.items() if k != "_id"}},
+                ),
+                return_exceptions=True,
+            )
+            if isinstance(block_result, Exception) and not _is_duplicate(block_result):
+                logger.warning("audit block insert failed tenant=%s: %s", tenant_id, block_result)
+            if isinstance(head_result, Exception) or getattr(head_result, "matched_count", 1) == 0:
+                # Entries are durable; the next load repairs the head from them.
+                self.stats["head_cas_misses"] += 1
+                self._heads.pop(tenant_id, None)
+            else:
+                self._heads[tenant_id] = new_head
+            self.stats["entries"] += len(entries)
+            self.stats["blocks"] += 1
+            return entries
+        raise RuntimeError(f"audit chain append kept conflicting for tenant {tenant_id}")
+
+
+_writer: Optional[AuditChainWriter] = None
+_writer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_audit_chain_writer() -> AuditChainWriter:
+    """Process-wide writer, recreated when the event loop changes (tests, workers)."""
+    global _writer, _writer_loop
+    loop = asyncio.get_running_loop()
+    if _writer is None or _writer_loop is not loop:
+        _writer, _writer_loop = AuditChainWriter(), loop
+    return _writer
 
 
 async def write_chained_audit_log(
@@ -58,17 +363,6 @@ async def write_chained_audit_log(
     timestamp_str = now.strftime("%Y-%m-%dT%H:%M:%S.%f")
     actor_id = actor.get("actor_id") or actor.get("email") or "system"
 
-    previous_hash = await get_last_hash(db, tenant_id)
-
-    current_hash = _compute_hash(
-        tenant_id=tenant_id,
-        action=action,
-        timestamp=timestamp_str,
-        previous_hash=previous_hash,
-        actor_id=str(actor_id),
-        entity_id=str(target_id),
-    )
-
     doc = {
         "_id": str(uuid.uuid4()),
         "organization_id": organization_id,
@@ -85,66 +379,158 @@ async def write_chained_audit_log(
         "after": after,
         "meta": meta or {},
         "origin": origin or {},
-        "previous_hash": previous_hash,
-        "current_hash": current_hash,
         "hash_timestamp": timestamp_str,  # Exact string used in hash computation
         "created_at": now,
     }
 
-    await db.audit_logs_chain.insert_one(doc)
-    return doc
+    # previous_hash/current_hash/chain_seq/block_seq are assigned when sealed.
+    return await get_audit_chain_writer().append(db, doc)
 
 
-async def verify_chain_integrity(db, tenant_id: str, limit: int = 1000) -> dict[str, Any]:
-    """Verify hash chain integrity for a tenant."""
-    cursor = db.audit_logs_chain.find(
-        {"tenant_id": tenant_id}
-    ).sort("created_at", 1).limit(limit)
-
-    entries = await cursor.to_list(length=limit)
-    if not entries:
-        return {"valid": True, "checked": 0, "errors": []}
-
-    errors = []
-    for i, entry in enumerate(entries):
-        expected_prev = entries[i - 1]["current_hash"] if i > 0 else "GENESIS"
+# ─── Verification ─────────────────────────────────────────────────────────────
+
+def _recompute(entry: dict[str, Any], tenant_id: str) -> str:
+    # Use stored hash_timestamp for exact recomputation
+    timestamp_str = entry.get("hash_timestamp", "")
+    if not timestamp_str:
+        # Fallback for entries without hash_timestamp
+        created = entry.get("created_at", "")
+        if isinstance(created, datetime):
+            timestamp_str = created.strftime("%Y-%m-%dT%H:%M:%S.%f")
+        else:
+            timestamp_str = str(created)
+
+    return _compute_hash(
+        tenant_id=tenant_id,
+        action=entry["action"],
+        timestamp=timestamp_str,
+        previous_hash=entry["previous_hash"],
+        actor_id=str(entry["actor"].get("actor_id", "")),
+        entity_id=str(entry["target"].get("id", "")),
+    )
+
+
+class _Report:
+    def __init__(self) -> None:
+        self.errors: list[dict[str, Any]] = []
+        self.error_count = 0
+        self.checked = 0
+        self.blocks_checked = 0
+
+    def add(self, error: dict[str, Any]) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+
+    def check_entry(self, entry: dict[str, Any], tenant_id: str, expected_prev: str) -> None:
         if entry.get("previous_hash") != expected_prev:
-            errors.append({
-                "index": i,
+            self.add({
+                "index": self.checked,
                 "entry_id": entry["_id"],
                 "expected_previous": expected_prev,
                 "actual_previous": entry.get("previous_hash"),
             })
-
-        # Use stored hash_timestamp for exact recomputation
-        timestamp_str = entry.get("hash_timestamp", "")
-        if not timestamp_str:
-            # Fallback for entries without hash_timestamp
-            created = entry.get("created_at", "")
-            if isinstance(created, datetime):
-                timestamp_str = created.strftime("%Y-%m-%dT%H:%M:%S.%f")
-            else:
-                timestamp_str = str(created)
-
-        recomputed = _compute_hash(
-            tenant_id=tenant_id,
-            action=entry["action"],
-            timestamp=timestamp_str,
-            previous_hash=entry["previous_hash"],
-            actor_id=str(entry["actor"].get("actor_id", "")),
-            entity_id=str(entry["target"].get("id", "")),
-        )
+        recomputed = _recompute(entry, tenant_id)
         if recomputed != entry.get("current_hash"):
-            errors.append({
-                "index": i,
+            self.add({
+                "index": self.checked,
                 "entry_id": entry["_id"],
                 "error": "hash_mismatch",
                 "expected": recomputed,
                 "actual": entry.get("current_hash"),
             })
+        self.checked += 1
+
+
+async def verify_chain_integrity(db, tenant_id: str, limit: int = 1000) -> dict[str, Any]:
+    """Verify hash chain integrity for a tenant.
+
+    Streams legacy entries by created_at, then sealed entries block by block
+    (linkage, entry hashes, Merkle root, block hash). ``limit`` caps the
+    entries checked; blocks are never split.
+    """
+    report = _Report()
+    expected_prev = GENESIS
+
+    legacy = db.audit_logs_chain.find(
+        {"tenant_id": tenant_id, "chain_seq": {"$exists": False}}
+    ).sort("created_at", 1)
+    async for entry in legacy:
+        if report.checked >= limit:
+            break
+        report.check_entry(entry, tenant_id, expected_prev)
+        expected_prev = entry.get("current_hash")
+
+    entries = db.audit_logs_chain.find(
+        {"tenant_id": tenant_id, "chain_seq": {"$exists": True}}
+    ).sort("chain_seq", 1).__aiter__()
+    blocks = db[BLOCKS_COLLECTION].find({"tenant_id": tenant_id}).sort("block_seq", 1)
+    carry: Optional[dict[str, Any]] = None
+    expected_seq = 1
+    prev_block_hash = GENESIS
+
+    async def _next_entry() -> Optional[dict[str, Any]]:
+        nonlocal carry
+        if carry is not None:
+            entry, carry = carry, None
+            return entry
+        try:
+            return await entries.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    async for block in blocks:
+        if report.checked >= limit:
+            break
+        hashes: list[str] = []
+        while True:
+            entry = await _next_entry()
+            if entry is None:
+                break
+            if entry["chain_seq"] > block["last_seq"]:
+                carry = entry
+                break
+            if entry["chain_seq"] != expected_seq:
+                report.add({"index": report.checked, "entry_id": entry["_id"], "error": "sequence_gap",
+                            "expected_seq": expected_seq, "actual_seq": entry["chain_seq"]})
+            report.check_entry(entry, tenant_id, expected_prev)
+            expected_prev = entry.get("current_hash")
+            expected_seq = entry["chain_seq"] + 1
+            hashes.append(entry.get("current_hash", ""))
+
+        root = merkle_root(hashes)
+        recomputed_block = _block_hash(
+            tenant_id, block["block_seq"], block["first_seq"], block["last_seq"], root, prev_block_hash,
+        )
+        if len(hashes) != block["count"] or root != block["merkle_root"]:
+            report.add({"block_seq": block["block_seq"], "error": "merkle_mismatch",
+                        "expected": root, "actual": block["merkle_root"], "entries": len(hashes)})
+        elif block.get("prev_block_hash") != prev_block_hash or recomputed_block != block["block_hash"]:
+            report.add({"block_seq": block["block_seq"], "error": "block_link_mismatch",
+                        "expected": recomputed_block, "actual": block["block_hash"]})
+        prev_block_hash = block["block_hash"]
+        report.blocks_checked += 1
+
+    if report.checked < limit:
+        # Sealed entries with no block doc: the writer stopped before sealing.
+        orphan = await _next_entry()
+        if orphan is not None:
+            report.add({"entry_id": orphan["_id"], "error": "unsealed_entries", "from_seq": orphan["chain_seq"]})
 
     return {
-        "valid": len(errors) == 0,
-        "checked": len(entries),
-        "errors": errors,
+        "valid": report.error_count == 0,
+        "checked": report.checked,
+        "blocks_checked": report.blocks_checked,
+        "error_count": report.error_count,
+        "errors": report.errors,
     }
+
+
+async def ensure_audit_chain_indexes(db) -> None:
+    await db.audit_logs_chain.create_index(
+        [("tenant_id", 1), ("chain_seq", 1)],
+        name="uniq_tenant_chain_seq",
+        unique=True,
+        partialFilterExpression={"chain_seq": {"$exists": True}},
+    )
+    await db[BLOCKS_COLLECTION].create_index([("tenant_id", 1), ("block_seq", 1)], name="idx_tenant_block_seq")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, Literal, Optional
+from typing import Any, Dict, Literal, Optional, Tuple
 
 from bson import ObjectId
 
@@ -118,20 +118,18 @@ class BookingLifecycleService:
             if existing:
                 return existing
 
-        # Build event document
-        doc: Dict[str, Any] = {
-            "organization_id": organization_id,
-            "agency_id": agency_id,
-            "booking_id": str(booking_id),
-            "event": event,
-            "occurred_at": occurred_at,
-            "created_at": now_utc(),
-            "created_by": created_by or {"type": "system", "id": None, "email": None},
-            "request_id": request_id,
-            "before": before or {},
-            "after": after or {},
-            "meta": meta or {},
-        }
+        doc = self.build_event(
+            organization_id=organization_id,
+            agency_id=agency_id,
+            booking_id=booking_id,
+            event=event,
+            occurred_at=occurred_at,
+            request_id=request_id,
+            created_by=created_by,
+            before=before,
+            after=after,
+            meta=meta,
+        )
 
         res = await self.db.booking_events.insert_one(doc)
         doc["_id"] = res.inserted_id
@@ -143,16 +141,6 @@ class BookingLifecycleService:
             # If booking_id is not a valid ObjectId, we still keep the event
             return doc
 
-        # Determine new status for lifecycle events
-        new_status: Optional[str] = None
-        if event == "BOOKING_CREATED":
-            new_status = "PENDING"
-        elif event == "BOOKING_CONFIRMED":
-            new_status = "CONFIRMED"
-        elif event == "BOOKING_CANCELLED":
-            new_status = "CANCELLED"
-        # BOOKING_AMENDED -> status remains as-is
-
         # Optional monotonic amendment sequence for multi-amend flows
         if event == "BOOKING_AMENDED":
             seq_doc = await self.db.bookings.find_one_and_update(
@@ -165,6 +153,60 @@ class BookingLifecycleService:
             if seq_doc and "amend_seq" in seq_doc:
                 doc["meta"]["amend_sequence"] = int(seq_doc["amend_seq"])
 
+        await self.db.bookings.update_one(*self.projection_update(oid, organization_id, event, occurred_at, request_id))
+
+        await self.run_hooks(organization_id=organization_id, booking_id=booking_id, event=event, meta=meta)
+
+        return doc
+
+    def build_event(
+        self,
+        *,
+        organization_id: str,
+        agency_id: str,
+        booking_id: str,
+        event: LifecycleEvent,
+        occurred_at: datetime,
+        request_id: Optional[str] = None,
+        created_by: Optional[Dict[str, Any]] = None,
+        before: Optional[Dict[str, Any]] = None,
+        after: Optional[Dict[str, Any]] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """booking_events document for an event (not written)."""
+        return {
+            "organization_id": organization_id,
+            "agency_id": agency_id,
+            "booking_id": str(booking_id),
+            "event": event,
+            "occurred_at": occurred_at,
+            "created_at": now_utc(),
+            "created_by": created_by or {"type": "system", "id": None, "email": None},
+            "request_id": request_id,
+            "before": before or {},
+            "after": after or {},
+            "meta": meta or {},
+        }
+
+    @staticmethod
+    def projection_update(
+        oid: ObjectId,
+        organization_id: str,
+        event: LifecycleEvent,
+        occurred_at: datetime,
+        request_id: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(filter, update) of the bookings projection for an event."""
+        # Determine new status for lifecycle events
+        new_status: Optional[str] = None
+        if event == "BOOKING_CREATED":
+            new_status = "PENDING"
+        elif event == "BOOKING_CONFIRMED":
+            new_status = "CONFIRMED"
+        elif event == "BOOKING_CANCELLED":
+            new_status = "CANCELLED"
+        # BOOKING_AMENDED -> status remains as-is
+
         update_fields: Dict[str, Any] = {
             "last_event": {
                 "event": event,
@@ -177,7 +219,7 @@ class BookingLifecycleService:
             update_fields["status"] = new_status
             update_fields["status_updated_at"] = occurred_at
 
-        await self.db.bookings.update_one(
+        return (
             {"_id": oid, "organization_id": organization_id},
             {
                 "$set": update_fields,
@@ -185,6 +227,21 @@ class BookingLifecycleService:
             },
         )
 
+    async def run_hooks(
+        self,
+        *,
+        organization_id: str,
+        booking_id: str,
+        event: LifecycleEvent,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Best-effort side effects after an event's projection is written."""
+        oid = ObjectId(booking_id)
+
+        # ── Room-night occupancy ledger (no-op for hotels without one) ──
+        from app.services.room_night_occupancy import refresh_booking_occupancy
+        await refresh_booking_occupancy(self.db, organization_id, booking_id)
+
         # ── Sheet Write-Back Hook (BOOKING_CONFIRMED) ──
         if event == "BOOKING_CONFIRMED":
             try:
@@ -227,5 +284,3 @@ class BookingLifecycleService:
                 logging.getLogger("sheet_writeback").warning(
                     "Write-back amend hook failed for booking %s: %s", booking_id, wb_err
                 )
-
-        return doc
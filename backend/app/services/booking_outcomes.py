@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional, Tuple
 
 from app.utils import now_utc
 
+logger = logging.getLogger(__name__)
+
 
 OPERATIONAL_REASONS = {"PRICE_CHANGED", "RATE_CHANGED", "HOTEL_OVERBOOK", "PAYMENT_FAILURE", "SUPPLIER_CANCELLED"}
 
@@ -193,5 +196,18 @@ async def upsert_booking_outcome(db, booking_doc: Dict[str, Any], today: Optiona
     {"$set": doc, "$setOnInsert": {"created_at": now}},
     upsert=True,
   )
+  await refresh_outcome_stats(db, org_id, booking_id)
 
   return doc
+
+
+async def refresh_outcome_stats(db, org_id: str, booking_id: str) -> None:
+  """Keep the agency × hotel match stats projection in sync after an outcome write."""
+  from app.services.match_stats_projection import refresh_match_stats_for_outcome
+
+  try:
+    outcome = await db.booking_outcomes.find_one({"organization_id": org_id, "booking_id": booking_id})
+    if outcome:
+      await refresh_match_stats_for_outcome(db, outcome)
+  except Exception as exc:  # projection is derived data; never fail the write
+    logger.warning("match stats refresh failed for booking %s: %s", booking_id, exc)
@@ -14,6 +14,7 @@ import logging
 from app.services.redis_cache import redis_invalidate_pattern
 from app.services.mongo_cache_service import cache_invalidate_pattern as mongo_invalidate
 from app.services import cache_metrics as cm
+from app.services.http_cache import purge_surrogate_keys, surrogate_keys
 
 logger = logging.getLogger("cache_invalidation")
 
@@ -46,6 +47,11 @@ async def _inv(prefix: str, scope: str = "") -> int:
         return 0
 
 
+async def _purge_cdn(scope: str, *surfaces: str) -> int:
+    """Purge CDN copies of public responses tagged "{surface}/{scope}"."""
+    return await purge_surrogate_keys(surrogate_keys(s, scope)[0] for s in surfaces)
+
+
 # ─── Domain-Specific Invalidation ─────────────────────────────
 
 async def invalidate_products(org_id: str) -> None:
@@ -53,6 +59,9 @@ async def invalidate_products(org_id: str) -> None:
     await _inv("products", org_id)
     await _inv("pub_search", org_id)
     await _inv("dash_popular", org_id)
+    await _inv(f"pub_search:{org_id}")
+    await _inv(f"sitemap:{org_id}")
+    await _purge_cdn(org_id, "pub_search", "sitemap")
 
 
 async def invalidate_hotels(org_id: str) -> None:
@@ -61,6 +70,9 @@ async def invalidate_hotels(org_id: str) -> None:
     await _inv("search", org_id)
     await _inv("b2b_htl_srch", org_id)
     await _inv("agency_hotels", org_id)
+    # Sitemaps list hotels across orgs: drop every variant.
+    await _inv("sitemap")
+    await purge_surrogate_keys(["sitemap"])
 
 
 async def invalidate_tours(org_id: str) -> None:
@@ -68,6 +80,11 @@ async def invalidate_tours(org_id: str) -> None:
     await _inv("pub_tours", org_id)
     await _inv("tour_detail", org_id)
     await _inv("pub_search", org_id)
+    await _inv(f"pub_tours:{org_id}")
+    await _inv(f"tour_detail:{org_id}")
+    await _inv(f"pub_search:{org_id}")
+    await _inv(f"tours_browse_filters:{org_id}")
+    await _purge_cdn(org_id, "pub_tours", "tour_detail", "pub_search")
 
 
 async def invalidate_crm_customers(org_id: str) -> None:
@@ -97,6 +114,8 @@ async def invalidate_campaigns(org_id: str) -> None:
     """Invalidate campaign caches."""
     await _inv("pub_camp", org_id)
     await _inv("pub_camps_list", org_id)
+    await _inv(f"sitemap:{org_id}")
+    await _purge_cdn(org_id, "sitemap")
 
 
 async def invalidate_tenant_features(tenant_id: str) -> None:
@@ -134,6 +153,8 @@ async def invalidate_dashboard(org_id: str) -> None:
 async def invalidate_storefront(tenant_id: str) -> None:
     """Invalidate storefront health/branding cache."""
     await _inv("sf_health", tenant_id)
+    await _inv(f"sf_health:{tenant_id}")
+    await _purge_cdn(tenant_id, "sf_health")
 
 
 async def invalidate_all_for_org(org_id: str) -> None:
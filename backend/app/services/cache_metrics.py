@@ -2,6 +2,7 @@
 
 Tracks all cache operations across L1 (Redis) and L2 (MongoDB):
   - hit / miss / fallback / stale serve counts
+  - single-flight coalescing (leaders, coalesced, cross-pod waits, early refresh)
   - invalidation success / failure
   - per-layer latency
   - Redis health events
@@ -122,8 +123,17 @@ def get_snapshot() -> dict[str, Any]:
                 "samples": len(samples),
             }
 
+    from app.services.single_flight import inflight_stats
+
+    single_flight = {
+        k: v for k, v in _counters.items()
+        if k.startswith(("singleflight_", "xfetch_")) or k == "stale_serve_count"
+    }
+    single_flight.update(inflight_stats())
+
     return {
         "counters": dict(_counters),
+        "single_flight": single_flight,
         "hit_rate_pct": hit_rate,
         "total_requests": total_req,
         "latency": latency_stats,
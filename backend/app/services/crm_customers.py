@@ -7,6 +7,17 @@ from uuid import uuid4
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase as Database
 
+from app.repositories.base_repository import keyset_page
+from app.services.search_index import (
+    SEARCH_TOKENS_FIELD,
+    apply_search,
+    build_search_tokens,
+    refresh_search_tokens,
+)
+
+# Never hand the internal search tokens back to API callers.
+_CUSTOMER_PROJECTION = {"_id": 0, SEARCH_TOKENS_FIELD: 0}
+
 
 def _normalize_for_json(obj: Any) -> Any:
     """Recursively normalize values for JSON/Pydantic serialization.
@@ -95,21 +106,20 @@ async def create_customer(db: Database, organization_id: str, user_id: str, data
         "created_at": now,
         "updated_at": now,
     }
+    doc[SEARCH_TOKENS_FIELD] = build_search_tokens(doc, "customers")
     await db.customers.insert_one(doc)
     doc.pop("_id", None)
+    doc.pop(SEARCH_TOKENS_FIELD, None)
     return doc
 
 
-async def list_customers(
-    db: Database,
+def _customer_list_query(
     organization_id: str,
     *,
     search: Optional[str] = None,
     cust_type: Optional[str] = None,
     tags: Optional[List[str]] = None,
-    page: int = 1,
-    page_size: int = 25,
-) -> Tuple[List[Dict[str, Any]], int]:
+) -> Dict[str, Any]:
     q: Dict[str, Any] = {"organization_id": organization_id}
 
     if cust_type:
@@ -118,25 +128,36 @@ async def list_customers(
     if tags:
         q["tags"] = {"$in": tags}
 
-    if search:
-        s = search.strip()
-        q["$or"] = [
-            {"name": {"$regex": s, "$options": "i"}},
-            {"contacts.value": {"$regex": s, "$options": "i"}},
-        ]
+    return apply_search(q, search, "customers")
+
+
+def _clamp_page_size(page_size: int) -> int:
+    if page_size < 1:
+        return 25
+    return min(page_size, 100)
+
+
+async def list_customers(
+    db: Database,
+    organization_id: str,
+    *,
+    search: Optional[str] = None,
+    cust_type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    page: int = 1,
+    page_size: int = 25,
+) -> Tuple[List[Dict[str, Any]], int]:
+    q = _customer_list_query(organization_id, search=search, cust_type=cust_type, tags=tags)
 
     if page < 1:
         page = 1
-    if page_size < 1:
-        page_size = 25
-    if page_size > 100:
-        page_size = 100
+    page_size = _clamp_page_size(page_size)
 
     skip = (page - 1) * page_size
 
     total = await db.customers.count_documents(q)
     cursor = (
-        db.customers.find(q, {"_id": 0})
+        db.customers.find(q, _CUSTOMER_PROJECTION)
         .sort([("updated_at", -1)])
         .skip(skip)
         .limit(page_size)
@@ -145,8 +166,35 @@ async def list_customers(
     return items, total
 
 
+async def list_customers_keyset(
+    db: Database,
+    organization_id: str,
+    *,
+    search: Optional[str] = None,
+    cust_type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    page_size: int = 25,
+) -> Dict[str, Any]:
+    """Cursor-paginated variant of :func:`list_customers` (updated_at desc, id).
+
+    The total is only counted for the first page (no cursor).
+    """
+    q = _customer_list_query(organization_id, search=search, cust_type=cust_type, tags=tags)
+    return await keyset_page(
+        db.customers,
+        q,
+        sort=[("updated_at", -1)],
+        tie_breaker="id",
+        limit=_clamp_page_size(page_size),
+        cursor=cursor,
+        projection=_CUSTOMER_PROJECTION,
+        count="exact",
+    )
+
+
 async def get_customer(db: Database, organization_id: str, customer_id: str) -> Optional[Dict[str, Any]]:
-    doc = await db.customers.find_one({"organization_id": organization_id, "id": customer_id}, {"_id": 0})
+    doc = await db.customers.find_one({"organization_id": organization_id, "id": customer_id}, _CUSTOMER_PROJECTION)
     return doc
 
 
@@ -269,12 +317,15 @@ async def patch_customer(
 
     update["updated_at"] = datetime.utcnow()
 
+    flt = {"organization_id": organization_id, "id": customer_id}
     res = await db.customers.find_one_and_update(
-        {"organization_id": organization_id, "id": customer_id},
+        flt,
         {"$set": update},
-        projection={"_id": 0},
+        projection=_CUSTOMER_PROJECTION,
         return_document=True,
     )
+    if res and ("name" in update or "contacts" in update):
+        await refresh_search_tokens(db, "customers", flt)
     return res
 
 
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from app.db import get_db
+from app.indexes.manifest import report_index_failure
 
 logger = logging.getLogger("distributed_lock")
 
@@ -137,4 +138,5 @@ async def ensure_lock_indexes() -> None:
             "expires_at", expireAfterSeconds=0, name="ttl_locks"
         )
     except Exception as e:
+        report_index_failure("locks", e)
         logger.warning("Lock index creation warning: %s", e)
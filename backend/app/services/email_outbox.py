@@ -7,7 +7,6 @@ from datetime import timedelta
 
 from app.services.email import EmailSendError, send_email_ses
 from app.utils import now_utc
-from app.routers.voucher import _get_or_create_voucher_for_booking  # reuse FAZ-9.2 helper
 
 logger = logging.getLogger("email_outbox")
 
@@ -31,7 +30,11 @@ async def enqueue_booking_email(
 
     booking_id = booking["_id"]
 
-    # Ensure voucher token exists
+    # Ensure voucher token exists. Imported here: the voucher router lives in
+    # the booking domain, which imports this module (import-order cycle when
+    # domains are mounted lazily).
+    from app.routers.voucher import _get_or_create_voucher_for_booking  # reuse FAZ-9.2 helper
+
     voucher = await _get_or_create_voucher_for_booking(db, organization_id, booking_id)
     token = voucher["token"]
 
@@ -9,14 +9,23 @@ Provides a reusable decorator for FastAPI endpoints:
 
 Cache key is auto-generated from: prefix + org_id + query params.
 Supports tenant-scoped caching and automatic invalidation.
+
+Hot endpoints coalesce misses and revalidate in the background:
+
+    hit, ck = await try_cache_get("pub_search", org, params, refresh=compute)
+    if hit:
+        return hit
+    data = await coalesced_compute(ck, compute)
 """
 from __future__ import annotations
 
 import hashlib
 import logging
-from typing import Any, Optional
+import time
+from typing import Any, Callable, Optional
 
-from app.services.redis_cache import redis_get, redis_set
+from app.services import single_flight as sf
+from app.services.redis_cache import _make_key, redis_get, redis_set
 
 logger = logging.getLogger("endpoint_cache")
 
@@ -44,25 +53,45 @@ def _build_cache_key(
     return ":".join(parts)
 
 
-async def try_cache_get(prefix: str, org_id: str = "", params: Optional[dict] = None):
-    """Try to get from Redis cache. Returns (hit, key) tuple."""
+async def try_cache_get(
+    prefix: str,
+    org_id: str = "",
+    params: Optional[dict] = None,
+    *,
+    refresh: Optional[Callable] = None,
+    ttl: int = 120,
+):
+    """Try to get from Redis cache. Returns (hit, key) tuple.
+
+    With ``refresh`` (the endpoint's compute function) an entry past its TTL
+    is still returned while one background refresh runs, and a hot entry may
+    be refreshed shortly before it expires (XFetch). Without it, an expired
+    entry counts as a miss.
+    """
     key = _build_cache_key(prefix, org_id, params)
-    hit = await redis_get(key)
+    hit = None
+    entry = await redis_get(key)
+    if entry is not None:
+        hit, meta = sf.unwrap(entry)
+        if refresh is not None:
+            sf.revalidate(_make_key(key), meta, lambda: _compute_and_store(key, refresh, ttl))
+        elif sf.is_stale(meta):
+            hit = None
     if hit is None:
         try:
             from app.services.cache_service import cache_get as mongo_get
 
             hit = await mongo_get(key)
             if hit is not None:
-                await redis_set(key, hit, ttl_seconds=120)
+                await redis_set(key, sf.wrap(hit, 120), ttl_seconds=120 + sf.STALE_SECONDS)
         except Exception:
             hit = None
     return hit, key
 
 
-async def cache_and_return(key: str, data: Any, ttl: int = 120):
+async def cache_and_return(key: str, data: Any, ttl: int = 120, *, compute_seconds: float = 0.0):
     """Store in Redis and return the data."""
-    await redis_set(key, data, ttl_seconds=ttl)
+    await redis_set(key, sf.wrap(data, ttl, compute_seconds), ttl_seconds=ttl + sf.STALE_SECONDS)
     try:
         from app.services.cache_service import cache_set as mongo_set
 
@@ -70,3 +99,26 @@ async def cache_and_return(key: str, data: Any, ttl: int = 120):
     except Exception:
         logger.debug("endpoint_cache mongo set failed", exc_info=True)
     return data
+
+
+async def _compute_and_store(key: str, compute_fn: Callable, ttl: int) -> Any:
+    started = time.monotonic()
+    data = await sf.call(compute_fn)
+    return await cache_and_return(key, data, ttl, compute_seconds=time.monotonic() - started)
+
+
+async def _peek(key: str) -> Any:
+    entry = await redis_get(key)
+    return None if entry is None else sf.unwrap(entry)[0]
+
+
+async def coalesced_compute(key: str, compute_fn: Callable, ttl: int = 120) -> Any:
+    """Compute a missed key once for all concurrent callers, store and return it.
+
+    Callers on other pods wait briefly for the leader's value (Redis lock).
+    """
+    return await sf.coalesce(
+        _make_key(key),
+        lambda: _compute_and_store(key, compute_fn, ttl),
+        probe=lambda: _peek(key),
+    )
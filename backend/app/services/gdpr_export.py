@@ -0,0 +1,266 @@
+"""KVKK/GDPR data export archives.
+
+Background variant of ``gdpr_service.export_user_data`` for data subjects
+of any size:
+
+- ``request_export`` records a run in ``gdpr_export_runs`` and enqueues a
+  ``gdpr.export`` job (``app.services.jobs``)
+- the job reads every ``EXPORT_SOURCES`` collection concurrently, each
+  cursor streaming batches into its own NDJSON part file — memory stays at
+  one batch per collection and nothing is truncated
+- the parts and a ``manifest.json`` are zipped into one archive in a local
+  work dir (GDPR_EXPORT_DIR), then stored in Mongo as ordered
+  ``gdpr_export_chunks`` (archives can exceed the 16 MB document limit of
+  the ``export_blobs`` used by admin export runs), so any API pod can serve
+  the download the worker built; the run gets a download token (7 days)
+- chunks carry the token expiry and a TTL index drops them once it passes;
+  ``find_download`` also purges an expired archive and marks the run expired
+
+Progress (rows written per collection) is stored on the run every
+PROGRESS_EVERY rows and when a collection finishes.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import secrets
+import shutil
+import uuid
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from app.services.gdpr_service import (
+    DATA_CONTROLLER,
+    EXPORT_LEGAL_BASIS,
+    EXPORT_SOURCES,
+    ExportSource,
+    export_cursor,
+    record_export_request,
+)
+from app.utils import now_utc
+
+logger = logging.getLogger("gdpr.export")
+
+RUNS_COLLECTION = "gdpr_export_runs"
+JOB_TYPE = "gdpr.export"
+EXPORT_FORMAT = "KVKK_COMPLIANT_NDJSON_v1"
+BATCH_SIZE = 500
+PROGRESS_EVERY = 2000
+DOWNLOAD_TTL = timedelta(days=7)
+CHUNKS_COLLECTION = "gdpr_export_chunks"
+CHUNK_SIZE = 1 << 20
+
+
+def export_dir() -> Path:
+    """Worker-local scratch space for building archives; nothing is served from it."""
+    base = os.environ.get("GDPR_EXPORT_DIR")
+    if base:
+        return Path(base)
+    return Path(os.environ.get("UPLOAD_DIR") or "./uploads") / "gdpr_exports"
+
+
+def _initial_progress() -> dict[str, Any]:
+    return {source.name: {"rows": 0, "done": False} for source in EXPORT_SOURCES}
+
+
+async def request_export(db, user_email: str, organization_id: str, requested_by: str) -> dict[str, Any]:
+    """Create an export run and queue its job."""
+    from app.services.jobs import enqueue_job
+
+    now = now_utc()
+    run = {
+        "_id": str(uuid.uuid4()),
+        "user_email": user_email,
+        "organization_id": organization_id,
+        "requested_by": requested_by,
+        "status": "queued",
+        "progress": _initial_progress(),
+        "rows_total": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await db[RUNS_COLLECTION].insert_one(run)
+    await enqueue_job(db, organization_id=organization_id, type=JOB_TYPE, payload={"export_id": run["_id"]})
+    return run
+
+
+def run_view(run: dict[str, Any], include_token: bool = False) -> dict[str, Any]:
+    """API view of a run (the download token only for its owner)."""
+    view = {
+        "id": run["_id"],
+        "user_email": run.get("user_email"),
+        "status": run.get("status"),
+        "progress": run.get("progress") or {},
+        "rows_total": run.get("rows_total", 0),
+        "error": run.get("error"),
+        "file": run.get("file"),
+        "created_at": str(run.get("created_at", "")),
+        "completed_at": str(run.get("completed_at", "")) if run.get("completed_at") else None,
+    }
+    download = run.get("download") or {}
+    if include_token and run.get("status") == "ready" and download.get("token"):
+        view["download_url"] = f"/api/gdpr/exports/download/{download['token']}"
+        view["download_expires_at"] = str(download.get("expires_at", ""))
+    return view
+
+
+async def _set_progress(db, export_id: str, name: str, rows: int, done: bool) -> None:
+    await db[RUNS_COLLECTION].update_one(
+        {"_id": export_id},
+        {"$set": {
+            f"progress.{name}": {"rows": rows, "done": done},
+            "updated_at": now_utc(),
+        }},
+    )
+
+
+async def _stream_source(db, export_id: str, source: ExportSource, run: dict[str, Any], path: Path) -> int:
+    """Write one collection as NDJSON, one cursor batch in memory at a time."""
+    rows = 0
+    cursor = export_cursor(db, source, run["user_email"], run["organization_id"], batch_size=BATCH_SIZE)
+    with open(path, "w", encoding="utf-8") as fh:
+        async for doc in cursor:
+            fh.write(json.dumps(source.project(doc), default=str, ensure_ascii=False))
+            fh.write("\n")
+            rows += 1
+            if rows % PROGRESS_EVERY == 0:
+                await _set_progress(db, export_id, source.name, rows, False)
+    await _set_progress(db, export_id, source.name, rows, True)
+    return rows
+
+
+def _build_archive(target: Path, parts: dict[str, Path], manifest: dict[str, Any]) -> tuple[int, str]:
+    """Zip the part files (streamed from disk); return (size, sha256)."""
+    tmp = target.with_suffix(".zip.tmp")
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+        for name, path in parts.items():
+            zf.write(path, arcname=f"{name}.ndjson")
+    os.replace(tmp, target)
+
+    digest = hashlib.sha256()
+    with open(target, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return target.stat().st_size, digest.hexdigest()
+
+
+async def _store_archive(db, export_id: str, path: Path, expires_at) -> int:
+    """Copy the archive into ``gdpr_export_chunks``; returns the chunk count."""
+    await db[CHUNKS_COLLECTION].delete_many({"export_id": export_id})  # a retried job
+    n = 0
+    with open(path, "rb") as fh:
+        while True:
+            data = await asyncio.to_thread(fh.read, CHUNK_SIZE)
+            if not data:
+                break
+            await db[CHUNKS_COLLECTION].insert_one(
+                {"export_id": export_id, "n": n, "data": data, "expires_at": expires_at}
+            )
+            n += 1
+    return n
+
+
+async def iter_archive(db, export_id: str):
+    """Archive bytes in order, one chunk in memory at a time."""
+    cursor = db[CHUNKS_COLLECTION].find({"export_id": export_id}).sort("n", 1)
+    async for chunk in cursor:
+        yield bytes(chunk["data"])
+
+
+async def run_gdpr_export(db, export_id: str) -> Optional[dict[str, Any]]:
+    """Build the archive of one run; failures mark the run and re-raise for job retry."""
+    run = await db[RUNS_COLLECTION].find_one({"_id": export_id})
+    if not run or run.get("status") == "ready":
+        return run
+
+    await db[RUNS_COLLECTION].update_one(
+        {"_id": export_id},
+        {"$set": {"status": "running", "progress": _initial_progress(), "error": None, "updated_at": now_utc()}},
+    )
+
+    workdir = export_dir() / export_id
+    workdir.mkdir(parents=True, exist_ok=True)
+    parts = {source.name: workdir / f"{source.name}.ndjson" for source in EXPORT_SOURCES}
+    try:
+        counts = await asyncio.gather(*[
+            _stream_source(db, export_id, source, run, parts[source.name]) for source in EXPORT_SOURCES
+        ])
+        rows = {source.name: n for source, n in zip(EXPORT_SOURCES, counts)}
+
+        now = now_utc()
+        manifest = {
+            "export_format": EXPORT_FORMAT,
+            "user_email": run["user_email"],
+            "exported_at": str(now),
+            "data_controller": DATA_CONTROLLER,
+            "legal_basis": EXPORT_LEGAL_BASIS,
+            "files": {f"{name}.ndjson": n for name, n in rows.items()},
+        }
+        archive = workdir / "archive.zip"
+        size_bytes, sha256 = await asyncio.to_thread(_build_archive, archive, parts, manifest)
+        expires_at = now + DOWNLOAD_TTL
+        chunks = await _store_archive(db, export_id, archive, expires_at)
+
+        update = {
+            "status": "ready",
+            "rows_total": sum(rows.values()),
+            "file": {
+                "filename": f"kvkk-export_{now.date().isoformat()}_{export_id[:8]}.zip",
+                "content_type": "application/zip",
+                "size_bytes": size_bytes,
+                "sha256": sha256,
+            },
+            "storage": {"mode": "mongo", "collection": CHUNKS_COLLECTION, "chunks": chunks},
+            "download": {"token": secrets.token_urlsafe(32), "expires_at": expires_at},
+            "completed_at": now,
+            "updated_at": now,
+        }
+        await db[RUNS_COLLECTION].update_one({"_id": export_id}, {"$set": update})
+    except Exception as e:
+        logger.error("GDPR export %s failed: %s", export_id, e)
+        await db[RUNS_COLLECTION].update_one(
+            {"_id": export_id},
+            {"$set": {"status": "failed", "error": str(e)[:500], "updated_at": now_utc()}},
+        )
+        raise
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    await record_export_request(
+        db, run["user_email"], run["organization_id"],
+        f"KVKK data export archive completed ({update['rows_total']} rows)",
+        export_id=export_id, requested_by=run.get("requested_by", ""),
+    )
+    return {**run, **update}
+
+
+async def expire_export(db, run: dict[str, Any]) -> None:
+    """Delete an archive whose token expired; the run keeps its metadata."""
+    await db[CHUNKS_COLLECTION].delete_many({"export_id": run["_id"]})
+    await db[RUNS_COLLECTION].update_one(
+        {"_id": run["_id"]},
+        {"$set": {"status": "expired", "download": None, "storage": None, "updated_at": now_utc()}},
+    )
+
+
+async def find_download(db, token: str) -> Optional[dict[str, Any]]:
+    """Ready run for a download token, or None when unknown/expired."""
+    run = await db[RUNS_COLLECTION].find_one({"download.token": token, "status": "ready"})
+    if not run:
+        return None
+    expires_at = (run.get("download") or {}).get("expires_at")
+    if expires_at is not None:
+        now = now_utc()
+        if expires_at.tzinfo is None:
+            now = now.replace(tzinfo=None)
+        if expires_at < now:
+            await expire_export(db, run)
+            return None
+    return run
@@ -1,7 +1,8 @@
 """KVKK/GDPR Full Compliance Service.
 
 Provides:
-- Data export (right to portability) - comprehensive across all collections
+- Data export (right to portability) - comprehensive across all collections,
+  inline JSON or a streamed NDJSON archive (see gdpr_export)
 - Data deletion (right to erasure)
 - Data anonymization
 - Consent tracking with KVKK-specific types
@@ -11,12 +12,16 @@ Provides:
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 import uuid
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from app.db import get_db
+from app.indexes.manifest import report_index_failure
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.utils import now_utc
 
 logger = logging.getLogger("gdpr")
@@ -116,53 +121,65 @@ async def get_latest_consent(
 
 # ----- Data Export (Comprehensive) -----
 
-async def export_user_data(user_email: str, organization_id: str) -> dict[str, Any]:
-    """Export all user data for GDPR/KVKK portability (comprehensive)."""
-    db = await get_db()
-
-    # Collect data from ALL relevant collections
-    user = await db.users.find_one({"email": user_email, "organization_id": organization_id})
-    user_data = None
-    if user:
-        user_data = {
-            "email": user.get("email"),
-            "name": user.get("name"),
-            "roles": user.get("roles"),
-            "phone": user.get("phone"),
-            "created_at": str(user.get("created_at", "")),
-            "last_login_at": str(user.get("last_login_at", "")),
-        }
-
-    # Bookings
-    bookings = await db.bookings.find(
-        {"organization_id": organization_id, "$or": [
-            {"guest_email": user_email},
-            {"created_by": user_email},
-        ]}
-    ).to_list(5000)
-    bookings_data = [
-        {
+@dataclass(frozen=True)
+class ExportSource:
+    """One collection of a data subject's export.
+
+    ``limit`` caps the inline JSON export only; the archive export
+    (``gdpr_export``) streams every matching document.
+    """
+
+    name: str
+    collection: str
+    query: Callable[[str, str], dict[str, Any]]
+    project: Callable[[dict[str, Any]], dict[str, Any]]
+    limit: int
+    sort: Optional[tuple[str, int]] = None
+
+
+def _ts(doc: dict[str, Any], field: str = "created_at") -> str:
+    return str(doc.get(field, ""))
+
+
+EXPORT_SOURCES: tuple[ExportSource, ...] = (
+    ExportSource(
+        "user", "users",
+        lambda email, org: {"email": email, "organization_id": org},
+        lambda u: {
+            "email": u.get("email"),
+            "name": u.get("name"),
+            "roles": u.get("roles"),
+            "phone": u.get("phone"),
+            "created_at": _ts(u),
+            "last_login_at": _ts(u, "last_login_at"),
+        },
+        limit=1,
+    ),
+    ExportSource(
+        "bookings", "bookings",
+        lambda email, org: {"organization_id": org, "$or": [
+            {"guest_email": email},
+            {"created_by": email},
+        ]},
+        lambda b: {
             "id": str(b.get("_id", "")),
             "status": b.get("status"),
             "hotel_name": b.get("hotel_name"),
             "stay": b.get("stay"),
             "guest_name": b.get("guest_name"),
             "amounts": b.get("amounts"),
-            "created_at": str(b.get("created_at", "")),
-        }
-        for b in bookings
-    ]
-
-    # Reservations
-    reservations = await db.reservations.find(
-        {"organization_id": organization_id, "$or": [
-            {"customer_email": user_email},
-            {"guest_email": user_email},
-            {"created_by": user_email},
-        ]}
-    ).to_list(5000)
-    reservations_data = [
-        {
+            "created_at": _ts(b),
+        },
+        limit=5000,
+    ),
+    ExportSource(
+        "reservations", "reservations",
+        lambda email, org: {"organization_id": org, "$or": [
+            {"customer_email": email},
+            {"guest_email": email},
+            {"created_by": email},
+        ]},
+        lambda r: {
             "id": str(r.get("_id", "")),
             "pnr": r.get("pnr"),
             "status": r.get("status"),
@@ -170,145 +187,157 @@ async def export_user_data(user_email: str, organization_id: str) -> dict[str, A
             "currency": r.get("currency"),
             "start_date": r.get("start_date"),
             "end_date": r.get("end_date"),
-            "created_at": str(r.get("created_at", "")),
-        }
-        for r in reservations
-    ]
-
-    # Tour reservations
-    tour_reservations = await db.tour_reservations.find(
-        {"organization_id": organization_id, "guest.email": user_email}
-    ).to_list(5000)
-    tour_data = [
-        {
+            "created_at": _ts(r),
+        },
+        limit=5000,
+    ),
+    ExportSource(
+        "tour_reservations", "tour_reservations",
+        lambda email, org: {"organization_id": org, "guest.email": email},
+        lambda t: {
             "id": str(t.get("_id", "")),
             "reservation_code": t.get("reservation_code"),
             "tour_name": t.get("tour_name"),
             "status": t.get("status"),
             "pricing": t.get("pricing"),
             "guest": t.get("guest"),
-            "created_at": str(t.get("created_at", "")),
-        }
-        for t in tour_reservations
-    ]
-
-    # Customers (CRM)
-    customers = await db.customers.find(
-        {"organization_id": organization_id, "$or": [
-            {"email": user_email},
-        ]}
-    ).to_list(100)
-    customers_data = [
-        {
+            "created_at": _ts(t),
+        },
+        limit=5000,
+    ),
+    ExportSource(
+        "customers", "customers",
+        lambda email, org: {"organization_id": org, "$or": [
+            {"email": email},
+        ]},
+        lambda c: {
             "id": str(c.get("_id", "")),
             "name": c.get("name"),
             "email": c.get("email"),
             "phone": c.get("phone"),
             "tags": c.get("tags"),
-            "created_at": str(c.get("created_at", "")),
-        }
-        for c in customers
-    ]
-
-    # CRM customers
-    crm_customers = await db.crm_customers.find(
-        {"organization_id": organization_id, "email": user_email}
-    ).to_list(100)
-    crm_data = [
-        {
+            "created_at": _ts(c),
+        },
+        limit=100,
+    ),
+    ExportSource(
+        "crm_customers", "crm_customers",
+        lambda email, org: {"organization_id": org, "email": email},
+        lambda c: {
             "id": str(c.get("_id", "")),
             "name": c.get("name"),
             "email": c.get("email"),
             "phone": c.get("phone"),
-            "created_at": str(c.get("created_at", "")),
-        }
-        for c in crm_customers
-    ]
-
-    # Payments
-    payments = await db.payments.find(
-        {"organization_id": organization_id, "$or": [
-            {"payer_email": user_email},
-            {"created_by": user_email},
-        ]}
-    ).to_list(5000)
-    payments_data = [
-        {
+            "created_at": _ts(c),
+        },
+        limit=100,
+    ),
+    ExportSource(
+        "payments", "payments",
+        lambda email, org: {"organization_id": org, "$or": [
+            {"payer_email": email},
+            {"created_by": email},
+        ]},
+        lambda p: {
             "id": str(p.get("_id", "")),
             "amount": p.get("amount"),
             "currency": p.get("currency"),
             "method": p.get("method"),
             "status": p.get("status"),
-            "created_at": str(p.get("created_at", "")),
-        }
-        for p in payments
-    ]
-
-    # Consent records
-    consents = await get_user_consents(user_email, organization_id)
-
-    # Audit logs
-    audit_logs = await db.audit_events.find(
-        {"organization_id": organization_id, "actor.email": user_email}
-    ).sort("created_at", -1).to_list(1000)
-    audit_data = [
-        {
+            "created_at": _ts(p),
+        },
+        limit=5000,
+    ),
+    ExportSource(
+        "consents", "gdpr_consents",
+        lambda email, org: {"user_email": email, "organization_id": org},
+        lambda d: {k: v for k, v in d.items() if k != "_id"} | {"id": str(d["_id"])},
+        limit=200,
+        sort=("recorded_at", -1),
+    ),
+    ExportSource(
+        "audit_logs", "audit_events",
+        lambda email, org: {"organization_id": org, "actor.email": email},
+        lambda a: {
             "action": a.get("action"),
             "target_type": a.get("target_type"),
-            "created_at": str(a.get("created_at", "")),
-        }
-        for a in audit_logs
-    ]
-
-    # Sessions
-    sessions = await db.refresh_tokens.find(
-        {"user_email": user_email}
-    ).to_list(100)
-    sessions_data = [
-        {
+            "created_at": _ts(a),
+        },
+        limit=1000,
+        sort=("created_at", -1),
+    ),
+    ExportSource(
+        "sessions", "refresh_tokens",
+        lambda email, org: {"user_email": email},
+        lambda s: {
             "user_agent": s.get("user_agent", "")[:100],
             "ip_address": s.get("ip_address"),
-            "created_at": str(s.get("created_at", "")),
-        }
-        for s in sessions
-    ]
+            "created_at": _ts(s),
+        },
+        limit=100,
+    ),
+)
+
+EXPORTED_COLLECTIONS = [
+    "users", "bookings", "reservations", "tour_reservations",
+    "customers", "crm_customers", "payments", "consents",
+    "audit_events", "sessions",
+]
+DATA_CONTROLLER = "Organization"
+EXPORT_LEGAL_BASIS = "KVKK Madde 11 - Veri taşınabilirliği hakkı"
+
 
-    # Log the export request
+def export_cursor(db, source: ExportSource, user_email: str, organization_id: str, **kwargs):
+    cursor = db[source.collection].find(source.query(user_email, organization_id), **kwargs)
+    if source.sort:
+        cursor = cursor.sort(*source.sort)
+    return cursor
+
+
+async def _read_source(db, source: ExportSource, user_email: str, organization_id: str) -> list[dict[str, Any]]:
+    docs = await export_cursor(db, source, user_email, organization_id).to_list(source.limit)
+    return [source.project(d) for d in docs]
+
+
+async def record_export_request(db, user_email: str, organization_id: str, details: str, **extra: Any) -> None:
+    """Log a completed export in gdpr_requests and the processing registry."""
     await db.gdpr_requests.insert_one({
         "_id": str(uuid.uuid4()),
         "user_email": user_email,
         "organization_id": organization_id,
         "request_type": "export",
         "status": "completed",
-        "collections_exported": [
-            "users", "bookings", "reservations", "tour_reservations",
-            "customers", "crm_customers", "payments", "consents",
-            "audit_events", "sessions",
-        ],
+        "collections_exported": EXPORTED_COLLECTIONS,
         "created_at": now_utc(),
+        **extra,
     })
+    await _log_data_processing(db, organization_id, user_email, action="data_export", details=details)
 
-    await _log_data_processing(
-        await get_db(), organization_id, user_email,
-        action="data_export",
-        details="Full KVKK data export completed",
-    )
+
+async def export_user_data(user_email: str, organization_id: str) -> dict[str, Any]:
+    """Export all user data for GDPR/KVKK portability (comprehensive).
+
+    Inline JSON, capped per collection; large subjects should use the
+    archive export (``gdpr_export.request_export``).
+    """
+    db = await get_db()
+
+    # Collect data from ALL relevant collections concurrently
+    results = await asyncio.gather(*[
+        _read_source(db, source, user_email, organization_id) for source in EXPORT_SOURCES
+    ])
+    data = {source.name: rows for source, rows in zip(EXPORT_SOURCES, results)}
+    user_rows = data.pop("user")
+
+    await record_export_request(db, user_email, organization_id, "Full KVKK data export completed")
 
     return {
         "export_format": "KVKK_COMPLIANT_JSON_v2",
-        "user": user_data,
-        "bookings": bookings_data,
-        "reservations": reservations_data,
-        "tour_reservations": tour_data,
-        "customers": customers_data,
-        "crm_customers": crm_data,
-        "payments": payments_data,
-        "consents": consents,
-        "audit_logs": audit_data,
-        "sessions": sessions_data,
+        "user": user_rows[0] if user_rows else None,
+        **data,
         "exported_at": str(now_utc()),
-        "data_controller": "Organization",
-        "legal_basis": "KVKK Madde 11 - Veri taşınabilirliği hakkı",
+        "data_controller": DATA_CONTROLLER,
+        "legal_basis": EXPORT_LEGAL_BASIS,
     }
 
 
@@ -402,6 +431,10 @@ async def anonymize_user_data(
             "name": anon_name,
             "phone": anon_phone,
             "anonymized_at": now,
+            # Search tokens are derived from PII; rebuild from the anonymized values.
+            SEARCH_TOKENS_FIELD: build_search_tokens(
+                {"name": anon_name, "email": anon_email, "phone": anon_phone}, "customers"
+            ),
         }},
     )
     if cust_result.modified_count:
@@ -571,5 +604,10 @@ async def ensure_gdpr_indexes() -> None:
         await db.gdpr_requests.create_index("created_at")
         await db.kvkk_processing_log.create_index([("organization_id", 1), ("timestamp", -1)])
         await db.kvkk_processing_log.create_index("data_subject")
+        await db.gdpr_export_runs.create_index("download.token", unique=True, sparse=True)
+        await db.gdpr_export_runs.create_index([("organization_id", 1), ("created_at", -1)])
+        await db.gdpr_export_chunks.create_index([("export_id", 1), ("n", 1)], unique=True)
+        await db.gdpr_export_chunks.create_index("expires_at", expireAfterSeconds=0)
     except Exception as e:
+        report_index_failure("gdpr", e)
         logger.warning("GDPR/KVKK index creation warning: %s", e)
@@ -8,6 +8,9 @@ import asyncio
 import hashlib
 import json
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.services.sheets_provider import get_service_account_json
@@ -72,12 +75,22 @@ def get_service_account_email(tenant_id: Optional[str] = None) -> Optional[str]:
         return None
 
 
+def credential_key(tenant_id: Optional[str] = None) -> Optional[str]:
+    """Stable hash of the service-account credential used for a tenant."""
+    raw = get_service_account_json(tenant_id)
+    if not raw:
+        return None
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
 def _get_sheets_service(tenant_id: Optional[str] = None):
     raw = get_service_account_json(tenant_id)
     if not raw:
         raise RuntimeError("GOOGLE_SERVICE_ACCOUNT_JSON not configured")
 
-    cache_key = f"readonly:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+    # googleapiclient services wrap a non thread-safe httplib2 transport, so
+    # the cache is per credential *and* per thread (see _HTTP_EXECUTOR).
+    cache_key = f"readonly:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}:{threading.get_ident()}"
     if cache_key in _client_cache:
         return _client_cache[cache_key]
 
@@ -94,6 +107,63 @@ def _get_sheets_service(tenant_id: Optional[str] = None):
     return service
 
 
+# Dedicated pool for blocking googleapiclient `.execute()` calls so sheet
+# syncs never block the event loop. Bounded so the per-thread service cache
+# stays small.
+_HTTP_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("GOOGLE_SHEETS_HTTP_THREADS", "8")),
+    thread_name_prefix="gsheets-http",
+)
+
+
+def _sheet_api_error(e: Exception, sheet_id: str, tenant_id: Optional[str]) -> RuntimeError:
+    err_str = str(e)
+    if "404" in err_str or "not found" in err_str.lower():
+        return RuntimeError(f"Sheet bulunamadi: {sheet_id}")
+    if "403" in err_str or "permission" in err_str.lower():
+        email = get_service_account_email(tenant_id) or "(bilinmiyor)"
+        return RuntimeError(
+            f"Sheet erisimi yok. Lutfen sheet'i su email'e paylasin: {email}"
+        )
+    return RuntimeError(f"Google Sheets API hatasi: {err_str}")
+
+
+def parse_sheet_values(
+    values: List[List[Any]],
+    header_row: int = 1,
+) -> Tuple[List[str], List[List[str]]]:
+    """Split raw `values` into (headers, non-empty padded data rows)."""
+    if len(values) < 2:
+        raise RuntimeError("Sheet'te en az 1 baslik ve 1 veri satiri olmali.")
+
+    headers = [str(h).strip() for h in values[header_row - 1]]
+    data_rows = []
+    for row in values[header_row:]:
+        padded = [str(cell).strip() if i < len(row) else "" for i, cell in enumerate(row)]
+        while len(padded) < len(headers):
+            padded.append("")
+        if any(c for c in padded):
+            data_rows.append(padded)
+
+    return headers, data_rows
+
+
+def _values_get(sheet_id: str, range_str: str, tenant_id: Optional[str]) -> Dict[str, Any]:
+    service = _get_sheets_service(tenant_id)
+    return service.spreadsheets().values().get(
+        spreadsheetId=sheet_id,
+        range=range_str,
+    ).execute()
+
+
+def _values_batch_get(sheet_id: str, ranges: List[str], tenant_id: Optional[str]) -> Dict[str, Any]:
+    service = _get_sheets_service(tenant_id)
+    return service.spreadsheets().values().batchGet(
+        spreadsheetId=sheet_id,
+        ranges=ranges,
+    ).execute()
+
+
 def fetch_sheet_data(
     sheet_id: str,
     worksheet_name: str = "Sheet1",
@@ -104,48 +174,93 @@ def fetch_sheet_data(
     if not is_configured(tenant_id):
         raise RuntimeError("Google Sheets entegrasyonu yapilandirilmamis.")
 
-    service = _get_sheets_service(tenant_id)
     range_str = f"{worksheet_name}"
     try:
-        result = service.spreadsheets().values().get(
-            spreadsheetId=sheet_id,
-            range=range_str,
-        ).execute()
+        result = _values_get(sheet_id, range_str, tenant_id)
         _schedule_integration_call_metering(
             metering_context=metering_context,
             operation="fetch_sheet_data",
             metadata={"sheet_id": sheet_id, "worksheet": worksheet_name, "range": range_str, "status": "success"},
         )
     except Exception as e:
-        err_str = str(e)
         _schedule_integration_call_metering(
             metering_context=metering_context,
             operation="fetch_sheet_data",
-            metadata={"sheet_id": sheet_id, "worksheet": worksheet_name, "range": range_str, "status": "error", "error": err_str[:200]},
+            metadata={"sheet_id": sheet_id, "worksheet": worksheet_name, "range": range_str, "status": "error", "error": str(e)[:200]},
         )
-        if "404" in err_str or "not found" in err_str.lower():
-            raise RuntimeError(f"Sheet bulunamadi: {sheet_id}")
-        if "403" in err_str or "permission" in err_str.lower():
-            email = get_service_account_email(tenant_id) or "(bilinmiyor)"
-            raise RuntimeError(
-                f"Sheet erisimi yok. Lutfen sheet'i su email'e paylasin: {email}"
-            )
-        raise RuntimeError(f"Google Sheets API hatasi: {err_str}")
+        raise _sheet_api_error(e, sheet_id, tenant_id)
 
-    values = result.get("values", [])
-    if len(values) < 2:
-        raise RuntimeError("Sheet'te en az 1 baslik ve 1 veri satiri olmali.")
+    return parse_sheet_values(result.get("values", []), header_row)
 
-    headers = [str(h).strip() for h in values[header_row - 1]]
-    data_rows = []
-    for row in values[header_row:]:
-        padded = [str(cell).strip() if i < len(row) else "" for i, cell in enumerate(row)]
-        while len(padded) < len(headers):
-            padded.append("")
-        if any(c for c in padded):
-            data_rows.append(padded)
 
-    return headers, data_rows
+async def fetch_sheet_data_async(
+    sheet_id: str,
+    worksheet_name: str = "Sheet1",
+    header_row: int = 1,
+    tenant_id: Optional[str] = None,
+    metering_context: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[str], List[List[str]]]:
+    """Same as :func:`fetch_sheet_data` with the HTTP call run off the event loop."""
+    if not is_configured(tenant_id):
+        raise RuntimeError("Google Sheets entegrasyonu yapilandirilmamis.")
+
+    range_str = f"{worksheet_name}"
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(_HTTP_EXECUTOR, _values_get, sheet_id, range_str, tenant_id)
+        _schedule_integration_call_metering(
+            metering_context=metering_context,
+            operation="fetch_sheet_data",
+            metadata={"sheet_id": sheet_id, "worksheet": worksheet_name, "range": range_str, "status": "success"},
+        )
+    except Exception as e:
+        _schedule_integration_call_metering(
+            metering_context=metering_context,
+            operation="fetch_sheet_data",
+            metadata={"sheet_id": sheet_id, "worksheet": worksheet_name, "range": range_str, "status": "error", "error": str(e)[:200]},
+        )
+        raise _sheet_api_error(e, sheet_id, tenant_id)
+
+    return parse_sheet_values(result.get("values", []), header_row)
+
+
+async def fetch_sheet_values_batch(
+    sheet_id: str,
+    worksheet_names: List[str],
+    tenant_id: Optional[str] = None,
+    metering_context: Optional[Dict[str, Any]] = None,
+) -> Dict[str, List[List[Any]]]:
+    """Read several worksheets of one spreadsheet with a single `batchGet`.
+
+    Returns raw values per worksheet name; parse with :func:`parse_sheet_values`.
+    """
+    if not is_configured(tenant_id):
+        raise RuntimeError("Google Sheets entegrasyonu yapilandirilmamis.")
+
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(
+            _HTTP_EXECUTOR, _values_batch_get, sheet_id, list(worksheet_names), tenant_id,
+        )
+        _schedule_integration_call_metering(
+            metering_context=metering_context,
+            operation="fetch_sheet_batch",
+            metadata={"sheet_id": sheet_id, "worksheets": list(worksheet_names), "status": "success"},
+        )
+    except Exception as e:
+        _schedule_integration_call_metering(
+            metering_context=metering_context,
+            operation="fetch_sheet_batch",
+            metadata={"sheet_id": sheet_id, "worksheets": list(worksheet_names), "status": "error", "error": str(e)[:200]},
+        )
+        raise _sheet_api_error(e, sheet_id, tenant_id)
+
+    # valueRanges come back in request order
+    value_ranges = result.get("valueRanges", [])
+    return {
+        name: (value_ranges[i].get("values", []) if i < len(value_ranges) else [])
+        for i, name in enumerate(worksheet_names)
+    }
 
 
 def fetch_sheet_headers(
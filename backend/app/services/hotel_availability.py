@@ -4,14 +4,15 @@ from datetime import datetime, date, timedelta
 from typing import Any
 
 from app.db import get_db
+from app.services import room_night_occupancy
+from app.services.room_night_occupancy import (  # noqa: F401 — re-exported
+    ACTIVE_BLOCK_STATUSES,
+    ACTIVE_BOOKING_STATUSES,
+    BLOCK_TYPES,
+)
 from app.utils import now_utc
 
 
-ACTIVE_BOOKING_STATUSES = ["confirmed", "guaranteed", "checked_in"]
-ACTIVE_BLOCK_STATUSES = ["active"]
-BLOCK_TYPES = ["out_of_order", "out_of_service", "maintenance"]
-
-
 def parse_date(date_str: str) -> date:
     """Parse YYYY-MM-DD to date object"""
     return datetime.fromisoformat(date_str).date()
@@ -101,77 +102,21 @@ async def compute_availability(
             rooms_by_type[room_type] = []
         rooms_by_type[room_type].append(room)
 
-    # 2) Fetch overlapping bookings
-    # Overlap: booking.check_in < search_check_out AND booking.check_out > search_check_in
-    bookings = await db.bookings.find({
-        "hotel_id": hotel_id,
-        "organization_id": organization_id,
-        "status": {"$in": ACTIVE_BOOKING_STATUSES},
-    }).to_list(5000)
-
-    # Filter overlapping bookings
-    overlapping_bookings = []
-    for booking in bookings:
-        stay = booking.get("stay") or {}
-        booking_check_in_str = stay.get("check_in") or booking.get("check_in") or booking.get("start_date")
-        booking_check_out_str = stay.get("check_out") or booking.get("check_out") or booking.get("end_date")
-
-        if not booking_check_in_str or not booking_check_out_str:
-            continue
-
-        booking_check_in = parse_date(booking_check_in_str)
-        booking_check_out = parse_date(booking_check_out_str)
-
-        # Overlap check
-        if booking_check_in < search_check_out and booking_check_out > search_check_in:
-            overlapping_bookings.append(booking)
-
-    # 3) Fetch overlapping blocks
-    blocks = await db.room_blocks.find({
-        "tenant_id": hotel_id,
-        "organization_id": organization_id,
-        "status": {"$in": ACTIVE_BLOCK_STATUSES},
-        "type": {"$in": BLOCK_TYPES},
-    }).to_list(1000)
-
-    overlapping_blocks = []
-    for block in blocks:
-        block_start = parse_date(block.get("start_date", ""))
-        block_end = block.get("end_date")
-
-        if block_end:
-            block_end_date = parse_date(block_end)
-            # Overlap check
-            if block_start < search_check_out and block_end_date > search_check_in:
-                overlapping_blocks.append(block)
-        else:
-            # Open-ended block
-            if block_start < search_check_out:
-                overlapping_blocks.append(block)
-
-    # 4) Map bookings + blocks to room_type
-    occupied_by_type: dict[str, set] = {}
-    blocked_by_type: dict[str, set] = {}
-
-    for booking in overlapping_bookings:
-        room_id = str(booking.get("room_id", ""))
-        if room_id and room_id in room_by_id:
-            room = room_by_id[room_id]
-            room_type = room.get("room_type", "standard")
-
-            if room_type not in occupied_by_type:
-                occupied_by_type[room_type] = set()
-            occupied_by_type[room_type].add(room_id)
-
-    for block in overlapping_blocks:
-        room_id = str(block.get("room_id", ""))
-        if room_id and room_id in room_by_id:
-            room = room_by_id[room_id]
-            room_type = room.get("room_type", "standard")
-
-            if room_type not in blocked_by_type:
-                blocked_by_type[room_type] = set()
-            blocked_by_type[room_type].add(room_id)
+    # 2-4) Occupied / blocked rooms per room_type. Hotels with a built
+    # occupancy ledger covering the stay read the stay's nights from it;
+    # the rest intersect bookings and blocks in Python.
+    ledger: dict[str, dict[str, Any]] | None = None
+    horizon = await room_night_occupancy.ledger_horizon(db, organization_id, hotel_id)
+    if horizon and check_out <= horizon:
+        ledger = await room_night_occupancy.read_stay(
+            db, organization_id, hotel_id, check_in, check_out, room_ids=set(room_by_id),
+        )
+        occupied_by_type = {rt: agg["occupied"] for rt, agg in ledger.items()}
+        blocked_by_type = {rt: agg["blocked"] for rt, agg in ledger.items()}
+    else:
+        occupied_by_type, blocked_by_type = await _occupancy_from_sources(
+            db, hotel_id, organization_id, search_check_in, search_check_out, room_by_id,
+        )
 
     # 5) Calculate availability per room_type
     availability: dict[str, Any] = {}
@@ -203,6 +148,10 @@ async def compute_availability(
 
         base_available = max(0, total_count - len(unavailable))
 
+        if ledger is not None:
+            # Busiest night of the stay (min-reduce over free rooms).
+            base_available = max(0, total_count - ledger.get(room_type, {}).get("max_unavailable", 0))
+
         # Calculate average base_price
         prices = [r.get("base_price", 0) for r in room_list if r.get("base_price")]
         avg_price = round(sum(prices) / len(prices), 2) if prices else 0.0
@@ -246,15 +195,18 @@ async def compute_availability(
             final_available = 0
         elif allocation_limit is not None:
             # Count sold on this channel (for this room_type in date range)
-            sold_on_channel = await db.bookings.count_documents({
-                "hotel_id": hotel_id,
-                "organization_id": organization_id,
-                "channel": channel,
-                "status": {"$in": ACTIVE_BOOKING_STATUSES},
-                "rate_snapshot.room_type_id": f"rt_{room_type}",
-                "stay.check_in": {"$lt": check_out},
-                "stay.check_out": {"$gt": check_in},
-            })
+            if ledger is not None:
+                sold_on_channel = ledger.get(room_type, {}).get("max_channel_sold", {}).get(channel, 0)
+            else:
+                sold_on_channel = await db.bookings.count_documents({
+                    "hotel_id": hotel_id,
+                    "organization_id": organization_id,
+                    "channel": channel,
+                    "status": {"$in": ACTIVE_BOOKING_STATUSES},
+                    "rate_snapshot.room_type_id": f"rt_{room_type}",
+                    "stay.check_in": {"$lt": check_out},
+                    "stay.check_out": {"$gt": check_in},
+                })
             final_available = max(0, min(base_available, allocation_limit - sold_on_channel))
         else:
             final_available = base_available
@@ -271,3 +223,87 @@ async def compute_availability(
         }
 
     return availability
+
+
+async def _occupancy_from_sources(
+    db,
+    hotel_id: str,
+    organization_id: str,
+    search_check_in: date,
+    search_check_out: date,
+    room_by_id: dict[str, dict],
+) -> tuple[dict[str, set], dict[str, set]]:
+    """Occupied / blocked room ids per room_type from bookings + room_blocks."""
+    # 2) Fetch overlapping bookings
+    # Overlap: booking.check_in < search_check_out AND booking.check_out > search_check_in
+    bookings = await db.bookings.find({
+        "hotel_id": hotel_id,
+        "organization_id": organization_id,
+        "status": {"$in": ACTIVE_BOOKING_STATUSES},
+    }).to_list(5000)
+
+    # Filter overlapping bookings
+    overlapping_bookings = []
+    for booking in bookings:
+        stay = booking.get("stay") or {}
+        booking_check_in_str = stay.get("check_in") or booking.get("check_in") or booking.get("start_date")
+        booking_check_out_str = stay.get("check_out") or booking.get("check_out") or booking.get("end_date")
+
+        if not booking_check_in_str or not booking_check_out_str:
+            continue
+
+        booking_check_in = parse_date(booking_check_in_str)
+        booking_check_out = parse_date(booking_check_out_str)
+
+        # Overlap check
+        if booking_check_in < search_check_out and booking_check_out > search_check_in:
+            overlapping_bookings.append(booking)
+
+    # 3) Fetch overlapping blocks
+    blocks = await db.room_blocks.find({
+        "tenant_id": hotel_id,
+        "organization_id": organization_id,
+        "status": {"$in": ACTIVE_BLOCK_STATUSES},
+        "type": {"$in": BLOCK_TYPES},
+    }).to_list(1000)
+
+    overlapping_blocks = []
+    for block in blocks:
+        block_start = parse_date(block.get("start_date", ""))
+        block_end = block.get("end_date")
+
+        if block_end:
+            block_end_date = parse_date(block_end)
+            # Overlap check
+            if block_start < search_check_out and block_end_date > search_check_in:
+                overlapping_blocks.append(block)
+        else:
+            # Open-ended block
+            if block_start < search_check_out:
+                overlapping_blocks.append(block)
+
+    # 4) Map bookings + blocks to room_type
+    occupied_by_type: dict[str, set] = {}
+    blocked_by_type: dict[str, set] = {}
+
+    for booking in overlapping_bookings:
+        room_id = str(booking.get("room_id", ""))
+        if room_id and room_id in room_by_id:
+            room = room_by_id[room_id]
+            room_type = room.get("room_type", "standard")
+
+            if room_type not in occupied_by_type:
+                occupied_by_type[room_type] = set()
+            occupied_by_type[room_type].add(room_id)
+
+    for block in overlapping_blocks:
+        room_id = str(block.get("room_id", ""))
+        if room_id and room_id in room_by_id:
+            room = room_by_id[room_id]
+            room_type = room.get("room_type", "standard")
+
+            if room_type not in blocked_by_type:
+                blocked_by_type[room_type] = set()
+            blocked_by_type[room_type].add(room_id)
+
+    return occupied_by_type, blocked_by_type
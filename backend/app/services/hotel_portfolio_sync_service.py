@@ -24,6 +24,7 @@ from app.services.sheets_provider import (
 )
 from app.services.sheet_reservation_import_service import import_sheet_reservations
 from app.services.cache_invalidation import invalidate_hotels
+from app.services.search_index import SEARCH_FIELDS, SEARCH_TOKENS_FIELD, build_search_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -291,6 +292,12 @@ async def upsert_inventory_rows(
                             pass
                     else:
                         hotel_set[k] = v
+                if any(f in hotel_set for f in SEARCH_FIELDS["hotels"]):
+                    # Renames must refresh the search tokens, not just the name.
+                    current = await db.hotels.find_one(
+                        {"_id": hotel_id}, {f: 1 for f in SEARCH_FIELDS["hotels"]},
+                    ) or {}
+                    hotel_set[SEARCH_TOKENS_FIELD] = build_search_tokens({**current, **hotel_set}, "hotels")
                 await db.hotels.update_one(
                     {"_id": hotel_id},
                     {"$set": hotel_set},
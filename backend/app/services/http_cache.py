@@ -0,0 +1,131 @@
+"""HTTP conditional GET + CDN surrogate keys for public catalog responses.
+
+    return conditional_response(
+        request, payload,
+        cache_control="public, max-age=60, stale-while-revalidate=300",
+        surrogate_keys=surrogate_keys("pub_search", org),
+    )
+
+- ETag: weak hash of the exact response body (cached payloads hash the same
+  on every pod, so a CDN or browser revalidates cheaply)
+- If-None-Match → 304 with no body
+- Surrogate-Key: space-separated purge tags, "{surface}/{scope}" plus
+  "org/{scope}"; purged by cache_invalidation when a catalog changes
+
+CDN purge (Fastly-compatible API) is enabled by env:
+  CDN_PURGE_SERVICE_ID, CDN_PURGE_API_TOKEN
+  CDN_PURGE_URL (default: https://api.fastly.com/service/{service_id}/purge)
+Without them purge_surrogate_keys is a no-op.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from typing import Any, Iterable, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+logger = logging.getLogger("http_cache")
+
+DEFAULT_PURGE_URL = "https://api.fastly.com/service/{service_id}/purge"
+PURGE_TIMEOUT_SECONDS = 5.0
+MAX_KEYS_PER_PURGE = 256  # Fastly batch purge limit
+
+
+def surrogate_keys(surface: str, scope: str = "") -> list[str]:
+    """Purge tags for a response: the surface and, when scoped, the org/tenant."""
+    if not scope:
+        return [surface]
+    return [f"{surface}/{scope}", f"org/{scope}"]
+
+
+def make_etag(body: bytes) -> str:
+    return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison per RFC 9110 §13.1.2, incl. lists and ``*``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def conditional_response(
+    request: Request,
+    content: Any,
+    *,
+    cache_control: str,
+    surrogate_keys: Iterable[str] = (),
+    media_type: Optional[str] = None,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """Return 200 with ETag (or 304 when the client copy is current).
+
+    ``content`` is a JSON-serializable payload, or ``str``/``bytes`` with
+    ``media_type`` for other representations (e.g. sitemap XML).
+    """
+    if media_type is None:
+        response: Response = JSONResponse(status_code=200, content=jsonable_encoder(content))
+    else:
+        response = Response(content=content, media_type=media_type)
+
+    etag = make_etag(response.body)
+    shared = {"ETag": etag, "Cache-Control": cache_control}
+    keys = " ".join(dict.fromkeys(surrogate_keys))
+    if keys:
+        shared["Surrogate-Key"] = keys
+    if headers:
+        shared.update(headers)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        from app.services import cache_metrics as cm
+        cm.inc("http_not_modified")
+        return Response(status_code=304, headers=shared)
+
+    response.headers.update(shared)
+    return response
+
+
+async def purge_surrogate_keys(keys: Iterable[str]) -> int:
+    """Ask the CDN to purge every response tagged with ``keys``.
+
+    Best-effort: returns the number of keys sent, 0 when unconfigured or on
+    error (cached copies then age out via Cache-Control).
+    """
+    keys = list(dict.fromkeys(k for k in keys if k))
+    service_id = os.environ.get("CDN_PURGE_SERVICE_ID", "")
+    token = os.environ.get("CDN_PURGE_API_TOKEN", "")
+    if not keys or not service_id or not token:
+        return 0
+
+    url = os.environ.get("CDN_PURGE_URL", DEFAULT_PURGE_URL).format(service_id=service_id)
+    from app.services import cache_metrics as cm
+    try:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=PURGE_TIMEOUT_SECONDS) as client:
+            for i in range(0, len(keys), MAX_KEYS_PER_PURGE):
+                batch = keys[i:i + MAX_KEYS_PER_PURGE]
+                resp = await client.post(
+                    url,
+                    headers={"Fastly-Key": token, "Surrogate-Key": " ".join(batch), "Accept": "application/json"},
+                )
+                resp.raise_for_status()
+        cm.inc("cdn_purge_keys", len(keys))
+        return len(keys)
+    except Exception as e:
+        cm.inc("cdn_purge_failures")
+        logger.warning("CDN purge failed for %s: %s", keys[:5], e)
+        return 0
@@ -2,20 +2,33 @@
 
 Handles Excel/CSV parsing, validation, column mapping,
 bulk hotel creation, and image downloading.
+
+Large files go through a streaming pipeline: ``read_table`` yields rows from
+a read-only workbook (or a lazy CSV reader) without materialising the sheet,
+``validate_hotel_file`` / ``import_hotel_file`` validate and write in chunks
+of ``IMPORT_CHUNK`` rows with one ``bulk_write`` each, and
+``download_hotel_images`` fetches images through a bounded worker pool with
+content-hash dedupe and thumbnails. Progress is kept on ``import_jobs.progress``.
 """
 from __future__ import annotations
 
 import asyncio
 import csv
+import hashlib
 import io
 import logging
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import aiofiles
 import httpx
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -26,57 +39,75 @@ def _now() -> datetime:
 
 # ── Excel / CSV Parsing ────────────────────────────────────────
 
+IMPORT_CHUNK = 1000
+
+
 def parse_excel(file_bytes: bytes, filename: str) -> Tuple[List[str], List[List[str]]]:
     """Parse XLSX or CSV file. Returns (headers, rows)."""
+    headers, rows = read_table(file_bytes, filename)
+    data_rows = list(rows)
+    if not data_rows:
+        raise ValueError("Dosyada en az 1 başlık ve 1 veri satırı olmalı.")
+    return headers, data_rows
+
+
+def read_table(file_bytes: bytes, filename: str) -> Tuple[List[str], Iterator[List[str]]]:
+    """Return (headers, lazy row iterator); completely empty rows are skipped."""
+    rows = iter_rows(file_bytes, filename)
+    headers = next(rows, None)
+    if headers is None:
+        raise ValueError("Dosyada en az 1 başlık ve 1 veri satırı olmalı.")
+    return headers, (r for r in rows if any(cell.strip() for cell in r))
+
+
+def preview_table(file_bytes: bytes, filename: str, limit: int = 20) -> Tuple[List[str], List[List[str]], int]:
+    """Return (headers, first ``limit`` rows, total row count) in one streaming pass."""
+    headers, rows = read_table(file_bytes, filename)
+    preview = list(islice(rows, limit))
+    total = len(preview) + sum(1 for _ in rows)
+    if not total:
+        raise ValueError("Dosyada en az 1 başlık ve 1 veri satırı olmalı.")
+    return headers, preview, total
+
+
+def iter_rows(file_bytes: bytes, filename: str) -> Iterator[List[str]]:
+    """Yield every row (header first) as a list of strings."""
     if filename.lower().endswith((".xlsx", ".xls")):
-        return _parse_xlsx(file_bytes)
+        return _iter_xlsx(file_bytes)
     elif filename.lower().endswith(".csv"):
-        return _parse_csv(file_bytes)
+        return _iter_csv(file_bytes)
     else:
         raise ValueError(f"Desteklenmeyen dosya formatı: {filename}")
 
 
-def _parse_xlsx(file_bytes: bytes) -> Tuple[List[str], List[List[str]]]:
+def _iter_xlsx(file_bytes: bytes) -> Iterator[List[str]]:
     from openpyxl import load_workbook
     wb = load_workbook(filename=io.BytesIO(file_bytes), read_only=True, data_only=True)
-    ws = wb.active
-    if ws is None:
-        raise ValueError("Excel dosyasında aktif sayfa bulunamadı.")
-
-    rows_raw = []
-    for row in ws.iter_rows(values_only=True):
-        rows_raw.append([str(cell) if cell is not None else "" for cell in row])
-
-    wb.close()
-
-    if len(rows_raw) < 2:
-        raise ValueError("Dosyada en az 1 başlık ve 1 veri satırı olmalı.")
-
-    headers = rows_raw[0]
-    data_rows = rows_raw[1:]
-    # Filter out completely empty rows
-    data_rows = [r for r in data_rows if any(cell.strip() for cell in r)]
-    return headers, data_rows
+    try:
+        ws = wb.active
+        if ws is None:
+            raise ValueError("Excel dosyasında aktif sayfa bulunamadı.")
+        for row in ws.iter_rows(values_only=True):
+            yield [str(cell) if cell is not None else "" for cell in row]
+    finally:
+        wb.close()
 
 
-def _parse_csv(file_bytes: bytes) -> Tuple[List[str], List[List[str]]]:
-    text = file_bytes.decode("utf-8-sig")
+def _iter_csv(file_bytes: bytes) -> Iterator[List[str]]:
+    head = file_bytes[:4096].decode("utf-8-sig", errors="ignore")
     delimiter = ","
     try:
-        dialect = csv.Sniffer().sniff(text[:2048], delimiters=",;\t")
+        dialect = csv.Sniffer().sniff(head[:2048], delimiters=",;\t")
         delimiter = dialect.delimiter
     except Exception:
-        delimiter = "\t" if "\t" in text.splitlines()[0] else ","
-    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
-    rows_raw = list(reader)
+        first_line = head.splitlines()[0] if head else ""
+        delimiter = "\t" if "\t" in first_line else ","
+    text = io.TextIOWrapper(io.BytesIO(file_bytes), encoding="utf-8-sig", newline="")
+    yield from csv.reader(text, delimiter=delimiter)
 
-    if len(rows_raw) < 2:
-        raise ValueError("Dosyada en az 1 başlık ve 1 veri satırı olmalı.")
 
-    headers = rows_raw[0]
-    data_rows = rows_raw[1:]
-    data_rows = [r for r in data_rows if any(cell.strip() for cell in r)]
-    return headers, data_rows
+def _take(rows: Iterator[List[str]], size: int) -> List[List[str]]:
+    return list(islice(rows, size))
 
 
 # ── Column Mapping ─────────────────────────────────────────────
@@ -107,18 +138,25 @@ def map_columns(headers: List[str], rows: List[List[str]], mapping: Dict[str, st
 def validate_hotels(
     rows: List[Dict[str, Any]],
     existing_names: set[str],
+    *,
+    first_row: int = 2,
+    seen_names: Optional[set[str]] = None,
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """Validate hotel rows.
 
     Returns (valid_rows, errors).
     errors = [{ row_number, field, message }]
+
+    Chunked callers pass the row number of the chunk's first row and share
+    ``seen_names`` across chunks so in-file duplicates are still caught.
     """
     valid = []
     errors = []
-    seen_names: set[str] = set()
+    if seen_names is None:
+        seen_names = set()
 
     for i, row in enumerate(rows):
-        row_num = i + 2  # +2 because row 1 is header, data starts at 2
+        row_num = i + first_row  # row 1 is header, data starts at 2
         row_errors = []
 
         name = (row.get("name") or "").strip()
@@ -176,15 +214,61 @@ async def get_existing_hotel_names(db, org_id: str) -> set[str]:
 
 # ── Bulk Insert ────────────────────────────────────────────────
 
+def build_hotel_doc(row: Dict[str, Any], org_id: str, created_by: str, job_id: str, now: datetime) -> Dict[str, Any]:
+    price_val = None
+    if row.get("price"):
+        try:
+            price_val = float(str(row["price"]).replace(",", "."))
+        except (ValueError, TypeError):
+            pass
+
+    stars_val = None
+    if row.get("stars"):
+        try:
+            stars_val = int(str(row["stars"]))
+        except (ValueError, TypeError):
+            pass
+
+    doc = {
+        "_id": str(uuid.uuid4()),
+        "organization_id": org_id,
+        "name": row.get("name", "").strip(),
+        "city": row.get("city", "").strip(),
+        "country": row.get("country", "TR").strip() or "TR",
+        "active": True,
+        "created_at": now,
+        "updated_at": now,
+        "created_by": created_by,
+        "updated_by": created_by,
+        "import_job_id": job_id,
+    }
+    if row.get("description"):
+        doc["description"] = row["description"].strip()
+    if price_val is not None:
+        doc["base_price"] = price_val
+    if row.get("address"):
+        doc["address"] = row["address"].strip()
+    if row.get("phone"):
+        doc["phone"] = row["phone"].strip()
+    if row.get("email"):
+        doc["email"] = row["email"].strip()
+    if stars_val is not None:
+        doc["stars"] = stars_val
+    if row.get("image_url"):
+        doc["image_url"] = row["image_url"].strip()
+    doc[SEARCH_TOKENS_FIELD] = build_search_tokens(doc, "hotels")
+    return doc
+
+
 async def create_hotels_bulk(
     db,
     org_id: str,
     rows: List[Dict[str, Any]],
     created_by: str,
     job_id: str,
-    batch_size: int = 100,
+    batch_size: int = IMPORT_CHUNK,
 ) -> Tuple[int, int, List[Dict[str, Any]]]:
-    """Bulk create hotels in batches.
+    """Bulk create hotels with one unordered ``bulk_write`` per batch.
 
     Returns (success_count, error_count, errors).
     """
@@ -199,59 +283,23 @@ async def create_hotels_bulk(
         for row in batch:
             row_num = row.pop("_row_number", 0)
             try:
-                price_val = None
-                if row.get("price"):
-                    try:
-                        price_val = float(str(row["price"]).replace(",", "."))
-                    except (ValueError, TypeError):
-                        pass
-
-                stars_val = None
-                if row.get("stars"):
-                    try:
-                        stars_val = int(str(row["stars"]))
-                    except (ValueError, TypeError):
-                        pass
-
-                doc = {
-                    "_id": str(uuid.uuid4()),
-                    "organization_id": org_id,
-                    "name": row.get("name", "").strip(),
-                    "city": row.get("city", "").strip(),
-                    "country": row.get("country", "TR").strip() or "TR",
-                    "active": True,
-                    "created_at": now,
-                    "updated_at": now,
-                    "created_by": created_by,
-                    "updated_by": created_by,
-                    "import_job_id": job_id,
-                }
-                if row.get("description"):
-                    doc["description"] = row["description"].strip()
-                if price_val is not None:
-                    doc["base_price"] = price_val
-                if row.get("address"):
-                    doc["address"] = row["address"].strip()
-                if row.get("phone"):
-                    doc["phone"] = row["phone"].strip()
-                if row.get("email"):
-                    doc["email"] = row["email"].strip()
-                if stars_val is not None:
-                    doc["stars"] = stars_val
-                if row.get("image_url"):
-                    doc["image_url"] = row["image_url"].strip()
-
-                docs.append(doc)
+                docs.append(build_hotel_doc(row, org_id, created_by, job_id, now))
             except Exception as e:
                 error_count += 1
                 errors.append({"row_number": row_num, "field": "general", "message": str(e)})
 
         if docs:
             try:
-                await db.hotels.insert_many(docs, ordered=False)
+                await db.hotels.bulk_write([InsertOne(doc) for doc in docs], ordered=False)
                 success += len(docs)
+            except BulkWriteError as e:
+                # Unordered: the rest of the batch is still written
+                inserted = e.details.get("nInserted", 0)
+                logger.error("Batch insert error: %s", e)
+                success += inserted
+                error_count += len(docs) - inserted
+                errors.append({"row_number": 0, "field": "batch", "message": str(e)})
             except Exception as e:
-                # Some may have succeeded in unordered insert
                 logger.error("Batch insert error: %s", e)
                 error_count += len(docs)
                 errors.append({"row_number": 0, "field": "batch", "message": str(e)})
@@ -259,14 +307,191 @@ async def create_hotels_bulk(
     return success, error_count, errors
 
 
+# ── Streaming Pipeline ─────────────────────────────────────────
+
+async def update_job_progress(db, job_id: str, **progress: Any) -> None:
+    update: Dict[str, Any] = {f"progress.{k}": v for k, v in progress.items()}
+    update["updated_at"] = _now()
+    await db.import_jobs.update_one({"_id": job_id}, {"$set": update})
+
+
+async def _validated_chunks(
+    db,
+    org_id: str,
+    file_bytes: bytes,
+    filename: str,
+    mapping: Dict[str, str],
+    chunk_size: int,
+):
+    """Yield (rows_read, valid_rows, errors) per chunk of the file."""
+    headers, rows = read_table(file_bytes, filename)
+    existing_names = await get_existing_hotel_names(db, org_id)
+    seen_names: set[str] = set()
+    rows_read = 0
+    while True:
+        # Parsing is CPU-bound; keep the event loop free between chunks.
+        raw = await asyncio.to_thread(_take, rows, chunk_size)
+        if not raw:
+            break
+        mapped = map_columns(headers, raw, mapping)
+        valid, errors = validate_hotels(
+            mapped, existing_names, first_row=rows_read + 2, seen_names=seen_names,
+        )
+        rows_read += len(raw)
+        yield rows_read, valid, errors
+
+
+async def validate_hotel_file(
+    db,
+    job_id: str,
+    org_id: str,
+    file_bytes: bytes,
+    filename: str,
+    mapping: Dict[str, str],
+    *,
+    chunk_size: int = IMPORT_CHUNK,
+) -> Dict[str, Any]:
+    """Validate the whole file chunk by chunk, persisting errors as it goes.
+
+    Returns counts plus the first 50 errors and 10 valid rows for the UI.
+    """
+    valid_count = error_count = rows_read = 0
+    first_errors: List[Dict[str, Any]] = []
+    preview_valid: List[Dict[str, Any]] = []
+    await update_job_progress(db, job_id, phase="validating", rows_read=0)
+
+    async for rows_read, valid, errors in _validated_chunks(db, org_id, file_bytes, filename, mapping, chunk_size):
+        await save_import_errors(db, job_id, errors)
+        valid_count += len(valid)
+        error_count += len(errors)
+        first_errors.extend(errors[:50 - len(first_errors)])
+        preview_valid.extend(valid[:10 - len(preview_valid)])
+        await update_job_progress(db, job_id, rows_read=rows_read, valid=valid_count, invalid=error_count)
+
+    return {
+        "total_rows": rows_read,
+        "valid_count": valid_count,
+        "error_count": error_count,
+        "errors": first_errors,
+        "preview_valid": preview_valid,
+    }
+
+
+async def import_hotel_file(
+    db,
+    job_id: str,
+    org_id: str,
+    file_bytes: bytes,
+    filename: str,
+    mapping: Dict[str, str],
+    created_by: str,
+    *,
+    chunk_size: int = IMPORT_CHUNK,
+) -> Tuple[int, int, List[Dict[str, Any]]]:
+    """Stream, validate and insert the file; one ``bulk_write`` per chunk.
+
+    Rows that fail validation are skipped (their errors were saved by
+    ``validate_hotel_file``). Returns (success_count, error_count, errors).
+    """
+    success = error_count = 0
+    errors: List[Dict[str, Any]] = []
+    await update_job_progress(db, job_id, phase="importing", rows_read=0, inserted=0)
+
+    async for rows_read, valid, _ in _validated_chunks(db, org_id, file_bytes, filename, mapping, chunk_size):
+        ok, failed, chunk_errors = await create_hotels_bulk(
+            db, org_id, valid, created_by, job_id, batch_size=chunk_size,
+        )
+        success += ok
+        error_count += failed
+        errors.extend(chunk_errors)
+        await update_job_progress(db, job_id, rows_read=rows_read, inserted=success, failed=error_count)
+
+    return success, error_count, errors
+
+
 # ── Image Downloader ───────────────────────────────────────────
 
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "hotel_images")
+IMAGE_CONCURRENCY = 8
+THUMBNAIL_SIZE = (320, 240)
+
+_CONTENT_TYPE_EXT = {"image/png": ".png", "image/webp": ".webp", "image/jpeg": ".jpg", "image/jpg": ".jpg"}
+
 
+def _image_ext(url: str, content_type: str) -> str:
+    ext = _CONTENT_TYPE_EXT.get(content_type.split(";")[0].strip().lower())
+    if ext:
+        return ext
+    if ".png" in url.lower():
+        return ".png"
+    if ".webp" in url.lower():
+        return ".webp"
+    return ".jpg"
 
-async def download_hotel_images(db, org_id: str, job_id: str, max_retries: int = 2) -> int:
+
+def _write_thumbnail(content: bytes, path: str) -> bool:
+    """Write a JPEG thumbnail; False when the bytes are not a readable image."""
+    try:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(content)) as img:
+            img.thumbnail(THUMBNAIL_SIZE)
+            img.convert("RGB").save(path, "JPEG", quality=80, optimize=True)
+        return True
+    except Exception as e:
+        logger.warning("Thumbnail generation failed for %s: %s", path, e)
+        return False
+
+
+async def _fetch_image(client: httpx.AsyncClient, url: str, max_retries: int) -> Optional[httpx.Response]:
+    for attempt in range(max_retries):
+        try:
+            resp = await client.get(url)
+            if resp.status_code == 200:
+                return resp
+            if resp.status_code < 500:
+                return None
+        except Exception as e:
+            logger.warning("Image download attempt %d failed for %s: %s", attempt + 1, url, e)
+        if attempt < max_retries - 1:
+            await asyncio.sleep(1)
+    return None
+
+
+async def _store_image(url: str, resp: httpx.Response) -> Dict[str, Any]:
+    """Persist an image under its content hash (identical files stored once)."""
+    content = resp.content
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    filename = f"{digest}{_image_ext(url, resp.headers.get('content-type', ''))}"
+    filepath = os.path.join(UPLOAD_DIR, filename)
+    thumb_name = f"{digest}_thumb.jpg"
+    thumb_path = os.path.join(UPLOAD_DIR, thumb_name)
+
+    if not os.path.exists(filepath):
+        async with aiofiles.open(filepath, "wb") as f:
+            await f.write(content)
+    has_thumb = os.path.exists(thumb_path) or await asyncio.to_thread(_write_thumbnail, content, thumb_path)
+
+    stored = {"local_image": f"/uploads/hotel_images/{filename}", "image_hash": digest}
+    if has_thumb:
+        stored["local_thumbnail"] = f"/uploads/hotel_images/{thumb_name}"
+    return stored
+
+
+async def download_hotel_images(
+    db,
+    org_id: str,
+    job_id: str,
+    max_retries: int = 2,
+    concurrency: int = IMAGE_CONCURRENCY,
+) -> int:
     """Download images for hotels that have image_url from a specific import job.
 
+    Hotels are fed to ``concurrency`` workers over one pooled HTTP client.
+    Each distinct URL is fetched once per job; files are named by content
+    hash so identical images from different URLs share one file and
+    thumbnail. Hotel updates are flushed with ``bulk_write``.
+
     Returns count of successfully downloaded images.
     """
     os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -275,43 +500,69 @@ async def download_hotel_images(db, org_id: str, job_id: str, max_retries: int =
         "organization_id": org_id,
         "import_job_id": job_id,
         "image_url": {"$exists": True, "$ne": ""},
-    })
-
-    downloaded = 0
-    async for hotel in cursor:
-        url = hotel.get("image_url", "")
-        if not url or not url.startswith("http"):
-            continue
-
-        hotel_id = hotel["_id"]
-        ext = ".jpg"
-        if ".png" in url.lower():
-            ext = ".png"
-        elif ".webp" in url.lower():
-            ext = ".webp"
-
-        filename = f"{hotel_id}{ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-
-        for attempt in range(max_retries):
+    }, {"image_url": 1})
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+    by_url: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
+    pending: List[UpdateOne] = []
+    counts = {"done": 0, "downloaded": 0, "failed": 0}
+
+    async def _flush() -> None:
+        if pending:
+            batch = pending[:]
+            pending.clear()
+            await db.hotels.bulk_write(batch, ordered=False)
+        await update_job_progress(
+            db, job_id, phase="images", images_done=counts["done"],
+            images_downloaded=counts["downloaded"], images_failed=counts["failed"],
+        )
+
+    async def _resolve(client: httpx.AsyncClient, url: str) -> Optional[Dict[str, Any]]:
+        future = by_url.get(url)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            by_url[url] = future
             try:
-                async with httpx.AsyncClient(timeout=15.0) as client:
-                    resp = await client.get(url)
-                    if resp.status_code == 200:
-                        async with aiofiles.open(filepath, "wb") as f:
-                            await f.write(resp.content)
-                        await db.hotels.update_one(
-                            {"_id": hotel_id},
-                            {"$set": {"local_image": f"/uploads/hotel_images/{filename}"}},
-                        )
-                        downloaded += 1
-                        break
+                resp = await _fetch_image(client, url, max_retries)
+                future.set_result(await _store_image(url, resp) if resp is not None else None)
             except Exception as e:
-                logger.warning("Image download attempt %d failed for %s: %s", attempt + 1, url, e)
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(1)
+                logger.warning("Image store failed for %s: %s", url, e)
+                future.set_result(None)
+        return await future
 
-    return downloaded
+    async def _worker(client: httpx.AsyncClient) -> None:
+        while True:
+            hotel = await queue.get()
+            try:
+                if hotel is None:
+                    return
+                stored = await _resolve(client, hotel["image_url"])
+                counts["done"] += 1
+                if stored:
+                    counts["downloaded"] += 1
+                    pending.append(UpdateOne({"_id": hotel["_id"]}, {"$set": stored}))
+                else:
+                    counts["failed"] += 1
+            finally:
+                queue.task_done()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=15.0, limits=limits, follow_redirects=True) as client:
+        workers = [asyncio.create_task(_worker(client)) for _ in range(concurrency)]
+        try:
+            async for hotel in cursor:
+                url = (hotel.get("image_url") or "").strip()
+                if url.startswith("http"):
+                    await queue.put({"_id": hotel["_id"], "image_url": url})
+                if len(pending) >= 200:
+                    await _flush()
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+    await _flush()
+
+    return counts["downloaded"]
 
 
 # ── Import Job Lifecycle ───────────────────────────────────────
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from datetime import date, timedelta
-from typing import Any
+import logging
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
 
 from bson import ObjectId
 from pymongo import UpdateOne
@@ -9,6 +11,17 @@ from pymongo import UpdateOne
 from app.db import get_db
 from app.utils import now_utc, to_object_id
 
+logger = logging.getLogger(__name__)
+
+HOLD_TTL_SECONDS = 15 * 60
+HOLDS_FIELD = "holds"
+
+
+class InventoryUnavailable(Exception):
+    def __init__(self, date_str: str):
+        super().__init__(f"no availability for {date_str}")
+        self.date = date_str
+
 
 async def upsert_inventory(org_id: str, user_email: str, payload: dict[str, Any]) -> dict[str, Any]:
     db = await get_db()
@@ -141,3 +154,165 @@ async def release_inventory(org_id: str, product_id: ObjectId, date_str: str, pa
         {"organization_id": org_id, "product_id": product_id, "date": date_str},
         {"$inc": {"capacity_available": pax}, "$set": {"updated_at": now_utc()}},
     )
+
+
+# ── Stay allocation ────────────────────────────────────────────────
+#
+# A stay reserves every night of [check_in, check_out) or nothing. Each
+# night is one conditional $inc on its own inventory document, and the same
+# update pushes a hold marker {id, pax, exp}, so a night always knows which
+# holds consumed it:
+#
+#   allocate → nights in date order; on the first refusal the nights taken
+#              so far are released (by hold id) and InventoryUnavailable
+#              is raised
+#   confirm  → markers are pulled, capacity stays consumed
+#   release  → +pax and pull, only on nights still carrying the marker, so
+#              it is idempotent and safe after a partial allocation
+#   expiry   → release_expired_holds() gives back holds a crashed process
+#              never confirmed or released
+#
+# Every allocation walks nights in the same (ascending) order, and a
+# sold-out stay is refused by one read before any write, so a flash sale on
+# one product-date costs losers a single find instead of write/undo pairs.
+
+
+async def _precheck_nights(db, org_id: str, product_oid: ObjectId, nights: list[str], pax: int) -> None:
+    docs = await db.inventory.find(
+        {"organization_id": org_id, "product_id": product_oid, "date": {"$in": nights}},
+        {"date": 1, "capacity_available": 1, "restrictions": 1},
+    ).to_list(len(nights))
+    by_date = {d["date"]: d for d in docs}
+    for night in nights:
+        doc = by_date.get(night)
+        if (
+            not doc
+            or int(doc.get("capacity_available") or 0) < pax
+            or (doc.get("restrictions") or {}).get("closed")
+        ):
+            raise InventoryUnavailable(night)
+
+
+async def allocate_stay(
+    org_id: str,
+    product_id: str | ObjectId,
+    nights: list[str],
+    pax: int,
+    *,
+    hold_ttl_seconds: int = HOLD_TTL_SECONDS,
+    hold_id: Optional[str] = None,
+) -> dict[str, Any]:
+    """Hold `pax` on every night in `nights`, all or nothing.
+
+    Returns ``{"hold_id", "nights", "pax", "expires_at"}``; raises
+    InventoryUnavailable with the first night that could not be held.
+    """
+    db = await get_db()
+    product_oid = to_object_id(product_id) if isinstance(product_id, str) else product_id
+    nights = sorted(set(nights))
+    if not nights:
+        raise ValueError("stay must cover at least one night")
+
+    await _precheck_nights(db, org_id, product_oid, nights, pax)
+
+    hold_id = hold_id or uuid.uuid4().hex
+    now = now_utc()
+    expires_at = now + timedelta(seconds=hold_ttl_seconds)
+    marker = {"id": hold_id, "pax": pax, "exp": expires_at}
+
+    for night in nights:
+        res = await db.inventory.update_one(
+            {
+                "organization_id": org_id,
+                "product_id": product_oid,
+                "date": night,
+                "capacity_available": {"$gte": pax},
+                "restrictions.closed": {"$ne": True},
+                f"{HOLDS_FIELD}.id": {"$ne": hold_id},
+            },
+            {
+                "$inc": {"capacity_available": -pax},
+                "$push": {HOLDS_FIELD: marker},
+                "$set": {"updated_at": now},
+            },
+        )
+        if res.modified_count != 1:
+            await release_stay(org_id, product_oid, hold_id)
+            raise InventoryUnavailable(night)
+
+    return {"hold_id": hold_id, "nights": nights, "pax": pax, "expires_at": expires_at}
+
+
+async def confirm_stay(org_id: str, product_id: ObjectId, hold_id: str) -> int:
+    """Make a hold permanent (capacity stays consumed). Returns nights confirmed."""
+    db = await get_db()
+    res = await db.inventory.update_many(
+        {"organization_id": org_id, "product_id": product_id, f"{HOLDS_FIELD}.id": hold_id},
+        {"$pull": {HOLDS_FIELD: {"id": hold_id}}, "$set": {"updated_at": now_utc()}},
+    )
+    return int(res.modified_count)
+
+
+async def release_stay(org_id: str, product_id: ObjectId, hold_id: str) -> int:
+    """Give back an unconfirmed hold. Idempotent; returns nights released."""
+    db = await get_db()
+    released = 0
+    async for doc in db.inventory.find(
+        {"organization_id": org_id, "product_id": product_id, f"{HOLDS_FIELD}.id": hold_id},
+        {"date": 1, HOLDS_FIELD: {"$elemMatch": {"id": hold_id}}},
+    ):
+        marker = next((m for m in doc.get(HOLDS_FIELD) or [] if m.get("id") == hold_id), {})
+        released += await _release_marker(db, doc["_id"], marker)
+    return released
+
+
+async def _release_marker(db, inventory_id: ObjectId, marker: dict[str, Any]) -> int:
+    if not marker.get("id"):
+        return 0
+    res = await db.inventory.update_one(
+        {"_id": inventory_id, f"{HOLDS_FIELD}.id": marker["id"]},
+        {
+            "$inc": {"capacity_available": int(marker.get("pax") or 0)},
+            "$pull": {HOLDS_FIELD: {"id": marker["id"]}},
+            "$set": {"updated_at": now_utc()},
+        },
+    )
+    return int(res.modified_count)
+
+
+async def release_expired_holds(now: Optional[datetime] = None, *, limit: int = 1000) -> dict[str, int]:
+    """Release holds past their expiry.
+
+    A hold whose id is already on a reservation (process died between the
+    insert and confirm_stay) is confirmed instead of released.
+    """
+    db = await get_db()
+    now = now or now_utc()
+    released = confirmed = 0
+    booked: dict[str, bool] = {}
+    async for doc in db.inventory.find(
+        {f"{HOLDS_FIELD}.exp": {"$lt": now}},
+        {HOLDS_FIELD: 1},
+    ).limit(limit):
+        for marker in doc.get(HOLDS_FIELD) or []:
+            exp = marker.get("exp")
+            if exp is None:
+                continue
+            # The Mongo client is not tz-aware; stored datetimes come back naive UTC.
+            if exp.tzinfo is None:
+                exp = exp.replace(tzinfo=timezone.utc)
+            if exp >= now:
+                continue
+            hold_id = marker["id"]
+            if hold_id not in booked:
+                booked[hold_id] = bool(await db.reservations.find_one({"inventory_hold_id": hold_id}, {"_id": 1}))
+            if booked[hold_id]:
+                res = await db.inventory.update_one(
+                    {"_id": doc["_id"]}, {"$pull": {HOLDS_FIELD: {"id": hold_id}}},
+                )
+                confirmed += int(res.modified_count)
+            else:
+                released += await _release_marker(db, doc["_id"], marker)
+    if released or confirmed:
+        logger.info("inventory holds expired: released=%d confirmed=%d", released, confirmed)
+    return {"released": released, "confirmed": confirmed}
@@ -2,6 +2,9 @@
 
 For peak periods, generates pre-computed availability snapshots
 to avoid real-time calculation overhead.
+
+Also the rebuild path for the room-night occupancy ledger that
+hotel_availability.compute_availability reads (see room_night_occupancy).
 """
 from __future__ import annotations
 
@@ -10,6 +13,7 @@ from datetime import date, timedelta
 from typing import Any, Optional
 
 from app.db import get_db
+from app.indexes.manifest import report_index_failure
 from app.utils import now_utc
 
 logger = logging.getLogger("inventory_snapshots")
@@ -132,6 +136,27 @@ async def get_availability_snapshot(
     return [{k: v for k, v in d.items()} for d in docs]
 
 
+async def rebuild_room_night_occupancy(
+    organization_id: str,
+    hotel_ids: Optional[list[str]] = None,
+) -> list[dict[str, Any]]:
+    """Rebuild the occupancy ledger for the given (default: all active) hotels."""
+    from app.services.room_night_occupancy import rebuild_hotel
+
+    db = await get_db()
+    if not hotel_ids:
+        hotels = await db.hotels.find(
+            {"organization_id": organization_id, "active": True}, {"_id": 1},
+        ).to_list(None)
+        hotel_ids = [str(h["_id"]) for h in hotels]
+
+    results = []
+    for hotel_id in hotel_ids:
+        summary = await rebuild_hotel(db, organization_id, hotel_id)
+        results.append({"hotel_id": hotel_id, **summary})
+    return results
+
+
 async def ensure_inventory_snapshot_indexes() -> None:
     db = await get_db()
     try:
@@ -147,5 +172,8 @@ async def ensure_inventory_snapshot_indexes() -> None:
             "computed_at", expireAfterSeconds=86400,  # 24h TTL
             name="ttl_computed",
         )
+        from app.services.room_night_occupancy import ensure_room_night_occupancy_indexes
+        await ensure_room_night_occupancy_indexes(db)
     except Exception as e:
+        report_index_failure("inventory_snapshots", e)
         logger.warning("Inventory snapshot index warning: %s", e)
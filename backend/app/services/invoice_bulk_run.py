@@ -0,0 +1,362 @@
+"""Month-end bulk invoicing runs.
+
+``create_invoice_from_booking`` / ``issue_invoice`` handle one invoice per
+call (4-8 round-trips each). A bulk run invoices a whole period instead:
+
+- ``start_invoice_run`` records a run in ``invoice_runs`` and enqueues an
+  ``invoice.bulk_run`` job (``app.services.jobs``)
+- build phase: one cursor over the period's confirmed bookings (``_id``
+  order); per BUILD_BATCH bookings one ``$in`` lookup skips those already
+  invoiced, drafts are built in memory (tax profiles cached by
+  ``tax_engine``) and invoices + events are written with two
+  ``insert_many`` calls. The last booking ``_id`` is checkpointed per batch.
+- issue phase: the run's drafts are submitted in integrator-sized batches
+  (``max_batch_size``), ISSUE_CONCURRENCY batches at a time; each batch is
+  one ``update_many`` before submission and one ``bulk_write`` after.
+
+A restarted run resumes from the build checkpoint; the issue phase selects
+by status, so only drafts are sent. Invoices left ``issuing`` without a
+``provider_invoice_id`` by an interrupted batch may already exist at the
+provider (EDM keys on ``faturaNo``) and cannot be looked up without a
+provider id, so they are never re-sent: they are flagged ``needs_review``
+and counted for manual reconciliation.
+
+The unique ``(tenant_id, idempotency_key)`` index guarantees one invoice per
+booking even when a run races a single-invoice create.
+
+Throughput per phase is stored on the run and exported via the metrics
+registry (``invoice_run_*``).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.accounting.integrators.registry import get_integrator
+from app.accounting.tenant_integrator_service import (
+    get_integrator_credentials,
+    has_active_integrator,
+)
+from app.domain.invoice.models import InvoiceStatus
+from app.infrastructure.metrics_registry import registry
+from app.services.invoice_engine import (
+    COL,
+    EVENTS_COL,
+    _idempotency_key,
+    build_booking_invoice,
+    build_event,
+    issue_outcome,
+)
+from app.utils import now_utc, serialize_doc
+
+logger = logging.getLogger("invoice.bulk_run")
+
+RUNS_COLLECTION = "invoice_runs"
+JOB_TYPE = "invoice.bulk_run"
+BUILD_BATCH = 500
+ISSUE_CONCURRENCY = 4
+INVOICEABLE_STATUSES = ["confirmed", "completed", "CONFIRMED", "COMPLETED"]
+
+_RESUMABLE_ISSUE = {"status": {"$in": [InvoiceStatus.DRAFT, InvoiceStatus.READY_FOR_ISSUE]}}
+_INTERRUPTED_ISSUE = {"status": InvoiceStatus.ISSUING, "provider_invoice_id": None, "needs_review": None}
+
+
+def period_bounds(period: str) -> tuple[datetime, datetime]:
+    """[start, end) of a ``YYYY-MM`` period in UTC."""
+    year, month = (int(part) for part in period.split("-"))
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+async def start_invoice_run(
+    db, tenant_id: str, org_id: str, period: str, issue: bool = True, created_by: str = "",
+) -> dict[str, Any]:
+    """Create a bulk run and queue its job."""
+    from app.services.jobs import enqueue_job
+
+    period_bounds(period)  # validate
+    now = now_utc()
+    run = {
+        "_id": str(uuid.uuid4()),
+        "tenant_id": tenant_id,
+        "organization_id": org_id,
+        "period": period,
+        "issue": issue,
+        "status": "queued",
+        "checkpoint": {"last_booking_id": None},
+        "counts": {"scanned": 0, "created": 0, "skipped": 0, "issued": 0, "failed": 0, "needs_review": 0},
+        "stats": {},
+        "error": None,
+        "created_by": created_by,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await db[RUNS_COLLECTION].insert_one(run)
+    await enqueue_job(db, organization_id=org_id, type=JOB_TYPE, payload={"run_id": run["_id"]})
+    return run
+
+
+def run_view(run: dict[str, Any]) -> dict[str, Any]:
+    view = serialize_doc(run)
+    view["id"] = view.pop("_id", run.get("_id"))
+    view.pop("checkpoint", None)
+    return view
+
+
+async def _set_run(db, run_id: str, fields: dict[str, Any], inc: Optional[dict[str, int]] = None) -> None:
+    update: dict[str, Any] = {"$set": {**fields, "updated_at": now_utc()}}
+    if inc:
+        update["$inc"] = {f"counts.{k}": v for k, v in inc.items() if v}
+    await db[RUNS_COLLECTION].update_one({"_id": run_id}, update)
+
+
+def _record(phase: str, outcome: str, n: int) -> None:
+    if n:
+        registry.inc("invoice_run_invoices_total", n, labels={"phase": phase, "outcome": outcome})
+
+
+# ── Build phase ───────────────────────────────────────────────────────
+
+async def _build_batch(db, run: dict[str, Any], bookings: list[dict], integrator_available: bool) -> dict[str, int]:
+    tenant_id, org_id = run["tenant_id"], run["organization_id"]
+    keyed = {_idempotency_key(tenant_id, str(b["_id"])): b for b in bookings}
+    invoiced = {
+        doc["idempotency_key"]
+        async for doc in db[COL].find(
+            {"tenant_id": tenant_id, "idempotency_key": {"$in": list(keyed)}},
+            {"idempotency_key": 1},
+        )
+    }
+
+    invoices = []
+    for key, booking in keyed.items():
+        if key in invoiced:
+            continue
+        doc = build_booking_invoice(
+            tenant_id, org_id, booking, None, integrator_available, run.get("created_by", ""), idem_key=key,
+        )
+        doc["run_id"] = run["_id"]
+        invoices.append(doc)
+
+    if invoices:
+        try:
+            await db[COL].insert_many(invoices, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != 11000 for err in errors):
+                raise
+            # Invoiced concurrently (single create or another run): keep theirs.
+            raced = {err["index"] for err in errors}
+            invoices = [doc for i, doc in enumerate(invoices) if i not in raced]
+    if invoices:
+        await db[EVENTS_COL].insert_many(
+            [build_event(tenant_id, d["invoice_id"], "invoice.created", run.get("created_by", "")) for d in invoices],
+            ordered=False,
+        )
+    return {"scanned": len(bookings), "created": len(invoices), "skipped": len(bookings) - len(invoices)}
+
+
+async def _build_phase(db, run: dict[str, Any]) -> None:
+    start, end = period_bounds(run["period"])
+    query: dict[str, Any] = {
+        "organization_id": run["organization_id"],
+        "status": {"$in": INVOICEABLE_STATUSES},
+        "created_at": {"$gte": start, "$lt": end},
+    }
+    last_id = (run.get("checkpoint") or {}).get("last_booking_id")
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+
+    integrator_available = await has_active_integrator(run["tenant_id"])
+    cursor = db.bookings.find(query).sort("_id", 1).batch_size(BUILD_BATCH)
+
+    created = 0
+    began = time.perf_counter()
+    batch: list[dict] = []
+
+    async def flush() -> None:
+        nonlocal created
+        t0 = time.perf_counter()
+        counts = await _build_batch(db, run, batch, integrator_available)
+        await _set_run(db, run["_id"], {"checkpoint.last_booking_id": batch[-1]["_id"]}, inc=counts)
+        registry.observe("invoice_run_batch_seconds", time.perf_counter() - t0, labels={"phase": "build"})
+        _record("build", "created", counts["created"])
+        _record("build", "skipped", counts["skipped"])
+        created += counts["created"]
+        batch.clear()
+
+    async for booking in cursor:
+        batch.append(booking)
+        if len(batch) >= BUILD_BATCH:
+            await flush()
+    if batch:
+        await flush()
+
+    rate = round(created / max(time.perf_counter() - began, 1e-6), 2)
+    registry.set_gauge("invoice_run_throughput_per_second", rate, labels={"phase": "build"})
+    await _set_run(db, run["_id"], {"stats.build_per_second": rate})
+
+
+# ── Issue phase ───────────────────────────────────────────────────────
+
+async def _issue_batch(db, run: dict[str, Any], integrator, provider_name: str, creds: dict, docs: list[dict]) -> dict[str, int]:
+    tenant_id, actor = run["tenant_id"], run.get("created_by", "")
+    t0 = time.perf_counter()
+    now = now_utc()
+    await asyncio.gather(
+        db[COL].update_many(
+            {"_id": {"$in": [d["_id"] for d in docs]}},
+            {"$set": {"status": InvoiceStatus.ISSUING, "updated_at": now}},
+        ),
+        db[EVENTS_COL].insert_many(
+            [build_event(tenant_id, d["invoice_id"], "invoice.issuing", actor) for d in docs], ordered=False,
+        ),
+    )
+
+    results = await integrator.issue_invoices([serialize_doc(d) for d in docs], creds)
+
+    ops, events = [], []
+    counts = {"issued": 0, "failed": 0}
+    for doc, result in zip(docs, results):
+        if result.success:
+            update = issue_outcome(provider_name, result.provider_invoice_id, result.status, result.message)
+            payload = {
+                "provider": provider_name,
+                "provider_status": result.status,
+                "provider_invoice_id": result.provider_invoice_id,
+            }
+        else:
+            update = {
+                "status": InvoiceStatus.FAILED,
+                "error_message": result.message,
+                "provider_status": result.status,
+                "updated_at": now_utc(),
+            }
+            payload = {"error": result.message}
+        status = InvoiceStatus(update["status"]).value
+        counts["issued" if status == InvoiceStatus.ISSUED else "failed"] += 1
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        events.append(build_event(tenant_id, doc["invoice_id"], f"invoice.{status}", actor, payload))
+
+    await asyncio.gather(
+        db[COL].bulk_write(ops, ordered=False),
+        db[EVENTS_COL].insert_many(events, ordered=False),
+    )
+    await _set_run(db, run["_id"], {}, inc=counts)
+    registry.observe("invoice_run_batch_seconds", time.perf_counter() - t0, labels={"phase": "issue"})
+    _record("issue", "issued", counts["issued"])
+    _record("issue", "failed", counts["failed"])
+    return counts
+
+
+async def _park_interrupted(db, run: dict[str, Any]) -> int:
+    """Flag invoices stranded mid-submit by an earlier attempt instead of re-sending them."""
+    query = {"run_id": run["_id"], "tenant_id": run["tenant_id"], **_INTERRUPTED_ISSUE}
+    stranded = await db[COL].find(query, {"_id": 1, "invoice_id": 1}).to_list(length=None)
+    if not stranded:
+        return 0
+
+    await db[COL].update_many(
+        {"_id": {"$in": [d["_id"] for d in stranded]}},
+        {"$set": {"needs_review": True, "updated_at": now_utc()}},
+    )
+    await db[EVENTS_COL].insert_many(
+        [
+            build_event(run["tenant_id"], d["invoice_id"], "invoice.needs_review", run.get("created_by", ""),
+                        {"reason": "interrupted_submission", "run_id": run["_id"]})
+            for d in stranded
+        ],
+        ordered=False,
+    )
+    await _set_run(db, run["_id"], {}, inc={"needs_review": len(stranded)})
+    _record("issue", "needs_review", len(stranded))
+    logger.warning("Invoice run %s: %d interrupted invoices parked for review", run["_id"], len(stranded))
+    return len(stranded)
+
+
+async def _issue_phase(db, run: dict[str, Any]) -> None:
+    await _park_interrupted(db, run)
+
+    provider_name = "edm"
+    integrator = get_integrator(provider_name)
+    creds = await get_integrator_credentials(run["tenant_id"], provider_name) or {}
+    size = max(1, int(getattr(integrator, "max_batch_size", 1)))
+
+    # Keyset pages by _id: invoices updated by in-flight batches are never re-read.
+    base = {"run_id": run["_id"], "tenant_id": run["tenant_id"], **_RESUMABLE_ISSUE}
+    last_id = None
+    submitted = 0
+    began = time.perf_counter()
+    pending: set[asyncio.Task] = set()
+    try:
+        while True:
+            query = dict(base)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            docs = await db[COL].find(query).sort("_id", 1).limit(size).to_list(length=size)
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            submitted += len(docs)
+
+            if len(pending) >= ISSUE_CONCURRENCY:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            pending.add(asyncio.create_task(_issue_batch(db, run, integrator, provider_name, creds, docs)))
+
+        if pending:
+            await asyncio.gather(*pending)
+            pending = set()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    rate = round(submitted / max(time.perf_counter() - began, 1e-6), 2)
+    registry.set_gauge("invoice_run_throughput_per_second", rate, labels={"phase": "issue"})
+    await _set_run(db, run["_id"], {"stats.issue_per_second": rate})
+
+
+# ── Job entry point ───────────────────────────────────────────────────
+
+async def run_invoice_run(db, run_id: str) -> Optional[dict[str, Any]]:
+    """Execute (or resume) a bulk run; failures mark the run and re-raise for job retry."""
+    run = await db[RUNS_COLLECTION].find_one({"_id": run_id})
+    if not run or run.get("status") == "completed":
+        return run
+
+    try:
+        await _set_run(db, run_id, {"status": "building", "error": None})
+        await _build_phase(db, run)
+        if run.get("issue", True):
+            await _set_run(db, run_id, {"status": "issuing"})
+            await _issue_phase(db, run)
+        await _set_run(db, run_id, {"status": "completed", "completed_at": now_utc()})
+    except Exception as e:
+        logger.error("Invoice run %s failed: %s", run_id, e)
+        await _set_run(db, run_id, {"status": "failed", "error": str(e)[:500]})
+        raise
+
+    return await db[RUNS_COLLECTION].find_one({"_id": run_id})
+
+
+async def ensure_invoice_run_indexes(db) -> None:
+    legacy = (await db[COL].index_information()).get("tenant_idempotency_key")
+    if legacy and not legacy.get("unique"):
+        await db[COL].drop_index("tenant_idempotency_key")
+    await db[COL].create_index(
+        [("tenant_id", 1), ("idempotency_key", 1)],
+        name="tenant_idempotency_key",
+        unique=True,
+        partialFilterExpression={"idempotency_key": {"$type": "string"}},
+    )
+    await db[COL].create_index([("run_id", 1), ("status", 1), ("_id", 1)], name="run_status")
+    await db[RUNS_COLLECTION].create_index([("tenant_id", 1), ("created_at", -1)], name="tenant_created")
@@ -55,45 +55,39 @@ def _manual_idempotency_key(tenant_id: str, lines: list[dict], grand_total: floa
     return hashlib.sha256(data.encode()).hexdigest()
 
 
-async def _write_event(
-    db, tenant_id: str, invoice_id: str, event_type: str, actor: str = "", payload: dict | None = None,
-):
-    await db[EVENTS_COL].insert_one({
+def build_event(
+    tenant_id: str, invoice_id: str, event_type: str, actor: str = "", payload: dict | None = None,
+) -> dict[str, Any]:
+    return {
         "tenant_id": tenant_id,
         "invoice_id": invoice_id,
         "type": event_type,
         "actor": actor,
         "payload": payload or {},
         "created_at": now_utc(),
-    })
+    }
+
+
+async def _write_event(
+    db, tenant_id: str, invoice_id: str, event_type: str, actor: str = "", payload: dict | None = None,
+):
+    await db[EVENTS_COL].insert_one(build_event(tenant_id, invoice_id, event_type, actor, payload))
 
 
 # ── Create from Booking ──────────────────────────────────────────────
 
-async def create_invoice_from_booking(
+def build_booking_invoice(
     tenant_id: str,
     org_id: str,
-    booking_id: str,
-    customer_data: dict[str, Any] | None = None,
+    booking: dict[str, Any],
+    customer_data: dict[str, Any] | None,
+    integrator_available: bool,
     created_by: str = "",
+    booking_id: str | None = None,
+    idem_key: str | None = None,
 ) -> dict[str, Any]:
-    """Create an invoice from a booking. Idempotent by booking_id."""
-    db = await get_db()
-
-    idem_key = _idempotency_key(tenant_id, booking_id)
-    existing = await db[COL].find_one({"idempotency_key": idem_key, "tenant_id": tenant_id})
-    if existing:
-        return serialize_doc(existing)
-
-    from bson import ObjectId
-    try:
-        booking = await db.bookings.find_one({"_id": ObjectId(booking_id), "organization_id": org_id})
-    except Exception:
-        booking = await db.bookings.find_one({"_id": booking_id, "organization_id": org_id})
-
-    if not booking:
-        return {"error": "Booking not found"}
-
+    """Draft invoice document for a booking (not persisted)."""
+    booking_id = booking_id or str(booking["_id"])
     booking_ser = serialize_doc(booking)
 
     customer_profile = None
@@ -110,9 +104,6 @@ async def create_invoice_from_booking(
     tax_id = (customer_profile or {}).get("tax_id", "")
     id_number = (customer_profile or {}).get("id_number", "")
 
-    # Check if tenant has an active integrator
-    integrator_available = await has_active_integrator(tenant_id)
-
     decision = decide_document_type(
         customer_type=customer_type,
         tax_id=tax_id,
@@ -126,7 +117,7 @@ async def create_invoice_from_booking(
     now = now_utc()
     invoice_id = f"INV-{uuid.uuid4().hex[:8].upper()}"
 
-    doc = {
+    return {
         "invoice_id": invoice_id,
         "tenant_id": tenant_id,
         "organization_id": org_id,
@@ -150,7 +141,7 @@ async def create_invoice_from_booking(
         "provider_status": None,
         "accounting_ref": None,
         "accounting_status": None,
-        "idempotency_key": idem_key,
+        "idempotency_key": idem_key or _idempotency_key(tenant_id, booking_id),
         "created_by": created_by,
         "created_at": now,
         "updated_at": now,
@@ -158,6 +149,40 @@ async def create_invoice_from_booking(
         "cancelled_at": None,
         "error_message": None,
     }
+
+
+async def create_invoice_from_booking(
+    tenant_id: str,
+    org_id: str,
+    booking_id: str,
+    customer_data: dict[str, Any] | None = None,
+    created_by: str = "",
+) -> dict[str, Any]:
+    """Create an invoice from a booking. Idempotent by booking_id."""
+    db = await get_db()
+
+    idem_key = _idempotency_key(tenant_id, booking_id)
+    existing = await db[COL].find_one({"idempotency_key": idem_key, "tenant_id": tenant_id})
+    if existing:
+        return serialize_doc(existing)
+
+    from bson import ObjectId
+    try:
+        booking = await db.bookings.find_one({"_id": ObjectId(booking_id), "organization_id": org_id})
+    except Exception:
+        booking = await db.bookings.find_one({"_id": booking_id, "organization_id": org_id})
+
+    if not booking:
+        return {"error": "Booking not found"}
+
+    # Check if tenant has an active integrator
+    integrator_available = await has_active_integrator(tenant_id)
+
+    doc = build_booking_invoice(
+        tenant_id, org_id, booking, customer_data, integrator_available, created_by,
+        booking_id=booking_id, idem_key=idem_key,
+    )
+    invoice_id = doc["invoice_id"]
     await db[COL].insert_one(doc)
     await _write_event(db, tenant_id, invoice_id, "invoice.created", created_by)
     return serialize_doc(doc)
@@ -295,6 +320,31 @@ async def transition_invoice(
 
 # ── Issue Invoice (via integrator adapter) ────────────────────────────
 
+def issue_outcome(provider_name: str, pid: str, edoc_status: str, message: str = "") -> dict[str, Any]:
+    """Invoice $set for an integrator submission/status result."""
+    now = now_utc()
+    if edoc_status in ("submitted", "accepted", "sent"):
+        final_status = InvoiceStatus.ISSUED
+    elif edoc_status == "rejected":
+        final_status = InvoiceStatus.FAILED
+    else:
+        final_status = InvoiceStatus.ISSUED
+
+    update = {
+        "status": final_status,
+        "provider": provider_name,
+        "provider_invoice_id": pid,
+        "provider_status": edoc_status,
+        "updated_at": now,
+    }
+    if final_status == InvoiceStatus.ISSUED:
+        update["issued_at"] = now
+        update["error_message"] = None
+    elif final_status == InvoiceStatus.FAILED:
+        update["error_message"] = message
+    return update
+
+
 async def issue_invoice(tenant_id: str, invoice_id: str, actor: str = "") -> dict[str, Any]:
     """Issue invoice through the e-document integrator (EDM).
 
@@ -369,28 +419,9 @@ async def issue_invoice(tenant_id: str, invoice_id: str, actor: str = "") -> dic
             status_result = issue_result
 
         # Determine final status
-        now = now_utc()
         edoc_status = status_result.status
-
-        if edoc_status in ("submitted", "accepted", "sent"):
-            final_status = InvoiceStatus.ISSUED
-        elif edoc_status == "rejected":
-            final_status = InvoiceStatus.FAILED
-        else:
-            final_status = InvoiceStatus.ISSUED
-
-        update = {
-            "status": final_status,
-            "provider": provider_name,
-            "provider_invoice_id": pid,
-            "provider_status": edoc_status,
-            "updated_at": now,
-        }
-        if final_status == InvoiceStatus.ISSUED:
-            update["issued_at"] = now
-            update["error_message"] = None
-        elif final_status == InvoiceStatus.FAILED:
-            update["error_message"] = status_result.message
+        update = issue_outcome(provider_name, pid, edoc_status, status_result.message)
+        final_status = update["status"]
 
         await db[COL].update_one({"_id": doc["_id"]}, {"$set": update})
         await _write_event(db, tenant_id, invoice_id, f"invoice.{final_status}", actor, {
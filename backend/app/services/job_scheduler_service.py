@@ -6,6 +6,8 @@ Manages scheduled background jobs using APScheduler:
   - Supplier health check (every 15 min)
   - Analytics aggregation (every 30 min)
   - Revenue reconciliation (daily)
+  - Expired inventory hold release (every minute)
+  - Revenue cube reconcile (daily)
 """
 from __future__ import annotations
 
@@ -201,6 +203,43 @@ async def job_revenue_reconciliation():
         logger.error("Revenue reconciliation failed: %s", e)
 
 
+async def job_inventory_hold_sweep():
+    """Every minute: Release stay holds that expired unconfirmed."""
+    import time
+    start = time.monotonic()
+    try:
+        from app.services.inventory import release_expired_holds
+        result = await release_expired_holds()
+
+        elapsed = (time.monotonic() - start) * 1000
+        _record_run("inventory_hold_sweep", "success",
+                     f"Released: {result['released']}, Confirmed: {result['confirmed']}", elapsed)
+    except Exception as e:
+        elapsed = (time.monotonic() - start) * 1000
+        _record_run("inventory_hold_sweep", "error", str(e), elapsed)
+        logger.error("Inventory hold sweep failed: %s", e)
+
+
+async def job_revenue_cube_reconcile():
+    """Daily: Rebuild the last two days of the revenue cube from source."""
+    import time
+    start = time.monotonic()
+    try:
+        from app.db import get_db
+        from app.suppliers.revenue_cube import rebuild_cube, since_day
+        db = await get_db()
+
+        result = await rebuild_cube(db, since=since_day(1))
+
+        elapsed = (time.monotonic() - start) * 1000
+        _record_run("revenue_cube_reconcile", "success",
+                     f"Cells: {result['cells_written']}, Stale: {result['cells_deleted']}", elapsed)
+    except Exception as e:
+        elapsed = (time.monotonic() - start) * 1000
+        _record_run("revenue_cube_reconcile", "error", str(e), elapsed)
+        logger.error("Revenue cube reconcile failed: %s", e)
+
+
 # ==========================================================================
 # Scheduler Management
 # ==========================================================================
@@ -255,10 +294,20 @@ def start_scheduler():
             IntervalTrigger(hours=24), id="revenue_reconciliation", name="Revenue Reconciliation",
             replace_existing=True,
         )
+        _scheduler.add_job(
+            job_inventory_hold_sweep,
+            IntervalTrigger(minutes=1), id="inventory_hold_sweep", name="Inventory Hold Sweep",
+            replace_existing=True,
+        )
+        _scheduler.add_job(
+            job_revenue_cube_reconcile,
+            IntervalTrigger(hours=24), id="revenue_cube_reconcile", name="Revenue Cube Reconcile",
+            replace_existing=True,
+        )
 
         _scheduler.start()
         _scheduler_started = True
-        logger.info("Job scheduler started with 5 scheduled jobs (AsyncIOScheduler)")
+        logger.info("Job scheduler started with 7 scheduled jobs (AsyncIOScheduler)")
     except Exception as e:
         logger.warning("Job scheduler start failed: %s", e)
 
@@ -292,6 +341,8 @@ async def trigger_job_manually(job_name: str) -> dict[str, Any]:
         "supplier_health_check": job_supplier_health_check,
         "analytics_aggregation": job_analytics_aggregation,
         "revenue_reconciliation": job_revenue_reconciliation,
+        "inventory_hold_sweep": job_inventory_hold_sweep,
+        "revenue_cube_reconcile": job_revenue_cube_reconcile,
     }
     fn = job_map.get(job_name)
     if not fn:
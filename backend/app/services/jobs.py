@@ -194,6 +194,22 @@ async def handle_indexnow_submit(db, job: Dict[str, Any]) -> None:
         await client.aclose()
 
 
+async def handle_gdpr_export(db, job: Dict[str, Any]) -> None:
+    """Job handler building a KVKK/GDPR export archive (see gdpr_export)."""
+
+    from app.services.gdpr_export import run_gdpr_export
+
+    payload = job.get("payload") or {}
+    await run_gdpr_export(db, payload["export_id"])
+
+
+async def handle_invoice_bulk_run(db, job: Dict[str, Any]) -> None:
+    """Job handler for month-end bulk invoicing (see invoice_bulk_run)."""
+
+    from app.services.invoice_bulk_run import run_invoice_run
+
+    payload = job.get("payload") or {}
+    await run_invoice_run(db, payload["run_id"])
 
 
 def register_job_handler(job_type: str, handler: JobHandler) -> None:
@@ -225,6 +241,8 @@ async def process_claimed_job(db, job: Dict[str, Any]) -> None:
 
 # Register built-in job handlers
 register_job_handler("seo.indexnow_submit", handle_indexnow_submit)
+register_job_handler("gdpr.export", handle_gdpr_export)
+register_job_handler("invoice.bulk_run", handle_invoice_bulk_run)
 
 
 async def run_job_worker_loop(worker_id: str, *, sleep_seconds: int = 5) -> None:
@@ -0,0 +1,380 @@
+"""Agency × hotel match stats projection (`agency_hotel_match_stats`).
+
+Daily buckets per (organization, agency, hotel) so the admin matches
+dashboard can answer from a small projection instead of grouping the full
+`bookings` / `booking_outcomes` collections on every request.
+
+Bucket kinds (``day`` is midnight UTC of the bucketed date):
+  - ``bookings``          by booking ``created_at``: status counters,
+                          operational/behavioral cancels, approval time sums
+  - ``outcomes_checkin``  by outcome ``checkin_date``: outcome + no-show counts
+  - ``outcomes_created``  by outcome ``created_at``: verified + verified no-show
+
+Maintenance:
+  - incremental: ``refresh_match_stats_for_booking`` recomputes just the
+    buckets a booking (and its outcome) fall into. Called by the
+    ``update_reporting_projection`` outbox consumer on booking events and after
+    outcome writes. Recomputing (instead of $inc deltas) keeps it idempotent
+    and independent of event ordering.
+  - backfill: ``rebuild_match_stats`` (see ``scripts/rebuild_match_stats.py``).
+    Once an organization has been rebuilt, the matches endpoints read from
+    the projection; before that they keep using the live aggregations.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReplaceOne
+
+from app.utils import now_utc
+
+logger = logging.getLogger(__name__)
+
+KIND_BOOKINGS = "bookings"
+KIND_OUTCOMES_CHECKIN = "outcomes_checkin"
+KIND_OUTCOMES_CREATED = "outcomes_created"
+
+OPERATIONAL_CANCEL_REASONS = ["PRICE_CHANGED", "RATE_CHANGED"]
+
+_REBUILD_BATCH_SIZE = 1000
+
+_OPERATIONAL_CANCEL_EXPR = {
+    "$and": [
+        {"$eq": ["$status", "cancelled"]},
+        {
+            "$or": [
+                {"$in": ["$cancel_reason", OPERATIONAL_CANCEL_REASONS]},
+                {"$eq": ["$cancelled_by", "system"]},
+            ]
+        },
+    ]
+}
+
+_BOOKING_COUNTERS = {
+    "total": {"$sum": 1},
+    "pending": {"$sum": {"$cond": [{"$eq": ["$status", "pending"]}, 1, 0]}},
+    "confirmed": {"$sum": {"$cond": [{"$eq": ["$status", "confirmed"]}, 1, 0]}},
+    "cancelled": {"$sum": {"$cond": [{"$eq": ["$status", "cancelled"]}, 1, 0]}},
+    "operational_cancelled": {"$sum": {"$cond": [_OPERATIONAL_CANCEL_EXPR, 1, 0]}},
+    "last_booking_at": {"$max": "$created_at"},
+    "approval_ms_sum": {
+        "$sum": {
+            "$cond": [
+                {"$and": [{"$eq": ["$status", "confirmed"]}, {"$eq": [{"$type": "$confirmed_at"}, "date"]}]},
+                {"$subtract": ["$confirmed_at", "$created_at"]},
+                0,
+            ]
+        }
+    },
+    "approval_count": {
+        "$sum": {
+            "$cond": [
+                {"$and": [{"$eq": ["$status", "confirmed"]}, {"$eq": [{"$type": "$confirmed_at"}, "date"]}]},
+                1,
+                0,
+            ]
+        }
+    },
+}
+
+_OUTCOME_CHECKIN_COUNTERS = {
+    "outcomes_total": {"$sum": 1},
+    "no_show": {"$sum": {"$cond": [{"$eq": ["$final_outcome", "no_show"]}, 1, 0]}},
+}
+
+_OUTCOME_CREATED_COUNTERS = {
+    "verified_total": {"$sum": {"$cond": [{"$eq": ["$verified", True]}, 1, 0]}},
+    "verified_no_show": {
+        "$sum": {
+            "$cond": [
+                {"$and": [{"$eq": ["$verified", True]}, {"$eq": ["$final_outcome", "no_show"]}]},
+                1,
+                0,
+            ]
+        }
+    },
+}
+
+_KIND_SOURCES = {
+    KIND_BOOKINGS: ("bookings", "created_at", _BOOKING_COUNTERS),
+    KIND_OUTCOMES_CHECKIN: ("booking_outcomes", "checkin_date", _OUTCOME_CHECKIN_COUNTERS),
+    KIND_OUTCOMES_CREATED: ("booking_outcomes", "created_at", _OUTCOME_CREATED_COUNTERS),
+}
+
+
+def day_start(value: datetime) -> datetime:
+    """Midnight UTC of the given timestamp (naive values are treated as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+
+def _bucket_id(kind: str, org_id: str, agency_id: str, hotel_id: str, day: datetime) -> str:
+    return f"{kind}:{org_id}:{agency_id}:{hotel_id}:{day.strftime('%Y-%m-%d')}"
+
+
+def _bucket_doc(kind: str, org_id: str, agency_id: str, hotel_id: str, day: datetime, row: Dict[str, Any]) -> Dict[str, Any]:
+    doc = {k: v for k, v in row.items() if k != "_id"}
+    if kind == KIND_BOOKINGS:
+        doc["behavioral_cancelled"] = max(int(doc.get("cancelled") or 0) - int(doc.get("operational_cancelled") or 0), 0)
+    doc.update({
+        "_id": _bucket_id(kind, org_id, agency_id, hotel_id, day),
+        "organization_id": org_id,
+        "agency_id": agency_id,
+        "hotel_id": hotel_id,
+        "kind": kind,
+        "day": day,
+        "updated_at": now_utc(),
+    })
+    return doc
+
+
+# ── Incremental maintenance ───────────────────────────────────
+
+async def refresh_bucket(db, kind: str, org_id: str, agency_id: str, hotel_id: str, day: datetime) -> None:
+    """Recompute one (kind, pair, day) bucket from its source collection."""
+    collection, date_field, counters = _KIND_SOURCES[kind]
+    day = day_start(day)
+    pipeline = [
+        {
+            "$match": {
+                "organization_id": org_id,
+                "agency_id": agency_id,
+                "hotel_id": hotel_id,
+                date_field: {"$gte": day, "$lt": day + timedelta(days=1)},
+            }
+        },
+        {"$group": {"_id": None, **counters}},
+    ]
+    rows = await db[collection].aggregate(pipeline).to_list(length=1)
+    bucket_id = _bucket_id(kind, org_id, agency_id, hotel_id, day)
+    if not rows:
+        await db.agency_hotel_match_stats.delete_one({"_id": bucket_id})
+        return
+    doc = _bucket_doc(kind, org_id, agency_id, hotel_id, day, rows[0])
+    await db.agency_hotel_match_stats.replace_one({"_id": bucket_id}, doc, upsert=True)
+
+
+async def refresh_match_stats_for_outcome(db, outcome: Dict[str, Any]) -> None:
+    """Refresh the outcome buckets an outcome document belongs to."""
+    org_id = outcome.get("organization_id")
+    agency_id = str(outcome.get("agency_id") or "")
+    hotel_id = str(outcome.get("hotel_id") or "")
+    if not org_id or not agency_id or not hotel_id:
+        return
+    if isinstance(outcome.get("checkin_date"), datetime):
+        await refresh_bucket(db, KIND_OUTCOMES_CHECKIN, org_id, agency_id, hotel_id, outcome["checkin_date"])
+    if isinstance(outcome.get("created_at"), datetime):
+        await refresh_bucket(db, KIND_OUTCOMES_CREATED, org_id, agency_id, hotel_id, outcome["created_at"])
+
+
+async def refresh_match_stats_for_booking(db, org_id: str, booking_id: str) -> bool:
+    """Refresh every bucket touched by a booking. Returns False if not found."""
+    from app.utils import to_object_id
+
+    lookup_ids: List[Any] = [booking_id]
+    try:
+        lookup_ids.append(to_object_id(booking_id))
+    except Exception:
+        pass
+    booking = await db.bookings.find_one(
+        {"organization_id": org_id, "_id": {"$in": lookup_ids}},
+        {"agency_id": 1, "hotel_id": 1, "created_at": 1},
+    )
+    if not booking:
+        return False
+
+    agency_id = str(booking.get("agency_id") or "")
+    hotel_id = str(booking.get("hotel_id") or "")
+    if agency_id and hotel_id and isinstance(booking.get("created_at"), datetime):
+        await refresh_bucket(db, KIND_BOOKINGS, org_id, agency_id, hotel_id, booking["created_at"])
+
+    outcome = await db.booking_outcomes.find_one({"organization_id": org_id, "booking_id": str(booking["_id"])})
+    if outcome:
+        await refresh_match_stats_for_outcome(db, outcome)
+    return True
+
+
+# ── Backfill ──────────────────────────────────────────────────
+
+async def rebuild_match_stats(db, org_id: Optional[str] = None) -> Dict[str, int]:
+    """Rebuild the projection from scratch (all orgs, or one org).
+
+    Streams grouped rows with ``allowDiskUse`` and writes them in batches, then
+    marks the organization(s) as served from the projection.
+    """
+    base_match: Dict[str, Any] = {"organization_id": org_id} if org_id else {}
+    written: Dict[str, int] = {}
+    orgs: set = set()
+
+    await db.agency_hotel_match_stats.delete_many(base_match)
+
+    for kind, (collection, date_field, counters) in _KIND_SOURCES.items():
+        pipeline = [
+            {"$match": {**base_match, date_field: {"$type": "date"}, "agency_id": {"$nin": [None, ""]}, "hotel_id": {"$nin": [None, ""]}}},
+            {
+                "$group": {
+                    "_id": {
+                        "organization_id": "$organization_id",
+                        "agency_id": {"$toString": "$agency_id"},
+                        "hotel_id": {"$toString": "$hotel_id"},
+                        "day": {"$dateTrunc": {"date": f"${date_field}", "unit": "day", "timezone": "UTC"}},
+                    },
+                    **counters,
+                }
+            },
+        ]
+        batch: List[ReplaceOne] = []
+        count = 0
+        async for row in db[collection].aggregate(pipeline, allowDiskUse=True):
+            key = row["_id"]
+            if not key.get("organization_id"):
+                continue
+            orgs.add(key["organization_id"])
+            doc = _bucket_doc(kind, key["organization_id"], key["agency_id"], key["hotel_id"], day_start(key["day"]), row)
+            batch.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+            if len(batch) >= _REBUILD_BATCH_SIZE:
+                await db.agency_hotel_match_stats.bulk_write(batch, ordered=False)
+                count += len(batch)
+                batch = []
+        if batch:
+            await db.agency_hotel_match_stats.bulk_write(batch, ordered=False)
+            count += len(batch)
+        written[kind] = count
+
+    if org_id:
+        orgs.add(org_id)
+    now = now_utc()
+    for org in orgs:
+        await db.agency_hotel_match_stats_state.update_one(
+            {"organization_id": org},
+            {"$set": {"organization_id": org, "rebuilt_at": now}},
+            upsert=True,
+        )
+
+    logger.info("Rebuilt agency_hotel_match_stats for %s: %s", org_id or "all orgs", written)
+    return written
+
+
+async def is_projection_ready(db, org_id: str) -> bool:
+    return await db.agency_hotel_match_stats_state.find_one({"organization_id": org_id}, {"_id": 1}) is not None
+
+
+# ── Read side ─────────────────────────────────────────────────
+
+async def load_match_summary_rows(db, org_id: str, days: int) -> List[Dict[str, Any]]:
+    """Per-pair booking totals over `days`, plus 7-day cancel repeat counts.
+
+    Rows are shaped like the legacy `$group` output (``_id`` = pair) with the
+    extra fields ``repeat_behavioral_7`` / ``repeat_operational_7``.
+    """
+    now = now_utc()
+    cutoff_day = day_start(now - timedelta(days=days))
+    seven_day = day_start(now - timedelta(days=7))
+
+    def _windowed(field: str, since: datetime) -> Dict[str, Any]:
+        return {"$sum": {"$cond": [{"$gte": ["$day", since]}, f"${field}", 0]}}
+
+    pipeline = [
+        {"$match": {"organization_id": org_id, "kind": KIND_BOOKINGS, "day": {"$gte": min(cutoff_day, seven_day)}}},
+        {
+            "$group": {
+                "_id": {"agency_id": "$agency_id", "hotel_id": "$hotel_id"},
+                "total": _windowed("total", cutoff_day),
+                "pending": _windowed("pending", cutoff_day),
+                "confirmed": _windowed("confirmed", cutoff_day),
+                "cancelled": _windowed("cancelled", cutoff_day),
+                "operational_cancelled": _windowed("operational_cancelled", cutoff_day),
+                "last_booking_at": {"$max": {"$cond": [{"$gte": ["$day", cutoff_day]}, "$last_booking_at", None]}},
+                "repeat_behavioral_7": _windowed("behavioral_cancelled", seven_day),
+                "repeat_operational_7": _windowed("operational_cancelled", seven_day),
+            }
+        },
+        {"$match": {"total": {"$gt": 0}}},
+        {"$sort": {"total": -1}},
+    ]
+    return await db.agency_hotel_match_stats.aggregate(pipeline).to_list(length=None)
+
+
+async def load_outcome_rows(db, org_id: str) -> Dict[str, Dict[str, int]]:
+    """Per-pair outcome metrics keyed by match id (``agency__hotel``).
+
+    Keys: no_show_total_7 / no_show_7 (by check-in date), verified_total_30 /
+    verified_no_show_30 / verified_no_show_7 (by outcome creation date).
+    """
+    now = now_utc()
+    seven_day = day_start(now - timedelta(days=7))
+    thirty_day = day_start(now - timedelta(days=30))
+    is_checkin = {"$eq": ["$kind", KIND_OUTCOMES_CHECKIN]}
+    is_created = {"$eq": ["$kind", KIND_OUTCOMES_CREATED]}
+
+    pipeline = [
+        {
+            "$match": {
+                "organization_id": org_id,
+                "$or": [
+                    {"kind": KIND_OUTCOMES_CHECKIN, "day": {"$gte": seven_day}},
+                    {"kind": KIND_OUTCOMES_CREATED, "day": {"$gte": thirty_day}},
+                ],
+            }
+        },
+        {
+            "$group": {
+                "_id": {"agency_id": "$agency_id", "hotel_id": "$hotel_id"},
+                "no_show_total_7": {"$sum": {"$cond": [is_checkin, "$outcomes_total", 0]}},
+                "no_show_7": {"$sum": {"$cond": [is_checkin, "$no_show", 0]}},
+                "verified_total_30": {"$sum": {"$cond": [is_created, "$verified_total", 0]}},
+                "verified_no_show_30": {"$sum": {"$cond": [is_created, "$verified_no_show", 0]}},
+                "verified_no_show_7": {
+                    "$sum": {"$cond": [{"$and": [is_created, {"$gte": ["$day", seven_day]}]}, "$verified_no_show", 0]}
+                },
+            }
+        },
+    ]
+    out: Dict[str, Dict[str, int]] = {}
+    async for row in db.agency_hotel_match_stats.aggregate(pipeline):
+        key = row.pop("_id") or {}
+        out[f"{key.get('agency_id')}__{key.get('hotel_id')}"] = {k: int(v or 0) for k, v in row.items()}
+    return out
+
+
+async def load_pair_metrics(db, org_id: str, agency_id: str, hotel_id: str, days: int) -> Dict[str, Any]:
+    """Totals + average approval hours for one pair over `days`."""
+    cutoff_day = day_start(now_utc() - timedelta(days=days))
+    pipeline = [
+        {
+            "$match": {
+                "organization_id": org_id,
+                "agency_id": agency_id,
+                "hotel_id": hotel_id,
+                "kind": KIND_BOOKINGS,
+                "day": {"$gte": cutoff_day},
+            }
+        },
+        {
+            "$group": {
+                "_id": None,
+                "total": {"$sum": "$total"},
+                "pending": {"$sum": "$pending"},
+                "confirmed": {"$sum": "$confirmed"},
+                "cancelled": {"$sum": "$cancelled"},
+                "approval_ms_sum": {"$sum": "$approval_ms_sum"},
+                "approval_count": {"$sum": "$approval_count"},
+            }
+        },
+    ]
+    rows = await db.agency_hotel_match_stats.aggregate(pipeline).to_list(length=1)
+    row = rows[0] if rows else {}
+    approval_count = int(row.get("approval_count") or 0)
+    return {
+        "total": int(row.get("total") or 0),
+        "pending": int(row.get("pending") or 0),
+        "confirmed": int(row.get("confirmed") or 0),
+        "cancelled": int(row.get("cancelled") or 0),
+        "avg_approval_hours": (
+            float(row.get("approval_ms_sum") or 0) / approval_count / 1000.0 / 3600.0 if approval_count else None
+        ),
+    }
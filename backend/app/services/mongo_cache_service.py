@@ -13,6 +13,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from app.db import get_db
+from app.indexes.manifest import report_index_failure
 
 logger = logging.getLogger("cache")
 
@@ -123,4 +124,5 @@ async def ensure_cache_indexes() -> None:
         await db[COLLECTION].create_index("category", name="idx_category")
         logger.info("Cache indexes ensured")
     except Exception as e:
+        report_index_failure("cache", e)
         logger.warning("Cache index creation warning: %s", e)
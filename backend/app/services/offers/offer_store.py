@@ -0,0 +1,166 @@
+"""Compact Redis store for search-session offers.
+
+One Redis hash per session, expiring together with the session metadata:
+
+    ss:{session_id}
+      _order      → [offer_token, ...]         (result order)
+      o:{token}   → canonical offer dict
+      p:{token}   → pricing overlay (B2B sessions only)
+
+Each value is a small blob: a 2-byte header (serializer, compressor) followed
+by the payload. msgpack + zstd when installed, JSON + zlib otherwise; readers
+decode either, so pods with different wheels can share sessions. Values
+under COMPRESS_MIN_BYTES are stored uncompressed.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional wheel
+    msgpack = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional wheel
+    zstandard = None  # type: ignore[assignment]
+
+logger = logging.getLogger("offers.offer_store")
+
+KEY_PREFIX = "ss:"
+ORDER_FIELD = "_order"
+OFFER_FIELD = "o:"
+OVERLAY_FIELD = "p:"
+COMPRESS_MIN_BYTES = 256
+ZSTD_LEVEL = 3
+
+_SER_MSGPACK, _SER_JSON = b"m", b"j"
+_CMP_ZSTD, _CMP_ZLIB, _CMP_NONE = b"z", b"d", b"n"
+
+
+def session_key(session_id: str) -> str:
+    return f"{KEY_PREFIX}{session_id}"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def encode(value: Any) -> bytes:
+    if msgpack is not None:
+        ser, raw = _SER_MSGPACK, msgpack.packb(value, default=_default, use_bin_type=True)
+    else:
+        ser, raw = _SER_JSON, json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return ser + _CMP_NONE + raw
+    if zstandard is not None:
+        return ser + _CMP_ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return ser + _CMP_ZLIB + zlib.compress(raw, 6)
+
+
+def decode(blob: bytes) -> Any:
+    ser, cmp, body = blob[:1], blob[1:2], blob[2:]
+    if cmp == _CMP_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this offer blob")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif cmp == _CMP_ZLIB:
+        body = zlib.decompress(body)
+
+    if ser == _SER_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("msgpack is required to read this offer blob")
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+async def _redis():
+    from app.infrastructure.redis_client import get_async_redis_binary
+    return await get_async_redis_binary()
+
+
+async def put_offers(
+    session_id: str,
+    offers: List[Dict[str, Any]],
+    *,
+    expires_at: datetime,
+    pricing_overlay_index: Optional[Dict[str, Any]] = None,
+) -> Optional[int]:
+    """Write a session's offers in one pipeline. Returns stored bytes, None without Redis."""
+    r = await _redis()
+    if r is None:
+        return None
+
+    mapping: Dict[str, bytes] = {ORDER_FIELD: encode([o["offer_token"] for o in offers])}
+    for o in offers:
+        mapping[OFFER_FIELD + o["offer_token"]] = encode(o)
+    for token, overlay in (pricing_overlay_index or {}).items():
+        mapping[OVERLAY_FIELD + token] = encode(overlay)
+
+    key = session_key(session_id)
+    try:
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expireat(key, expires_at)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("offer_store write failed [%s]: %s", session_id, e)
+        return None
+    return sum(len(v) for v in mapping.values())
+
+
+async def get_offer(session_id: str, offer_token: str) -> Optional[Dict[str, Any]]:
+    r = await _redis()
+    if r is None:
+        return None
+    try:
+        blob = await r.hget(session_key(session_id), OFFER_FIELD + offer_token)
+    except Exception as e:
+        logger.warning("offer_store offer read failed [%s]: %s", session_id, e)
+        return None
+    return decode(blob) if blob else None
+
+
+async def get_overlay(session_id: str, offer_token: str) -> Optional[Dict[str, Any]]:
+    r = await _redis()
+    if r is None:
+        return None
+    try:
+        blob = await r.hget(session_key(session_id), OVERLAY_FIELD + offer_token)
+    except Exception as e:
+        logger.warning("offer_store overlay read failed [%s]: %s", session_id, e)
+        return None
+    return decode(blob) if blob else None
+
+
+async def get_all(session_id: str) -> Optional[Dict[str, Any]]:
+    """Return {"offers": [...], "pricing_overlay_index": {...}} or None when expired."""
+    r = await _redis()
+    if r is None:
+        return None
+    try:
+        fields = await r.hgetall(session_key(session_id))
+    except Exception as e:
+        logger.warning("offer_store read failed [%s]: %s", session_id, e)
+        return None
+    if not fields:
+        return None
+
+    fields = {(k.decode() if isinstance(k, bytes) else k): v for k, v in fields.items()}
+    order: Iterable[str] = decode(fields[ORDER_FIELD]) if ORDER_FIELD in fields else []
+    offers = [decode(fields[OFFER_FIELD + t]) for t in order if OFFER_FIELD + t in fields]
+    overlays = {
+        k[len(OVERLAY_FIELD):]: decode(v) for k, v in fields.items() if k.startswith(OVERLAY_FIELD)
+    }
+    return {"offers": offers, "pricing_overlay_index": overlays}
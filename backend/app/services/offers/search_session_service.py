@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.services.offers import offer_store
 
 
 SEARCH_SESSION_TTL_MINUTES = 30
 
+OFFER_STORE_REDIS = "redis"
+OFFER_STORE_MONGO = "mongo"
+
+
+def offer_store_mode() -> str:
+    """SEARCH_SESSION_OFFER_STORE: redis (default) | mongo (legacy, whole session in one document)."""
+    mode = os.environ.get("SEARCH_SESSION_OFFER_STORE", OFFER_STORE_REDIS).strip().lower()
+    return OFFER_STORE_MONGO if mode == OFFER_STORE_MONGO else OFFER_STORE_REDIS
+
 
 def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
@@ -33,33 +44,81 @@ async def create_search_session(
     offers: List[Dict[str, Any]],
     pricing_overlay_index: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
+    """Persist a search session.
+
+    Offers (and pricing overlays) go to the compact Redis offer store keyed
+    per offer token; MongoDB keeps only session metadata. Without Redis (or
+    with SEARCH_SESSION_OFFER_STORE=mongo) the whole session is stored in
+    MongoDB as before (offer_store="mongo").
+    """
     now = _utc_now()
     expires_at = now + timedelta(minutes=SEARCH_SESSION_TTL_MINUTES)
+    oid = ObjectId()
+    session_id = str(oid)
 
-    # Build offer_index for quick lookup by offer_token
-    offer_index: Dict[str, Dict[str, Any]] = {}
-    for o in offers:
-        offer_index[o["offer_token"]] = {
-            "supplier_code": o["supplier_code"],
-            "supplier_offer_id": o["supplier_offer_id"],
-        }
-
-    doc = {
+    doc: Dict[str, Any] = {
+        "_id": oid,
         "organization_id": organization_id,
         "tenant_id": tenant_id,
         "created_at": now,
         "expires_at": expires_at,
         "query": query,
-        # Store canonical offers as plain dicts
-        "offers": offers,
-        "offer_index": offer_index,
-        "pricing_overlay_index": pricing_overlay_index or {},
+        "offer_count": len(offers),
     }
 
-    res = await db.search_sessions.insert_one(doc)
-    session_id = str(res.inserted_id)
+    stored_bytes = None
+    if offer_store_mode() == OFFER_STORE_REDIS:
+        stored_bytes = await offer_store.put_offers(
+            session_id, offers, expires_at=expires_at, pricing_overlay_index=pricing_overlay_index,
+        )
+    if stored_bytes is not None:
+        doc["offer_store"] = OFFER_STORE_REDIS
+        doc["offer_bytes"] = stored_bytes
+    else:
+        # Build offer_index for quick lookup by offer_token
+        offer_index: Dict[str, Dict[str, Any]] = {}
+        for o in offers:
+            offer_index[o["offer_token"]] = {
+                "supplier_code": o["supplier_code"],
+                "supplier_offer_id": o["supplier_offer_id"],
+            }
+        doc.update({
+            "offer_store": OFFER_STORE_MONGO,
+            # Store canonical offers as plain dicts
+            "offers": offers,
+            "offer_index": offer_index,
+            "pricing_overlay_index": pricing_overlay_index or {},
+        })
+
+    await db.search_sessions.insert_one(doc)
+
+    return {"session_id": session_id, "expires_at": expires_at, "offers": offers}
+
+
+async def _session_meta(
+    db: AsyncIOMotorDatabase,
+    organization_id: str,
+    session_id: str,
+    projection: Optional[Dict[str, int]] = None,
+) -> Optional[Dict[str, Any]]:
+    try:
+        oid = ObjectId(session_id)
+    except Exception:
+        return None
+    return await db.search_sessions.find_one({"_id": oid, "organization_id": organization_id}, projection)
+
+
+async def hydrate_search_session(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Attach offers + pricing overlays to a metadata document.
 
-    return {"session_id": session_id, "expires_at": expires_at, "offers": doc["offers"]}
+    Returns None when the offers have already expired from Redis.
+    """
+    if not doc or doc.get("offer_store") != OFFER_STORE_REDIS:
+        return doc
+    stored = await offer_store.get_all(str(doc["_id"]))
+    if stored is None:
+        return None
+    return {**doc, **stored}
 
 
 async def get_search_session(
@@ -68,13 +127,24 @@ async def get_search_session(
     organization_id: str,
     session_id: str,
 ) -> Optional[Dict[str, Any]]:
-    try:
-        oid = ObjectId(session_id)
-    except Exception:
-        return None
+    doc = await _session_meta(db, organization_id, session_id)
+    return await hydrate_search_session(doc)
 
-    doc = await db.search_sessions.find_one({"_id": oid, "organization_id": organization_id})
-    return doc
+
+async def get_offer_overlay(
+    db: AsyncIOMotorDatabase,
+    *,
+    organization_id: str,
+    session_id: str,
+    offer_token: str,
+) -> Optional[Dict[str, Any]]:
+    """Pricing overlay captured at search time for one offer."""
+    meta = await _session_meta(db, organization_id, session_id, {"offer_store": 1, "pricing_overlay_index": 1})
+    if not meta:
+        return None
+    if meta.get("offer_store") == OFFER_STORE_REDIS:
+        return await offer_store.get_overlay(session_id, offer_token)
+    return (meta.get("pricing_overlay_index") or {}).get(offer_token)
 
 
 async def find_offer_in_session(
@@ -84,6 +154,12 @@ async def find_offer_in_session(
     session_id: str,
     offer_token: str,
 ) -> Optional[Dict[str, Any]]:
+    meta = await _session_meta(db, organization_id, session_id, {"offer_store": 1})
+    if not meta:
+        return None
+    if meta.get("offer_store") == OFFER_STORE_REDIS:
+        return await offer_store.get_offer(session_id, offer_token)
+
     session = await get_search_session(db, organization_id=organization_id, session_id=session_id)
     if not session:
         return None
@@ -11,6 +11,7 @@ from datetime import datetime, timezone, timedelta
 from typing import Optional
 
 from app.db import get_db
+from app.repositories.base_repository import keyset_page
 from app.services.order_event_service import append_event
 from app.services.order_mapping_service import map_booking_to_order_item
 
@@ -140,6 +141,41 @@ async def create_order(
 
 # ── Read Orders ──
 
+async def _page_orders(db, query: dict, *, skip: int, limit: int, cursor: Optional[str]) -> dict:
+    """Keyset page (created_at desc, order_id) unless a legacy offset is requested.
+
+    The total is counted on the first page only; cursor pages return None.
+    """
+    if cursor or skip == 0:
+        page = await keyset_page(
+            db.orders,
+            query,
+            sort=[("created_at", -1)],
+            tie_breaker="order_id",
+            limit=limit,
+            cursor=cursor,
+            projection={"_id": 0},
+            count="exact",
+        )
+        return {
+            "orders": page["items"],
+            "total": page["total"],
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": page["next_cursor"],
+        }
+
+    total = await db.orders.count_documents(query)
+    docs_cursor = (
+        db.orders.find(query, {"_id": 0})
+        .sort("created_at", -1)
+        .skip(skip)
+        .limit(limit)
+    )
+    orders = await docs_cursor.to_list(length=limit)
+    return {"orders": orders, "total": total, "skip": skip, "limit": limit}
+
+
 async def get_orders(
     org_id: str = "default_org",
     skip: int = 0,
@@ -147,6 +183,7 @@ async def get_orders(
     status: Optional[str] = None,
     channel: Optional[str] = None,
     agency_id: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> dict:
     """List orders with pagination and filters."""
     db = await get_db()
@@ -158,15 +195,7 @@ async def get_orders(
     if agency_id:
         query["agency_id"] = agency_id
 
-    total = await db.orders.count_documents(query)
-    cursor = (
-        db.orders.find(query, {"_id": 0})
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
-    )
-    orders = await cursor.to_list(length=limit)
-    return {"orders": orders, "total": total, "skip": skip, "limit": limit}
+    return await _page_orders(db, query, skip=skip, limit=limit, cursor=cursor)
 
 
 async def get_order_by_id(order_id: str) -> Optional[dict]:
@@ -215,6 +244,7 @@ async def search_orders(
     date_to: Optional[str] = None,
     settlement_status: Optional[str] = None,
     q: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> dict:
     """Advanced search with multiple filters."""
     db = await get_db()
@@ -259,17 +289,9 @@ async def search_orders(
         if matching_order_ids:
             query["order_id"] = {"$in": matching_order_ids}
         else:
-            return {"orders": [], "total": 0, "skip": skip, "limit": limit}
+            return {"orders": [], "total": 0, "skip": skip, "limit": limit, "next_cursor": None}
 
-    total = await db.orders.count_documents(query)
-    cursor = (
-        db.orders.find(query, {"_id": 0})
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
-    )
-    orders = await cursor.to_list(length=limit)
-    return {"orders": orders, "total": total, "skip": skip, "limit": limit}
+    return await _page_orders(db, query, skip=skip, limit=limit, cursor=cursor)
 
 
 # ── Update Order ──
@@ -5,6 +5,11 @@ NOT read from environment variables — they are loaded by the router from the
 encrypted `supplier_credentials` collection (per-agency). The constructor
 requires explicit `base_url` and `token` arguments.
 
+Connections are not owned by the instance: `_post` goes through the pooled,
+rate-limited client the adapter registry keeps per (base_url, token), so
+constructing a `PaximumClient` per request still reuses keep-alive
+connections.
+
 This client keeps the surface intentionally thin — a `_post` helper plus
 one method per documented endpoint. Higher-level orchestration (search→
 checkAvailability→placeOrder) lives in the proxy router.
@@ -17,6 +22,7 @@ from typing import Any, Dict, List, Optional
 import httpx
 
 from app.services.paximum.errors import PaximumError
+from app.services.suppliers.registry import registry
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +30,7 @@ DEFAULT_TIMEOUT_SECONDS = 60.0
 
 
 class PaximumClient:
-    """Stateless wrapper around the Paximum REST API."""
+    """Thin wrapper around the Paximum REST API (connections are pooled per account)."""
 
     def __init__(self, *, base_url: str, token: str,
                  timeout: float = DEFAULT_TIMEOUT_SECONDS):
@@ -33,6 +39,7 @@ class PaximumClient:
         self._base_url = base_url.rstrip("/")
         self._token = token
         self._timeout = timeout
+        self._http = registry.clients.get("paximum", self._base_url, token)
 
     # ───────────────── Low-level helper ─────────────────
 
@@ -42,11 +49,9 @@ class PaximumClient:
             "Authorization": f"Bearer {self._token}",
             "Content-Type": "application/json; charset=utf-8",
             "Accept": "application/json",
-            "Accept-Encoding": "gzip, deflate",
         }
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as cli:
-                resp = await cli.post(url, headers=headers, json=body)
+            resp = await self._http.request_json("POST", url, body, headers=headers, timeout=self._timeout, operation=path)
         except httpx.TimeoutException as exc:
             logger.warning("Paximum timeout %s: %s", path, exc)
             raise PaximumError(504, f"Paximum yanıt vermedi (timeout): {path}") from exc
@@ -5,22 +5,27 @@ Collects:
 - Error rates
 - Booking throughput
 - System metrics
+
+Request durations and error counts live in the fixed-bucket registry
+(app.infrastructure.metrics_registry): constant cost per request, merged
+across workers when scraped.
 """
 from __future__ import annotations
 
 import logging
-import time
 from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Optional
 
 from app.db import get_db
+from app.infrastructure.metrics_registry import merged_snapshot, quantile, registry, render_prometheus
 
 logger = logging.getLogger("prometheus")
 
+HTTP_DURATION_METRIC = "http_request_duration_seconds"
+HTTP_ERRORS_METRIC = "http_errors_total"
+
 # In-memory counters (reset on restart, supplemented by DB)
-_request_durations: list[dict[str, Any]] = []
-_error_counts: dict[str, int] = defaultdict(int)
 _booking_counts: dict[str, int] = defaultdict(int)
 _supplier_metrics: dict[str, dict[str, Any]] = defaultdict(lambda: {
     "search_count": 0, "search_latency_sum": 0.0,
@@ -32,21 +37,25 @@ _search_metrics: dict[str, dict[str, int]] = defaultdict(lambda: {
 })
 
 
-def record_request_duration(method: str, path: str, status_code: int, duration_ms: float) -> None:
-    """Record a request duration (in-memory, flushed periodically)."""
-    _request_durations.append({
-        "method": method,
-        "path": _normalize_path(path),
-        "status_code": status_code,
-        "duration_ms": duration_ms,
-        "timestamp": time.time(),
-    })
-    # Keep only last 10000 entries
-    if len(_request_durations) > 10000:
-        _request_durations.pop(0)
-
+def record_request_duration(
+    method: str,
+    path: str,
+    status_code: int,
+    duration_ms: float,
+    route: Optional[str] = None,
+) -> None:
+    """Record a request duration into the route's latency histogram.
+
+    ``route`` is the matched route template (``/api/bookings/{booking_id}``);
+    without it the raw path is normalized.
+    """
+    registry.observe(
+        HTTP_DURATION_METRIC,
+        duration_ms / 1000,
+        {"method": method, "route": route or _normalize_path(path)},
+    )
     if status_code >= 400:
-        _error_counts[f"{status_code}"] += 1
+        registry.inc(HTTP_ERRORS_METRIC, labels={"status": str(status_code)})
 
 
 def record_booking_event(event_type: str) -> None:
@@ -110,33 +119,26 @@ async def generate_prometheus_metrics() -> str:
     now = datetime.now(timezone.utc)
     lines: list[str] = []
 
-    # --- API Response Time ---
+    snap = merged_snapshot()
+
+    # --- API Response Time (legacy avg/p95 lines, from the histograms) ---
     lines.append("# HELP http_request_duration_ms HTTP request duration in milliseconds")
     lines.append("# TYPE http_request_duration_ms summary")
-
-    # Aggregate recent durations by path
-    path_stats: dict[str, list[float]] = defaultdict(list)
-    cutoff = time.time() - 300  # Last 5 minutes
-    for entry in _request_durations:
-        if entry["timestamp"] > cutoff:
-            key = f'{entry["method"]}_{entry["path"]}'
-            path_stats[key].append(entry["duration_ms"])
-
-    for path_key, durations in path_stats.items():
-        avg = sum(durations) / len(durations) if durations else 0
-        p95 = sorted(durations)[int(len(durations) * 0.95)] if durations else 0
-        count = len(durations)
-        safe_key = path_key.replace('"', '').replace('\n', '')
-        lines.append(f'http_request_duration_ms_avg{{path="{safe_key}"}} {avg:.1f}')
-        lines.append(f'http_request_duration_ms_p95{{path="{safe_key}"}} {p95:.1f}')
+    for (name, labels), (bounds, counts, total) in sorted(snap["histograms"].items()):
+        count = sum(counts)
+        if name != HTTP_DURATION_METRIC or not count:
+            continue
+        label = dict(labels)
+        safe_key = f'{label.get("method", "")}_{label.get("route", "")}'.replace('"', '').replace('\n', '')
+        lines.append(f'http_request_duration_ms_avg{{path="{safe_key}"}} {total / count * 1000:.1f}')
+        lines.append(f'http_request_duration_ms_p95{{path="{safe_key}"}} {quantile(bounds, counts, 0.95) * 1000:.1f}')
         lines.append(f'http_request_count{{path="{safe_key}"}} {count}')
 
-    # --- Error Rate ---
+    # --- Registry: latency histograms, error counts, observability counters ---
     lines.append("")
+    lines.append("# HELP http_request_duration_seconds HTTP request duration by route")
     lines.append("# HELP http_errors_total HTTP errors by status code")
-    lines.append("# TYPE http_errors_total counter")
-    for status, count in _error_counts.items():
-        lines.append(f'http_errors_total{{status="{status}"}} {count}')
+    lines.append(render_prometheus(snap).rstrip("\n"))
 
     # --- Booking Throughput ---
     lines.append("")
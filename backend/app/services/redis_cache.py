@@ -269,15 +269,43 @@ async def multilayer_cached(
     mongo_ttl: int = 300,
     tenant_id: str = "",
     category: str = "",
+    stale_ttl: Optional[int] = None,
 ) -> Any:
     """L1 Redis → L2 MongoDB → Compute.
 
     Redis has shorter TTL (hot, in-memory).
     MongoDB has longer TTL (warm, persistent).
     Tracks metrics for all operations.
+
+    Misses are single-flighted (see single_flight): one computation per key
+    across concurrent callers and pods. Redis entries past ``redis_ttl`` are
+    served stale for ``stale_ttl`` seconds while one background refresh runs.
     """
     import time as _time
     from app.services import cache_metrics as cm
+    from app.services import single_flight as sf
+
+    stale_ttl = sf.STALE_SECONDS if stale_ttl is None else stale_ttl
+    flight_key = _make_key(key, tenant_id)
+
+    async def _compute_and_store() -> Any:
+        t2 = _time.monotonic()
+        result = await sf.call(compute_fn)
+        compute_s = _time.monotonic() - t2
+        cm.record_latency("compute", round(compute_s * 1000, 2))
+
+        # Store in both layers
+        await redis_set(key, sf.wrap(result, redis_ttl, compute_s), redis_ttl + stale_ttl, tenant_id)
+        try:
+            from app.services.cache_service import cache_set as mongo_set
+            await mongo_set(key, result, mongo_ttl, tenant_id)
+        except Exception:
+            pass
+        return result
+
+    async def _probe() -> Any:
+        entry = await redis_get(key, tenant_id)
+        return None if entry is None else sf.unwrap(entry)[0]
 
     # L1: Redis
     t0 = _time.monotonic()
@@ -287,14 +315,16 @@ async def multilayer_cached(
 
     if redis_hit is not None:
         cm.hit("redis")
-        return redis_hit
+        value, meta = sf.unwrap(redis_hit)
+        sf.revalidate(flight_key, meta, _compute_and_store)
+        return value
 
     cm.miss("redis")
 
     # L2: MongoDB fallback
     mongo_hit = None
     try:
-        from app.services.cache_service import cache_get as mongo_get, cache_set as mongo_set
+        from app.services.cache_service import cache_get as mongo_get
         t1 = _time.monotonic()
         mongo_hit = await mongo_get(key, tenant_id)
         l2_ms = round((_time.monotonic() - t1) * 1000, 2)
@@ -304,28 +334,15 @@ async def multilayer_cached(
             cm.hit("mongo")
             cm.fallback("redis", "mongo")
             # Promote to L1
-            await redis_set(key, mongo_hit, redis_ttl, tenant_id)
+            await redis_set(key, sf.wrap(mongo_hit, redis_ttl), redis_ttl + stale_ttl, tenant_id)
             return mongo_hit
         cm.miss("mongo")
     except Exception as e:
         logger.warning("Mongo L2 read failed for key=%s: %s", key, e)
         cm.miss("mongo")
 
-    # Compute
-    t2 = _time.monotonic()
-    result = await compute_fn()
-    compute_ms = round((_time.monotonic() - t2) * 1000, 2)
-    cm.record_latency("compute", compute_ms)
-
-    # Store in both layers
-    await redis_set(key, result, redis_ttl, tenant_id)
-    try:
-        from app.services.cache_service import cache_set as mongo_set
-        await mongo_set(key, result, mongo_ttl, tenant_id)
-    except Exception:
-        pass
-
-    return result
+    # Compute (once per key)
+    return await sf.coalesce(flight_key, _compute_and_store, probe=_probe)
 
 
 async def multilayer_invalidate(key: str, tenant_id: str = "") -> dict[str, Any]:
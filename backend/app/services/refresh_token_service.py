@@ -14,6 +14,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from app.db import get_db
+from app.indexes.manifest import report_index_failure
 from app.services.refresh_token_crypto import generate_refresh_token, hash_refresh_token
 from app.services.session_service import get_active_session, revoke_session, set_session_refresh_family, update_session_last_seen
 
@@ -195,4 +196,5 @@ async def ensure_refresh_token_indexes() -> None:
         )
         logger.info("Refresh token indexes ensured")
     except Exception as e:
+        report_index_failure("refresh_tokens", e)
         logger.warning("Refresh token index creation warning: %s", e)
@@ -8,7 +8,7 @@ from fastapi import HTTPException
 from app.constants.usage_metrics import UsageMetric
 from app.constants.booking_statuses import can_transition, get_status_label
 from app.db import get_db
-from app.services.inventory import consume_inventory, release_inventory
+from app.services.inventory import InventoryUnavailable, allocate_stay, confirm_stay, release_inventory, release_stay
 from app.services.pricing import calc_price_for_date
 from app.services.quota_enforcement_service import enforce_quota_or_raise
 from app.services.usage_service import track_reservation_created
@@ -58,14 +58,12 @@ async def create_reservation(*, org_id: str, user_email: str, payload: dict[str,
     else:
         dates = [start_date]
 
-    consumed: list[str] = []
-    for d in dates:
-        ok = await consume_inventory(org_id, payload["product_id"], d, pax)
-        if not ok:
-            for rd in consumed:
-                await release_inventory(org_id, product_oid, rd, pax)
-            raise HTTPException(status_code=409, detail=f"Müsaitlik yok: {d}")
-        consumed.append(d)
+    # All nights or none; the hold expires on its own if this request dies
+    # before the reservation is written (see inventory.release_expired_holds).
+    try:
+        hold = await allocate_stay(org_id, product_oid, dates, pax)
+    except InventoryUnavailable as exc:
+        raise HTTPException(status_code=409, detail=f"Müsaitlik yok: {exc.date}")
 
     currency = (rate_plan or {}).get("currency") or "TRY"
     total = 0.0
@@ -128,9 +126,15 @@ async def create_reservation(*, org_id: str, user_email: str, payload: dict[str,
         "updated_at": now_utc(),
         "created_by": user_email,
         "updated_by": user_email,
+        "inventory_hold_id": hold["hold_id"],
     }
 
-    ins = await db.reservations.insert_one(res_doc)
+    try:
+        ins = await db.reservations.insert_one(res_doc)
+    except Exception:
+        await release_stay(org_id, product_oid, hold["hold_id"])
+        raise
+    await confirm_stay(org_id, product_oid, hold["hold_id"])
     saved = await db.reservations.find_one({"_id": ins.inserted_id})
     assert saved
 
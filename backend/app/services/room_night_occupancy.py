@@ -0,0 +1,517 @@
+"""Room-night occupancy ledger.
+
+One document per hotel × room_type × night in ``room_night_occupancy``:
+
+  {_id: "<org>:<hotel>:<room_type>:<date>", organization_id, hotel_id,
+   room_type, date,
+   occ:  {booking_id: room_id},     # active bookings holding a room
+   blk:  {block_id: room_id},       # active out-of-order/service blocks
+   chan: {booking_id: channel}}     # bookings counted against allotments
+
+Entries are keyed by the source id, so applying a booking or block is
+idempotent: its previous entries (tracked in ``room_night_occupancy_sources``)
+are unset and the current ones written. compute_availability then needs a
+range read of the stay's nights instead of loading every booking and block
+of the hotel.
+
+A hotel uses the ledger once it has been rebuilt
+(inventory_snapshot_service.rebuild_room_night_occupancy), which records the
+covered horizon in ``room_night_occupancy_state``; until then, and for stays
+past the horizon, availability is computed from the source collections.
+
+Keeping it current:
+
+- booking_lifecycle hooks and the ``refresh_room_night_occupancy`` outbox
+  consumer re-apply a booking as soon as its events are processed
+- ``reconcile_hotel`` (Celery beat, every RECONCILE_INTERVAL_SECONDS)
+  re-applies every booking changed since the previous pass, whichever code
+  path wrote it, and applies room blocks (added, changed or removed; they
+  have no writer in this API)
+- a ledger not reconciled within LEDGER_MAX_LAG_SECONDS is not trusted:
+  availability falls back to the source collections until the next pass
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.utils import now_utc
+
+logger = logging.getLogger("room_night_occupancy")
+
+LEDGER = "room_night_occupancy"
+SOURCES = "room_night_occupancy_sources"
+STATE = "room_night_occupancy_state"
+
+ACTIVE_BOOKING_STATUSES = ["confirmed", "guaranteed", "checked_in"]
+ACTIVE_BLOCK_STATUSES = ["active"]
+BLOCK_TYPES = ["out_of_order", "out_of_service", "maintenance"]
+# Open-ended blocks are materialized this far past their start.
+OPEN_BLOCK_HORIZON_DAYS = 730
+_FIELDS = ("occ", "blk", "chan")
+
+RECONCILE_INTERVAL_SECONDS = 60
+# Re-read writes that landed while the previous pass was running.
+RECONCILE_OVERLAP = timedelta(minutes=2)
+LEDGER_MAX_LAG_SECONDS = int(os.environ.get("ROOM_NIGHT_LEDGER_MAX_LAG_S", "900"))
+
+
+def parse_date(value: Any) -> Optional[date]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+def _nights(start: date, end: date) -> Iterable[str]:
+    cur = start
+    while cur < end:
+        yield cur.isoformat()
+        cur += timedelta(days=1)
+
+
+def _ledger_id(org_id: str, hotel_id: str, room_type: str, night: str) -> str:
+    return f"{org_id}:{hotel_id}:{room_type}:{night}"
+
+
+def _digest(entries: Iterable[Tuple[str, str, str, str]]) -> str:
+    return hashlib.sha1(repr(sorted(entries)).encode("utf-8")).hexdigest()
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def booking_stay(booking: Dict[str, Any]) -> Tuple[Optional[date], Optional[date]]:
+    stay = booking.get("stay") or {}
+    return (
+        parse_date(stay.get("check_in") or booking.get("check_in") or booking.get("start_date")),
+        parse_date(stay.get("check_out") or booking.get("check_out") or booking.get("end_date")),
+    )
+
+
+def booking_entries(booking: Dict[str, Any], room_types: Dict[str, str]) -> List[Tuple[str, str, str, str]]:
+    """(room_type, night, field, value) entries for an active booking.
+
+    ``occ`` follows the booked room's type; ``chan`` follows the rate's
+    room type (``rate_snapshot.room_type_id`` = "rt_<type>"), the same
+    attribution compute_availability used for allotment counts.
+    """
+    if booking.get("status") not in ACTIVE_BOOKING_STATUSES:
+        return []
+    check_in, check_out = booking_stay(booking)
+    if not check_in or not check_out:
+        return []
+    entries: List[Tuple[str, str, str, str]] = []
+    room_id = str(booking.get("room_id") or "")
+    room_type = room_types.get(room_id)
+    rate_type_id = str((booking.get("rate_snapshot") or {}).get("room_type_id") or "")
+    channel = booking.get("channel")
+    for night in _nights(check_in, check_out):
+        if room_type:
+            entries.append((room_type, night, "occ", room_id))
+        if channel and rate_type_id.startswith("rt_"):
+            entries.append((rate_type_id[3:], night, "chan", str(channel)))
+    return entries
+
+
+def block_entries(block: Dict[str, Any], room_types: Dict[str, str]) -> List[Tuple[str, str, str, str]]:
+    if block.get("status") not in ACTIVE_BLOCK_STATUSES or block.get("type") not in BLOCK_TYPES:
+        return []
+    room_id = str(block.get("room_id") or "")
+    room_type = room_types.get(room_id)
+    start = parse_date(block.get("start_date"))
+    if not room_type or not start:
+        return []
+    end = parse_date(block.get("end_date")) or start + timedelta(days=OPEN_BLOCK_HORIZON_DAYS)
+    return [(room_type, night, "blk", room_id) for night in _nights(start, end)]
+
+
+async def room_types_by_id(db, organization_id: str, hotel_id: str) -> Dict[str, str]:
+    rooms = await db.rooms.find(
+        {"tenant_id": hotel_id, "organization_id": organization_id},
+        {"room_type": 1},
+    ).to_list(5000)
+    return {str(r["_id"]): r.get("room_type", "standard") for r in rooms}
+
+
+async def apply_source(
+    db,
+    organization_id: str,
+    hotel_id: str,
+    source_key: str,
+    entry_key: str,
+    entries: List[Tuple[str, str, str, str]],
+) -> int:
+    """Replace one booking's/block's ledger entries. Returns ledger docs written.
+
+    Entries are overwritten in place (never unset-then-set), so a concurrent
+    availability read never sees the source missing from a night it keeps.
+    """
+    previous = await db[SOURCES].find_one({"_id": source_key}) or {}
+    per_doc: Dict[str, Dict[str, Any]] = {}
+    for room_type, night, field, value in entries:
+        doc_id = _ledger_id(organization_id, hotel_id, room_type, night)
+        slot = per_doc.setdefault(doc_id, {"room_type": room_type, "date": night, "fields": {}})
+        slot["fields"][field] = value
+
+    now = now_utc()
+    ops: List[UpdateOne] = []
+    for doc_id, slot in per_doc.items():
+        update: Dict[str, Any] = {
+            "$set": {**{f"{f}.{entry_key}": v for f, v in slot["fields"].items()}, "updated_at": now},
+            "$setOnInsert": {
+                "organization_id": organization_id,
+                "hotel_id": hotel_id,
+                "room_type": slot["room_type"],
+                "date": slot["date"],
+            },
+        }
+        unset = {f"{f}.{entry_key}": "" for f in _FIELDS if f not in slot["fields"]}
+        if unset:
+            update["$unset"] = unset
+        ops.append(UpdateOne({"_id": doc_id}, update, upsert=True))
+    if ops:
+        await db[LEDGER].bulk_write(ops, ordered=False)
+
+    stale = [i for i in previous.get("doc_ids") or [] if i not in per_doc]
+    if stale:
+        await db[LEDGER].update_many(
+            {"_id": {"$in": stale}},
+            {"$unset": {f"{f}.{entry_key}": "" for f in _FIELDS}},
+        )
+
+    if per_doc:
+        await db[SOURCES].update_one(
+            {"_id": source_key},
+            {"$set": {
+                "organization_id": organization_id,
+                "hotel_id": hotel_id,
+                "kind": source_key.split(":", 1)[0],
+                "doc_ids": sorted(per_doc),
+                "digest": _digest(entries),
+                "updated_at": now,
+            }},
+            upsert=True,
+        )
+    elif previous:
+        await db[SOURCES].delete_one({"_id": source_key})
+    return len(per_doc)
+
+
+async def apply_booking(db, booking: Dict[str, Any], room_types: Optional[Dict[str, str]] = None) -> int:
+    org_id = booking.get("organization_id")
+    hotel_id = booking.get("hotel_id")
+    if not org_id or not hotel_id:
+        return 0
+    if room_types is None:
+        room_types = await room_types_by_id(db, org_id, hotel_id)
+    booking_id = str(booking["_id"])
+    return await apply_source(
+        db, org_id, hotel_id, f"booking:{booking_id}", booking_id, booking_entries(booking, room_types),
+    )
+
+
+async def apply_block(db, block: Dict[str, Any], room_types: Optional[Dict[str, str]] = None) -> int:
+    org_id = block.get("organization_id")
+    hotel_id = block.get("tenant_id")
+    if not org_id or not hotel_id:
+        return 0
+    if room_types is None:
+        room_types = await room_types_by_id(db, org_id, hotel_id)
+    block_id = str(block["_id"])
+    return await apply_source(
+        db, org_id, hotel_id, f"block:{block_id}", block_id, block_entries(block, room_types),
+    )
+
+
+async def refresh_booking_occupancy(
+    db,
+    organization_id: str,
+    booking_id: str,
+    hotel_id: Optional[str] = None,
+) -> int:
+    """Re-apply a booking after a state change (best-effort; logs on failure)."""
+    try:
+        from app.utils import to_object_id
+
+        # Cheap exit for hotels without a ledger, before loading the booking.
+        if hotel_id and not await ledger_horizon(db, organization_id, hotel_id, fresh_only=False):
+            return 0
+        booking = await db.bookings.find_one({"_id": booking_id, "organization_id": organization_id})
+        if booking is None:
+            try:
+                booking = await db.bookings.find_one(
+                    {"_id": to_object_id(booking_id), "organization_id": organization_id},
+                )
+            except Exception:
+                booking = None
+        if booking is None or not booking.get("hotel_id"):
+            return 0
+        if not hotel_id and not await ledger_horizon(db, organization_id, booking["hotel_id"], fresh_only=False):
+            return 0
+        return await apply_booking(db, booking)
+    except Exception as exc:
+        logger.warning("occupancy ledger refresh failed for booking %s: %s", booking_id, exc)
+        return 0
+
+
+async def ledger_horizon(
+    db, organization_id: str, hotel_id: str, *, fresh_only: bool = True,
+) -> Optional[str]:
+    """Last night (exclusive) the ledger covers for this hotel.
+
+    None if it was never built or, with ``fresh_only``, if neither a rebuild
+    nor a reconcile pass ran within LEDGER_MAX_LAG_SECONDS.
+    """
+    state = await db[STATE].find_one(
+        {"_id": f"{organization_id}:{hotel_id}"}, {"horizon_end": 1, "built_at": 1, "reconciled_at": 1},
+    )
+    if not state:
+        return None
+    if fresh_only:
+        checked = [_aware(t) for t in (state.get("built_at"), state.get("reconciled_at")) if t]
+        if not checked or (now_utc() - max(checked)).total_seconds() > LEDGER_MAX_LAG_SECONDS:
+            return None
+    return state.get("horizon_end")
+
+
+async def read_stay(
+    db,
+    organization_id: str,
+    hotel_id: str,
+    check_in: str,
+    check_out: str,
+    room_ids: Optional[set] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Range read + reduce for a stay.
+
+    Per room type: room ids occupied / blocked on any night, the busiest
+    night's unavailable room count (the min-reduce over free rooms), and the
+    busiest night's sold count per channel. `room_ids` restricts occupancy
+    to those rooms (e.g. the hotel's active rooms).
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    cursor = db[LEDGER].find(
+        {
+            "organization_id": organization_id,
+            "hotel_id": hotel_id,
+            "date": {"$gte": check_in, "$lt": check_out},
+        },
+        {"room_type": 1, "occ": 1, "blk": 1, "chan": 1},
+    )
+    async for doc in cursor:
+        agg = out.setdefault(doc["room_type"], {
+            "occupied": set(), "blocked": set(), "max_unavailable": 0, "max_channel_sold": Counter(),
+        })
+        occ = set((doc.get("occ") or {}).values())
+        blk = set((doc.get("blk") or {}).values())
+        if room_ids is not None:
+            occ &= room_ids
+            blk &= room_ids
+        agg["occupied"] |= occ
+        agg["blocked"] |= blk
+        agg["max_unavailable"] = max(agg["max_unavailable"], len(occ | blk))
+        for channel, sold in Counter((doc.get("chan") or {}).values()).items():
+            if sold > agg["max_channel_sold"][channel]:
+                agg["max_channel_sold"][channel] = sold
+    return out
+
+
+async def rebuild_hotel(
+    db,
+    organization_id: str,
+    hotel_id: str,
+    *,
+    horizon_days: int = OPEN_BLOCK_HORIZON_DAYS,
+) -> Dict[str, Any]:
+    """Recompute the hotel's ledger from bookings and blocks."""
+    started = now_utc()
+    state_id = f"{organization_id}:{hotel_id}"
+    # Availability falls back to the source collections while the ledger is rebuilt.
+    await db[STATE].delete_one({"_id": state_id})
+    room_types = await room_types_by_id(db, organization_id, hotel_id)
+    await db[LEDGER].delete_many({"organization_id": organization_id, "hotel_id": hotel_id})
+    await db[SOURCES].delete_many({"organization_id": organization_id, "hotel_id": hotel_id})
+
+    # Aggregate every entry in memory, then write each ledger doc once.
+    docs: Dict[str, Dict[str, Any]] = {}
+    sources: Dict[str, set] = {}
+    digests: Dict[str, str] = {}
+
+    def _add(source_key: str, entry_key: str, entries):
+        digests[source_key] = _digest(entries)
+        for room_type, night, field, value in entries:
+            doc_id = _ledger_id(organization_id, hotel_id, room_type, night)
+            doc = docs.setdefault(doc_id, {
+                "_id": doc_id, "organization_id": organization_id, "hotel_id": hotel_id,
+                "room_type": room_type, "date": night, "occ": {}, "blk": {}, "chan": {},
+            })
+            doc[field][entry_key] = value
+            sources.setdefault(source_key, set()).add(doc_id)
+
+    bookings = 0
+    async for booking in db.bookings.find(
+        {"hotel_id": hotel_id, "organization_id": organization_id, "status": {"$in": ACTIVE_BOOKING_STATUSES}},
+    ):
+        bookings += 1
+        _add(f"booking:{booking['_id']}", str(booking["_id"]), booking_entries(booking, room_types))
+
+    blocks = 0
+    async for block in db.room_blocks.find(
+        {"tenant_id": hotel_id, "organization_id": organization_id, "status": {"$in": ACTIVE_BLOCK_STATUSES}},
+    ):
+        blocks += 1
+        _add(f"block:{block['_id']}", str(block["_id"]), block_entries(block, room_types))
+
+    batch: List[Dict[str, Any]] = []
+    for doc in docs.values():
+        doc["updated_at"] = started
+        batch.append(doc)
+        if len(batch) >= 1000:
+            await db[LEDGER].insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db[LEDGER].insert_many(batch, ordered=False)
+
+    source_ops = [
+        UpdateOne(
+            {"_id": key},
+            {"$set": {
+                "organization_id": organization_id,
+                "hotel_id": hotel_id,
+                "kind": key.split(":", 1)[0],
+                "doc_ids": sorted(ids),
+                "digest": digests[key],
+                "updated_at": started,
+            }},
+            upsert=True,
+        )
+        for key, ids in sources.items()
+    ]
+    for i in range(0, len(source_ops), 1000):
+        await db[SOURCES].bulk_write(source_ops[i:i + 1000], ordered=False)
+
+    horizon_end = (started.astimezone(timezone.utc).date() + timedelta(days=horizon_days)).isoformat()
+    await db[STATE].update_one(
+        {"_id": state_id},
+        {"$set": {
+            "organization_id": organization_id,
+            "hotel_id": hotel_id,
+            "built_at": started,
+            "reconciled_at": started,
+            "horizon_end": horizon_end,
+            "ledger_docs": len(docs),
+        }},
+        upsert=True,
+    )
+    summary = {"bookings": bookings, "blocks": blocks, "ledger_docs": len(docs), "horizon_end": horizon_end}
+    logger.info("occupancy ledger rebuilt hotel=%s %s", hotel_id, summary)
+    return summary
+
+
+async def _reconcile_blocks(db, organization_id: str, hotel_id: str, room_types: Dict[str, str]) -> int:
+    """Apply added/changed/removed room blocks; unchanged ones are skipped."""
+    known = {
+        doc["_id"]: doc.get("digest")
+        async for doc in db[SOURCES].find(
+            {"organization_id": organization_id, "hotel_id": hotel_id, "kind": "block"}, {"digest": 1},
+        )
+    }
+    applied = 0
+    async for block in db.room_blocks.find({"tenant_id": hotel_id, "organization_id": organization_id}):
+        block_id = str(block["_id"])
+        source_key = f"block:{block_id}"
+        entries = block_entries(block, room_types)
+        previous = known.pop(source_key, None)
+        if (previous is None and not entries) or previous == _digest(entries):
+            continue
+        await apply_source(db, organization_id, hotel_id, source_key, block_id, entries)
+        applied += 1
+    # Blocks deleted from room_blocks.
+    for source_key in known:
+        await apply_source(db, organization_id, hotel_id, source_key, source_key.split(":", 1)[1], [])
+        applied += 1
+    return applied
+
+
+async def reconcile_hotel(db, organization_id: str, hotel_id: str) -> Optional[Dict[str, Any]]:
+    """Catch the ledger up with bookings changed since the last pass and with room blocks.
+
+    Booking writers that bypass the lifecycle/outbox triggers (ops actions,
+    supplier state machine, amendments, maintenance tasks) are picked up by
+    ``updated_at``/``status_updated_at``. Returns None for hotels without a ledger.
+    """
+    state_id = f"{organization_id}:{hotel_id}"
+    state = await db[STATE].find_one({"_id": state_id})
+    if not state:
+        return None
+
+    started = now_utc()
+    since = _aware(state.get("reconciled_at") or state["built_at"]) - RECONCILE_OVERLAP
+    room_types = await room_types_by_id(db, organization_id, hotel_id)
+
+    bookings = 0
+    async for booking in db.bookings.find({
+        "organization_id": organization_id,
+        "hotel_id": hotel_id,
+        "$or": [{"updated_at": {"$gte": since}}, {"status_updated_at": {"$gte": since}}],
+    }):
+        await apply_booking(db, booking, room_types)
+        bookings += 1
+    blocks = await _reconcile_blocks(db, organization_id, hotel_id, room_types)
+
+    # A concurrent rebuild dropped the state: leave it to the rebuild.
+    await db[STATE].update_one({"_id": state_id, "built_at": state["built_at"]}, {"$set": {"reconciled_at": started}})
+    return {"bookings": bookings, "blocks": blocks}
+
+
+async def reconcile_all(db) -> Dict[str, Any]:
+    """One reconcile pass over every hotel with a built ledger (periodic task)."""
+    totals = {"hotels": 0, "bookings": 0, "blocks": 0, "failed": 0}
+    async for state in db[STATE].find({}, {"organization_id": 1, "hotel_id": 1}):
+        org_id = state.get("organization_id")
+        hotel_id = state.get("hotel_id")
+        if not org_id or not hotel_id:
+            org_id, _, hotel_id = state["_id"].partition(":")
+        try:
+            summary = await reconcile_hotel(db, org_id, hotel_id)
+        except Exception as exc:
+            totals["failed"] += 1
+            logger.warning("occupancy ledger reconcile failed hotel=%s: %s", hotel_id, exc)
+            continue
+        if summary:
+            totals["hotels"] += 1
+            totals["bookings"] += summary["bookings"]
+            totals["blocks"] += summary["blocks"]
+    return totals
+
+
+async def ensure_room_night_occupancy_indexes(db) -> None:
+    await db[LEDGER].create_index(
+        [("organization_id", 1), ("hotel_id", 1), ("date", 1), ("room_type", 1)],
+        name="idx_hotel_night",
+    )
+    await db[SOURCES].create_index([("organization_id", 1), ("hotel_id", 1)], name="idx_sources_hotel")
+    await db[SOURCES].create_index(
+        [("organization_id", 1), ("hotel_id", 1), ("kind", 1)], name="idx_sources_hotel_kind",
+    )
+    # reconcile_hotel's change scan ($or over both timestamps).
+    await db.bookings.create_index(
+        [("organization_id", 1), ("hotel_id", 1), ("updated_at", 1)], name="idx_hotel_updated_at",
+    )
+    await db.bookings.create_index(
+        [("organization_id", 1), ("hotel_id", 1), ("status_updated_at", 1)], name="idx_hotel_status_updated_at",
+    )
@@ -0,0 +1,228 @@
+"""Token/prefix search index stored on the documents themselves.
+
+Unanchored case-insensitive ``$regex`` filters cannot use an index, so every
+keystroke on a list/search endpoint scans the whole tenant. Instead each
+searchable document carries a ``search_tokens`` array:
+
+  field values → Turkish-aware fold (İ/I/ı/ş/ğ/ü/ö/ç → ascii) → words →
+  edge prefixes (2..MAX_PREFIX_LEN chars)
+
+and a query matches with ``{"search_tokens": {"$all": [folded query words]}}``
+served by a multikey ``(organization_id, search_tokens)`` index. Matching is
+word-prefix ("ayş yıl" finds "Ayşe Yılmaz"), not arbitrary substring.
+
+Documents written before the tokens existed (``search_tokens`` missing) keep
+matching through the legacy regex, restricted to those documents, until
+``scripts/backfill_search_tokens.py`` has been run.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TOKENS_FIELD = "search_tokens"
+MIN_PREFIX_LEN = 2
+MAX_PREFIX_LEN = 20
+MAX_TOKENS_PER_DOC = 400
+MAX_QUERY_TERMS = 8
+
+# Searchable fields per collection. Dotted paths walk into sub-documents and
+# lists (e.g. every ``contacts[].value``). The first field ranks highest.
+SEARCH_FIELDS: Dict[str, Sequence[str]] = {
+    "customers": ("name", "company_name", "contacts.value", "email", "phone"),
+    "bookings": ("guest_name", "customer_name", "guest.full_name", "booking_ref", "code", "pnr", "hotel_name"),
+    "reservations": ("guest_name", "customer_name", "guest.full_name", "booking_ref", "code", "pnr", "hotel_name"),
+    "hotels": ("name", "city", "country"),
+}
+
+# Turkish dotted/dotless i must be lowered before casefold() mangles them
+# ("İ".lower() is "i̇" with a combining dot); the rest folds to ascii so a
+# query typed without Turkish characters still matches.
+_TR_LOWER = str.maketrans({"İ": "i", "I": "ı"})
+_TR_ASCII = str.maketrans({"ı": "i", "ş": "s", "ğ": "g", "ü": "u", "ö": "o", "ç": "c", "â": "a", "î": "i", "û": "u"})
+_WORD_RE = re.compile(r"[0-9a-z]+")
+
+
+def fold_text(value: Any) -> str:
+    """Lower-case with Turkish rules and strip diacritics."""
+    text = str(value or "").translate(_TR_LOWER).lower().translate(_TR_ASCII)
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(value: Any) -> List[str]:
+    return _WORD_RE.findall(fold_text(value))
+
+
+def _word_variants(word: str) -> List[str]:
+    # Phone numbers are typed with or without the 0 / 90 trunk prefix.
+    if word.isdigit() and len(word) >= 10:
+        variants = [word]
+        if word.startswith("90"):
+            variants.append(word[2:])
+        if word.startswith("0"):
+            variants.append(word[1:])
+        return variants
+    return [word]
+
+
+def _values_at(doc: Dict[str, Any], path: str) -> List[Any]:
+    values: List[Any] = [doc]
+    for part in path.split("."):
+        nxt: List[Any] = []
+        for v in values:
+            if isinstance(v, list):
+                nxt.extend(item.get(part) for item in v if isinstance(item, dict))
+            elif isinstance(v, dict):
+                nxt.append(v.get(part))
+        values = nxt
+    flat: List[Any] = []
+    for v in values:
+        if isinstance(v, list):
+            flat.extend(v)
+        elif v not in (None, ""):
+            flat.append(v)
+    return flat
+
+
+def build_search_tokens(doc: Dict[str, Any], collection: str) -> List[str]:
+    """Edge-prefix tokens for the searchable fields of `doc`."""
+    tokens: Dict[str, None] = {}
+    for path in SEARCH_FIELDS[collection]:
+        for value in _values_at(doc, path):
+            for word in tokenize(value):
+                for variant in _word_variants(word):
+                    top = min(len(variant), MAX_PREFIX_LEN)
+                    for n in range(min(MIN_PREFIX_LEN, top), top + 1):
+                        tokens[variant[:n]] = None
+            if len(tokens) >= MAX_TOKENS_PER_DOC:
+                return list(tokens)[:MAX_TOKENS_PER_DOC]
+    return list(tokens)
+
+
+def query_terms(query: Optional[str]) -> List[str]:
+    """Folded query words usable against ``search_tokens`` (deduplicated)."""
+    terms: Dict[str, None] = {}
+    for word in tokenize(query):
+        if len(word) >= MIN_PREFIX_LEN:
+            terms[word[:MAX_PREFIX_LEN]] = None
+    return list(terms)[:MAX_QUERY_TERMS]
+
+
+def _legacy_regex_filter(query: str, collection: str) -> Dict[str, Any]:
+    regex = {"$regex": re.escape(query.strip()), "$options": "i"}
+    return {"$or": [{path: regex} for path in SEARCH_FIELDS[collection]]}
+
+
+def search_filter(query: Optional[str], collection: str) -> Optional[Dict[str, Any]]:
+    """Mongo filter for a free-text `query`, or None for an empty query.
+
+    Indexed token lookup, plus the legacy regex for documents that have no
+    tokens yet. Single-character queries only use the regex branch.
+    """
+    if not query or not query.strip():
+        return None
+    legacy = _legacy_regex_filter(query, collection)
+    terms = query_terms(query)
+    if not terms:
+        return legacy
+    return {
+        "$or": [
+            {SEARCH_TOKENS_FIELD: {"$all": terms}},
+            {SEARCH_TOKENS_FIELD: {"$exists": False}, **legacy},
+        ]
+    }
+
+
+def apply_search(base: Dict[str, Any], query: Optional[str], collection: str) -> Dict[str, Any]:
+    """AND the search filter onto `base` without clobbering an existing ``$or``."""
+    flt = search_filter(query, collection)
+    if flt is None:
+        return base
+    if "$or" in base:
+        return {"$and": [base, flt]}
+    return {**base, **flt}
+
+
+def search_score(doc: Dict[str, Any], terms: Sequence[str], collection: str) -> float:
+    """Relevance of `doc` for folded `terms`.
+
+    Per term: exact word 3, word prefix 1, weighted by field position (the
+    first field counts most); +2 when the primary field starts with the
+    first term.
+    """
+    fields = SEARCH_FIELDS[collection]
+    score = 0.0
+    for rank, path in enumerate(fields):
+        weight = 1.0 / (rank + 1)
+        words = [w for value in _values_at(doc, path) for w in tokenize(value)]
+        if not words:
+            continue
+        for term in terms:
+            if term in words:
+                score += 3 * weight
+            elif any(w.startswith(term) for w in words):
+                score += weight
+        if rank == 0 and terms and words[0].startswith(terms[0]):
+            score += 2
+    return score
+
+
+def rank_by_relevance(docs: List[Dict[str, Any]], query: Optional[str], collection: str) -> List[Dict[str, Any]]:
+    """Stable sort of `docs` by :func:`search_score` (ties keep input order)."""
+    terms = query_terms(query)
+    if not terms:
+        return docs
+    return sorted(docs, key=lambda d: search_score(d, terms, collection), reverse=True)
+
+
+async def refresh_search_tokens(db, collection: str, flt: Dict[str, Any]) -> None:
+    """Recompute tokens for the single document matching `flt`."""
+    projection = {path.split(".")[0]: 1 for path in SEARCH_FIELDS[collection]}
+    doc = await db[collection].find_one(flt, projection)
+    if doc:
+        await db[collection].update_one(
+            {"_id": doc["_id"]},
+            {"$set": {SEARCH_TOKENS_FIELD: build_search_tokens(doc, collection)}},
+        )
+
+
+async def backfill_search_tokens(
+    db,
+    collection: str,
+    *,
+    organization_id: Optional[str] = None,
+    only_missing: bool = True,
+    batch_size: int = 500,
+) -> int:
+    """(Re)build ``search_tokens`` for a collection in bulk. Returns docs written."""
+    flt: Dict[str, Any] = {}
+    if organization_id:
+        flt["organization_id"] = organization_id
+    if only_missing:
+        flt[SEARCH_TOKENS_FIELD] = {"$exists": False}
+    projection = {path.split(".")[0]: 1 for path in SEARCH_FIELDS[collection]}
+
+    written = 0
+    ops: List[UpdateOne] = []
+    async for doc in db[collection].find(flt, projection).batch_size(batch_size):
+        ops.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {SEARCH_TOKENS_FIELD: build_search_tokens(doc, collection)}},
+        ))
+        if len(ops) >= batch_size:
+            await db[collection].bulk_write(ops, ordered=False)
+            written += len(ops)
+            ops = []
+    if ops:
+        await db[collection].bulk_write(ops, ordered=False)
+        written += len(ops)
+
+    logger.info("search tokens backfilled: collection=%s docs=%d", collection, written)
+    return written
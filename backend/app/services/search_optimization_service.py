@@ -6,9 +6,11 @@ for better performance during high-traffic periods.
 from __future__ import annotations
 
 import logging
+import time
 from typing import Any, Optional
 
 from app.db import get_db
+from app.services import single_flight
 from app.services.mongo_cache_service import cache_get, cache_set
 from app.services.redis_cache import redis_get, redis_set
 
@@ -30,15 +32,47 @@ async def search_available_hotels(
     """Optimized hotel availability search using aggregation pipeline."""
     # Check cache: L1 Redis → L2 MongoDB
     cache_key = f"search:{organization_id}:{check_in}:{check_out}:{guests}:{room_type}:{min_price}:{max_price}:{agency_id}:{limit}:{skip}"
+
+    def _compute():
+        return _search_and_cache(
+            cache_key, organization_id, check_in, check_out,
+            min_price=min_price, max_price=max_price, limit=limit, skip=skip, guests=guests,
+        )
+
     redis_hit = await redis_get(cache_key)
     if redis_hit:
-        return redis_hit
+        # Expired entries are served while one background refresh runs
+        value, meta = single_flight.unwrap(redis_hit)
+        single_flight.revalidate(cache_key, meta, _compute)
+        return value
     cached = await cache_get(cache_key)
     if cached:
         # Promote to Redis L1
-        await redis_set(cache_key, cached, ttl_seconds=120)
+        await redis_set(cache_key, single_flight.wrap(cached, 120), ttl_seconds=120 + single_flight.STALE_SECONDS)
         return cached
 
+    # Miss: one aggregation per query across concurrent requests (and pods)
+    return await single_flight.coalesce(cache_key, _compute, probe=lambda: _peek(cache_key))
+
+
+async def _peek(cache_key: str) -> Any:
+    entry = await redis_get(cache_key)
+    return None if entry is None else single_flight.unwrap(entry)[0]
+
+
+async def _search_and_cache(
+    cache_key: str,
+    organization_id: str,
+    check_in: str,
+    check_out: str,
+    *,
+    min_price: Optional[float],
+    max_price: Optional[float],
+    limit: int,
+    skip: int,
+    guests: int,
+) -> dict[str, Any]:
+    started = time.monotonic()
     db = await get_db()
 
     # Single aggregation pipeline instead of nested loops
@@ -157,8 +191,12 @@ async def search_available_hotels(
         },
     }
 
-    # Cache results: L1 Redis (2 min) + L2 MongoDB (5 min)
-    await redis_set(cache_key, response, ttl_seconds=120)
+    # Cache results: L1 Redis (2 min + stale window) + L2 MongoDB (5 min)
+    await redis_set(
+        cache_key,
+        single_flight.wrap(response, 120, time.monotonic() - started),
+        ttl_seconds=120 + single_flight.STALE_SECONDS,
+    )
     await cache_set(cache_key, response, category="search_results")
 
     return response
@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List
 
 from app.services.google_sheet_schema_service import get_reservation_writeback_headers
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.utils import now_utc
 
 SYSTEM_WRITEBACK_RECORD_TYPES = {
@@ -264,6 +265,7 @@ async def import_sheet_reservations(
             source_row=row_number,
             normalized=normalized,
         )
+        booking_doc[SEARCH_TOKENS_FIELD] = build_search_tokens(booking_doc, "bookings")
         existing_booking = await db.bookings.find_one(
             {"organization_id": connection["organization_id"], "_id": booking_id}
         )
@@ -0,0 +1,174 @@
+"""Concurrent scheduler for legacy Google Sheets hotel syncs.
+
+One scheduled cycle:
+  load enabled connections → group per tenant → order by staleness →
+  bounded worker pool → per-tenant lock → batchGet per spreadsheet → sync.
+
+Google quota is respected with an in-process token bucket per service-account
+credential (the Sheets read quota is per project/user, so tenants sharing the
+platform credential share one bucket). A 429 answer drains the bucket so the
+remaining work backs off instead of hammering the API.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.infrastructure.rate_limiter import LocalTokenBucket
+from app.services.google_sheets_client import credential_key, fetch_sheet_values_batch
+from app.services.sheet_sync_service import acquire_sync_lock, release_sync_lock, run_sheet_sync
+
+logger = logging.getLogger(__name__)
+
+SYNC_WORKERS = int(os.environ.get("GOOGLE_SHEETS_SYNC_WORKERS", "4"))
+# Google Sheets API default: 60 read requests / minute / user.
+READ_QUOTA_PER_MINUTE = float(os.environ.get("GOOGLE_SHEETS_READ_QUOTA_PER_MINUTE", "60"))
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+_quota_buckets: Dict[str, LocalTokenBucket] = {}
+
+
+def _quota_bucket(cred_key: str) -> LocalTokenBucket:
+    bucket = _quota_buckets.get(cred_key)
+    if bucket is None:
+        bucket = LocalTokenBucket(capacity=READ_QUOTA_PER_MINUTE, refill_rate=READ_QUOTA_PER_MINUTE / 60.0)
+        _quota_buckets[cred_key] = bucket
+    return bucket
+
+
+def _is_quota_error(message: Optional[str]) -> bool:
+    msg = (message or "").lower()
+    return "429" in msg or "resource_exhausted" in msg or "rate limit" in msg
+
+
+def _last_sync(conn: Dict[str, Any]) -> datetime:
+    value = conn.get("last_sync_at")
+    if not isinstance(value, datetime):
+        return _EPOCH
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def order_by_staleness(connections: List[Dict[str, Any]]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Group connections per tenant, stalest tenant (and connection) first.
+
+    Never-synced connections sort before everything else.
+    """
+    by_tenant: Dict[str, List[Dict[str, Any]]] = {}
+    for conn in connections:
+        by_tenant.setdefault(conn.get("tenant_id", ""), []).append(conn)
+    for conns in by_tenant.values():
+        conns.sort(key=_last_sync)
+    return sorted(by_tenant.items(), key=lambda item: _last_sync(item[1][0]))
+
+
+async def _sync_sheet_group(
+    db,
+    tenant_id: str,
+    sheet_id: str,
+    conns: List[Dict[str, Any]],
+    bucket: Optional[LocalTokenBucket],
+) -> List[Dict[str, Any]]:
+    """Sync every connection pointing at one spreadsheet.
+
+    Several worksheets of the same spreadsheet are read with one `batchGet`;
+    if that fails each connection falls back to its own fetch.
+    """
+    prefetched: Dict[str, List[List[Any]]] = {}
+    if len(conns) > 1:
+        worksheets = list(dict.fromkeys(c.get("worksheet_name", "Sheet1") for c in conns))
+        if bucket:
+            await bucket.acquire()
+        try:
+            prefetched = await fetch_sheet_values_batch(
+                sheet_id,
+                worksheets,
+                tenant_id=tenant_id,
+                metering_context={
+                    "organization_id": conns[0].get("organization_id"),
+                    "tenant_id": tenant_id,
+                    "source": "integrations.google_sheets.legacy_sync",
+                    "source_event_id": f"{sheet_id}:{int(time.time())}:batch",
+                    "metadata": {"connection_ids": [c["_id"] for c in conns]},
+                },
+            )
+        except Exception as e:
+            if bucket and _is_quota_error(str(e)):
+                bucket.drain()
+            logger.warning("Sheets batchGet failed for %s, falling back per worksheet: %s", sheet_id, e)
+
+    results = []
+    for conn in conns:
+        values = prefetched.get(conn.get("worksheet_name", "Sheet1"))
+        if values is None and bucket:
+            await bucket.acquire()
+        run = await run_sheet_sync(db, conn, prefetched_values=values)
+        if bucket and run.get("status") == "error" and _is_quota_error(run.get("error_message")):
+            bucket.drain()
+        results.append(run)
+    return results
+
+
+async def _sync_tenant(db, tenant_id: str, conns: List[Dict[str, Any]], summary: Dict[str, Any]) -> None:
+    if not await acquire_sync_lock(db, tenant_id):
+        logger.info("Skipping sync for tenant %s (locked)", tenant_id)
+        summary["skipped_tenants"] += 1
+        return
+
+    try:
+        cred_key = credential_key(tenant_id)
+        bucket = _quota_bucket(cred_key) if cred_key else None
+
+        by_sheet: Dict[str, List[Dict[str, Any]]] = {}
+        for conn in conns:
+            by_sheet.setdefault(conn["sheet_id"], []).append(conn)
+
+        for sheet_id, sheet_conns in by_sheet.items():
+            for run in await _sync_sheet_group(db, tenant_id, sheet_id, sheet_conns, bucket):
+                summary["synced"] += 1
+                if run.get("status") == "error":
+                    summary["errors"] += 1
+    except Exception as e:
+        logger.error("Scheduled sync error for tenant %s: %s", tenant_id, e)
+        summary["errors"] += 1
+    finally:
+        await release_sync_lock(db, tenant_id)
+
+
+async def run_sync_cycle(db, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Run one scheduled sync cycle over all enabled connections.
+
+    Tenants are processed by at most `workers` concurrent workers, stalest
+    first; connections of one tenant stay sequential (per-tenant lock).
+    """
+    started = time.monotonic()
+    connections = await db.sheet_connections.find({"sync_enabled": True}).to_list(length=None)
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in order_by_staleness(connections):
+        queue.put_nowait(item)
+
+    summary: Dict[str, Any] = {
+        "tenants": queue.qsize(),
+        "connections": len(connections),
+        "synced": 0,
+        "errors": 0,
+        "skipped_tenants": 0,
+    }
+
+    async def _worker() -> None:
+        while True:
+            try:
+                tenant_id, conns = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await _sync_tenant(db, tenant_id, conns, summary)
+
+    pool_size = max(1, min(workers or SYNC_WORKERS, summary["tenants"] or 1))
+    await asyncio.gather(*(_worker() for _ in range(pool_size)))
+
+    summary["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return summary
@@ -9,12 +9,17 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from app.services.google_sheets_client import fetch_sheet_data
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.services.google_sheets_client import fetch_sheet_data_async, parse_sheet_values
 from app.services.import_service import validate_hotels, get_existing_hotel_names
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -60,64 +65,166 @@ def make_row_key(sheet_id: str, worksheet: str, row_number: int) -> str:
 
 # ── Delta Detection ───────────────────────────────────────
 
-async def compute_delta(
-    db,
-    tenant_id: str,
-    connection_id: str,
+# Max operations per bulk_write round trip (fingerprints and hotels).
+BULK_CHUNK_SIZE = 500
+
+
+def _chunks(items: List[Any], size: int = BULK_CHUNK_SIZE) -> Iterator[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def load_fingerprints(db, tenant_id: str, connection_id: str) -> Dict[str, str]:
+    """Load every stored fingerprint of a connection in one query (row_key -> fingerprint)."""
+    cursor = db.sheet_row_fingerprints.find(
+        {"tenant_id": tenant_id, "sheet_connection_id": connection_id},
+        {"_id": 0, "row_key": 1, "fingerprint": 1},
+    )
+    return {doc["row_key"]: doc.get("fingerprint") async for doc in cursor}
+
+
+def diff_fingerprints(
+    existing: Dict[str, str],
     sheet_id: str,
     worksheet: str,
     mapped_rows: List[Dict[str, Any]],
-) -> List[Dict[str, Any]]:
-    """Filter out rows that haven't changed since last sync."""
-    changed = []
+) -> Tuple[List[Dict[str, Any]], Dict[str, str], List[str]]:
+    """Diff mapped rows against stored fingerprints in memory.
+
+    Returns (changed_rows, new_fingerprints, deleted_row_keys). Deleted keys are
+    rows of this sheet/worksheet that were fingerprinted before but are no
+    longer present in the sheet.
+    """
+    changed: List[Dict[str, Any]] = []
+    new_fps: Dict[str, str] = {}
+    seen = set()
     for row in mapped_rows:
-        row_num = row.get("_row_number", 0)
-        row_key = make_row_key(sheet_id, worksheet, row_num)
+        row_key = make_row_key(sheet_id, worksheet, row.get("_row_number", 0))
+        seen.add(row_key)
         fp = fingerprint_row(row)
+        if existing.get(row_key) == fp:
+            continue  # Unchanged
+        new_fps[row_key] = fp
+        changed.append(row)
 
-        existing = await db.sheet_row_fingerprints.find_one({
-            "tenant_id": tenant_id,
-            "sheet_connection_id": connection_id,
-            "row_key": row_key,
-        })
+    prefix = f"{sheet_id}|{worksheet}|"
+    deleted = [key for key in existing if key.startswith(prefix) and key not in seen]
+    return changed, new_fps, deleted
 
-        if existing and existing.get("fingerprint") == fp:
-            continue  # Unchanged
 
-        # Upsert fingerprint
-        await db.sheet_row_fingerprints.update_one(
-            {
-                "tenant_id": tenant_id,
-                "sheet_connection_id": connection_id,
-                "row_key": row_key,
-            },
+async def write_fingerprints(
+    db,
+    tenant_id: str,
+    connection_id: str,
+    fingerprints: Dict[str, str],
+    deleted_keys: List[str],
+) -> None:
+    """Persist changed fingerprints and drop removed rows via chunked bulk writes."""
+    now = _now()
+    ops = [
+        UpdateOne(
+            {"tenant_id": tenant_id, "sheet_connection_id": connection_id, "row_key": row_key},
             {
-                "$set": {"fingerprint": fp, "updated_at": _now()},
+                "$set": {"fingerprint": fp, "updated_at": now},
                 "$setOnInsert": {"_id": str(uuid.uuid4())},
             },
             upsert=True,
         )
-        changed.append(row)
+        for row_key, fp in fingerprints.items()
+    ]
+    for chunk in _chunks(ops):
+        await db.sheet_row_fingerprints.bulk_write(chunk, ordered=False)
+
+    for chunk in _chunks(deleted_keys):
+        await db.sheet_row_fingerprints.delete_many({
+            "tenant_id": tenant_id,
+            "sheet_connection_id": connection_id,
+            "row_key": {"$in": chunk},
+        })
 
-    return changed
+
+async def compute_sheet_delta(
+    db,
+    tenant_id: str,
+    connection_id: str,
+    sheet_id: str,
+    worksheet: str,
+    mapped_rows: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Batched delta: one fingerprint read, in-memory diff, bulk fingerprint writes.
+
+    Returns {"changed": [...rows], "unchanged": int, "deleted": int}.
+    """
+    existing = await load_fingerprints(db, tenant_id, connection_id)
+    changed, new_fps, deleted = diff_fingerprints(existing, sheet_id, worksheet, mapped_rows)
+    await write_fingerprints(db, tenant_id, connection_id, new_fps, deleted)
+    return {
+        "changed": changed,
+        "unchanged": len(mapped_rows) - len(changed),
+        "deleted": len(deleted),
+    }
+
+
+async def compute_delta(
+    db,
+    tenant_id: str,
+    connection_id: str,
+    sheet_id: str,
+    worksheet: str,
+    mapped_rows: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Filter out rows that haven't changed since last sync."""
+    delta = await compute_sheet_delta(db, tenant_id, connection_id, sheet_id, worksheet, mapped_rows)
+    return delta["changed"]
 
 
 # ── Upsert Hotels ──────────────────────────────────────────
 
+def _hotel_update_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    update_fields: Dict[str, Any] = {}
+    if row.get("country"):
+        update_fields["country"] = row["country"].strip()
+    if row.get("description"):
+        update_fields["description"] = row["description"].strip()
+    if row.get("image_url"):
+        update_fields["image_url"] = row["image_url"].strip()
+    if row.get("address"):
+        update_fields["address"] = row["address"].strip()
+    if row.get("phone"):
+        update_fields["phone"] = row["phone"].strip()
+    if row.get("email"):
+        update_fields["email"] = row["email"].strip()
+    if row.get("price"):
+        try:
+            update_fields["base_price"] = float(str(row["price"]).replace(",", "."))
+        except (ValueError, TypeError):
+            pass
+    if row.get("stars"):
+        try:
+            update_fields["stars"] = int(str(row["stars"]))
+        except (ValueError, TypeError):
+            pass
+    return update_fields
+
+
 async def upsert_hotels_bulk(
     db,
     org_id: str,
     rows: List[Dict[str, Any]],
     source: str = "sheet_sync",
 ) -> Tuple[int, int, List[Dict[str, Any]]]:
-    """Upsert hotels by (organization_id, name, city).
+    """Upsert hotels by (organization_id, name, city) via chunked bulk_write.
+
+    Rows sharing the same (name, city) are merged in sheet order so the result
+    matches sequential upserts without racing duplicate inserts.
 
     Returns (upsert_count, error_count, errors).
     """
     now = _now()
-    upserts = 0
     errors_list: List[Dict[str, Any]] = []
 
+    # (name, city) -> [update_fields, row_numbers]
+    merged: Dict[Tuple[str, str], List[Any]] = {}
     for row in rows:
         row_num = row.pop("_row_number", 0)
         name = (row.get("name") or "").strip()
@@ -125,36 +232,25 @@ async def upsert_hotels_bulk(
         if not name or not city:
             errors_list.append({"row_number": row_num, "field": "name/city", "message": "Eksik"})
             continue
+        entry = merged.setdefault((name, city), [{}, []])
+        entry[0].update(_hotel_update_fields(row))
+        entry[1].append(row_num)
 
-        try:
-            update_fields: Dict[str, Any] = {
-                "updated_at": now,
-                "updated_by": source,
-            }
-            if row.get("country"):
-                update_fields["country"] = row["country"].strip()
-            if row.get("description"):
-                update_fields["description"] = row["description"].strip()
-            if row.get("image_url"):
-                update_fields["image_url"] = row["image_url"].strip()
-            if row.get("address"):
-                update_fields["address"] = row["address"].strip()
-            if row.get("phone"):
-                update_fields["phone"] = row["phone"].strip()
-            if row.get("email"):
-                update_fields["email"] = row["email"].strip()
-            if row.get("price"):
-                try:
-                    update_fields["base_price"] = float(str(row["price"]).replace(",", "."))
-                except (ValueError, TypeError):
-                    pass
-            if row.get("stars"):
-                try:
-                    update_fields["stars"] = int(str(row["stars"]))
-                except (ValueError, TypeError):
-                    pass
-
-            await db.hotels.update_one(
+    keys = list(merged.keys())
+    upserts = 0
+    for key_chunk in _chunks(keys):
+        ops = []
+        for name, city in key_chunk:
+            update_fields = {**merged[(name, city)][0], "updated_at": now, "updated_by": source}
+            on_insert: Dict[str, Any] = {}
+            # Only the sheet's country can change the searchable fields of an
+            # existing hotel; otherwise tokens are written once on insert.
+            tokens = build_search_tokens({"name": name, "city": city, "country": update_fields.get("country")}, "hotels")
+            if update_fields.get("country"):
+                update_fields[SEARCH_TOKENS_FIELD] = tokens
+            else:
+                on_insert[SEARCH_TOKENS_FIELD] = tokens
+            ops.append(UpdateOne(
                 {"organization_id": org_id, "name": name, "city": city},
                 {
                     "$set": update_fields,
@@ -166,13 +262,29 @@ async def upsert_hotels_bulk(
                         "active": True,
                         "created_at": now,
                         "created_by": source,
+                        **on_insert,
                     },
                 },
                 upsert=True,
-            )
-            upserts += 1
+            ))
+
+        failed: Dict[int, str] = {}
+        try:
+            await db.hotels.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                failed[err.get("index", -1)] = err.get("errmsg", "bulk write error")
         except Exception as e:
-            errors_list.append({"row_number": row_num, "field": "general", "message": str(e)})
+            failed = {i: str(e) for i in range(len(ops))}
+
+        for i, key in enumerate(key_chunk):
+            row_numbers = merged[key][1]
+            if i in failed:
+                errors_list.extend(
+                    {"row_number": rn, "field": "general", "message": failed[i]} for rn in row_numbers
+                )
+            else:
+                upserts += len(row_numbers)
 
     return upserts, len(errors_list), errors_list
 
@@ -210,9 +322,12 @@ async def release_sync_lock(db, tenant_id: str) -> None:
 async def run_sheet_sync(
     db,
     connection: Dict[str, Any],
+    prefetched_values: Optional[List[List[Any]]] = None,
 ) -> Dict[str, Any]:
     """Execute a full sync cycle for a sheet connection.
 
+    `prefetched_values` carries raw worksheet values already read through a
+    `batchGet` by the sync scheduler; when omitted the worksheet is fetched.
     Returns sync run summary.
     """
     conn_id = connection["_id"]
@@ -235,27 +350,36 @@ async def run_sheet_sync(
         "rows_processed": 0,
         "upserts": 0,
         "errors": 0,
+        "rows_changed": 0,
+        "rows_unchanged": 0,
+        "rows_deleted": 0,
+        "duration_ms": None,
+        "rows_per_sec": None,
         "error_message": None,
     }
     await db.sheet_sync_runs.insert_one(run_doc)
+    started = time.monotonic()
 
     try:
         # 1. Fetch
-        headers, rows = fetch_sheet_data(
-            sheet_id,
-            worksheet,
-            tenant_id=tenant_id,
-            metering_context={
-                "organization_id": connection.get("organization_id"),
-                "tenant_id": tenant_id,
-                "source": "integrations.google_sheets.legacy_sync",
-                "source_event_id": f"{run_id}:fetch",
-                "metadata": {
-                    "connection_id": conn_id,
-                    "worksheet": worksheet,
+        if prefetched_values is not None:
+            headers, rows = parse_sheet_values(prefetched_values)
+        else:
+            headers, rows = await fetch_sheet_data_async(
+                sheet_id,
+                worksheet,
+                tenant_id=tenant_id,
+                metering_context={
+                    "organization_id": connection.get("organization_id"),
+                    "tenant_id": tenant_id,
+                    "source": "integrations.google_sheets.legacy_sync",
+                    "source_event_id": f"{run_id}:fetch",
+                    "metadata": {
+                        "connection_id": conn_id,
+                        "worksheet": worksheet,
+                    },
                 },
-            },
-        )
+            )
         run_doc["rows_fetched"] = len(rows)
 
         # 2. Map
@@ -270,7 +394,11 @@ async def run_sheet_sync(
         run_doc["rows_processed"] = len(valid)
 
         # 4. Delta
-        changed = await compute_delta(db, tenant_id, conn_id, sheet_id, worksheet, valid)
+        delta = await compute_sheet_delta(db, tenant_id, conn_id, sheet_id, worksheet, valid)
+        changed = delta["changed"]
+        run_doc["rows_changed"] = len(changed)
+        run_doc["rows_unchanged"] = delta["unchanged"]
+        run_doc["rows_deleted"] = delta["deleted"]
 
         # 5. Upsert
         if changed:
@@ -316,6 +444,10 @@ async def run_sheet_sync(
             }},
         )
 
+    elapsed = time.monotonic() - started
+    run_doc["duration_ms"] = round(elapsed * 1000, 1)
+    run_doc["rows_per_sec"] = round(run_doc["rows_fetched"] / elapsed, 1) if elapsed > 0 else None
+
     # Save run
     await db.sheet_sync_runs.update_one(
         {"_id": run_id},
@@ -326,19 +458,12 @@ async def run_sheet_sync(
 
 
 async def run_scheduled_sync(db) -> int:
-    """Run sync for all enabled connections. Called by scheduler."""
-    cursor = db.sheet_connections.find({"sync_enabled": True})
-    synced = 0
-    async for conn in cursor:
-        tenant_id = conn.get("tenant_id", "")
-        if not await acquire_sync_lock(db, tenant_id):
-            logger.info("Skipping sync for tenant %s (locked)", tenant_id)
-            continue
-        try:
-            await run_sheet_sync(db, conn)
-            synced += 1
-        except Exception as e:
-            logger.error("Scheduled sync error for tenant %s: %s", tenant_id, e)
-        finally:
-            await release_sync_lock(db, tenant_id)
-    return synced
+    """Run sync for all enabled connections. Called by scheduler.
+
+    Delegates to the bounded, quota-aware worker pool in
+    `sheet_sync_scheduler`; returns the number of synced connections.
+    """
+    from app.services.sheet_sync_scheduler import run_sync_cycle
+
+    summary = await run_sync_cycle(db)
+    return summary["synced"]
@@ -0,0 +1,266 @@
+"""Single-flight request coalescing for read-through caches.
+
+When a hot key expires, only one caller recomputes it:
+  - in-process: concurrent callers await the leader's future
+  - cross-pod: the leader holds a short Redis lock (SET NX PX); callers on
+    other pods poll the cache for the leader's value instead of recomputing
+
+Values written through this module are stored in an envelope carrying a soft
+expiry and the cost of the last computation. That enables:
+  - probabilistic early refresh (XFetch): a hit may trigger one background
+    refresh shortly before expiry, more likely the more expensive the key
+  - stale-while-revalidate: past the soft expiry the value is still served
+    for STALE_SECONDS while one background refresh runs
+
+Plain (pre-envelope) values are read as fresh and never refreshed early.
+
+Counters (cache_metrics): singleflight_leaders, singleflight_coalesced,
+singleflight_lock_waits, singleflight_remote_coalesced,
+singleflight_lock_timeouts, singleflight_refreshes,
+singleflight_refresh_failures, xfetch_early_refresh, stale_serve_count.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import math
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from app.services import cache_metrics as cm
+
+logger = logging.getLogger("single_flight")
+
+LOCK_PREFIX = "sf:lock:"
+LOCK_TTL_MS = 10_000         # crash safety: a dead leader frees the key after 10s
+LOCK_WAIT_SECONDS = 3.0      # how long another pod waits for the leader's value
+LOCK_POLL_SECONDS = 0.05
+STALE_SECONDS = 300          # serve-stale window after the soft expiry
+XFETCH_BETA = 1.0            # >1 refreshes earlier, <1 later
+
+ENVELOPE_MARK = "__sf__"
+
+_RELEASE_LUA = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) end return 0"
+)
+
+_inflight: dict[str, asyncio.Future] = {}
+_refreshing: set[str] = set()
+_background: set[asyncio.Task] = set()
+
+
+# ─── Envelope ────────────────────────────────────────────────
+
+def wrap(value: Any, ttl_seconds: float, compute_seconds: float = 0.0, now: Optional[float] = None) -> dict[str, Any]:
+    """Envelope a value with its soft expiry and compute cost (seconds)."""
+    now = time.time() if now is None else now
+    return {
+        ENVELOPE_MARK: 1,
+        "v": value,
+        "exp": now + ttl_seconds,
+        "delta": round(max(compute_seconds, 0.0), 4),
+    }
+
+
+def unwrap(entry: Any) -> tuple[Any, Optional[dict[str, Any]]]:
+    """Return (value, envelope). The envelope is None for plain values."""
+    if isinstance(entry, dict) and entry.get(ENVELOPE_MARK) == 1 and "v" in entry:
+        return entry["v"], entry
+    return entry, None
+
+
+def is_stale(meta: Optional[dict[str, Any]], now: Optional[float] = None) -> bool:
+    if not meta:
+        return False
+    now = time.time() if now is None else now
+    return now >= float(meta.get("exp") or 0)
+
+
+def should_refresh_early(
+    meta: Optional[dict[str, Any]],
+    *,
+    beta: float = XFETCH_BETA,
+    now: Optional[float] = None,
+    rand: Callable[[], float] = random.random,
+) -> bool:
+    """XFetch: ``now - delta * beta * ln(U) >= expiry`` with U ~ (0, 1].
+
+    The closer the entry is to its expiry and the longer it took to compute,
+    the likelier one reader refreshes it ahead of the herd.
+    """
+    if not meta or not meta.get("delta"):
+        return False
+    now = time.time() if now is None else now
+    gap = -float(meta["delta"]) * beta * math.log(1.0 - rand())
+    return now + gap >= float(meta["exp"])
+
+
+# ─── Cross-pod lock ──────────────────────────────────────────
+
+def _redis():
+    from app.services.redis_cache import _client
+    return _client()
+
+
+def acquire_lock(key: str, ttl_ms: int = LOCK_TTL_MS) -> Optional[str]:
+    """Take the compute lock for ``key``.
+
+    Returns a token, "" when Redis is unavailable (no cross-pod coordination)
+    or None when another pod holds the lock.
+    """
+    r = _redis()
+    if r is None:
+        return ""
+    token = uuid.uuid4().hex
+    try:
+        return token if r.set(LOCK_PREFIX + key, token, nx=True, px=ttl_ms) else None
+    except Exception as e:
+        logger.debug("single_flight lock error [%s]: %s", key, e)
+        return ""
+
+
+def release_lock(key: str, token: Optional[str]) -> None:
+    """Release the lock only if ``token`` still owns it."""
+    if not token:
+        return
+    r = _redis()
+    if r is None:
+        return
+    try:
+        r.eval(_RELEASE_LUA, 1, LOCK_PREFIX + key, token)
+    except Exception as e:
+        logger.debug("single_flight unlock error [%s]: %s", key, e)
+
+
+# ─── Coalescing ──────────────────────────────────────────────
+
+async def call(fn: Callable[[], Any]) -> Any:
+    """Call a compute function that may be sync or async."""
+    result = fn()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _wait_for(probe: Callable[[], Awaitable[Any]]) -> Any:
+    deadline = time.monotonic() + LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_SECONDS)
+        value = await probe()
+        if value is not None:
+            return value
+    return None
+
+
+async def _lead(key: str, compute_fn: Callable[[], Any], probe: Optional[Callable[[], Awaitable[Any]]]) -> Any:
+    cm.inc("singleflight_leaders")
+    token = acquire_lock(key)
+    if token is None and probe is not None:
+        cm.inc("singleflight_lock_waits")
+        value = await _wait_for(probe)
+        if value is not None:
+            cm.inc("singleflight_remote_coalesced")
+            return value
+        cm.inc("singleflight_lock_timeouts")
+    try:
+        return await call(compute_fn)
+    finally:
+        release_lock(key, token)
+
+
+async def coalesce(
+    key: str,
+    compute_fn: Callable[[], Any],
+    *,
+    probe: Optional[Callable[[], Awaitable[Any]]] = None,
+) -> Any:
+    """Run ``compute_fn`` once for all concurrent callers of ``key``.
+
+    ``probe`` reads the cached value; it lets this pod wait for a leader on
+    another pod. ``compute_fn`` is expected to store its own result.
+    """
+    fut = _inflight.get(key)
+    if fut is not None:
+        cm.inc("singleflight_coalesced")
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if not fut.cancelled():
+                raise
+            # The leader was cancelled, not us: take over.
+            return await coalesce(key, compute_fn, probe=probe)
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        result = await _lead(key, compute_fn, probe)
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except BaseException as exc:
+        fut.set_exception(exc)
+        fut.exception()  # followers re-raise it; silence "never retrieved"
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        if _inflight.get(key) is fut:
+            del _inflight[key]
+
+
+# ─── Revalidation ────────────────────────────────────────────
+
+async def _refresh(key: str, compute_fn: Callable[[], Any]) -> None:
+    token = acquire_lock(key)
+    if token is None:
+        return  # another pod is already refreshing this key
+    try:
+        cm.inc("singleflight_refreshes")
+        await call(compute_fn)
+    except Exception as e:
+        cm.inc("singleflight_refresh_failures")
+        logger.warning("single_flight background refresh failed [%s]: %s", key, e)
+    finally:
+        release_lock(key, token)
+        _refreshing.discard(key)
+
+
+def refresh_in_background(key: str, compute_fn: Callable[[], Any]) -> bool:
+    """Schedule one background refresh of ``key`` per process.
+
+    Returns False when a refresh or a foreground computation is already
+    running here.
+    """
+    if key in _refreshing or key in _inflight:
+        return False
+    _refreshing.add(key)
+    task = asyncio.get_running_loop().create_task(_refresh(key, compute_fn))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return True
+
+
+def revalidate(key: str, meta: Optional[dict[str, Any]], refresh_fn: Callable[[], Any]) -> bool:
+    """Refresh a served entry in the background when stale or XFetch-selected.
+
+    Returns True when the entry is past its soft expiry (served stale).
+    """
+    if meta is None:
+        return False
+    if is_stale(meta):
+        cm.stale_serve(key)
+        refresh_in_background(key, refresh_fn)
+        return True
+    if should_refresh_early(meta):
+        cm.inc("xfetch_early_refresh")
+        refresh_in_background(key, refresh_fn)
+    return False
+
+
+def inflight_stats() -> dict[str, int]:
+    return {"inflight": len(_inflight), "refreshing": len(_refreshing)}
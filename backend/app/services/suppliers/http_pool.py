@@ -0,0 +1,192 @@
+"""Long-lived, pooled HTTP clients for supplier APIs (one per credential).
+
+Supplier clients such as ``PaximumClient`` and ``TourVisioClient`` are cheap
+per-request objects; the expensive part — TLS handshakes and keep-alive
+connections — lives here. ``SupplierClientPool`` hands out one
+``PooledSupplierClient`` per ``(supplier, account)`` so every call made with
+the same credentials reuses the same ``httpx.AsyncClient`` connection pool.
+
+Each pooled client also carries:
+
+- a ``LocalTokenBucket`` so sync bursts stay under the supplier's rate limit
+  (drained when the supplier answers 429),
+- gzip request bodies (opt-in per supplier) and gzip/deflate responses,
+- ``supplier_http_request_seconds`` latency histograms per operation.
+
+The pool hangs off the adapter registry (``registry.clients`` in
+``app.services.suppliers.registry``) and is closed on API shutdown.
+Accounts are identified by a hash of their credentials so tokens never
+appear in keys or metrics.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from app.infrastructure.metrics_registry import registry as metrics
+from app.infrastructure.rate_limiter import LocalTokenBucket
+
+logger = logging.getLogger("suppliers.http_pool")
+
+MAX_POOLED_ACCOUNTS = 256
+GZIP_MIN_BYTES = 1024
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+# (requests_per_second, burst). Paximum mirrors SUPPLIER_ACTIVATION_PLANS;
+# override with <CODE>_RATE_LIMIT_RPS / <CODE>_RATE_LIMIT_BURST.
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "paximum": (30.0, 50),
+    "tourvisio": (10.0, 20),
+}
+FALLBACK_RATE_LIMIT: Tuple[float, int] = (10.0, 20)
+
+
+def account_key(*credential_parts: str) -> str:
+    raw = "\x00".join(str(p or "") for p in credential_parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _status_class(status_code: Optional[int]) -> str:
+    return f"{status_code // 100}xx" if status_code else "error"
+
+
+def rate_settings(supplier: str) -> Dict[str, Any]:
+    prefix = supplier.upper()
+    rps, burst = DEFAULT_RATE_LIMITS.get(supplier, FALLBACK_RATE_LIMIT)
+    return {
+        "rate": float(os.environ.get(f"{prefix}_RATE_LIMIT_RPS", rps)),
+        "burst": int(os.environ.get(f"{prefix}_RATE_LIMIT_BURST", burst)),
+        "gzip_requests": os.environ.get(f"{prefix}_GZIP_REQUESTS", "0").lower() in ("1", "true", "yes"),
+    }
+
+
+class PooledSupplierClient:
+    """Keep-alive HTTP client + token bucket for one supplier account."""
+
+    def __init__(
+        self,
+        supplier: str,
+        account: str,
+        *,
+        rate: float,
+        burst: int,
+        gzip_requests: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.supplier = supplier
+        self.account = account
+        self.bucket = LocalTokenBucket(burst, rate)
+        self.gzip_requests = gzip_requests
+        self.transport = transport
+        self.requests = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        # Connections are bound to the event loop that opened them.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=DEFAULT_LIMITS,
+                transport=self.transport,
+                headers={"Accept-Encoding": "gzip, deflate"},
+            )
+            self._loop = loop
+        return self._client
+
+    async def request_json(
+        self,
+        method: str,
+        url: str,
+        body: Any,
+        *,
+        headers: Dict[str, str],
+        timeout: float,
+        operation: str,
+    ) -> httpx.Response:
+        """Send ``body`` as JSON; raises ``httpx`` errors like ``AsyncClient.request``."""
+        waited = await self.bucket.acquire()
+        if waited:
+            metrics.observe("supplier_rate_limit_wait_seconds", waited, labels={"supplier": self.supplier})
+
+        content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        headers = dict(headers)
+        if self.gzip_requests and len(content) >= GZIP_MIN_BYTES:
+            content = gzip.compress(content, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+        status_code: Optional[int] = None
+        started = time.perf_counter()
+        try:
+            resp = await self._http().request(method, url, content=content, headers=headers, timeout=timeout)
+            status_code = resp.status_code
+        finally:
+            self.requests += 1
+            metrics.observe(
+                "supplier_http_request_seconds",
+                time.perf_counter() - started,
+                labels={"supplier": self.supplier, "operation": operation, "status": _status_class(status_code)},
+            )
+        if resp.status_code == 429:
+            self.bucket.drain()
+        return resp
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+class SupplierClientPool:
+    """LRU of ``PooledSupplierClient`` keyed by ``(supplier, account_key)``."""
+
+    def __init__(self, max_accounts: int = MAX_POOLED_ACCOUNTS) -> None:
+        self.max_accounts = max_accounts
+        self._clients: "OrderedDict[Tuple[str, str], PooledSupplierClient]" = OrderedDict()
+
+    def get(self, supplier: str, *credential_parts: str) -> PooledSupplierClient:
+        supplier = supplier.lower()
+        key = (supplier, account_key(*credential_parts))
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+            return client
+
+        client = PooledSupplierClient(supplier, key[1], **rate_settings(supplier))
+        self._clients[key] = client
+        if len(self._clients) > self.max_accounts:
+            _, evicted = self._clients.popitem(last=False)
+            self._close_soon(evicted)
+        metrics.set_gauge("supplier_http_pooled_accounts", len(self._clients))
+        return client
+
+    @staticmethod
+    def _close_soon(client: PooledSupplierClient) -> None:
+        try:
+            asyncio.get_running_loop().create_task(client.aclose())
+        except RuntimeError:
+            pass
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {"supplier": supplier, "account": account, "requests": c.requests, "tokens": round(c.bucket.tokens, 2)}
+            for (supplier, account), c in self._clients.items()
+        ]
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), OrderedDict()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as exc:  # pragma: no cover - best effort on shutdown
+                logger.warning("Closing %s client failed: %s", client.supplier, exc)
@@ -8,6 +8,7 @@ from typing import Any, Optional
 
 import httpx
 
+from .registry import registry
 from .paximum_mapping import map_booking, map_hotel, map_offer, map_search_result
 from .paximum_models import Hotel, Offer, PaximumBooking, SearchResult
 
@@ -50,6 +51,7 @@ class PaximumAdapter:
         self.token = token
         self.timeout_seconds = timeout_seconds
         self.max_retries = max_retries
+        self._http = registry.clients.get("paximum", self.base_url, token)
 
     def _headers(self, trace_id: Optional[str] = None) -> dict[str, str]:
         headers = {
@@ -73,13 +75,12 @@ class PaximumAdapter:
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
-                    resp = await client.request(
-                        method=method,
-                        url=url,
-                        headers=self._headers(trace_id),
-                        json=json_body,
-                    )
+                resp = await self._http.request_json(
+                    method, url, json_body,
+                    headers=self._headers(trace_id),
+                    timeout=self.timeout_seconds,
+                    operation=path,
+                )
 
                 if resp.status_code in (401, 403):
                     raise PaximumAuthError("Paximum authentication failed")
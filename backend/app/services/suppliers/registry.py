@@ -3,12 +3,15 @@ from __future__ import annotations
 from typing import Dict
 
 from app.services.suppliers.contracts import SupplierAdapter, SupplierAdapterError
+from app.services.suppliers.http_pool import SupplierClientPool
 
 
 class AdapterRegistry:
     def __init__(self) -> None:
         self._adapters: Dict[str, SupplierAdapter] = {}
         self._aliases: Dict[str, str] = {}
+        # Pooled per-credential HTTP clients shared by adapters and API clients
+        self.clients = SupplierClientPool()
 
     def _normalize_code(self, code: str) -> str:
         return (code or "").strip().lower()
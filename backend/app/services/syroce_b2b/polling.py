@@ -5,6 +5,21 @@ Replit project, we periodically poll ``/availability`` and ``/rates`` and apply
 the results to a local table with **last-write-wins** keyed by
 ``(room_type, date range)``.
 
+Polling is incremental. The PMS contract exposes neither ETags nor an
+``updated_since`` cursor, so each polled window (one per configured room type)
+keeps a content hash in ``syroce_b2b_poll_state``:
+
+- an unchanged window is skipped without touching the local table;
+- a changed window writes only the rows whose own ``content_hash`` moved, in
+  one unordered ``bulk_write``;
+- each window's cadence adapts to its change rate — it is polled at the
+  configured interval while it changes and backs off (up to
+  ``_MAX_BACKOFF_FACTOR``×) while it is quiet. Webhook hints and manual syncs
+  pass ``force=True`` and poll every window immediately.
+
+``synced_at`` on a local row is therefore the time its content was last
+written; ``last_polled_at`` on the window state is the last confirmation.
+
 The service is dormant until the integration is CONNECTED and polling is enabled
 in the connection store. It never raises into the event loop — errors are logged
 and recorded, and the loop backs off and retries.
@@ -12,18 +27,27 @@ and recorded, and the loop backs off and retries.
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
 from app.db import get_db
+from app.infrastructure.metrics_registry import registry
 from app.services.syroce_b2b import connection_store as store
 
 logger = logging.getLogger("syroce_b2b.polling")
 
 LOCAL_COLLECTION = "syroce_b2b_local_ari"
+STATE_COLLECTION = "syroce_b2b_poll_state"
 _MIN_INTERVAL_S = 30.0
 _ERROR_BACKOFF_S = 60.0
+_MAX_BACKOFF_FACTOR = 4
+_DUPLICATE_KEY = 11000
 
 
 def _today() -> date:
@@ -38,45 +62,109 @@ def _state_key(room_type: str, date_from: str, date_to: str) -> str:
     return f"{room_type or '*'}|{date_from}|{date_to}"
 
 
-async def _upsert_lww(doc: Dict[str, Any]) -> None:
-    """Last-write-wins upsert keyed by (room_type, date range).
+def _content_hash(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _next_interval(state: Optional[Dict[str, Any]], changed: bool, base: float) -> float:
+    """Poll at ``base`` while a window changes; double up to the cap while quiet."""
+    if changed or not state:
+        return base
+    current = float(state.get("interval_s") or base)
+    return min(base * _MAX_BACKOFF_FACTOR, max(base, current * 2))
 
-    A polling cycle is always the freshest source for the window it queried, so we
-    gate the write on ``synced_at`` to stay safe under concurrent/overlapping
-    cycles. ``matched_count == 0`` means no doc yet OR the stored one is newer;
-    the insert then either creates it or (on a duplicate) loses the race — and we
-    re-raise any non-duplicate DB error so the caller can record/retry.
-    """
-    db = await get_db()
-    key = doc["_id"]
-    synced_at = doc["synced_at"]
-    res = await db[LOCAL_COLLECTION].update_one(
-        {"_id": key, "synced_at": {"$lte": synced_at}},
-        {"$set": doc},
-    )
-    if res.matched_count == 0:
-        try:
-            await db[LOCAL_COLLECTION].insert_one(doc)
-        except Exception as exc:  # pragma: no cover - exercised under races
-            from pymongo.errors import DuplicateKeyError
-
-            if isinstance(exc, DuplicateKeyError):
-                # Stored doc is strictly newer -> drop this stale write (LWW).
-                logger.debug("syroce_b2b polling stale write dropped key=%s", key)
-            else:
-                raise
 
+def _seconds_until_due(state: Optional[Dict[str, Any]], now: datetime) -> float:
+    if not state or not state.get("next_poll_at"):
+        return 0.0
+    due = state["next_poll_at"]
+    if due.tzinfo is None:  # Mongo returns naive UTC datetimes
+        due = due.replace(tzinfo=timezone.utc)
+    return (due - now).total_seconds()
 
-async def sync_once() -> Dict[str, Any]:
-    """Run one availability + rates poll and apply results locally (LWW).
 
-    Returns a small non-secret summary. Raises only on configuration/connection
-    problems; transport/PMS errors are surfaced to the caller for handling.
+async def _apply_lww(docs: List[Dict[str, Any]]) -> int:
+    """Last-write-wins upsert of changed rows in one unordered ``bulk_write``.
+
+    A polling cycle is always the freshest source for the window it queried, so
+    each write is gated on ``synced_at`` to stay safe under concurrent or
+    overlapping cycles. When the stored row is newer the gated filter misses and
+    the upsert collides on ``_id``; those duplicate-key errors are stale writes
+    losing the race and are dropped. Any other write error is re-raised so the
+    caller can record/retry.
+    """
+    if not docs:
+        return 0
+    db = await get_db()
+    ops = [
+        UpdateOne(
+            {"_id": doc["_id"], "synced_at": {"$lte": doc["synced_at"]}},
+            {"$set": {k: v for k, v in doc.items() if k != "_id"}},
+            upsert=True,
+        )
+        for doc in docs
+    ]
+    try:
+        await db[LOCAL_COLLECTION].bulk_write(ops, ordered=False)
+    except BulkWriteError as exc:
+        errors = exc.details.get("writeErrors") or []
+        if any(err.get("code") != _DUPLICATE_KEY for err in errors):
+            raise
+        logger.debug("syroce_b2b polling dropped %d stale writes", len(errors))
+        return len(docs) - len(errors)
+    return len(docs)
+
+
+def _window_rows(
+    avail: Dict[str, Any],
+    rates: Dict[str, Any],
+    *,
+    rt: Optional[str],
+    ci: str,
+    co: str,
+    agency_id: Optional[str],
+) -> List[Dict[str, Any]]:
+    rate_index: Dict[str, Any] = {}
+    for r in (rates.get("rates") or rates.get("room_types") or []):
+        if isinstance(r, dict) and r.get("room_type"):
+            rate_index[r["room_type"]] = r
+
+    rows: List[Dict[str, Any]] = []
+    for room in (avail.get("room_types") or []):
+        if not isinstance(room, dict):
+            continue
+        rtype = room.get("room_type") or rt or "*"
+        row = {
+            "_id": _state_key(rtype, ci, co),
+            "agency_id": agency_id,
+            "room_type": rtype,
+            "date_from": ci,
+            "date_to": co,
+            "available_rooms": room.get("available_rooms"),
+            "total_rooms": room.get("total_rooms"),
+            "base_price": room.get("base_price"),
+            "capacity": room.get("capacity"),
+            "rate": rate_index.get(rtype),
+            "source": "polling",
+        }
+        row["content_hash"] = _content_hash(row)
+        rows.append(row)
+    return rows
+
+
+async def sync_once(*, force: bool = False) -> Dict[str, Any]:
+    """Poll the due availability + rates windows and apply changed rows (LWW).
+
+    ``force`` polls every window regardless of its adaptive schedule. Returns a
+    small non-secret summary. Raises only on configuration/connection problems;
+    transport/PMS errors are surfaced to the caller for handling.
     """
     from app.services.syroce_b2b.client import SyroceB2BClient
 
     settings = await store.get_poll_settings()
     horizon = int(settings.get("poll_horizon_days") or 30)
+    base_interval = max(_MIN_INTERVAL_S, float(settings.get("poll_interval_seconds") or 300))
     room_types: List[Optional[str]] = settings.get("poll_room_types") or [None]
     if not room_types:
         room_types = [None]
@@ -85,44 +173,78 @@ async def sync_once() -> Dict[str, Any]:
     check_out = check_in + timedelta(days=horizon)
     ci, co = _iso(check_in), _iso(check_out)
 
+    db = await get_db()
+    window_ids = [rt or "*" for rt in room_types]
+    states = {
+        doc["_id"]: doc
+        async for doc in db[STATE_COLLECTION].find({"_id": {"$in": window_ids}})
+    }
+
     client = await SyroceB2BClient.load()
     now = datetime.now(timezone.utc)
-    written = 0
     agency_id = await store.get_agency_id()
-
-    for rt in room_types:
-        avail = await client.get_availability(check_in=ci, check_out=co, room_type=rt)
-        rates = await client.get_rates(start_date=ci, end_date=co, room_type=rt)
-
-        rate_index: Dict[str, Any] = {}
-        for r in (rates.get("rates") or rates.get("room_types") or []):
-            if isinstance(r, dict) and r.get("room_type"):
-                rate_index[r["room_type"]] = r
-
-        for room in (avail.get("room_types") or []):
-            if not isinstance(room, dict):
+    written = unchanged = polled = skipped = 0
+    state_ops: List[UpdateOne] = []
+
+    try:
+        for rt, window_id in zip(room_types, window_ids):
+            state = states.get(window_id)
+            if not force and _seconds_until_due(state, now) > 0:
+                skipped += 1
                 continue
-            rtype = room.get("room_type") or rt or "*"
-            key = _state_key(rtype, ci, co)
-            await _upsert_lww(
-                {
-                    "_id": key,
-                    "agency_id": agency_id,
-                    "room_type": rtype,
-                    "date_from": ci,
-                    "date_to": co,
-                    "available_rooms": room.get("available_rooms"),
-                    "total_rooms": room.get("total_rooms"),
-                    "base_price": room.get("base_price"),
-                    "capacity": room.get("capacity"),
-                    "rate": rate_index.get(rtype),
-                    "source": "polling",
-                    "synced_at": now,
-                }
-            )
-            written += 1
 
-    return {"written": written, "check_in": ci, "check_out": co, "synced_at": now}
+            avail = await client.get_availability(check_in=ci, check_out=co, room_type=rt)
+            rates = await client.get_rates(start_date=ci, end_date=co, room_type=rt)
+            polled += 1
+
+            window_hash = _content_hash([ci, co, avail, rates])
+            changed = not state or state.get("hash") != window_hash
+            if changed:
+                rows = _window_rows(avail, rates, rt=rt, ci=ci, co=co, agency_id=agency_id)
+                stored = {
+                    doc["_id"]: doc.get("content_hash")
+                    async for doc in db[LOCAL_COLLECTION].find(
+                        {"_id": {"$in": [row["_id"] for row in rows]}}, {"content_hash": 1}
+                    )
+                }
+                dirty = [{**row, "synced_at": now} for row in rows if stored.get(row["_id"]) != row["content_hash"]]
+                written += await _apply_lww(dirty)
+                unchanged += len(rows) - len(dirty)
+
+            interval = _next_interval(state, changed, base_interval)
+            update: Dict[str, Any] = {
+                "hash": window_hash,
+                "interval_s": interval,
+                "last_polled_at": now,
+                "next_poll_at": now + timedelta(seconds=interval),
+            }
+            if changed:
+                update["last_changed_at"] = now
+            state_ops.append(UpdateOne(
+                {"_id": window_id},
+                {"$set": update, "$inc": {"polls": 1, "changes": int(changed)}},
+                upsert=True,
+            ))
+            states[window_id] = {**(state or {}), **update}
+    finally:
+        if state_ops:
+            await db[STATE_COLLECTION].bulk_write(state_ops, ordered=False)
+        registry.inc("syroce_b2b_poll_windows_total", polled, labels={"result": "polled"})
+        registry.inc("syroce_b2b_poll_windows_total", skipped, labels={"result": "skipped"})
+        registry.inc("syroce_b2b_poll_rows_total", written, labels={"result": "written"})
+        registry.inc("syroce_b2b_poll_rows_total", unchanged, labels={"result": "unchanged"})
+
+    next_due = min(_seconds_until_due(states.get(window_id), now) for window_id in window_ids)
+    return {
+        "written": written,
+        "unchanged": unchanged,
+        "polled": polled,
+        "skipped": skipped,
+        "next_poll_in": max(_MIN_INTERVAL_S, next_due),
+        "check_in": ci,
+        "check_out": co,
+        "synced_at": now,
+    }
 
 
 # ── background loop ──────────────────────────────────────────────────
@@ -146,7 +268,12 @@ class PollingService:
                     interval = max(_MIN_INTERVAL_S, float(settings.get("poll_interval_seconds") or 300))
                     if settings.get("poll_enabled"):
                         summary = await sync_once()
-                        logger.info("syroce_b2b polling cycle wrote %d rows.", summary.get("written", 0))
+                        interval = summary["next_poll_in"]
+                        logger.info(
+                            "syroce_b2b polling cycle polled %d/%d windows, wrote %d rows (%d unchanged).",
+                            summary["polled"], summary["polled"] + summary["skipped"],
+                            summary["written"], summary["unchanged"],
+                        )
                     else:
                         interval = 60.0
             except asyncio.CancelledError:
@@ -205,6 +332,7 @@ def polling_running() -> bool:
 
 __all__ = [
     "LOCAL_COLLECTION",
+    "STATE_COLLECTION",
     "sync_once",
     "PollingService",
     "start_polling",
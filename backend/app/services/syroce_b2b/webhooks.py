@@ -97,7 +97,7 @@ async def drain_unprocessed(limit: int = 50) -> int:
     if needs_refresh:
         try:
             from app.services.syroce_b2b import polling
-            await polling.sync_once()
+            await polling.sync_once(force=True)
         except Exception as exc:
             logger.warning("syroce_b2b webhook-triggered sync failed: %s", exc)
     return processed
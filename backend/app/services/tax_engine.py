@@ -9,6 +9,7 @@ Supports:
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from typing import Any
 
 logger = logging.getLogger("tax_engine")
@@ -41,6 +42,18 @@ def get_tax_rates(country_code: str) -> dict[str, Any]:
     return TAX_RATES.get(country_code.upper(), TAX_RATES["DEFAULT"])
 
 
+@lru_cache(maxsize=1024)
+def tax_profile(country_code: str, supplier_code: str = "") -> tuple[dict[str, Any], str]:
+    """(rates, tax mode) for a country/supplier pair.
+
+    Cached: bulk invoicing prices thousands of bookings over a handful of
+    country/supplier pairs.
+    """
+    rates = get_tax_rates(country_code)
+    tax_mode = SUPPLIER_TAX_MODES.get(supplier_code.replace("real_", ""), "tax_included")
+    return rates, tax_mode
+
+
 def calculate_tax_breakdown(
     base_price: float,
     country_code: str = "TR",
@@ -53,8 +66,7 @@ def calculate_tax_breakdown(
 
     Returns complete price breakdown with tax components.
     """
-    rates = get_tax_rates(country_code)
-    tax_mode = SUPPLIER_TAX_MODES.get(supplier_code.replace("real_", ""), "tax_included")
+    rates, tax_mode = tax_profile(country_code, supplier_code)
 
     vat_pct = rates["vat_pct"]
     tourism_pct = rates["tourism_tax_pct"]
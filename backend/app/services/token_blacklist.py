@@ -14,6 +14,7 @@ import logging
 from datetime import datetime, timezone
 
 from app.db import get_db
+from app.indexes.manifest import report_index_failure
 
 logger = logging.getLogger("token_blacklist")
 
@@ -113,4 +114,5 @@ async def ensure_blacklist_indexes() -> None:
         await db[COLLECTION].create_index("user_email", name="idx_user_email")
         logger.info("Token blacklist indexes ensured")
     except Exception as e:
+        report_index_failure("token_blacklist", e)
         logger.warning("Token blacklist index creation warning: %s", e)
@@ -8,7 +8,9 @@ environment variables — they are loaded by the router from the encrypted
 Auth is Login-based: the client logs in once, caches the bearer token until
 `expiresOn` in a process-wide dict keyed by `(base_url, agency, user)`, and
 reuses it across calls. The cache is shared across requests but partitioned
-by tenant so different agencies never share tokens.
+by tenant so different agencies never share tokens. Connections are pooled the
+same way: every call goes through the rate-limited client the adapter
+registry keeps for that `(base_url, agency, user)`.
 """
 from __future__ import annotations
 
@@ -19,6 +21,7 @@ from typing import Any, Dict, Optional, Tuple
 
 import httpx
 
+from app.services.suppliers.registry import registry
 from app.services.tourvisio.errors import TourVisioError
 
 logger = logging.getLogger(__name__)
@@ -78,6 +81,7 @@ class TourVisioClient:
         self._password = password
         self._timeout = timeout
         self._cache_key = (self._base_url, self._agency, self._user)
+        self._http = registry.clients.get("tourvisio", *self._cache_key)
 
     # ───────────────── Auth ─────────────────
 
@@ -92,11 +96,10 @@ class TourVisioClient:
             },
         }
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as cli:
-                resp = await cli.post(url, headers={
-                    "Content-Type": "application/json; charset=utf-8",
-                    "Accept": "application/json",
-                }, json=body)
+            resp = await self._http.request_json("POST", url, body, headers={
+                "Content-Type": "application/json; charset=utf-8",
+                "Accept": "application/json",
+            }, timeout=self._timeout, operation=LOGIN_PATH)
         except httpx.TimeoutException as exc:
             raise TourVisioError(504, "TourVisio login timeout") from exc
         except httpx.HTTPError as exc:
@@ -185,8 +188,7 @@ class TourVisioClient:
             "Accept": "application/json",
         }
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as cli:
-                resp = await cli.post(url, headers=headers, json=envelope)
+            resp = await self._http.request_json("POST", url, envelope, headers=headers, timeout=self._timeout, operation=path)
         except httpx.TimeoutException as exc:
             raise TourVisioError(504, f"TourVisio yanıt vermedi (timeout): {path}") from exc
         except httpx.HTTPError as exc:
@@ -198,8 +200,7 @@ class TourVisioClient:
             token = await self._get_token()
             envelope["header"]["token"] = token
             try:
-                async with httpx.AsyncClient(timeout=self._timeout) as cli:
-                    resp = await cli.post(url, headers=headers, json=envelope)
+                resp = await self._http.request_json("POST", url, envelope, headers=headers, timeout=self._timeout, operation=path)
             except httpx.HTTPError as exc:
                 raise TourVisioError(502, f"TourVisio bağlantı hatası (retry): {exc}") from exc
 
@@ -0,0 +1,84 @@
+"""Request-scoped unit of work for write-heavy endpoints.
+
+Handlers queue their audit entries, lifecycle events, projection updates
+and outbox rows on the unit instead of awaiting each write. ``commit``
+flushes them with one ordered ``bulk_write`` per collection, all
+collections concurrently, so a request pays one round-trip for its writes
+instead of one per document.
+
+Used as an async context manager the unit also commits when the handler
+raises, so writes queued before an ``AppError`` (e.g. RISK_BLOCKED audit)
+persist exactly as they did when they were awaited inline.
+
+``step`` records per-step latencies; they are stored on
+``request.state.server_timing`` and returned as a ``Server-Timing``
+response header by ``CorrelationIdMiddleware``.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import Request
+from pymongo import InsertOne, UpdateOne
+
+from app.services.audit import build_audit_log
+
+
+class UnitOfWork:
+    def __init__(self, db, request: Optional[Request] = None):
+        self.db = db
+        self.request = request
+        self.timings: list[tuple[str, float]] = []
+        self._ops: dict[str, list[Any]] = {}
+        if request is not None:
+            request.state.server_timing = self.timings
+
+    async def __aenter__(self) -> "UnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.commit()
+
+    @property
+    def pending(self) -> int:
+        return sum(len(ops) for ops in self._ops.values())
+
+    def insert(self, collection: str, doc: dict[str, Any]) -> None:
+        self._ops.setdefault(collection, []).append(InsertOne(doc))
+
+    def update(self, collection: str, filter: dict[str, Any], update: dict[str, Any]) -> None:
+        self._ops.setdefault(collection, []).append(UpdateOne(filter, update))
+
+    def audit(self, **kwargs: Any) -> dict[str, Any]:
+        """Queue an audit_logs entry (same document as ``write_audit_log``)."""
+        doc = build_audit_log(request=self.request, **kwargs)
+        self.insert("audit_logs", doc)
+        return doc
+
+    def outbox(self, doc: dict[str, Any]) -> None:
+        self.insert("outbox_events", doc)
+
+    @asynccontextmanager
+    async def step(self, name: str) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((name, (time.perf_counter() - start) * 1000))
+
+    async def commit(self) -> None:
+        """Flush queued writes; a no-op when nothing is pending."""
+        if not self._ops:
+            return
+        ops, self._ops = self._ops, {}
+        async with self.step("commit"):
+            await asyncio.gather(*[
+                self.db[collection].bulk_write(batch, ordered=True) for collection, batch in ops.items()
+            ])
+
+
+def server_timing_header(timings: list[tuple[str, float]]) -> str:
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings)
@@ -16,6 +16,8 @@ from __future__ import annotations
 
 import logging
 
+from app.indexes.manifest import report_index_failure
+
 logger = logging.getLogger("suppliers.indexes")
 
 
@@ -67,6 +69,7 @@ async def ensure_supplier_ecosystem_indexes(db) -> int:
             # Duplicate index is fine
             if "already exists" not in str(e).lower():
                 logger.warning("Index creation failed for %s: %s", collection_name, e)
+                report_index_failure(collection_name, e)
 
     logger.info("Ensured %d supplier ecosystem indexes", count)
     return count
@@ -25,6 +25,7 @@ import time
 import uuid
 from typing import Any, Dict, Optional
 
+from app.services.search_index import SEARCH_TOKENS_FIELD, build_search_tokens
 from app.suppliers.contracts.schemas import (
     ConfirmRequest, PricingRequest, SupplierContext,
 )
@@ -100,7 +101,7 @@ async def orchestrate_booking(
         {"_id": booking_id, "organization_id": ctx.organization_id}
     )
     if not existing:
-        await db.bookings.insert_one({
+        draft = {
             "_id": booking_id,
             "organization_id": ctx.organization_id,
             "supplier_state": BookingState.DRAFT.value,
@@ -111,7 +112,9 @@ async def orchestrate_booking(
             "contact": contact,
             "created_at": now,
             "updated_at": now,
-        })
+        }
+        draft[SEARCH_TOKENS_FIELD] = build_search_tokens(draft, "bookings")
+        await db.bookings.insert_one(draft)
 
     # Create orchestration run record
     run = {
@@ -9,53 +9,53 @@ Metrics:
   - commission per supplier
   - cancellation revenue loss
   - GMV (Gross Merchandise Value)
+
+All figures are read from the daily revenue cube (``revenue_cube``), not
+from ``unified_bookings``.
 """
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone, timedelta
 from typing import Any
 
+from app.suppliers.revenue_cube import rollup, since_day
+
 logger = logging.getLogger("suppliers.revenue_analytics")
 
+_BOOKED = {"bookings": {"$gt": 0}}
+
 
 async def get_supplier_revenue_analytics(db, days: int = 30) -> list[dict[str, Any]]:
     """Detailed revenue analytics per supplier."""
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-
-    pipeline = [
-        {"$match": {"created_at": {"$gte": cutoff}}},
-        {"$group": {
-            "_id": "$supplier_code",
-            "total_bookings": {"$sum": 1},
-            "total_revenue": {"$sum": "$confirmed_price"},
-            "avg_booking_value": {"$avg": "$confirmed_price"},
-            "currencies": {"$addToSet": "$currency"},
-            "fallback_count": {"$sum": {"$cond": ["$fallback_used", 1, 0]}},
-            "confirmed_count": {"$sum": {"$cond": [{"$eq": ["$status", "confirmed"]}, 1, 0]}},
-        }},
-        {"$sort": {"total_revenue": -1}},
-    ]
-    cursor = db["unified_bookings"].aggregate(pipeline)
-    raw = await cursor.to_list(length=50)
+    rows = await rollup(db, ("supplier_code", "currency"), since_day(days), match=_BOOKED)
 
-    results = []
-    grand_total = sum(r.get("total_revenue", 0) for r in raw)
+    by_supplier: dict[str, dict[str, Any]] = {}
+    for r in rows:
+        agg = by_supplier.setdefault(r.get("supplier_code") or "", {
+            "bookings": 0, "confirmed": 0, "gmv": 0, "fallback_count": 0, "currencies": [],
+        })
+        for m in ("bookings", "confirmed", "gmv", "fallback_count"):
+            agg[m] += r.get(m, 0)
+        if r.get("currency") and r["currency"] not in agg["currencies"]:
+            agg["currencies"].append(r["currency"])
+
+    ranked = sorted(by_supplier.items(), key=lambda x: x[1]["gmv"], reverse=True)[:50]
+    grand_total = sum(agg["gmv"] for _, agg in ranked)
 
-    for r in raw:
-        sc = r["_id"]
+    results = []
+    for sc, agg in ranked:
         if not sc:
             continue
-        revenue = r.get("total_revenue", 0)
+        revenue = agg["gmv"]
         results.append({
             "supplier_code": sc,
-            "total_bookings": r.get("total_bookings", 0),
-            "confirmed_bookings": r.get("confirmed_count", 0),
+            "total_bookings": agg["bookings"],
+            "confirmed_bookings": agg["confirmed"],
             "total_revenue": round(revenue, 2),
-            "avg_booking_value": round(r.get("avg_booking_value", 0), 2),
+            "avg_booking_value": round(revenue / agg["bookings"], 2) if agg["bookings"] else 0,
             "revenue_share_pct": round(revenue / grand_total * 100, 2) if grand_total > 0 else 0,
-            "fallback_count": r.get("fallback_count", 0),
-            "currencies": r.get("currencies", []),
+            "fallback_count": agg["fallback_count"],
+            "currencies": agg["currencies"],
         })
 
     return results
@@ -63,41 +63,31 @@ async def get_supplier_revenue_analytics(db, days: int = 30) -> list[dict[str, A
 
 async def get_agency_revenue_analytics(db, days: int = 30) -> list[dict[str, Any]]:
     """Revenue analytics per agency."""
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-
-    pipeline = [
-        {"$match": {"created_at": {"$gte": cutoff}}},
-        {"$group": {
-            "_id": "$organization_id",
-            "total_bookings": {"$sum": 1},
-            "total_revenue": {"$sum": "$confirmed_price"},
-            "avg_booking_value": {"$avg": "$confirmed_price"},
-            "top_suppliers": {"$push": "$supplier_code"},
-            "product_types": {"$addToSet": "$product_type"},
-        }},
-        {"$sort": {"total_revenue": -1}},
-    ]
-    cursor = db["unified_bookings"].aggregate(pipeline)
-    raw = await cursor.to_list(length=100)
+    rows = await rollup(db, ("organization_id", "supplier_code", "product_type"), since_day(days), match=_BOOKED)
 
-    results = []
-    for r in raw:
-        org_id = r["_id"]
+    by_org: dict[str, dict[str, Any]] = {}
+    for r in rows:
+        org_id = r.get("organization_id")
         if not org_id:
             continue
-        # Count supplier frequency
-        supplier_freq: dict[str, int] = {}
-        for s in r.get("top_suppliers", []):
-            supplier_freq[s] = supplier_freq.get(s, 0) + 1
-        preferred = sorted(supplier_freq.items(), key=lambda x: x[1], reverse=True)[:3]
+        agg = by_org.setdefault(org_id, {"bookings": 0, "gmv": 0, "suppliers": {}, "product_types": []})
+        agg["bookings"] += r.get("bookings", 0)
+        agg["gmv"] += r.get("gmv", 0)
+        sc = r.get("supplier_code") or ""
+        agg["suppliers"][sc] = agg["suppliers"].get(sc, 0) + r.get("bookings", 0)
+        if r.get("product_type") and r["product_type"] not in agg["product_types"]:
+            agg["product_types"].append(r["product_type"])
 
+    results = []
+    for org_id, agg in sorted(by_org.items(), key=lambda x: x[1]["gmv"], reverse=True)[:100]:
+        preferred = sorted(agg["suppliers"].items(), key=lambda x: x[1], reverse=True)[:3]
         results.append({
             "organization_id": org_id,
-            "total_bookings": r.get("total_bookings", 0),
-            "total_revenue": round(r.get("total_revenue", 0), 2),
-            "avg_booking_value": round(r.get("avg_booking_value", 0), 2),
+            "total_bookings": agg["bookings"],
+            "total_revenue": round(agg["gmv"], 2),
+            "avg_booking_value": round(agg["gmv"] / agg["bookings"], 2) if agg["bookings"] else 0,
             "preferred_suppliers": [{"supplier": s, "count": c} for s, c in preferred],
-            "product_types": r.get("product_types", []),
+            "product_types": agg["product_types"],
         })
 
     return results
@@ -105,73 +95,43 @@ async def get_agency_revenue_analytics(db, days: int = 30) -> list[dict[str, Any
 
 async def get_gmv_summary(db, days: int = 30) -> dict[str, Any]:
     """Gross Merchandise Value and platform-wide revenue KPIs."""
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-
-    pipeline = [
-        {"$match": {"created_at": {"$gte": cutoff}}},
-        {"$group": {
-            "_id": None,
-            "gmv": {"$sum": "$confirmed_price"},
-            "total_bookings": {"$sum": 1},
-            "avg_booking_value": {"$avg": "$confirmed_price"},
-            "min_booking": {"$min": "$confirmed_price"},
-            "max_booking": {"$max": "$confirmed_price"},
-            "unique_agencies": {"$addToSet": "$organization_id"},
-            "unique_suppliers": {"$addToSet": "$supplier_code"},
-        }},
-    ]
-    cursor = db["unified_bookings"].aggregate(pipeline)
-    raw = await cursor.to_list(length=1)
+    rows = await rollup(db, ("organization_id", "supplier_code"), since_day(days), match=_BOOKED)
 
-    if not raw:
+    if not rows:
         return {
             "gmv": 0, "total_bookings": 0, "avg_booking_value": 0,
             "min_booking": 0, "max_booking": 0,
             "unique_agencies": 0, "unique_suppliers": 0,
         }
 
-    r = raw[0]
-    # Get commission revenue from commission_records
-    commission_pipeline = [
-        {"$match": {"created_at": {"$gte": cutoff}}},
-        {"$group": {
-            "_id": None,
-            "total_commission": {"$sum": "$platform_commission"},
-            "total_markup": {"$sum": "$platform_markup"},
-        }},
-    ]
-    comm_cursor = db["commission_records"].aggregate(commission_pipeline)
-    comm_raw = await comm_cursor.to_list(length=1)
-    platform_revenue = 0
-    if comm_raw:
-        platform_revenue = (comm_raw[0].get("total_commission", 0) or 0) + (comm_raw[0].get("total_markup", 0) or 0)
+    gmv = sum(r.get("gmv", 0) for r in rows)
+    bookings = sum(r.get("bookings", 0) for r in rows)
+    platform_revenue = sum((r.get("commission", 0) or 0) + (r.get("markup", 0) or 0) for r in rows)
+    mins = [r["min_price"] for r in rows if r.get("min_price") is not None]
+    maxs = [r["max_price"] for r in rows if r.get("max_price") is not None]
 
     return {
-        "gmv": round(r.get("gmv", 0), 2),
+        "gmv": round(gmv, 2),
         "platform_revenue": round(platform_revenue, 2),
-        "total_bookings": r.get("total_bookings", 0),
-        "avg_booking_value": round(r.get("avg_booking_value", 0), 2),
-        "min_booking": round(r.get("min_booking", 0), 2),
-        "max_booking": round(r.get("max_booking", 0), 2),
-        "unique_agencies": len(r.get("unique_agencies", [])),
-        "unique_suppliers": len(r.get("unique_suppliers", [])),
+        "total_bookings": bookings,
+        "avg_booking_value": round(gmv / bookings, 2) if bookings else 0,
+        "min_booking": round(min(mins), 2) if mins else 0,
+        "max_booking": round(max(maxs), 2) if maxs else 0,
+        "unique_agencies": len({r["organization_id"] for r in rows if r.get("organization_id")}),
+        "unique_suppliers": len({r["supplier_code"] for r in rows if r.get("supplier_code")}),
     }
 
 
 async def get_destination_revenue(db, days: int = 30, limit: int = 10) -> list[dict[str, Any]]:
-    """Revenue breakdown by destination."""
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-
-    # Get from search analytics booking events that have destination info
-    pipeline = [
-        {"$match": {"event_type": "search_event", "timestamp": {"$gte": cutoff}}},
-        {"$group": {
-            "_id": "$details.destination",
-            "search_count": {"$sum": 1},
-        }},
-        {"$sort": {"search_count": -1}},
-        {"$limit": limit},
+    """Revenue breakdown by destination (searches, bookings and GMV)."""
+    rows = await rollup(db, ("destination",), since_day(days), match={"destination": {"$ne": ""}})
+    rows.sort(key=lambda r: (r.get("searches", 0), r.get("gmv", 0)), reverse=True)
+    return [
+        {
+            "destination": r["destination"],
+            "search_count": r.get("searches", 0),
+            "bookings": r.get("bookings", 0),
+            "revenue": round(r.get("gmv", 0), 2),
+        }
+        for r in rows[:limit]
     ]
-    cursor = db["search_analytics"].aggregate(pipeline)
-    raw = await cursor.to_list(length=limit)
-    return [{"destination": r["_id"], "search_count": r["search_count"]} for r in raw if r["_id"]]
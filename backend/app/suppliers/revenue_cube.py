@@ -0,0 +1,263 @@
+"""Revenue Daily Cube.
+
+Daily rollup of unified bookings and searches that backs the revenue
+analytics and forecasting endpoints:
+
+  dimensions: day × organization_id (agency) × supplier_code × destination
+              × product_type × currency
+  measures:   bookings, confirmed, fallback_count, gmv (confirmed_price),
+              sell, markup, commission, searches, min_price, max_price
+
+The cube is maintained incrementally — one upsert per confirmed booking
+(``record_booking``) and per search (``record_search``) — so an endpoint
+reads a few hundred cube cells instead of scanning ``unified_bookings``.
+``rebuild_cube`` recomputes a day range from the source collections
+(scripts/backfill_revenue_cube.py, nightly reconcile job).
+
+Windows are whole UTC days: ``days=30`` covers today and the 30 days
+before it.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from pymongo import ReplaceOne
+
+logger = logging.getLogger("suppliers.revenue_cube")
+
+CUBE_COLLECTION = "revenue_daily_cube"
+DIMENSIONS = ("day", "organization_id", "supplier_code", "destination", "product_type", "currency")
+MEASURES = ("bookings", "confirmed", "fallback_count", "gmv", "sell", "markup", "commission", "searches")
+REBUILD_BATCH = 1000
+
+
+def _day(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).date().isoformat() if value.tzinfo else value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if value:
+        return str(value)[:10]
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def since_day(days: int, today: Optional[date] = None) -> str:
+    """First cube day of a ``days`` window ending today."""
+    today = today or datetime.now(timezone.utc).date()
+    return (today - timedelta(days=days)).isoformat()
+
+
+def cell_id(dims: dict[str, Any]) -> str:
+    return "|".join(str(dims.get(d) or "") for d in DIMENSIONS)
+
+
+def _cell_update(
+    dims: dict[str, Any], inc: dict[str, float], price: Optional[float] = None,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    update: dict[str, Any] = {
+        "$setOnInsert": dims,
+        "$inc": inc,
+        "$set": {"updated_at": datetime.now(timezone.utc)},
+    }
+    if price is not None:
+        update["$min"] = {"min_price": price}
+        update["$max"] = {"max_price": price}
+    return {"_id": cell_id(dims)}, update
+
+
+def booking_cell_update(booking: dict[str, Any], commission: float = 0.0) -> tuple[dict[str, Any], dict[str, Any]]:
+    """(filter, update) adding one ``unified_bookings`` document to its cell."""
+    dims = {
+        "day": _day(booking.get("created_at")),
+        "organization_id": booking.get("organization_id") or "",
+        "supplier_code": booking.get("supplier_code") or "",
+        "destination": booking.get("destination") or "",
+        "product_type": booking.get("product_type") or "",
+        "currency": booking.get("currency") or "",
+    }
+    price = float(booking.get("confirmed_price") or 0)
+    inc = {
+        "bookings": 1,
+        "confirmed": 1 if booking.get("status") == "confirmed" else 0,
+        "fallback_count": 1 if booking.get("fallback_used") else 0,
+        "gmv": price,
+        "sell": float(booking.get("sell_price") or 0),
+        "markup": float(booking.get("platform_markup") or 0),
+        "commission": float(commission or 0),
+    }
+    return _cell_update(dims, inc, price)
+
+
+async def record_booking(db, booking: dict[str, Any], commission: float = 0.0) -> None:
+    """Add a confirmed booking to the cube (best effort — rebuild heals misses)."""
+    query, update = booking_cell_update(booking, commission)
+    try:
+        await db[CUBE_COLLECTION].update_one(query, update, upsert=True)
+    except Exception as e:
+        logger.warning("Revenue cube booking update failed: %s", e)
+
+
+async def record_search(db, organization_id: str, product_type: str, destination: str) -> None:
+    """Count a search in its (org, destination, product_type) cell."""
+    dims = {
+        "day": _day(None),
+        "organization_id": organization_id or "",
+        "supplier_code": "",
+        "destination": destination or "",
+        "product_type": product_type or "",
+        "currency": "",
+    }
+    query, update = _cell_update(dims, {"searches": 1})
+    try:
+        await db[CUBE_COLLECTION].update_one(query, update, upsert=True)
+    except Exception as e:
+        logger.warning("Revenue cube search update failed: %s", e)
+
+
+# ─── Queries ──────────────────────────────────────────────────────────────────
+
+async def rollup(
+    db,
+    group_by: Iterable[str],
+    since: str,
+    until: Optional[str] = None,
+    match: Optional[dict[str, Any]] = None,
+    limit: Optional[int] = 10_000,
+) -> list[dict[str, Any]]:
+    """Sum cube measures over ``[since, until)`` grouped by the given dimensions.
+
+    Each row carries the group dimensions as plain keys plus every measure.
+    """
+    day_filter: dict[str, Any] = {"$gte": since}
+    if until:
+        day_filter["$lt"] = until
+    keys = list(group_by)
+    group: dict[str, Any] = {"_id": {k: f"${k}" for k in keys} if keys else None}
+    for m in MEASURES:
+        group[m] = {"$sum": f"${m}"}
+    group["min_price"] = {"$min": "$min_price"}
+    group["max_price"] = {"$max": "$max_price"}
+
+    pipeline = [{"$match": {"day": day_filter, **(match or {})}}, {"$group": group}]
+    raw = await db[CUBE_COLLECTION].aggregate(pipeline).to_list(length=limit)
+    rows = []
+    for r in raw:
+        dims = r.pop("_id") or {}
+        rows.append({**dims, **r})
+    return rows
+
+
+# ─── Rebuild ──────────────────────────────────────────────────────────────────
+
+def _booking_rebuild_pipeline(since: Optional[str]) -> list[dict[str, Any]]:
+    match = {"created_at": {"$gte": since}} if since else {}
+    return [
+        {"$match": match},
+        {"$lookup": {
+            "from": "commission_records",
+            "localField": "internal_booking_id",
+            "foreignField": "booking_id",
+            "as": "_commission",
+        }},
+        {"$group": {
+            "_id": {
+                "day": {"$substrBytes": ["$created_at", 0, 10]},
+                "organization_id": {"$ifNull": ["$organization_id", ""]},
+                "supplier_code": {"$ifNull": ["$supplier_code", ""]},
+                "destination": {"$ifNull": ["$destination", ""]},
+                "product_type": {"$ifNull": ["$product_type", ""]},
+                "currency": {"$ifNull": ["$currency", ""]},
+            },
+            "bookings": {"$sum": 1},
+            "confirmed": {"$sum": {"$cond": [{"$eq": ["$status", "confirmed"]}, 1, 0]}},
+            "fallback_count": {"$sum": {"$cond": ["$fallback_used", 1, 0]}},
+            "gmv": {"$sum": "$confirmed_price"},
+            "sell": {"$sum": "$sell_price"},
+            "markup": {"$sum": "$platform_markup"},
+            "commission": {"$sum": {"$sum": "$_commission.platform_commission"}},
+            "min_price": {"$min": "$confirmed_price"},
+            "max_price": {"$max": "$confirmed_price"},
+        }},
+    ]
+
+
+def _search_rebuild_pipeline(since: Optional[str]) -> list[dict[str, Any]]:
+    match: dict[str, Any] = {"event_type": "search_event"}
+    if since:
+        match["timestamp"] = {"$gte": since}
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "day": {"$substrBytes": ["$timestamp", 0, 10]},
+                "organization_id": {"$ifNull": ["$organization_id", ""]},
+                "supplier_code": "",
+                "destination": {"$ifNull": ["$details.destination", ""]},
+                "product_type": {"$ifNull": ["$details.product_type", ""]},
+                "currency": "",
+            },
+            "searches": {"$sum": 1},
+        }},
+    ]
+
+
+async def rebuild_cube(db, since: Optional[str] = None) -> dict[str, Any]:
+    """Recompute cube cells from ``since`` (ISO day, None = all history).
+
+    Rebuilt cells are replaced in place; cells of the range that the rebuild
+    did not touch and that saw no live update since it started are deleted.
+    Live increments racing with the rebuild for a cell can be lost for that
+    cell until the next rebuild — run it off-peak.
+    """
+    started = datetime.now(timezone.utc)
+    cells: dict[str, dict[str, Any]] = {}
+
+    sources = (
+        ("unified_bookings", _booking_rebuild_pipeline(since)),
+        ("search_analytics", _search_rebuild_pipeline(since)),
+    )
+    for collection, pipeline in sources:
+        async for row in db[collection].aggregate(pipeline, allowDiskUse=True):
+            dims = {d: row["_id"].get(d) or "" for d in DIMENSIONS}
+            if not dims["day"]:
+                continue
+            cell = cells.setdefault(cell_id(dims), {**dims, **{m: 0 for m in MEASURES}})
+            for m in MEASURES:
+                cell[m] += row.get(m) or 0
+            for bound in ("min_price", "max_price"):
+                if row.get(bound) is not None:
+                    current = cell.get(bound)
+                    pick = min if bound == "min_price" else max
+                    cell[bound] = row[bound] if current is None else pick(current, row[bound])
+
+    ops = []
+    written = 0
+    for cid, cell in cells.items():
+        ops.append(ReplaceOne({"_id": cid}, {**cell, "updated_at": started}, upsert=True))
+        if len(ops) >= REBUILD_BATCH:
+            await db[CUBE_COLLECTION].bulk_write(ops, ordered=False)
+            written += len(ops)
+            ops = []
+    if ops:
+        await db[CUBE_COLLECTION].bulk_write(ops, ordered=False)
+        written += len(ops)
+
+    stale: dict[str, Any] = {"updated_at": {"$lt": started}}
+    if since:
+        stale["day"] = {"$gte": since}
+    deleted = await db[CUBE_COLLECTION].delete_many(stale)
+
+    return {
+        "since": since,
+        "cells_written": written,
+        "cells_deleted": getattr(deleted, "deleted_count", 0),
+        "duration_ms": round((datetime.now(timezone.utc) - started).total_seconds() * 1000, 1),
+    }
+
+
+async def ensure_revenue_cube_indexes(db) -> None:
+    await db[CUBE_COLLECTION].create_index([("day", 1), ("supplier_code", 1)], name="idx_day_supplier")
+    await db[CUBE_COLLECTION].create_index([("day", 1), ("organization_id", 1)], name="idx_day_org")
+    await db[CUBE_COLLECTION].create_index([("updated_at", 1)], name="idx_updated_at")
@@ -4,61 +4,116 @@ Estimates:
   - expected monthly bookings
   - supplier revenue projections
   - agency growth trends
+  - destination revenue projections
 
-Uses simple linear regression on historical data.
+History is read once from the daily revenue cube (``revenue_cube``) as a
+day × supplier × agency × destination grid. Every daily series (platform
+revenue and bookings, each supplier, agency and destination) is fitted in
+one vectorized pass by ``forecast_engine`` — trend plus weekly and yearly
+seasonality, with 90% intervals per 30-day period.
+
+Results are cached per UTC day and forecast horizon; the cube only gains
+today's cells during the day, so the cost is one fit per worker per day.
 """
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
+import numpy as np
+
+from app.suppliers.forecast_engine import forecast_periods
+from app.suppliers.revenue_cube import rollup, since_day
+
 logger = logging.getLogger("suppliers.forecasting")
 
+_BOOKED = {"bookings": {"$gt": 0}}
+HISTORY_DAYS = 730
+PERIOD_DAYS = 30
+HISTORY_PERIODS = 6
+MAX_DESTINATIONS = 20
 
-async def get_revenue_forecast(db, forecast_months: int = 3) -> dict[str, Any]:
-    """Generate revenue forecast based on recent trends."""
-    # Get monthly data for the last 6 months
+_cache: dict[tuple[str, int], dict[str, Any]] = {}
+
+
+async def get_revenue_forecast(db, forecast_months: int = 3, refresh: bool = False) -> dict[str, Any]:
+    """Generate revenue forecast based on recent trends (cached per day)."""
     now = datetime.now(timezone.utc)
-    months_data = []
+    key = (now.date().isoformat(), forecast_months)
+    if not refresh and key in _cache:
+        return _cache[key]
 
-    for i in range(6, 0, -1):
-        month_start = (now - timedelta(days=i * 30)).isoformat()
-        month_end = (now - timedelta(days=(i - 1) * 30)).isoformat()
-
-        pipeline = [
-            {"$match": {"created_at": {"$gte": month_start, "$lt": month_end}}},
-            {"$group": {
-                "_id": None,
-                "revenue": {"$sum": "$confirmed_price"},
-                "bookings": {"$sum": 1},
-            }},
-        ]
-        cursor = db["unified_bookings"].aggregate(pipeline)
-        raw = await cursor.to_list(length=1)
-
-        if raw:
-            months_data.append({
-                "month_offset": -i,
-                "revenue": raw[0].get("revenue", 0),
-                "bookings": raw[0].get("bookings", 0),
-            })
-        else:
-            months_data.append({"month_offset": -i, "revenue": 0, "bookings": 0})
-
-    # Simple linear regression for forecasting
-    revenue_forecast = _forecast_series(
-        [m["revenue"] for m in months_data], forecast_months
-    )
-    booking_forecast = _forecast_series(
-        [m["bookings"] for m in months_data], forecast_months
+    result = await _build_forecast(db, forecast_months, now)
+    for stale in [k for k in _cache if k[0] != key[0]]:
+        del _cache[stale]
+    _cache[key] = result
+    return result
+
+
+def _index(labels: list[str]) -> tuple[list[str], np.ndarray]:
+    names, inverse = np.unique(np.asarray(labels, dtype=object).astype(str), return_inverse=True)
+    return [str(n) for n in names], inverse
+
+
+def _grid(inverse: np.ndarray, size: int, day_idx: np.ndarray, weights: np.ndarray, days: int) -> np.ndarray:
+    grid = np.zeros((size, days))
+    np.add.at(grid, (inverse, day_idx), weights)
+    return grid
+
+
+async def _build_forecast(db, forecast_months: int, now: datetime) -> dict[str, Any]:
+    today = now.date()
+    first = today - timedelta(days=HISTORY_DAYS - 1)
+    rows = await rollup(
+        db, ("day", "supplier_code", "organization_id", "destination"),
+        since_day(HISTORY_DAYS - 1, today), match=_BOOKED, limit=None,
     )
+    rows = [r for r in rows if first <= date.fromisoformat(r["day"]) <= today]
+
+    day_idx = np.array([(date.fromisoformat(r["day"]) - first).days for r in rows], dtype=int)
+    gmv = np.array([r.get("gmv", 0) or 0 for r in rows], dtype=float)
+    bookings = np.array([r.get("bookings", 0) or 0 for r in rows], dtype=float)
+    suppliers, sup_inv = _index([r.get("supplier_code") or "" for r in rows])
+    agencies, org_inv = _index([r.get("organization_id") or "" for r in rows])
+    destinations, dst_inv = _index([r.get("destination") or "" for r in rows])
+
+    platform = np.zeros((2, HISTORY_DAYS))
+    np.add.at(platform[0], day_idx, gmv)
+    np.add.at(platform[1], day_idx, bookings)
+    supplier_rev = _grid(sup_inv, len(suppliers), day_idx, gmv, HISTORY_DAYS)
+    agency_rev = _grid(org_inv, len(agencies), day_idx, gmv, HISTORY_DAYS)
+    agency_bookings = _grid(org_inv, len(agencies), day_idx, bookings, HISTORY_DAYS)
+    destination_rev = _grid(dst_inv, len(destinations), day_idx, gmv, HISTORY_DAYS)
+
+    months_data = []
+    for i in range(HISTORY_PERIODS, 0, -1):
+        window = platform[:, HISTORY_DAYS - i * PERIOD_DAYS:HISTORY_DAYS - (i - 1) * PERIOD_DAYS]
+        months_data.append({
+            "month_offset": -i,
+            "revenue": round(float(window[0].sum()), 2),
+            "bookings": int(window[1].sum()),
+        })
 
-    # Supplier revenue projections
-    supplier_projections = await _supplier_projections(db, forecast_months)
+    # One fit for every series, starting at the first day with any booking.
+    series = np.vstack([platform, supplier_rev, agency_rev, destination_rev])
+    active = np.flatnonzero(platform[1])
+    if active.size:
+        start = int(active[0])
+        fit = forecast_periods(series[:, start:], first + timedelta(days=start), forecast_months, PERIOD_DAYS)
+        revenue_forecast, booking_forecast = fit.periods(0), fit.periods(1)
+    else:
+        fit = None
+        revenue_forecast = booking_forecast = [
+            {"period": i + 1, "predicted": 0, "confidence": "low"} for i in range(forecast_months)
+        ]
 
-    # Agency growth trends
-    agency_trends = await _agency_growth_trends(db)
+    offset = 2
+    supplier_projections = _supplier_projections(fit, offset, suppliers, supplier_rev)
+    offset += len(suppliers)
+    agency_trends = _agency_growth_trends(fit, offset, agencies, agency_rev, agency_bookings)
+    offset += len(agencies)
+    destination_forecasts = _destination_forecasts(fit, offset, destinations, destination_rev)
 
     return {
         "historical": months_data,
@@ -66,163 +121,86 @@ async def get_revenue_forecast(db, forecast_months: int = 3) -> dict[str, Any]:
         "booking_forecast": booking_forecast,
         "supplier_projections": supplier_projections,
         "agency_trends": agency_trends,
+        "destination_forecasts": destination_forecasts,
         "forecast_months": forecast_months,
         "generated_at": now.isoformat(),
     }
 
 
-def _forecast_series(values: list[float], periods: int) -> list[dict[str, Any]]:
-    """Simple linear forecast. Returns predicted values for N future periods."""
-    n = len(values)
-    if n == 0:
-        return [{"period": i + 1, "predicted": 0, "confidence": "low"} for i in range(periods)]
-
-    # Filter out zero values for trend calculation
-    non_zero = [v for v in values if v > 0]
-
-    if len(non_zero) < 2:
-        avg = sum(values) / n
-        return [
-            {"period": i + 1, "predicted": round(avg, 2), "confidence": "low"}
-            for i in range(periods)
-        ]
-
-    # Linear regression: y = mx + b
-    x_vals = list(range(n))
-    x_mean = sum(x_vals) / n
-    y_mean = sum(values) / n
-
-    numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_vals, values))
-    denominator = sum((x - x_mean) ** 2 for x in x_vals)
-
-    if denominator == 0:
-        slope = 0
-    else:
-        slope = numerator / denominator
-
-    intercept = y_mean - slope * x_mean
-
-    # R-squared for confidence
-    ss_res = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(x_vals, values))
-    ss_tot = sum((y - y_mean) ** 2 for y in values)
-    r_squared = 1 - ss_res / ss_tot if ss_tot > 0 else 0
-
-    confidence = "high" if r_squared > 0.7 else ("medium" if r_squared > 0.3 else "low")
-
-    forecasts = []
-    for i in range(periods):
-        future_x = n + i
-        predicted = max(0, slope * future_x + intercept)
-        forecasts.append({
-            "period": i + 1,
-            "predicted": round(predicted, 2),
-            "confidence": confidence,
-            "trend": "up" if slope > 0 else ("down" if slope < 0 else "flat"),
-            "growth_rate": round(slope / max(y_mean, 1) * 100, 1),
-        })
-
-    return forecasts
-
-
-async def _supplier_projections(db, months: int) -> list[dict[str, Any]]:
+def _supplier_projections(fit, offset: int, suppliers: list[str], revenue: np.ndarray) -> list[dict[str, Any]]:
     """Revenue projections per supplier."""
-    cutoff_90 = (datetime.now(timezone.utc) - timedelta(days=90)).isoformat()
-    cutoff_30 = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
-
-    # Last 90 days
-    pipeline_90 = [
-        {"$match": {"created_at": {"$gte": cutoff_90}}},
-        {"$group": {
-            "_id": "$supplier_code",
-            "total_revenue_90d": {"$sum": "$confirmed_price"},
-            "bookings_90d": {"$sum": 1},
-        }},
-    ]
-    cursor_90 = db["unified_bookings"].aggregate(pipeline_90)
-    data_90 = {r["_id"]: r for r in await cursor_90.to_list(length=50) if r["_id"]}
-
-    # Last 30 days
-    pipeline_30 = [
-        {"$match": {"created_at": {"$gte": cutoff_30}}},
-        {"$group": {
-            "_id": "$supplier_code",
-            "total_revenue_30d": {"$sum": "$confirmed_price"},
-            "bookings_30d": {"$sum": 1},
-        }},
-    ]
-    cursor_30 = db["unified_bookings"].aggregate(pipeline_30)
-    data_30 = {r["_id"]: r for r in await cursor_30.to_list(length=50) if r["_id"]}
+    rev_30 = revenue[:, -PERIOD_DAYS:].sum(axis=1)
+    monthly_avg = revenue[:, -3 * PERIOD_DAYS:].sum(axis=1) / 3
 
     results = []
-    for sc in set(list(data_90.keys()) + list(data_30.keys())):
-        if sc and not sc.startswith("mock_"):
-            rev_90 = data_90.get(sc, {}).get("total_revenue_90d", 0)
-            rev_30 = data_30.get(sc, {}).get("total_revenue_30d", 0)
-            monthly_avg = rev_90 / 3 if rev_90 > 0 else 0
-            trend = "up" if rev_30 > monthly_avg else ("down" if rev_30 < monthly_avg * 0.8 else "stable")
-
-            results.append({
-                "supplier_code": sc,
-                "revenue_30d": round(rev_30, 2),
-                "monthly_avg_90d": round(monthly_avg, 2),
-                "projected_monthly": round(rev_30 * 1.05 if trend == "up" else rev_30, 2),
-                "projected_total": round((rev_30 * 1.05 if trend == "up" else rev_30) * months, 2),
-                "trend": trend,
-            })
+    for i, sc in enumerate(suppliers):
+        if not sc or sc.startswith("mock_") or not revenue[i, -3 * PERIOD_DAYS:].any():
+            continue
+        row = offset + i
+        trend = "up" if rev_30[i] > monthly_avg[i] else ("down" if rev_30[i] < monthly_avg[i] * 0.8 else "stable")
+        projected = fit.predicted[row] if fit else np.zeros(1)
+        results.append({
+            "supplier_code": sc,
+            "revenue_30d": round(float(rev_30[i]), 2),
+            "monthly_avg_90d": round(float(monthly_avg[i]), 2),
+            "projected_monthly": round(float(projected[0]), 2),
+            "projected_total": round(float(projected.sum()), 2),
+            "projected_lower": round(float(fit.lower[row].sum()), 2) if fit else 0,
+            "projected_upper": round(float(fit.upper[row].sum()), 2) if fit else 0,
+            "confidence": fit.confidence(row) if fit else "low",
+            "trend": trend,
+        })
 
     results.sort(key=lambda x: x["projected_total"], reverse=True)
     return results
 
 
-async def _agency_growth_trends(db) -> list[dict[str, Any]]:
+def _agency_growth_trends(
+    fit, offset: int, agencies: list[str], revenue: np.ndarray, bookings: np.ndarray,
+) -> list[dict[str, Any]]:
     """Agency growth trend analysis."""
-    cutoff_60 = (datetime.now(timezone.utc) - timedelta(days=60)).isoformat()
-    cutoff_30 = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
-
-    # First 30 days (30-60 days ago)
-    pipeline_old = [
-        {"$match": {"created_at": {"$gte": cutoff_60, "$lt": cutoff_30}}},
-        {"$group": {
-            "_id": "$organization_id",
-            "bookings": {"$sum": 1},
-            "revenue": {"$sum": "$confirmed_price"},
-        }},
-    ]
-    cursor_old = db["unified_bookings"].aggregate(pipeline_old)
-    old_data = {r["_id"]: r for r in await cursor_old.to_list(length=100) if r["_id"]}
-
-    # Recent 30 days
-    pipeline_new = [
-        {"$match": {"created_at": {"$gte": cutoff_30}}},
-        {"$group": {
-            "_id": "$organization_id",
-            "bookings": {"$sum": 1},
-            "revenue": {"$sum": "$confirmed_price"},
-        }},
-    ]
-    cursor_new = db["unified_bookings"].aggregate(pipeline_new)
-    new_data = {r["_id"]: r for r in await cursor_new.to_list(length=100) if r["_id"]}
+    prev = slice(-2 * PERIOD_DAYS, -PERIOD_DAYS)
+    current = slice(-PERIOD_DAYS, None)
+    old_rev, new_rev = revenue[:, prev].sum(axis=1), revenue[:, current].sum(axis=1)
+    growth = (new_rev - old_rev) / np.maximum(old_rev, 1) * 100
 
     results = []
-    all_orgs = set(list(old_data.keys()) + list(new_data.keys()))
-    for org in all_orgs:
-        if not org:
+    for i, org in enumerate(agencies):
+        if not org or not bookings[i, -2 * PERIOD_DAYS:].any():
             continue
-        old = old_data.get(org, {"bookings": 0, "revenue": 0})
-        new = new_data.get(org, {"bookings": 0, "revenue": 0})
-        old_rev = old.get("revenue", 0)
-        new_rev = new.get("revenue", 0)
-        growth = ((new_rev - old_rev) / max(old_rev, 1)) * 100
-
+        row = offset + i
         results.append({
             "organization_id": org,
-            "bookings_prev": old.get("bookings", 0),
-            "bookings_current": new.get("bookings", 0),
-            "revenue_prev": round(old_rev, 2),
-            "revenue_current": round(new_rev, 2),
-            "growth_pct": round(growth, 1),
-            "trend": "growing" if growth > 10 else ("declining" if growth < -10 else "stable"),
+            "bookings_prev": int(bookings[i, prev].sum()),
+            "bookings_current": int(bookings[i, current].sum()),
+            "revenue_prev": round(float(old_rev[i]), 2),
+            "revenue_current": round(float(new_rev[i]), 2),
+            "growth_pct": round(float(growth[i]), 1),
+            "trend": "growing" if growth[i] > 10 else ("declining" if growth[i] < -10 else "stable"),
+            "projected_next_30d": round(float(fit.predicted[row, 0]), 2) if fit else 0,
         })
 
     results.sort(key=lambda x: x["growth_pct"], reverse=True)
     return results
+
+
+def _destination_forecasts(fit, offset: int, destinations: list[str], revenue: np.ndarray) -> list[dict[str, Any]]:
+    """Next-period revenue projection per destination."""
+    if fit is None:
+        return []
+    results = []
+    for i, dest in enumerate(destinations):
+        if not dest:
+            continue
+        row = offset + i
+        results.append({
+            "destination": dest,
+            "revenue_30d": round(float(revenue[i, -PERIOD_DAYS:].sum()), 2),
+            "projected_monthly": round(float(fit.predicted[row, 0]), 2),
+            "lower": round(float(fit.lower[row, 0]), 2),
+            "upper": round(float(fit.upper[row, 0]), 2),
+            "trend": fit.trend(row),
+        })
+
+    results.sort(key=lambda x: x["projected_monthly"], reverse=True)
+    return results[:MAX_DESTINATIONS]
@@ -63,6 +63,9 @@ async def track_search(
         "duration_ms": duration_ms,
     })
 
+    from app.suppliers.revenue_cube import record_search
+    await record_search(db, organization_id, product_type, destination)
+
     # Upsert recent search for this org
     await db["recent_searches"].update_one(
         {"organization_id": organization_id, "destination": destination, "product_type": product_type},
@@ -53,3 +53,20 @@ def health_check_suppliers():
     except Exception as exc:
         logger.error("Supplier health check failed: %s", exc)
         return {"error": str(exc)}
+
+
+@celery_app.task(name="app.tasks.maintenance.reconcile_room_night_occupancy")
+def reconcile_room_night_occupancy():
+    """Catch room-night occupancy ledgers up with booking changes and room blocks."""
+    try:
+        import asyncio
+        from app.db import get_db
+        from app.services.room_night_occupancy import reconcile_all
+
+        async def _run():
+            return await reconcile_all(await get_db())
+
+        return asyncio.get_event_loop().run_until_complete(_run())
+    except Exception as exc:
+        logger.error("Occupancy ledger reconcile failed: %s", exc)
+        return {"error": str(exc)}
@@ -15,6 +15,7 @@ Consumers:
   3. update_billing_projection  — Revenue/billing aggregation
   4. update_reporting_projection — Funnel/KPI aggregation
   5. dispatch_webhook           — External webhook delivery
+  6. refresh_room_night_occupancy — Room-night occupancy ledger projection
 """
 from __future__ import annotations
 
@@ -446,6 +447,16 @@ async def _async_update_reporting_projection(
             upsert=True,
         )
 
+    # Agency × hotel match stats (admin matches dashboard). Best-effort: the
+    # $inc writes above are not idempotent, so a failure here must not retry
+    # the event; rebuild_match_stats repairs any stale bucket.
+    if event_type.startswith("booking.") and aggregate_id:
+        from app.services.match_stats_projection import refresh_match_stats_for_booking
+        try:
+            await refresh_match_stats_for_booking(db, organization_id, aggregate_id)
+        except Exception as exc:
+            logger.warning("[reporting] Match stats refresh failed for booking %s: %s", aggregate_id, exc)
+
     await _mark_processed(db, event_id, "update_reporting_projection", {
         "status": "updated", "date": date_key, "stage": stage,
     })
@@ -525,3 +536,44 @@ async def _async_dispatch_webhook(
 
     logger.info("[webhook] Delegated %s to webhook system for event %s", event_type, event_id)
     return {"status": "delegated", "event_type": event_type}
+
+
+# ── 6. Room-Night Occupancy Consumer ─────────────────────────
+# Re-applies the booking's current state, so replays are harmless and no
+# idempotency record is kept.
+
+@celery_app.task(
+    name="app.tasks.outbox_consumers.refresh_room_night_occupancy",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=30,
+    retry_backoff=True,
+    queue="reports",
+)
+def refresh_room_night_occupancy(
+    self,
+    event_id: str,
+    event_type: str,
+    payload: dict,
+    organization_id: str,
+    aggregate_id: str,
+    aggregate_type: str,
+):
+    """Bring the room-night occupancy ledger in line with the booking."""
+    handler = "refresh_room_night_occupancy"
+    logger.info("[%s] Processing %s for %s", handler, event_type, aggregate_id)
+
+    try:
+        return _run_async(_async_refresh_room_night_occupancy(organization_id, aggregate_id))
+    except Exception as exc:
+        logger.error("[%s] Failed for event %s: %s", handler, event_id, exc)
+        raise self.retry(exc=exc)
+
+
+async def _async_refresh_room_night_occupancy(organization_id: str, aggregate_id: str) -> dict:
+    from app.db import get_db
+    from app.services.room_night_occupancy import refresh_booking_occupancy
+
+    db = await get_db()
+    written = await refresh_booking_occupancy(db, organization_id, aggregate_id)
+    return {"status": "refreshed", "ledger_docs": written}
@@ -45,6 +45,9 @@ def serialize_doc(doc: Any) -> Any:
         for k, v in doc.items():
             if k == "_id":
                 out["id"] = serialize_doc(v)
+            elif k == "search_tokens":
+                # Internal index field (app.services.search_index), never exposed.
+                continue
             else:
                 out[k] = serialize_doc(v)
         return out
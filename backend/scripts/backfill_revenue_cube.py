@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import get_db
+from app.suppliers.revenue_cube import rebuild_cube, since_day
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the revenue daily cube from unified_bookings, commission_records and search_analytics",
+    )
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--days", type=int, help="Rebuild today and the N days before it")
+    group.add_argument("--since", help="Rebuild from this ISO day (YYYY-MM-DD)")
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    db = await get_db()
+    since = args.since or (since_day(args.days) if args.days is not None else None)
+    return await rebuild_cube(db, since=since)
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    print(json.dumps(asyncio.run(_run(args)), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import get_db
+from app.services.search_index import SEARCH_FIELDS, backfill_search_tokens
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Build search_tokens for customers/bookings/reservations/hotels")
+    parser.add_argument(
+        "--collection",
+        action="append",
+        choices=sorted(SEARCH_FIELDS),
+        help="Collection to backfill (repeatable, default: all)",
+    )
+    parser.add_argument("--organization-id", default=None, help="Only this organization (default: all)")
+    parser.add_argument("--all", action="store_true", help="Rebuild every document, not only those without tokens")
+    parser.add_argument("--batch-size", type=int, default=500)
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    db = await get_db()
+    written = {}
+    for coll in args.collection or sorted(SEARCH_FIELDS):
+        written[coll] = await backfill_search_tokens(
+            db,
+            coll,
+            organization_id=args.organization_id,
+            only_missing=not args.all,
+            batch_size=args.batch_size,
+        )
+    return written
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    print(json.dumps(asyncio.run(_run(args))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bson import ObjectId
+
+from app.db import get_db
+from app.services.inventory import InventoryUnavailable, allocate_stay, confirm_stay
+from app.utils import date_range_yyyy_mm_dd, now_utc
+
+BENCH_ORG = "bench_inventory_allocation"
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Contention benchmark: N concurrent stays on the same product-date (writes to a throwaway org)",
+    )
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=100, help="Rooms available per night")
+    parser.add_argument("--nights", type=int, default=3, help="Nights per stay")
+    parser.add_argument("--pax", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded inventory documents")
+    return parser
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    db = await get_db()
+    product_id = ObjectId()
+    nights = date_range_yyyy_mm_dd("2030-01-01", f"2030-01-{1 + args.nights:02d}")
+    await db.inventory.insert_many([
+        {
+            "organization_id": BENCH_ORG,
+            "product_id": product_id,
+            "date": night,
+            "capacity_total": args.capacity,
+            "capacity_available": args.capacity,
+            "restrictions": {"closed": False, "cta": False, "ctd": False},
+            "created_at": now_utc(),
+        }
+        for night in nights
+    ])
+
+    latencies: list[float] = []
+
+    async def _book() -> bool:
+        started = time.perf_counter()
+        try:
+            hold = await allocate_stay(BENCH_ORG, product_id, nights, args.pax)
+            await confirm_stay(BENCH_ORG, product_id, hold["hold_id"])
+            return True
+        except InventoryUnavailable:
+            return False
+        finally:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_book() for _ in range(args.concurrency)))
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        docs = await db.inventory.find(
+            {"organization_id": BENCH_ORG, "product_id": product_id},
+            {"date": 1, "capacity_available": 1, "holds": 1},
+        ).to_list(None)
+    finally:
+        if not args.keep:
+            await db.inventory.delete_many({"organization_id": BENCH_ORG, "product_id": product_id})
+
+    booked = sum(results)
+    remaining = {d["date"]: d["capacity_available"] for d in docs}
+    expected_booked = min(args.concurrency, args.capacity // args.pax)
+    return {
+        "concurrency": args.concurrency,
+        "nights": len(nights),
+        "booked": booked,
+        "refused": len(results) - booked,
+        "expected_booked": expected_booked,
+        "oversold": any(v < 0 for v in remaining.values()),
+        "consistent": booked == expected_booked
+        and all(v == args.capacity - booked * args.pax for v in remaining.values())
+        and not any(d.get("holds") for d in docs),
+        "wall_ms": round(wall_ms, 1),
+        "throughput_per_s": round(len(results) / (wall_ms / 1000), 1) if wall_ms else None,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": _pct(latencies, 0.50),
+            "p95": _pct(latencies, 0.95),
+            "p99": _pct(latencies, 0.99),
+        },
+    }
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    report = asyncio.run(_run(args))
+    print(json.dumps(report, indent=2))
+    if not report["consistent"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.infrastructure import rate_limiter as rl
+from app.infrastructure.redis_client import get_async_redis
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Rate-limit check latency: sequential EVALSHA per bucket vs. one multi-bucket call vs. lease mode",
+    )
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per mode")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent requests in flight")
+    parser.add_argument("--route-tier", default="b2b_booking", help="Route tier checked besides api_global/tenant_global")
+    parser.add_argument("--plan", default="enterprise", help="Plan slug for tenant_global scaling")
+    return parser
+
+
+def _stats(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p99": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 3),
+    }
+
+
+async def _sequential(buckets):
+    for key, tier, plan in buckets:
+        result = await rl.check_rate_limit(key, tier, plan_slug=plan)
+        if not result.allowed:
+            return result
+    return result
+
+
+async def _bench(mode: str, args: argparse.Namespace) -> dict:
+    run = uuid.uuid4().hex[:8]
+    buckets = [
+        (f"bench-user-{run}", args.route_tier, None),
+        (f"bench-ip-{run}", "api_global", None),
+        (f"bench-org-{run}", "tenant_global", args.plan),
+    ]
+    latencies: list[float] = []
+    denied = 0
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def _one():
+        nonlocal denied
+        async with sem:
+            started = time.perf_counter()
+            if mode == "sequential":
+                result = await _sequential(buckets)
+            else:
+                result = await rl.check_rate_limits(buckets, lease_mode=(mode == "lease"))
+            latencies.append((time.perf_counter() - started) * 1000)
+            denied += not result.allowed
+
+    calls_before = rl._lease_stats["redis_calls"]
+    started = time.perf_counter()
+    await asyncio.gather(*[_one() for _ in range(args.requests)])
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "latency_ms": _stats(latencies),
+        "throughput_rps": round(args.requests / elapsed),
+        "denied": denied,
+    }
+    if mode != "sequential":
+        report["redis_calls"] = rl._lease_stats["redis_calls"] - calls_before
+    return report
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    r = await get_async_redis()
+    if r is None:
+        raise SystemExit("Redis is not configured (REDIS_URL)")
+    report = {"requests": args.requests, "concurrency": args.concurrency, "modes": {}}
+    try:
+        for mode in ("sequential", "multi_bucket", "lease"):
+            report["modes"][mode] = await _bench(mode, args)
+    finally:
+        async for key in r.scan_iter(match="rl:*:bench-*", count=500):
+            await r.delete(key)
+    return report
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    print(json.dumps(asyncio.run(_run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import bson
+
+from app.db import get_db
+from app.services.offers import offer_store
+from app.services.offers.search_session_service import (
+    OFFER_STORE_MONGO,
+    OFFER_STORE_REDIS,
+    create_search_session,
+    find_offer_in_session,
+    get_search_session,
+)
+
+BENCH_ORG = "bench_search_session"
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Search session create/lookup latency: Redis offer store vs. legacy single document",
+    )
+    parser.add_argument("--offers", type=int, default=2000, help="Offers per session")
+    parser.add_argument("--sessions", type=int, default=10, help="Sessions created per store")
+    parser.add_argument("--lookups", type=int, default=200, help="Offer-token lookups per store")
+    parser.add_argument("--stores", default="mongo,redis", help="Comma-separated: mongo,redis")
+    return parser
+
+
+def _offer(i: int) -> dict:
+    return {
+        "offer_token": f"tok_{i:06d}_{random.getrandbits(32):08x}",
+        "supplier_code": random.choice(["mock", "paximum"]),
+        "supplier_offer_id": f"sup-{i}",
+        "product_type": "hotel",
+        "hotel": {"name": f"Otel {i}", "city": "Antalya", "country": "TR", "latitude": 36.88, "longitude": 30.70},
+        "stay": {"check_in": "2030-07-01", "check_out": "2030-07-05", "nights": 4, "adults": 2, "children": 0},
+        "room": {"room_name": "Standart Oda", "board_type": "AI"},
+        "cancellation_policy": {"refundable": True, "deadline": "2030-06-25", "raw": {"penalty_pct": 0}},
+        "price": {"amount": round(random.uniform(400, 4000), 2), "currency": "EUR"},
+        "availability_token": f"avail-{i}",
+        "raw_fingerprint": f"{random.getrandbits(128):032x}",
+    }
+
+
+def _stats(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean": round(statistics.fmean(ordered), 2),
+        "p50": round(ordered[len(ordered) // 2], 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+    }
+
+
+async def _bench_store(db, store: str, offers: list[dict], args: argparse.Namespace) -> dict:
+    os.environ["SEARCH_SESSION_OFFER_STORE"] = store
+    create_ms: list[float] = []
+    session_ids: list[str] = []
+    for _ in range(args.sessions):
+        started = time.perf_counter()
+        session = await create_search_session(
+            db, organization_id=BENCH_ORG, tenant_id=None, query={"destination": "AYT"}, offers=offers,
+        )
+        create_ms.append((time.perf_counter() - started) * 1000)
+        session_ids.append(session["session_id"])
+
+    meta = await db.search_sessions.find_one({"_id": bson.ObjectId(session_ids[0])})
+    if store == OFFER_STORE_REDIS and meta.get("offer_store") != OFFER_STORE_REDIS:
+        return {"skipped": "Redis unavailable (session fell back to MongoDB)"}
+
+    lookup_ms: list[float] = []
+    for _ in range(args.lookups):
+        sid = random.choice(session_ids)
+        token = random.choice(offers)["offer_token"]
+        started = time.perf_counter()
+        found = await find_offer_in_session(db, organization_id=BENCH_ORG, session_id=sid, offer_token=token)
+        lookup_ms.append((time.perf_counter() - started) * 1000)
+        assert found and found["offer_token"] == token
+
+    started = time.perf_counter()
+    full = await get_search_session(db, organization_id=BENCH_ORG, session_id=session_ids[0])
+    full_ms = (time.perf_counter() - started) * 1000
+    assert len(full["offers"]) == len(offers)
+
+    return {
+        "mongo_document_bytes": len(bson.encode(meta)),
+        "redis_offer_bytes": meta.get("offer_bytes"),
+        "create_ms": _stats(create_ms),
+        "lookup_ms": _stats(lookup_ms),
+        "full_session_read_ms": round(full_ms, 2),
+    }
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    db = await get_db()
+    offers = [_offer(i) for i in range(args.offers)]
+    report: dict = {
+        "offers_per_session": args.offers,
+        "codec": {"msgpack": offer_store.msgpack is not None, "zstd": offer_store.zstandard is not None},
+        "stores": {},
+    }
+    try:
+        for store in [s.strip() for s in args.stores.split(",") if s.strip()]:
+            if store not in (OFFER_STORE_MONGO, OFFER_STORE_REDIS):
+                raise SystemExit(f"unknown store: {store}")
+            report["stores"][store] = await _bench_store(db, store, offers, args)
+    finally:
+        await db.search_sessions.delete_many({"organization_id": BENCH_ORG})
+    return report
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    print(json.dumps(asyncio.run(_run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
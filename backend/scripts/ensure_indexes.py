@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import get_db
+from app.indexes.manifest import MODE_AUTO, MODE_FORCE, apply_index_manifest
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="One-shot index migration: apply the startup index manifest (use with INDEX_BOOTSTRAP_MODE=skip)",
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the stored manifest hash matches")
+    parser.add_argument("--concurrency", type=int, default=None, help="Concurrent index steps (default: INDEX_BUILD_CONCURRENCY)")
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    db = await get_db()
+    return await apply_index_manifest(
+        db,
+        mode=MODE_FORCE if args.force else MODE_AUTO,
+        concurrency=args.concurrency,
+    )
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = _build_parser().parse_args()
+    result = asyncio.run(_run(args))
+    print(json.dumps(result))
+    if result.get("status") not in ("applied", "unchanged"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
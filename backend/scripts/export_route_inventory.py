@@ -9,6 +9,11 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+# Inventory and prefix map describe the full route table.
+os.environ["ROUTER_LOAD_MODE"] = "eager"
+
+from app.bootstrap.domain_router_registry import DOMAIN_ROUTER_MOUNTS
+from app.bootstrap.lazy_router_loader import DEFAULT_ROUTER_PREFIX_MAP_PATH, write_router_prefix_map
 from app.bootstrap.route_inventory import (
     DEFAULT_ROUTE_INVENTORY_PATH,
     export_route_inventory_artifacts,
@@ -21,6 +26,11 @@ def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Export deterministic route inventory artifacts")
     parser.add_argument("--destination", default=str(DEFAULT_ROUTE_INVENTORY_PATH), help="Inventory JSON output path")
     parser.add_argument("--summary-out", default=str(DEFAULT_ROUTE_INVENTORY_SUMMARY_PATH), help="Summary JSON output path")
+    parser.add_argument(
+        "--prefix-map-out",
+        default=str(DEFAULT_ROUTER_PREFIX_MAP_PATH),
+        help="Router prefix map output path (used by ROUTER_LOAD_MODE=lazy)",
+    )
     parser.add_argument(
         "--environment",
         default=os.environ.get("APP_ENV_NAME") or os.environ.get("ENV") or "runtime",
@@ -41,6 +51,7 @@ def main() -> None:
         raise SystemExit(1)
     print(artifacts["inventory"])
     print(artifacts["summary"])
+    print(write_router_prefix_map(DOMAIN_ROUTER_MOUNTS, args.prefix_map_out))
 
 
 if __name__ == "__main__":
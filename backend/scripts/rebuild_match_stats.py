@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import get_db
+from app.services.match_stats_projection import rebuild_match_stats
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Rebuild the agency_hotel_match_stats projection from bookings/outcomes")
+    parser.add_argument("--organization-id", default=None, help="Only rebuild this organization (default: all)")
+    return parser
+
+
+async def _run(org_id: str | None) -> dict:
+    db = await get_db()
+    return await rebuild_match_stats(db, org_id)
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    written = asyncio.run(_run(args.organization_id))
+    print(json.dumps(written))
+
+
+if __name__ == "__main__":
+    main()
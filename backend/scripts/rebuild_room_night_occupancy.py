@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.inventory_snapshot_service import rebuild_room_night_occupancy
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Rebuild the room-night occupancy ledger from bookings and room blocks")
+    parser.add_argument("--organization-id", required=True)
+    parser.add_argument("--hotel-id", action="append", help="Hotel to rebuild (repeatable, default: all active)")
+    return parser
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    results = asyncio.run(rebuild_room_night_occupancy(args.organization_id, args.hotel_id))
+    print(json.dumps(results, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
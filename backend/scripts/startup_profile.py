@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.bootstrap.startup_profile import DEFAULT_PROFILE_TARGET, profile_imports
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Per-module import-time tree of the API entrypoint, as JSON")
+    parser.add_argument("--target", default=DEFAULT_PROFILE_TARGET, help="Module to import")
+    parser.add_argument("--mode", choices=("eager", "lazy"), default="eager", help="ROUTER_LOAD_MODE for the child")
+    parser.add_argument("--top", type=int, default=30, help="Slowest modules to list")
+    parser.add_argument("--max-depth", type=int, default=None, help="Trim the tree below this depth")
+    parser.add_argument("--out", default=None, help="Write JSON here instead of stdout")
+    return parser
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    profile = profile_imports(
+        args.target,
+        env={"ROUTER_LOAD_MODE": args.mode},
+        top=args.top,
+        max_depth=args.max_depth,
+    )
+    payload = json.dumps(profile, indent=2)
+    if args.out:
+        Path(args.out).write_text(payload + "\n")
+        print(f"{args.out}: {profile['total_ms']}ms across {profile['module_count']} modules")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Batched audit hash chain unit tests (DB-free).
+
+Covers:
+- Concurrent writes for one tenant produce a single linear chain sealed into blocks
+- Merkle root per block and streaming block-by-block verification
+- Legacy (pre-batching) entries stay valid and the first block links to them
+- A cross-pod append conflict reloads the head and re-seals on top of it
+- A lagging head document is repaired from the chain tail
+- Repair skips a block another pod is still inserting, but seals an abandoned partial block
+- Tampering with an entry or a block is reported
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.services import audit_hash_chain as ahc
+
+TENANT = "t1"
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            for op, arg in cond.items():
+                if op == "$exists" and (key in doc) != arg:
+                    return False
+                if op == "$gt" and not (value is not None and value > arg):
+                    return False
+                if op == "$in" and value not in arg:
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key, direction):
+        self._docs = sorted(self._docs, key=lambda d: d.get(key), reverse=direction < 0)
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(d) for d in self._docs[:length]]
+
+    def __aiter__(self):
+        async def _gen():
+            for d in self._docs:
+                yield dict(d)
+        return _gen()
+
+
+class _UpdateResult:
+    def __init__(self, matched):
+        self.matched_count = matched
+
+
+class _Collection:
+    def __init__(self, unique=None):
+        self.docs = []
+        self.unique = unique
+        self.insert_calls = 0
+
+    def _conflicts(self, doc):
+        if any(d["_id"] == doc["_id"] for d in self.docs):
+            return True
+        if self.unique and all(k in doc for k in self.unique):
+            key = tuple(doc[k] for k in self.unique)
+            return any(tuple(d.get(k) for k in self.unique) == key for d in self.docs)
+        return False
+
+    async def insert_one(self, doc):
+        if self._conflicts(doc):
+            raise DuplicateKeyError("dup")
+        self.docs.append(dict(doc))
+
+    async def insert_many(self, docs, ordered=True):
+        self.insert_calls += 1
+        for i, doc in enumerate(docs):
+            if self._conflicts(doc):
+                raise BulkWriteError({"writeErrors": [{"index": i, "code": 11000}], "nInserted": i})
+            self.docs.append(dict(doc))
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+
+    async def find_one(self, query, sort=None):
+        docs = [d for d in self.docs if _matches(d, query)]
+        if sort:
+            key, direction = sort[0]
+            docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        return dict(docs[0]) if docs else None
+
+    def find(self, query, projection=None):
+        return _Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def update_one(self, query, update):
+        for d in self.docs:
+            if _matches(d, query):
+                d.update(update["$set"])
+                return _UpdateResult(1)
+        return _UpdateResult(0)
+
+
+class _DB:
+    def __init__(self):
+        self.audit_logs_chain = _Collection(unique=("tenant_id", "chain_seq"))
+        self.collections = {
+            ahc.HEADS_COLLECTION: _Collection(),
+            ahc.BLOCKS_COLLECTION: _Collection(),
+        }
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+
+async def _write(db, n, start=0):
+    return await asyncio.gather(*[
+        ahc.write_chained_audit_log(
+            db, organization_id="o1", tenant_id=TENANT, actor={"actor_id": f"u{i}"},
+            action="booking.update", target_type="booking", target_id=f"b{i}",
+        )
+        for i in range(start, start + n)
+    ])
+
+
+@pytest.fixture(autouse=True)
+def _fresh_writer(monkeypatch):
+    monkeypatch.setattr(ahc, "_writer", None)
+    monkeypatch.setattr(ahc, "BLOCK_LINGER_SECONDS", 0)
+
+
+def test_merkle_root_duplicates_odd_leaf():
+    a, b, c = "a" * 64, "b" * 64, "c" * 64
+    assert ahc.merkle_root([a]) == a
+    assert ahc.merkle_root([a, b, c]) == ahc.merkle_root([a, b, c, c])
+    assert ahc.merkle_root([a, b]) != ahc.merkle_root([b, a])
+
+
+@pytest.mark.anyio
+async def test_concurrent_writes_form_one_chain_in_blocks():
+    db = _DB()
+    docs = await _write(db, 150)
+
+    seqs = sorted(d["chain_seq"] for d in docs)
+    assert seqs == list(range(1, 151))
+    by_seq = {d["chain_seq"]: d for d in db.audit_logs_chain.docs}
+    for seq in range(2, 151):
+        assert by_seq[seq]["previous_hash"] == by_seq[seq - 1]["current_hash"]
+    assert by_seq[1]["previous_hash"] == ahc.GENESIS
+
+    blocks = db[ahc.BLOCKS_COLLECTION].docs
+    assert [b["count"] for b in blocks] == [64, 64, 22]
+    assert db.audit_logs_chain.insert_calls == 3
+    head = db[ahc.HEADS_COLLECTION].docs[0]
+    assert head["seq"] == 150 and head["hash"] == by_seq[150]["current_hash"]
+
+    result = await ahc.verify_chain_integrity(db, TENANT, limit=10_000)
+    assert result["valid"], result["errors"]
+    assert result["checked"] == 150 and result["blocks_checked"] == 3
+
+
+@pytest.mark.anyio
+async def test_first_block_links_to_legacy_tail():
+    db = _DB()
+    legacy_prev = ahc.GENESIS
+    for i in range(3):
+        entry = {
+            "_id": f"legacy{i}", "tenant_id": TENANT, "action": "x", "actor": {"actor_id": "u"},
+            "target": {"id": str(i)}, "hash_timestamp": f"2024-01-0{i + 1}T00:00:00.000000",
+            "created_at": f"2024-01-0{i + 1}", "previous_hash": legacy_prev,
+        }
+        entry["current_hash"] = ahc._entry_hash(entry, legacy_prev)
+        legacy_prev = entry["current_hash"]
+        db.audit_logs_chain.docs.append(entry)
+
+    docs = await _write(db, 2)
+    assert min(docs, key=lambda d: d["chain_seq"])["previous_hash"] == legacy_prev
+
+    result = await ahc.verify_chain_integrity(db, TENANT)
+    assert result["valid"] and result["checked"] == 5
+
+
+@pytest.mark.anyio
+async def test_cross_pod_conflict_reseals_on_new_head():
+    db = _DB()
+    await _write(db, 2)
+
+    # Another pod appends seq 3 behind our cached head.
+    pending = dict(db.audit_logs_chain.docs[0], _id="other-pod")
+    head = await ahc._load_head(db, TENANT)
+    entries, block, new_head = ahc._seal(TENANT, head, [pending])
+    await db.audit_logs_chain.insert_many(entries)
+    await db[ahc.BLOCKS_COLLECTION].insert_one(block)
+    await db[ahc.HEADS_COLLECTION].update_one({"_id": TENANT, "seq": 2}, {"$set": new_head})
+
+    docs = await _write(db, 1, start=10)
+    writer = ahc.get_audit_chain_writer()
+    assert writer.stats["conflicts"] == 1
+    assert docs[0]["chain_seq"] == 4
+    assert docs[0]["previous_hash"] == entries[0]["current_hash"]
+    assert (await ahc.verify_chain_integrity(db, TENANT))["valid"]
+
+
+@pytest.mark.anyio
+async def test_lagging_head_is_repaired_from_tail():
+    db = _DB()
+    await _write(db, 3)
+    # Simulate a crash between the entry insert and block/head writes.
+    db[ahc.HEADS_COLLECTION].docs[0].update(seq=0, hash=ahc.GENESIS, block_seq=0, block_hash=ahc.GENESIS)
+    db[ahc.BLOCKS_COLLECTION].docs.clear()
+    ahc._writer = None
+
+    docs = await _write(db, 1, start=5)
+    assert docs[0]["chain_seq"] == 4 and docs[0]["block_seq"] == 2
+    result = await ahc.verify_chain_integrity(db, TENANT)
+    assert result["valid"], result["errors"]
+    assert result["blocks_checked"] == 2
+
+
+async def _partial_block(db, landed, total=4, age=timedelta(0)):
+    """Another pod's block of ``total`` entries with only ``landed`` inserted."""
+    head = await ahc._load_head(db, TENANT)
+    pending = [dict(db.audit_logs_chain.docs[0], _id=f"other{i}", created_at=ahc.now_utc() - age)
+               for i in range(total)]
+    entries, block, new_head = ahc._seal(TENANT, head, pending)
+    db.audit_logs_chain.docs.extend(dict(e) for e in entries[:landed])
+    return head, entries, block, new_head
+
+
+@pytest.mark.anyio
+async def test_repair_skips_block_still_landing():
+    db = _DB()
+    await _write(db, 3)
+    head, entries, block, new_head = await _partial_block(db, landed=2)
+
+    assert (await ahc._load_head(db, TENANT))["seq"] == 3
+    assert len(db[ahc.BLOCKS_COLLECTION].docs) == 1
+
+    # The other pod finishes its insert, block and head CAS.
+    db.audit_logs_chain.docs.extend(dict(e) for e in entries[2:])
+    await db[ahc.BLOCKS_COLLECTION].insert_one(block)
+    await db[ahc.HEADS_COLLECTION].update_one({"_id": TENANT, "seq": head["seq"]}, {"$set": new_head})
+
+    docs = await _write(db, 1, start=10)
+    assert docs[0]["chain_seq"] == 8
+    result = await ahc.verify_chain_integrity(db, TENANT)
+    assert result["valid"], result["errors"]
+
+
+@pytest.mark.anyio
+async def test_repair_seals_abandoned_partial_block():
+    db = _DB()
+    await _write(db, 3)
+    await _partial_block(db, landed=2, age=timedelta(seconds=ahc.PARTIAL_BLOCK_GRACE_SECONDS + 1))
+    ahc._writer = None
+
+    docs = await _write(db, 1, start=10)
+    assert docs[0]["chain_seq"] == 6 and docs[0]["block_seq"] == 3
+    assert db[ahc.BLOCKS_COLLECTION].docs[1]["count"] == 2
+    result = await ahc.verify_chain_integrity(db, TENANT)
+    assert result["valid"], result["errors"]
+
+
+@pytest.mark.anyio
+async def test_tampering_is_reported():
+    db = _DB()
+    await _write(db, 5)
+    db.audit_logs_chain.docs[2]["action"] = "booking.delete"
+
+    result = await ahc.verify_chain_integrity(db, TENANT)
+    assert not result["valid"]
+    assert {e.get("error") for e in result["errors"]} >= {"hash_mismatch"}
+
+    ahc._writer = None  # the cached head belongs to the first database
+    db2 = _DB()
+    await _write(db2, 5)
+    db2[ahc.BLOCKS_COLLECTION].docs[0]["merkle_root"] = "0" * 64
+    result = await ahc.verify_chain_integrity(db2, TENANT)
+    assert [e["error"] for e in result["errors"]] == ["merkle_mismatch"]
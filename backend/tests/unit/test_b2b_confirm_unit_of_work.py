@@ -0,0 +1,163 @@
+"""B2B confirm unit-of-work unit tests (DB-free).
+
+Covers:
+- A successful confirm flushes audit, event and booking writes in one bulk_write per collection
+- Credit and risk pre-checks run concurrently; a credit failure is still reported first
+- Writes queued before a risk block are committed with the error response
+- Per-step latencies are exposed via request.state for the Server-Timing header
+"""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+
+import app.services.risk.engine as risk_engine
+from app.errors import AppError
+from app.modules.b2b.routers import b2b_bookings_confirm as confirm
+from app.services.risk.engine import RiskDecision, RiskResult
+from app.services.suppliers.contracts import ConfirmResult, ConfirmStatus
+from app.services.unit_of_work import server_timing_header
+
+ORG = "org1"
+
+
+class _Coll:
+    def __init__(self, db, name):
+        self.db, self.name, self.docs = db, name, []
+
+    async def find_one(self, query):
+        self.db.reads.append(self.name)
+        for doc in self.docs:
+            if all(doc.get(k) == v for k, v in query.items()):
+                return doc
+        return None
+
+    async def bulk_write(self, ops, ordered=True):
+        self.db.flushes.append((self.name, ops))
+
+    async def insert_one(self, doc):
+        raise AssertionError(f"unbatched insert into {self.name}")
+
+    async def update_one(self, *args, **kwargs):
+        raise AssertionError(f"unbatched update of {self.name}")
+
+
+class _DB:
+    def __init__(self):
+        self.colls, self.reads, self.flushes = {}, [], []
+
+    def __getitem__(self, name):
+        return self.colls.setdefault(name, _Coll(self, name))
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in ("colls", "reads", "flushes"):
+            raise AttributeError(name)
+        return self[name]
+
+
+def _request():
+    return SimpleNamespace(
+        state=SimpleNamespace(tenant_id=None),
+        headers={"user-agent": "pytest"},
+        url=SimpleNamespace(path="/api/b2b/bookings/x/confirm"),
+        method="POST",
+        client=None,
+    )
+
+
+class _Adapter:
+    async def confirm_booking(self, ctx, booking):
+        return ConfirmResult(supplier_code="paximum", supplier_booking_id="SUP-1",
+                             status=ConfirmStatus.CONFIRMED, raw={})
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    db = _DB()
+    oid = ObjectId()
+    db.bookings.docs.append({
+        "_id": oid, "organization_id": ORG, "status": "PENDING", "amount": 500.0,
+        "offer_ref": {"supplier": "paximum", "supplier_offer_id": "OF-1"},
+    })
+    running = {"now": 0, "max": 0}
+
+    async def _overlap():
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+
+    state = {"credit": True, "decision": RiskDecision.ALLOW}
+
+    async def _credit(db, organization_id, amount):
+        await _overlap()
+        return state["credit"]
+
+    async def _risk(db, organization_id, booking):
+        await _overlap()
+        return RiskResult(score=0.1, decision=state["decision"], reasons=[])
+
+    async def _hooks(self, **kwargs):
+        db.reads.append("hooks")
+
+    monkeypatch.setattr(confirm, "has_available_credit", _credit)
+    monkeypatch.setattr(risk_engine, "evaluate_booking_risk", _risk)
+    monkeypatch.setattr(confirm.supplier_registry, "get", lambda name: _Adapter())
+    monkeypatch.setattr(confirm.BookingLifecycleService, "run_hooks", _hooks)
+    return db, str(oid), running, state
+
+
+async def _call(db, booking_id, request):
+    user = {"organization_id": ORG, "email": "agent@example.com", "roles": ["agency_agent"]}
+    return await confirm.confirm_b2b_booking(booking_id, request, user=user, db=db)
+
+
+def _actions(db):
+    return [op._doc["action"] for name, ops in db.flushes if name == "audit_logs" for op in ops]
+
+
+@pytest.mark.anyio
+async def test_confirm_flushes_writes_in_one_batch(setup):
+    db, booking_id, running, _ = setup
+    request = _request()
+    assert await _call(db, booking_id, request) == {"booking_id": booking_id, "state": "confirmed"}
+
+    assert running["max"] == 2  # credit + risk overlapped
+    assert sorted(name for name, _ in db.flushes) == ["audit_logs", "booking_events", "bookings"]
+    assert _actions(db) == ["RISK_EVALUATED", "B2B_BOOKING_CONFIRMED"]
+
+    bookings = dict(db.flushes)["bookings"]
+    assert all(isinstance(op, UpdateOne) for op in bookings) and len(bookings) == 2
+    assert bookings[1]._doc["$set"]["status"] == "CONFIRMED"
+    event = dict(db.flushes)["booking_events"][0]
+    assert isinstance(event, InsertOne) and event._doc["event"] == "BOOKING_CONFIRMED"
+    assert db.reads[-1] == "hooks"  # write-back hook sees the committed projection
+
+    steps = [name for name, _ in request.state.server_timing]
+    assert steps == ["load", "prechecks", "supplier", "commit", "hooks"]
+    assert server_timing_header([("load", 1.25)]) == "load;dur=1.2"
+
+
+@pytest.mark.anyio
+async def test_credit_failure_reported_before_risk(setup):
+    db, booking_id, running, state = setup
+    state["credit"], state["decision"] = False, RiskDecision.BLOCK
+    with pytest.raises(AppError) as exc:
+        await _call(db, booking_id, _request())
+    assert exc.value.code == "credit_limit_exceeded"
+    assert db.flushes == []
+
+
+@pytest.mark.anyio
+async def test_risk_block_commits_queued_writes(setup):
+    db, booking_id, _, state = setup
+    state["decision"] = RiskDecision.BLOCK
+    with pytest.raises(AppError) as exc:
+        await _call(db, booking_id, _request())
+    assert exc.value.code == "risk_blocked"
+    assert _actions(db) == ["RISK_EVALUATED", "RISK_BLOCKED"]
+    assert dict(db.flushes)["bookings"][0]._doc["$set"]["risk"]["decision"] == "block"
@@ -0,0 +1,154 @@
+"""Async event-bus dispatch unit tests (DB- and Redis-free).
+
+Covers:
+- publish returns before slow handlers run; events persist via one insert_many
+- Per-handler concurrency limit and timeout (counted, never raised)
+- Full queue makes publishers wait and counts backpressure
+- drain finishes queued events and later publishes run inline
+- Inline mode is unchanged without a dispatcher / with wait=True
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.infrastructure import event_bus
+
+EVENT = "test.dispatch"
+
+
+class _Events:
+    def __init__(self):
+        self.docs = []
+        self.insert_many_calls = 0
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        self.insert_many_calls += 1
+        self.docs.extend(docs)
+
+
+class _DB:
+    def __init__(self):
+        self.domain_events = _Events()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = _DB()
+
+    async def _get_db():
+        return fake
+
+    async def _no_redis():
+        return None
+
+    monkeypatch.setattr("app.db.get_db", _get_db)
+    monkeypatch.setattr("app.infrastructure.redis_client.get_async_redis", _no_redis)
+    monkeypatch.setattr(event_bus, "_handlers", {})
+    monkeypatch.setattr(event_bus, "_dispatcher", None)
+    monkeypatch.setattr(event_bus, "DISPATCH_MODE", "async")
+    return fake
+
+
+@pytest.mark.anyio
+async def test_publish_returns_before_handlers_and_batches_writes(db):
+    started, release = asyncio.Event(), asyncio.Event()
+    seen = []
+
+    async def slow_handler(event):
+        started.set()
+        await release.wait()
+        seen.append(event["payload"]["n"])
+
+    event_bus.subscribe(EVENT, slow_handler)
+    dispatcher = event_bus.start_event_dispatcher()
+
+    for n in range(5):
+        await event_bus.publish(EVENT, {"n": n})
+    assert seen == []  # caller did not wait for the handler
+
+    await dispatcher.flush_writes()
+    assert len(db.domain_events.docs) == 5
+    assert db.domain_events.insert_many_calls == 1
+
+    await asyncio.wait_for(started.wait(), 1)
+    release.set()
+    await event_bus.drain_event_dispatcher()
+    assert sorted(seen) == [0, 1, 2, 3, 4]
+    assert event_bus.get_dispatch_stats() == {"mode": "inline"}
+
+
+@pytest.mark.anyio
+async def test_handler_concurrency_limit_and_timeout(db, monkeypatch):
+    monkeypatch.setattr(event_bus, "HANDLER_CONCURRENCY", 2)
+    monkeypatch.setattr(event_bus, "HANDLER_TIMEOUT_SECONDS", 0.05)
+    running = {"now": 0, "max": 0}
+
+    async def limited(event):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+
+    async def hangs(event):
+        await asyncio.sleep(10)
+
+    event_bus.subscribe(EVENT, limited)
+    event_bus.subscribe(EVENT, hangs)
+    dispatcher = event_bus.start_event_dispatcher()
+
+    for n in range(8):
+        await event_bus.publish(EVENT, {"n": n})
+    await asyncio.wait_for(dispatcher.queue.join(), 2)
+
+    assert running["max"] == 2
+    assert dispatcher.stats["handler_timeouts"] == 8
+    assert dispatcher.stats["dispatched"] == 8
+    await event_bus.drain_event_dispatcher()
+
+
+@pytest.mark.anyio
+async def test_full_queue_applies_backpressure(db):
+    gate = asyncio.Event()
+
+    async def blocked(event):
+        await gate.wait()
+
+    event_bus.subscribe(EVENT, blocked)
+    dispatcher = event_bus.EventDispatcher(workers=1, queue_size=1)
+    dispatcher.start()
+    event_bus._dispatcher = dispatcher
+
+    await event_bus.publish(EVENT, {"n": 0})
+    await asyncio.sleep(0)  # worker picks up event 0
+    await event_bus.publish(EVENT, {"n": 1})  # fills the queue
+    third = asyncio.ensure_future(event_bus.publish(EVENT, {"n": 2}))
+    await asyncio.sleep(0.01)
+    assert not third.done()
+    assert dispatcher.stats["backpressure_waits"] == 1
+
+    gate.set()
+    await asyncio.wait_for(third, 1)
+    await event_bus.drain_event_dispatcher()
+    assert dispatcher.stats["dispatched"] == 3
+
+
+@pytest.mark.anyio
+async def test_inline_mode_and_wait_flag(db, monkeypatch):
+    seen = []
+    event_bus.subscribe(EVENT, lambda event: seen.append(event["payload"]["n"]))
+
+    await event_bus.publish(EVENT, {"n": 1})
+    assert seen == [1] and len(db.domain_events.docs) == 1
+
+    event_bus.start_event_dispatcher()
+    await event_bus.publish(EVENT, {"n": 2}, wait=True)
+    assert seen == [1, 2]
+    await event_bus.drain_event_dispatcher()
+
+    monkeypatch.setattr(event_bus, "DISPATCH_MODE", "inline")
+    assert event_bus.start_event_dispatcher() is None
@@ -0,0 +1,103 @@
+"""Vectorized forecast engine unit tests.
+
+Covers:
+- Trend + weekly seasonality recovered for many series in one lstsq solve
+- Period intervals cover the true period sums
+- Sparse series fall back to a flat, low-confidence mean
+- get_revenue_forecast is cached per day and horizon
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.suppliers import forecast_engine, revenue_forecasting
+
+
+def _series(days, first, level, slope, weekly, noise, rng):
+    ordinals = first.toordinal() + np.arange(days)
+    return level + slope * np.arange(days) + weekly * np.sin(2 * np.pi * ordinals / 7) + rng.normal(0, noise, days)
+
+
+def test_fits_all_rows_in_one_solve_with_weekly_seasonality(monkeypatch):
+    rng = np.random.default_rng(7)
+    first, days = date(2025, 1, 1), 420
+    values = np.vstack([
+        _series(days, first, 100, 0.5, 30, 5, rng),
+        _series(days, first, 400, -0.2, 0, 5, rng),
+        _series(days, first, 50, 0.0, 10, 1, rng),
+    ])
+
+    calls = []
+    real_lstsq = np.linalg.lstsq
+    monkeypatch.setattr(np.linalg, "lstsq", lambda *a, **k: calls.append(1) or real_lstsq(*a, **k))
+
+    fit = forecast_engine.forecast_periods(values, first, periods=2, period_days=28)
+    assert len(calls) == 1
+    assert fit.predicted.shape == (3, 2)
+
+    # True next-period sums (weekly terms cancel over 28 days).
+    t = days + np.arange(28)
+    expected = [(100 + 0.5 * t).sum(), (400 - 0.2 * t).sum(), 50 * 28]
+    for row, truth in enumerate(expected):
+        assert fit.lower[row, 0] <= truth <= fit.upper[row, 0]
+        assert abs(fit.predicted[row, 0] - truth) / truth < 0.02
+
+    assert fit.trend(0) == "up" and fit.trend(1) == "down"
+    assert fit.confidence(0) == "high"
+    period = fit.periods(0)[0]
+    assert set(period) == {"period", "predicted", "lower", "upper", "confidence", "trend", "growth_rate"}
+
+
+def test_sparse_series_fall_back_to_flat_mean():
+    values = np.zeros((1, 60))
+    values[0, 10] = 300.0
+    fit = forecast_engine.forecast_periods(values, date(2025, 1, 1), periods=3)
+    assert fit.confidence(0) == "low" and fit.trend(0) == "flat"
+    assert np.allclose(fit.predicted[0], 300.0 / 60 * 30)
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class _Cube:
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads = 0
+
+    def aggregate(self, pipeline, **kwargs):
+        self.reads += 1
+        return _Cursor([dict(r) for r in self.rows])
+
+
+@pytest.mark.anyio
+async def test_forecast_is_cached_per_day(monkeypatch):
+    monkeypatch.setattr(revenue_forecasting, "_cache", {})
+    today = datetime.now(timezone.utc).date()
+    rows = [
+        {"_id": {"day": (today - timedelta(days=d)).isoformat(), "supplier_code": "ratehawk",
+                 "organization_id": "org1", "destination": "Antalya"},
+         "bookings": 2, "gmv": 100.0 + d % 7}
+        for d in range(120)
+    ]
+    cube = _Cube(rows)
+    db = {"revenue_daily_cube": cube}
+
+    first = await revenue_forecasting.get_revenue_forecast(db, forecast_months=3)
+    again = await revenue_forecasting.get_revenue_forecast(db, forecast_months=3)
+    assert again is first and cube.reads == 1
+
+    assert len(first["revenue_forecast"]) == 3
+    assert first["historical"][-1]["bookings"] == 60
+    assert first["supplier_projections"][0]["supplier_code"] == "ratehawk"
+    assert first["destination_forecasts"][0]["destination"] == "Antalya"
+
+    await revenue_forecasting.get_revenue_forecast(db, forecast_months=3, refresh=True)
+    assert cube.reads == 2
@@ -0,0 +1,180 @@
+"""Streaming hotel import pipeline unit tests (DB-free).
+
+Covers:
+- XLSX/CSV rows are streamed lazily; empty rows are skipped; parse_excel keeps its shape
+- Validation runs per chunk and still catches duplicates across chunk boundaries
+- Valid rows are written with one bulk_write per chunk and progress lands on import_jobs
+- Images are fetched by a bounded pool, once per URL, stored once per content hash with a thumbnail
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+
+import httpx
+import pytest
+from openpyxl import Workbook
+from PIL import Image
+
+from app.services import import_service as imp
+from app.services.search_index import SEARCH_TOKENS_FIELD
+
+JOB, ORG = "job1", "org1"
+MAPPING = {"0": "name", "1": "city", "2": "price", "3": "image_url"}
+
+
+def _xlsx(rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Otel", "Şehir", "Fiyat", "Resim"])
+    for row in rows:
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._it = iter(list(self.docs))
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Coll:
+    def __init__(self, db, name):
+        self.db, self.name, self.docs = db, name, []
+
+    def find(self, query, projection=None):
+        return _Cursor([d for d in self.docs if all(
+            (k in d and d[k] != "") if isinstance(v, dict) else d.get(k) == v for k, v in query.items()
+        )])
+
+    async def insert_many(self, docs, ordered=True):
+        self.docs.extend(docs)
+
+    async def update_one(self, query, update):
+        doc = next(d for d in self.docs if d["_id"] == query["_id"])
+        for key, value in update["$set"].items():
+            target = doc
+            *path, leaf = key.split(".")
+            for part in path:
+                target = target.setdefault(part, {})
+            target[leaf] = value
+
+    async def bulk_write(self, ops, ordered=True):
+        self.db.bulk.append((self.name, len(ops)))
+        for op in ops:
+            if hasattr(op, "_doc") and "$set" in op._doc:
+                await self.update_one(op._filter, op._doc)
+            else:
+                self.docs.append(op._doc)
+
+
+class _DB:
+    def __init__(self):
+        self.colls, self.bulk = {}, []
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in ("colls", "bulk"):
+            raise AttributeError(name)
+        return self.colls.setdefault(name, _Coll(self, name))
+
+
+@pytest.fixture
+def db():
+    fake = _DB()
+    fake.hotels.docs.append({"_id": "h0", "organization_id": ORG, "name": "Mevcut Otel"})
+    fake.import_jobs.docs.append({"_id": JOB, "organization_id": ORG, "status": "uploaded"})
+    return fake
+
+
+def test_rows_are_streamed_and_parse_excel_is_compatible():
+    headers, rows = imp.read_table(_xlsx([["A", "İzmir", "10", ""], [None, None], ["B", "Bodrum", "", ""]]), "x.xlsx")
+    assert headers == ["Otel", "Şehir", "Fiyat", "Resim"]
+    assert not isinstance(rows, list)
+    assert [r[0] for r in rows] == ["A", "B"]
+
+    csv_bytes = "﻿Otel;Şehir\nA;İzmir\n;\nB;Bodrum\n".encode()
+    assert imp.parse_excel(csv_bytes, "x.csv") == (["Otel", "Şehir"], [["A", "İzmir"], ["B", "Bodrum"]])
+    assert imp.preview_table(csv_bytes, "x.csv", limit=1) == (["Otel", "Şehir"], [["A", "İzmir"]], 2)
+    with pytest.raises(ValueError):
+        imp.parse_excel(b"Otel;Sehir\n", "x.csv")
+
+
+@pytest.mark.anyio
+async def test_chunked_validate_and_import(db):
+    rows = [[f"Otel {i}", "Antalya", "1500", ""] for i in range(2500)]
+    rows[1200] = ["Otel 5", "Antalya", "", ""]  # duplicate across the chunk boundary
+    rows[2000] = ["mevcut otel", "Antalya", "", ""]  # already in the org
+    rows[2100] = ["Otel X", "", "abc", ""]  # two field errors
+    data = _xlsx(rows)
+
+    result = await imp.validate_hotel_file(db, JOB, ORG, data, "x.xlsx", MAPPING)
+    assert (result["total_rows"], result["valid_count"], result["error_count"]) == (2500, 2497, 4)
+    assert {e["row_number"] for e in result["errors"]} == {1202, 2002, 2102}
+    assert len(result["preview_valid"]) == 10
+    assert len(db.import_errors.docs) == 4
+    assert db.import_jobs.docs[0]["progress"] == {"phase": "validating", "rows_read": 2500, "valid": 2497, "invalid": 4}
+
+    success, failed, errors = await imp.import_hotel_file(db, JOB, ORG, data, "x.xlsx", MAPPING, "admin@example.com")
+    assert (success, failed, errors) == (2497, 0, [])
+    assert [n for name, n in db.bulk if name == "hotels"] == [1000, 999, 498]
+    imported = [h for h in db.hotels.docs if h.get("import_job_id") == JOB]
+    assert len(imported) == 2497 and imported[0]["base_price"] == 1500.0
+    assert "antalya" in imported[0][SEARCH_TOKENS_FIELD]
+    assert db.import_jobs.docs[0]["progress"]["inserted"] == 2497
+
+
+@pytest.mark.anyio
+async def test_images_fetched_concurrently_and_deduplicated(db, monkeypatch, tmp_path):
+    buf = io.BytesIO()
+    Image.new("RGB", (800, 600), "red").save(buf, "PNG")
+    png = buf.getvalue()
+    fetched, active = [], {"now": 0, "max": 0}
+
+    async def handler(request):
+        fetched.append(str(request.url))
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if "missing" in str(request.url):
+            return httpx.Response(404)
+        return httpx.Response(200, content=png, headers={"content-type": "image/png"})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(imp.httpx, "AsyncClient",
+                        lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+    monkeypatch.setattr(imp, "UPLOAD_DIR", str(tmp_path))
+
+    urls = ["https://cdn.test/a.png"] * 3 + ["https://cdn.test/b.png", "https://cdn.test/missing.jpg"]
+    urls += [f"https://cdn.test/p{i}.png" for i in range(6)]
+    for i, url in enumerate(urls):
+        db.hotels.docs.append({"_id": f"i{i}", "organization_id": ORG, "import_job_id": JOB, "image_url": url})
+
+    downloaded = await imp.download_hotel_images(db, ORG, JOB, concurrency=4)
+    assert downloaded == 10
+    assert sorted(fetched) == sorted(set(urls))  # each URL fetched once
+    assert 1 < active["max"] <= 4
+
+    digest = hashlib.sha256(png).hexdigest()[:32]
+    assert sorted(os.listdir(tmp_path)) == [f"{digest}.png", f"{digest}_thumb.jpg"]  # one file per content
+    hotels = {h["_id"]: h for h in db.hotels.docs}
+    assert hotels["i0"]["local_image"] == hotels["i3"]["local_image"]
+    assert hotels["i0"]["local_thumbnail"].endswith("_thumb.jpg")
+    assert "local_image" not in hotels["i4"]
+    with Image.open(tmp_path / os.path.basename(hotels["i0"]["local_thumbnail"])) as thumb:
+        assert thumb.size[0] <= imp.THUMBNAIL_SIZE[0] and thumb.size[1] <= imp.THUMBNAIL_SIZE[1]
+    assert db.import_jobs.docs[0]["progress"]["images_failed"] == 1
@@ -0,0 +1,133 @@
+"""Conditional GET + surrogate key unit tests.
+
+Covers:
+- ETag/If-None-Match → 304 (weak comparison, lists, ``*``) for JSON and XML
+- Surrogate-Key headers and CDN purge batching (no-op when unconfigured)
+- invalidate_tours/invalidate_products purge the matching surrogate keys
+"""
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services import cache_invalidation, http_cache
+from app.services.http_cache import conditional_response, etag_matches, surrogate_keys
+
+PAYLOAD = {"items": [{"id": "t1", "name": "Kapadokya"}], "total": 1}
+
+
+def _app(state):
+    app = FastAPI()
+
+    @app.get("/catalog")
+    async def catalog(request: Request):
+        return conditional_response(
+            request, state["payload"], cache_control="public, max-age=60",
+            surrogate_keys=surrogate_keys("pub_tours", "org1"),
+        )
+
+    @app.get("/sitemap.xml")
+    async def sitemap(request: Request):
+        return conditional_response(request, "<urlset/>", media_type="application/xml", cache_control="public")
+
+    return TestClient(app)
+
+
+def test_etag_comparison_is_weak_and_handles_lists():
+    etag = 'W/"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"zzz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abd"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_if_none_match_returns_304_until_payload_changes():
+    state = {"payload": PAYLOAD}
+    client = _app(state)
+
+    first = client.get("/catalog")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["surrogate-key"] == "pub_tours/org1 org/org1"
+    assert first.headers["cache-control"] == "public, max-age=60"
+
+    again = client.get("/catalog", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    state["payload"] = {**PAYLOAD, "total": 2}
+    changed = client.get("/catalog", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+    xml = client.get("/sitemap.xml")
+    assert xml.headers["content-type"].startswith("application/xml")
+    assert client.get("/sitemap.xml", headers={"If-None-Match": xml.headers["etag"]}).status_code == 304
+
+
+class _FakeClient:
+    calls: list = []
+
+    def __init__(self, timeout=None):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def post(self, url, headers=None):
+        self.calls.append((url, headers))
+
+        class _Resp:
+            def raise_for_status(self):
+                return None
+
+        return _Resp()
+
+
+@pytest.mark.anyio
+async def test_purge_is_noop_without_config_and_batches_with_it(monkeypatch):
+    import httpx
+
+    monkeypatch.delenv("CDN_PURGE_SERVICE_ID", raising=False)
+    assert await http_cache.purge_surrogate_keys(["a"]) == 0
+
+    monkeypatch.setenv("CDN_PURGE_SERVICE_ID", "svc")
+    monkeypatch.setenv("CDN_PURGE_API_TOKEN", "tok")
+    monkeypatch.setattr(httpx, "AsyncClient", _FakeClient)
+    monkeypatch.setattr(http_cache, "MAX_KEYS_PER_PURGE", 2)
+    _FakeClient.calls = []
+
+    assert await http_cache.purge_surrogate_keys(["k1", "k2", "k1", "k3"]) == 3
+    assert [h["Surrogate-Key"] for _, h in _FakeClient.calls] == ["k1 k2", "k3"]
+    assert _FakeClient.calls[0][0] == "https://api.fastly.com/service/svc/purge"
+    assert _FakeClient.calls[0][1]["Fastly-Key"] == "tok"
+
+
+@pytest.mark.anyio
+async def test_domain_invalidation_purges_matching_surrogate_keys(monkeypatch):
+    cleared, purged = [], []
+
+    async def _inv(prefix, scope=""):
+        cleared.append((prefix, scope))
+        return 0
+
+    async def _purge(keys):
+        purged.extend(keys)
+        return 0
+
+    monkeypatch.setattr(cache_invalidation, "_inv", _inv)
+    monkeypatch.setattr(cache_invalidation, "purge_surrogate_keys", _purge)
+
+    await cache_invalidation.invalidate_tours("org1")
+    assert purged == ["pub_tours/org1", "tour_detail/org1", "pub_search/org1"]
+    # Endpoint-cache keys are "<prefix>:<org>:..." (unscoped Redis keys).
+    assert ("pub_tours:org1", "") in cleared
+
+    purged.clear()
+    await cache_invalidation.invalidate_products("org1")
+    assert purged == ["pub_search/org1", "sitemap/org1"]
@@ -0,0 +1,150 @@
+"""Startup index manifest unit tests (DB-free).
+
+Covers:
+- Manifest hash is stable and depends on the step list
+- Phases run in order, steps of one phase concurrently
+- Failures a step swallows (reported or counted) still fail the step
+- Unchanged hash skips every step; skip mode defers to the migration job
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.indexes import manifest
+from app.indexes.crm_indexes import ensure_crm_indexes
+from app.indexes.manifest import (
+    INDEX_MANIFEST,
+    IndexStep,
+    apply_index_manifest,
+    manifest_hash,
+    report_index_failure,
+    run_index_steps,
+)
+
+
+def test_manifest_hash_is_stable_and_tracks_steps():
+    assert manifest_hash() == manifest_hash()
+    assert manifest_hash(INDEX_MANIFEST[:-1]) != manifest_hash()
+
+
+def test_manifest_step_targets_resolve():
+    for step in INDEX_MANIFEST:
+        assert callable(manifest._resolve(step)), step.name
+
+
+_events: list = []
+
+
+async def _slow_step(db):
+    _events.append("slow:start")
+    await asyncio.sleep(0.02)
+    _events.append("slow:end")
+
+
+async def _fast_step(db):
+    _events.append("fast")
+
+
+async def _first_step(db):
+    _events.append("first")
+
+
+async def _failing_step(db):
+    raise RuntimeError("boom")
+
+
+_STEPS = (
+    IndexStep("first", f"{__name__}:_first_step", phase=0),
+    IndexStep("slow", f"{__name__}:_slow_step"),
+    IndexStep("fast", f"{__name__}:_fast_step"),
+)
+
+
+@pytest.mark.anyio
+async def test_run_index_steps_orders_phases_and_overlaps_steps():
+    _events.clear()
+    results = await run_index_steps(None, _STEPS, concurrency=4)
+
+    assert _events[0] == "first"
+    assert _events.index("fast") < _events.index("slow:end")
+    assert [r["name"] for r in results] == ["first", "slow", "fast"]
+    assert all(r["error"] is None for r in results)
+
+
+@pytest.mark.anyio
+async def test_failing_step_is_reported_not_raised():
+    results = await run_index_steps(None, (IndexStep("bad", f"{__name__}:_failing_step"),))
+    assert results[0]["error"] == "boom"
+
+
+async def _counting_step(db):
+    return {"created": 3, "errors": 1, "error_details": [{"index": "idx_x", "error": "nope"}]}
+
+
+class _BrokenCollection:
+    def __init__(self, name):
+        self.name = name
+
+    async def create_index(self, *args, **kwargs):
+        raise RuntimeError("not primary")
+
+
+class _BrokenDB:
+    def __getattr__(self, name):
+        return _BrokenCollection(name)
+
+    def __getitem__(self, name):
+        return _BrokenCollection(name)
+
+
+@pytest.mark.anyio
+async def test_swallowed_index_errors_fail_the_step():
+    results = await run_index_steps(
+        _BrokenDB(),
+        (
+            IndexStep("crm", "app.indexes.crm_indexes:ensure_crm_indexes"),
+            IndexStep("counting", f"{__name__}:_counting_step"),
+            IndexStep("fast", f"{__name__}:_fast_step"),
+        ),
+    )
+    by_name = {r["name"]: r["error"] for r in results}
+
+    assert "not primary" in by_name["crm"]
+    assert "1 index errors" in by_name["counting"]
+    assert by_name["fast"] is None
+
+
+@pytest.mark.anyio
+async def test_report_outside_a_manifest_run_is_a_noop():
+    report_index_failure("anything", RuntimeError("ignored"))
+    await ensure_crm_indexes(_BrokenDB())
+
+
+class _ManifestCollection:
+    def __init__(self, doc=None):
+        self.doc = doc
+
+    async def find_one(self, flt):
+        return self.doc
+
+
+class _DB(dict):
+    def __getitem__(self, name):
+        return self.setdefault(name, _ManifestCollection())
+
+
+@pytest.mark.anyio
+async def test_unchanged_hash_skips_and_skip_mode_defers(monkeypatch):
+    async def _must_not_run(*args, **kwargs):
+        raise AssertionError("index steps must not run")
+
+    monkeypatch.setattr(manifest, "run_index_steps", _must_not_run)
+
+    db = _DB()
+    db[manifest.MANIFEST_COLLECTION] = _ManifestCollection({"hash": manifest_hash()})
+    assert (await apply_index_manifest(db))["status"] == "unchanged"
+
+    db[manifest.MANIFEST_COLLECTION] = _ManifestCollection({"hash": "old"})
+    assert (await apply_index_manifest(db, mode=manifest.MODE_SKIP))["status"] == "deferred"
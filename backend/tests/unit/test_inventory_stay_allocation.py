@@ -0,0 +1,221 @@
+"""Atomic stay allocation unit tests (DB-free).
+
+Covers:
+- All-or-nothing multi-night holds incl. rollback after a partial allocation
+- No oversell under concurrent allocations of the same product-date
+- Idempotent release, confirm, and expiry sweep (booked holds are kept)
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.services import inventory
+from app.utils import now_utc
+
+ORG = "org1"
+PRODUCT = ObjectId()
+
+
+def _get(doc, path):
+    for part in path.split("."):
+        if isinstance(doc, list):
+            return [item.get(part) for item in doc if isinstance(item, dict)]
+        doc = (doc or {}).get(part)
+    return doc
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        value = _get(doc, key)
+        values = value if isinstance(value, list) else [value]
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$gte" in cond and (value is None or value < cond["$gte"]):
+                return False
+            if "$lt" in cond and not any(v is not None and v < cond["$lt"] for v in values):
+                return False
+            if "$ne" in cond and cond["$ne"] in values:
+                return False
+        elif cond not in values:
+            return False
+    return True
+
+
+class _Result:
+    def __init__(self, n):
+        self.modified_count = n
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, n):
+        return self._docs
+
+    def __aiter__(self):
+        self._it = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Inventory:
+    def __init__(self, docs):
+        self.docs = docs
+        self.updates = 0
+
+    def find(self, query, projection=None):
+        return _Cursor([{**d, "holds": list(d.get("holds") or [])} for d in self.docs if _matches(d, query)])
+
+    async def update_one(self, query, update):
+        await asyncio.sleep(0)  # let concurrent callers interleave
+        self.updates += 1
+        for doc in self.docs:
+            if _matches(doc, query):
+                self._apply(doc, update)
+                return _Result(1)
+        return _Result(0)
+
+    async def update_many(self, query, update):
+        hits = [d for d in self.docs if _matches(d, query)]
+        for doc in hits:
+            self._apply(doc, update)
+        return _Result(len(hits))
+
+    @staticmethod
+    def _apply(doc, update):
+        for k, v in update.get("$inc", {}).items():
+            doc[k] = doc.get(k, 0) + v
+        for k, v in update.get("$push", {}).items():
+            doc.setdefault(k, []).append(v)
+        for k, v in update.get("$pull", {}).items():
+            doc[k] = [m for m in doc.get(k, []) if m.get("id") != v["id"]]
+        doc.update(update.get("$set", {}))
+
+
+class _Reservations:
+    def __init__(self):
+        self.hold_ids = set()
+
+    async def find_one(self, query, projection=None):
+        return {"_id": 1} if query["inventory_hold_id"] in self.hold_ids else None
+
+
+class _DB:
+    def __init__(self, nights):
+        self.inventory = _Inventory([
+            {"_id": i, "organization_id": ORG, "product_id": PRODUCT, "date": d,
+             "capacity_available": cap, "restrictions": {"closed": False}}
+            for i, (d, cap) in enumerate(nights.items())
+        ])
+        self.reservations = _Reservations()
+
+    def capacity(self):
+        return {d["date"]: d["capacity_available"] for d in self.inventory.docs}
+
+
+@pytest.fixture
+def make_db(monkeypatch):
+    def _make(nights):
+        db = _DB(nights)
+
+        async def _get_db():
+            return db
+
+        monkeypatch.setattr(inventory, "get_db", _get_db)
+        return db
+
+    return _make
+
+
+NIGHTS = ["2026-07-01", "2026-07-02", "2026-07-03"]
+
+
+@pytest.mark.anyio
+async def test_allocate_holds_every_night_and_confirm_keeps_capacity(make_db):
+    db = make_db({d: 5 for d in NIGHTS})
+
+    hold = await inventory.allocate_stay(ORG, PRODUCT, list(reversed(NIGHTS)), 2)
+
+    assert hold["nights"] == NIGHTS
+    assert db.capacity() == {d: 3 for d in NIGHTS}
+    assert await inventory.confirm_stay(ORG, PRODUCT, hold["hold_id"]) == 3
+    assert await inventory.release_stay(ORG, PRODUCT, hold["hold_id"]) == 0
+    assert db.capacity() == {d: 3 for d in NIGHTS}
+
+
+@pytest.mark.anyio
+async def test_sold_out_night_is_refused_without_writes(make_db):
+    db = make_db({NIGHTS[0]: 5, NIGHTS[1]: 0, NIGHTS[2]: 5})
+
+    with pytest.raises(inventory.InventoryUnavailable) as exc:
+        await inventory.allocate_stay(ORG, PRODUCT, NIGHTS, 1)
+
+    assert exc.value.date == NIGHTS[1]
+    assert db.inventory.updates == 0
+
+
+@pytest.mark.anyio
+async def test_partial_allocation_rolls_back(make_db, monkeypatch):
+    db = make_db({NIGHTS[0]: 5, NIGHTS[1]: 1, NIGHTS[2]: 5})
+
+    async def _stale_precheck(*args):
+        # Another booking takes the last room between precheck and write.
+        db.inventory.docs[1]["capacity_available"] = 0
+
+    monkeypatch.setattr(inventory, "_precheck_nights", _stale_precheck)
+
+    with pytest.raises(inventory.InventoryUnavailable):
+        await inventory.allocate_stay(ORG, PRODUCT, NIGHTS, 1)
+
+    assert db.capacity() == {NIGHTS[0]: 5, NIGHTS[1]: 0, NIGHTS[2]: 5}
+    assert all(not d.get("holds") for d in db.inventory.docs)
+
+
+@pytest.mark.anyio
+async def test_concurrent_allocations_never_oversell(make_db):
+    db = make_db({NIGHTS[0]: 10, NIGHTS[1]: 10})
+
+    async def _book():
+        try:
+            await inventory.allocate_stay(ORG, PRODUCT, NIGHTS[:2], 1)
+            return True
+        except inventory.InventoryUnavailable:
+            return False
+
+    results = await asyncio.gather(*(_book() for _ in range(60)))
+
+    assert sum(results) == 10
+    assert db.capacity() == {NIGHTS[0]: 0, NIGHTS[1]: 0}
+
+
+@pytest.mark.anyio
+async def test_expired_holds_are_released_unless_booked(make_db):
+    db = make_db({NIGHTS[0]: 4})
+    lost = await inventory.allocate_stay(ORG, PRODUCT, NIGHTS[:1], 1, hold_ttl_seconds=1)
+    booked = await inventory.allocate_stay(ORG, PRODUCT, NIGHTS[:1], 1, hold_ttl_seconds=1)
+    live = await inventory.allocate_stay(ORG, PRODUCT, NIGHTS[:1], 1)
+    db.reservations.hold_ids.add(booked["hold_id"])
+
+    result = await inventory.release_expired_holds(now_utc() + timedelta(seconds=5))
+
+    assert result == {"released": 1, "confirmed": 1}
+    assert db.capacity() == {NIGHTS[0]: 2}
+    # Only the unexpired hold keeps its marker; the booked one became permanent.
+    assert [m["id"] for m in db.inventory.docs[0]["holds"]] == [live["hold_id"]]
+    assert await inventory.release_stay(ORG, PRODUCT, lost["hold_id"]) == 0
@@ -0,0 +1,275 @@
+"""Month-end bulk invoicing run unit tests (DB-free).
+
+Covers:
+- Period bookings are invoiced in batches; already-invoiced bookings are skipped
+- Drafts are issued in integrator-sized batches with bounded concurrency
+- Invoices and events are written with batched calls, never one by one
+- A run failing mid-issue resumes from its checkpoint without duplicates
+- Invoices interrupted mid-submit are parked for review, never re-sent
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.accounting.integrators.base_integrator import EDocumentResult
+from app.infrastructure.metrics_registry import registry
+from app.services import invoice_bulk_run as bulk
+from app.services.invoice_engine import _idempotency_key
+
+TENANT = ORG = "org1"
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, q) for q in cond):
+                return False
+            continue
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            for op, arg in cond.items():
+                if op == "$in" and value not in arg:
+                    return False
+                if op == "$gte" and not value >= arg:
+                    return False
+                if op == "$lt" and not value < arg:
+                    return False
+                if op == "$gt" and not value > arg:
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+    def __aiter__(self):
+        self._it = iter(list(self.docs))
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Coll:
+    def __init__(self, db, name):
+        self.db, self.name, self.docs = db, name, []
+
+    def _call(self, op):
+        self.db.calls.append((self.name, op))
+
+    def find(self, query, projection=None):
+        return _Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def find_one(self, query):
+        return next((d for d in self.docs if _matches(d, query)), None)
+
+    async def insert_one(self, doc):
+        self._call("insert_one")
+        self.docs.append(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        self._call("insert_many")
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+            self.docs.append(doc)
+
+    def _apply(self, doc, update):
+        for key, value in update.get("$set", {}).items():
+            target = doc
+            *path, leaf = key.split(".")
+            for part in path:
+                target = target.setdefault(part, {})
+            target[leaf] = value
+        for key, value in update.get("$inc", {}).items():
+            group, leaf = key.split(".")
+            doc[group][leaf] = doc[group].get(leaf, 0) + value
+
+    async def update_one(self, query, update):
+        if self.name != bulk.RUNS_COLLECTION:
+            self._call("update_one")
+        self._apply(await self.find_one(query), update)
+
+    async def update_many(self, query, update):
+        self._call("update_many")
+        for doc in [d for d in self.docs if _matches(d, query)]:
+            self._apply(doc, update)
+
+    async def bulk_write(self, ops, ordered=True):
+        self._call("bulk_write")
+        for op in ops:
+            self._apply(await self.find_one(op._filter), op._doc)
+
+
+class _DB:
+    def __init__(self):
+        self.colls, self.calls = {}, []
+
+    def __getitem__(self, name):
+        return self.colls.setdefault(name, _Coll(self, name))
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in ("colls", "calls"):
+            raise AttributeError(name)
+        return self[name]
+
+
+class _Integrator:
+    max_batch_size = 3
+
+    def __init__(self, fail_first=False):
+        self.batches, self.active, self.max_active = [], 0, 0
+        self.fail_first = fail_first
+
+    async def issue_invoices(self, invoices, credentials):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if self.fail_first:
+            self.fail_first = False
+            raise RuntimeError("provider down")
+        self.batches.append([inv["invoice_id"] for inv in invoices])
+        return [
+            EDocumentResult(success=False, status="rejected", message="VKN hatali")
+            if inv["guest_name"] == "reject" else
+            EDocumentResult(success=True, provider_invoice_id=f"P-{inv['invoice_id']}", status="submitted")
+            for inv in invoices
+        ]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = _DB()
+    in_period = datetime(2026, 9, 15, tzinfo=timezone.utc)
+    for i in range(8):
+        fake.bookings.docs.append({
+            "_id": ObjectId(), "organization_id": ORG, "status": "confirmed", "created_at": in_period,
+            "hotel_name": "Otel", "amount": 1200.0, "currency": "TRY",
+            "guest_name": "reject" if i == 5 else f"Misafir {i}",
+        })
+    fake.bookings.docs.append({"_id": ObjectId(), "organization_id": ORG, "status": "confirmed",
+                               "created_at": datetime(2026, 10, 1, tzinfo=timezone.utc), "amount": 10.0})
+    fake.bookings.docs.append({"_id": ObjectId(), "organization_id": ORG, "status": "cancelled",
+                               "created_at": in_period, "amount": 10.0})
+    already = fake.bookings.docs[0]["_id"]
+    fake.invoices.docs.append({"_id": ObjectId(), "tenant_id": TENANT, "status": "issued",
+                               "idempotency_key": _idempotency_key(TENANT, str(already))})
+
+    async def _enqueue(db, **kwargs):
+        fake.jobs.docs.append(kwargs)
+
+    async def _has_integrator(tenant_id):
+        return True
+
+    async def _creds(tenant_id, provider):
+        return {"username": "u"}
+
+    monkeypatch.setattr("app.services.jobs.enqueue_job", _enqueue)
+    monkeypatch.setattr(bulk, "has_active_integrator", _has_integrator)
+    monkeypatch.setattr(bulk, "get_integrator_credentials", _creds)
+    monkeypatch.setattr(bulk, "BUILD_BATCH", 3)
+    return fake
+
+
+@pytest.mark.anyio
+async def test_bulk_run_builds_and_issues_in_batches(db, monkeypatch):
+    integrator = _Integrator()
+    monkeypatch.setattr(bulk, "get_integrator", lambda name: integrator)
+    registry.reset()
+
+    run = await bulk.start_invoice_run(db, TENANT, ORG, "2026-09", created_by="muhasebe@example.com")
+    assert db.jobs.docs == [{"organization_id": ORG, "type": "invoice.bulk_run", "payload": {"run_id": run["_id"]}}]
+
+    done = await bulk.run_invoice_run(db, run["_id"])
+    assert done["status"] == "completed"
+    assert done["counts"] == {"scanned": 8, "created": 7, "skipped": 1, "issued": 6, "failed": 1, "needs_review": 0}
+
+    assert [len(b) for b in integrator.batches] == [3, 3, 1]
+    assert integrator.max_active > 1
+
+    created = [d for d in db.invoices.docs if d.get("run_id") == run["_id"]]
+    assert len(created) == 7
+    assert sum(d["status"] == "issued" and d["provider_invoice_id"].startswith("P-") for d in created) == 6
+    rejected = next(d for d in created if d["guest_name"] == "reject")
+    assert rejected["status"] == "failed" and rejected["error_message"] == "VKN hatali"
+    assert rejected["totals"]["grand_total"] > 0
+
+    types = [e["type"] for e in db.invoice_events.docs]
+    assert types.count("invoice.created") == types.count("invoice.issuing") == 7
+    assert types.count("invoice.issued") == 6 and types.count("invoice.failed") == 1
+
+    # Writes are batched: 3 build batches + 3 issue batches, nothing per invoice.
+    assert all(op not in ("insert_one", "update_one") for name, op in db.calls if name in ("invoices", "invoice_events"))
+    assert sum(1 for name, op in db.calls if (name, op) == ("invoices", "insert_many")) == 3
+    assert sum(1 for name, op in db.calls if (name, op) == ("invoices", "bulk_write")) == 3
+
+    counters = registry.snapshot()["counters"]
+    assert any("invoice_run_invoices_total" in str(key) for key in counters)
+    view = bulk.run_view(done)
+    assert view["id"] == run["_id"] and "checkpoint" not in view
+    assert set(done["stats"]) == {"build_per_second", "issue_per_second"}
+
+
+@pytest.mark.anyio
+async def test_failed_run_resumes_without_duplicates(db, monkeypatch):
+    integrator = _Integrator(fail_first=True)
+    monkeypatch.setattr(bulk, "get_integrator", lambda name: integrator)
+    monkeypatch.setattr(bulk, "ISSUE_CONCURRENCY", 1)
+
+    run = await bulk.start_invoice_run(db, TENANT, ORG, "2026-09")
+    with pytest.raises(RuntimeError):
+        await bulk.run_invoice_run(db, run["_id"])
+
+    stored = await db.invoice_runs.find_one({"_id": run["_id"]})
+    assert stored["status"] == "failed" and stored["error"] == "provider down"
+    assert stored["checkpoint"]["last_booking_id"] == max(
+        b["_id"] for b in db.bookings.docs if b["created_at"].month == 9 and b["status"] == "confirmed"
+    )
+    stranded = [d for d in db.invoices.docs if d.get("run_id") == run["_id"] and d["status"] == "issuing"]
+    assert len(stranded) == 3
+
+    done = await bulk.run_invoice_run(db, run["_id"])
+    assert done["status"] == "completed"
+    assert len([d for d in db.invoices.docs if d.get("run_id") == run["_id"]]) == 7
+    assert done["counts"]["created"] == 7 and done["counts"]["issued"] + done["counts"]["failed"] == 4
+    assert done["counts"]["needs_review"] == 3
+
+    # The interrupted batch may already exist at the provider: never re-sent.
+    sent = sorted(i for b in integrator.batches for i in b)
+    assert not set(sent) & {d["invoice_id"] for d in stranded}
+    assert all(d["status"] == "issuing" and d["needs_review"] for d in stranded)
+    review_events = [e for e in db.invoice_events.docs if e["type"] == "invoice.needs_review"]
+    assert sorted(e["invoice_id"] for e in review_events) == sorted(d["invoice_id"] for d in stranded)
+
+    db.invoice_runs.docs[0]["status"] = "failed"
+    again = await bulk.run_invoice_run(db, run["_id"])
+    assert again["counts"]["needs_review"] == 3 and sorted(i for b in integrator.batches for i in b) == sent
+
+
+def test_period_bounds_wrap_year():
+    start, end = bulk.period_bounds("2026-12")
+    assert (start.month, end.year, end.month) == (12, 2027, 1)
@@ -0,0 +1,112 @@
+"""Keyset pagination helper unit tests (DB-free).
+
+Covers:
+- Cursor encode/decode roundtrip (datetimes survive)
+- Malformed / mismatched cursors raise InvalidCursor
+- keyset_filter shape for compound sorts
+- keyset_page next_cursor handling and projection re-inclusion
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.repositories.base_repository import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    keyset_page,
+)
+
+
+def test_cursor_roundtrip_preserves_datetime():
+    ts = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    cursor = encode_cursor([ts, "cust_1"])
+    values = decode_cursor(cursor, 2)
+    assert values[0].replace(tzinfo=timezone.utc) == ts
+    assert values[1] == "cust_1"
+
+
+def test_decode_rejects_garbage_and_wrong_length():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor!!", 2)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor(["a"]), 2)
+
+
+def test_decode_rejects_operator_injection():
+    for crafted in ([{"$ne": None}, "c1"], ["t1", ["a", "b"]]):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor(crafted), 2)
+
+
+def test_keyset_filter_compound_sort():
+    flt = keyset_filter([("updated_at", -1), ("id", -1)], ["t1", "c1"])
+    assert flt == {
+        "$or": [
+            {"updated_at": {"$lt": "t1"}},
+            {"updated_at": "t1", "id": {"$lt": "c1"}},
+        ]
+    }
+    assert keyset_filter([("n", 1)], [5]) == {"n": {"$gt": 5}}
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+        self._limit = None
+
+    def sort(self, spec):
+        for field, direction in reversed(spec):
+            self._docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    async def to_list(self, length):
+        return [dict(d) for d in self._docs[: self._limit]]
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.last_query = None
+        self.last_projection = None
+
+    def find(self, query, projection=None):
+        self.last_query = query
+        self.last_projection = projection
+        return _FakeCursor(list(self.docs))
+
+    async def count_documents(self, query, **kwargs):
+        return len(self.docs)
+
+
+@pytest.mark.anyio
+async def test_keyset_page_returns_cursor_and_strips_reincluded_fields():
+    coll = _FakeCollection([{"_id": i, "ts": 100 - i, "name": f"n{i}"} for i in range(5)])
+
+    page = await keyset_page(
+        coll, {"org": "o1"}, sort=[("ts", -1)], limit=2, projection={"_id": 0}, count="exact"
+    )
+
+    assert coll.last_projection is None
+    assert [d["name"] for d in page["items"]] == ["n0", "n1"]
+    assert all("_id" not in d for d in page["items"])
+    assert page["total"] == 5
+    assert decode_cursor(page["next_cursor"], 2) == [99, 1]
+
+    nxt = await keyset_page(coll, {"org": "o1"}, sort=[("ts", -1)], limit=2, cursor=page["next_cursor"])
+    assert "$and" in coll.last_query
+    assert nxt["total"] is None
+
+
+@pytest.mark.anyio
+async def test_keyset_page_last_page_has_no_cursor():
+    coll = _FakeCollection([{"_id": 1, "ts": 1}])
+    page = await keyset_page(coll, {}, sort=[("ts", -1)], limit=5)
+    assert page["next_cursor"] is None
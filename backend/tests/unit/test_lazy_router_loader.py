@@ -0,0 +1,130 @@
+"""Lazy router mounting + startup profile unit tests.
+
+Covers:
+- Domains load on the first request to one of their prefixes
+- Route precedence after lazy loads matches eager registration order
+- Unclaimed paths and the OpenAPI schema load everything
+- ``-X importtime`` parsing into a module tree
+"""
+from __future__ import annotations
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.bootstrap import domain_router_registry as registry
+from app.bootstrap import lazy_router_loader
+from app.bootstrap.domain_router_registry import RouterMount
+from app.bootstrap.lazy_router_loader import (
+    build_router_prefix_map,
+    install_lazy_router_loader,
+    prefix_keys,
+)
+from app.bootstrap.startup_profile import parse_importtime, summarize_profile
+
+
+def _router(name: str, *paths: str) -> APIRouter:
+    router = APIRouter()
+    for path in paths:
+        router.add_api_route(path, lambda name=name: {"domain": name}, methods=["GET"])
+    return router
+
+
+ROUTERS = {
+    "core": _router("core", "/api/auth/me"),
+    "catchall": _router("catchall", "/api/items/{item_id}"),
+    "items": _router("items", "/api/items/special", "/api/items/list"),
+    "reports": _router("reports", "/api/reports/daily"),
+}
+MOUNTS = (
+    RouterMount("core", "core", eager=True),
+    RouterMount("catchall", "catchall"),
+    RouterMount("items", "items"),
+    RouterMount("reports", "reports"),
+)
+
+
+def _patch_resolve(monkeypatch):
+    for module in (registry, lazy_router_loader):
+        monkeypatch.setattr(module, "resolve_mount", lambda mount: ROUTERS[mount.target])
+
+
+def _app(monkeypatch, mounts=MOUNTS):
+    _patch_resolve(monkeypatch)
+    app = FastAPI(openapi_url="/api/openapi.json")
+    loader = install_lazy_router_loader(app, mounts, build_router_prefix_map(mounts))
+    return app, loader
+
+
+def test_prefix_keys_skip_templated_segments():
+    assert prefix_keys("/api/items/{id}") == ["/api/items", "/api"]
+    assert prefix_keys("/api/{tenant}/x") == ["/api"]
+    assert prefix_keys("/") == []
+
+
+def test_domain_loads_on_first_request_to_its_prefix(monkeypatch):
+    app, loader = _app(monkeypatch)
+    client = TestClient(app)
+    assert loader.pending == ["catchall", "items", "reports"]
+
+    assert client.get("/api/auth/me").json() == {"domain": "core"}
+    assert loader.pending == ["catchall", "items", "reports"]
+
+    assert client.get("/api/reports/daily").json() == {"domain": "reports"}
+    assert loader.pending == ["catchall", "items"]
+
+    # /api/v1/* is rewritten downstream; the loader resolves the same domain.
+    assert loader.mounts_for_path("/api/v1/items/list") == {"catchall", "items"}
+
+
+def test_lazy_load_keeps_eager_precedence(monkeypatch):
+    app, loader = _app(monkeypatch)
+    client = TestClient(app)
+    loader.load(["items"])
+    loader.load(["catchall"])
+
+    # "catchall" is registered before "items", so it wins as it would eagerly.
+    assert client.get("/api/items/special").json() == {"domain": "catchall"}
+    paths = [r.path for r in app.router.routes if r.path.startswith("/api/items")]
+    assert paths == ["/api/items/{item_id}", "/api/items/special", "/api/items/list"]
+
+
+def test_unclaimed_path_and_openapi_load_everything(monkeypatch):
+    app, loader = _app(monkeypatch)
+    client = TestClient(app)
+    assert client.get("/nothing-here").status_code == 404
+    assert loader.complete
+
+    app, loader = _app(monkeypatch)
+    schema = TestClient(app).get("/api/openapi.json").json()
+    assert "/api/reports/daily" in schema["paths"]
+
+
+def test_mount_missing_from_prefix_map_is_included_at_startup(monkeypatch):
+    _patch_resolve(monkeypatch)
+    app = FastAPI()
+    loader = install_lazy_router_loader(app, MOUNTS, {"items": ["/api/items"]})
+    assert loader.pending == ["items"]
+
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     app.b.leaf
+import time:       200 |        300 |   app.b
+import time:        50 |         50 |   app.c
+import time:      1000 |       1350 | app.a
+import time:        10 |         10 | json
+"""
+
+
+def test_parse_importtime_builds_nested_tree():
+    tree = parse_importtime(IMPORTTIME)
+    assert [n["module"] for n in tree] == ["app.a", "json"]
+    a = tree[0]
+    assert a["cumulative_ms"] == 1.35
+    assert [c["module"] for c in a["children"]] == ["app.b", "app.c"]
+    assert a["children"][0]["children"][0]["module"] == "app.b.leaf"
+
+    summary = summarize_profile(tree, top=2, max_depth=1)
+    assert summary["module_count"] == 5
+    assert summary["slowest_self"][0] == {"module": "app.a", "self_ms": 1.0}
+    assert summary["tree"][0]["children"] == []
@@ -0,0 +1,368 @@
+"""Agency × hotel match stats projection unit tests (DB-free).
+
+Covers:
+- Day bucketing (UTC midnight, naive timestamps treated as UTC)
+- Bucket document shape (deterministic ids, derived behavioral cancels)
+- refresh_bucket recomputes (and drops) a bucket from its source rows
+- refresh_match_stats_for_booking finds str / ObjectId ids and fans out to outcome buckets
+- The admin matches list is identical from the projection and the live aggregates
+
+The fake collections evaluate the small aggregation subset the projection
+and the matches router use.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.modules.booking.routers.matches import list_matches
+from app.services.match_stats_projection import (
+    KIND_BOOKINGS,
+    KIND_OUTCOMES_CHECKIN,
+    KIND_OUTCOMES_CREATED,
+    _bucket_doc,
+    _bucket_id,
+    day_start,
+    rebuild_match_stats,
+    refresh_bucket,
+    refresh_match_stats_for_booking,
+)
+from app.utils import now_utc
+
+ORG = "org_1"
+
+
+def test_day_start_normalizes_to_utc_midnight():
+    ts = datetime(2026, 3, 5, 23, 30, tzinfo=timezone(timedelta(hours=-3)))
+    assert day_start(ts) == datetime(2026, 3, 6, tzinfo=timezone.utc)
+    assert day_start(datetime(2026, 3, 5, 8, 0)) == datetime(2026, 3, 5, tzinfo=timezone.utc)
+
+
+def test_bucket_doc_has_deterministic_id_and_behavioral_cancels():
+    day = datetime(2026, 3, 5, tzinfo=timezone.utc)
+    row = {"_id": None, "total": 5, "cancelled": 3, "operational_cancelled": 1}
+
+    doc = _bucket_doc(KIND_BOOKINGS, "org_1", "ag_1", "ho_1", day, row)
+
+    assert doc["_id"] == "bookings:org_1:ag_1:ho_1:2026-03-05"
+    assert doc["behavioral_cancelled"] == 2
+    assert doc["kind"] == KIND_BOOKINGS
+    assert doc["day"] == day
+
+
+# ── In-memory aggregation fake ────────────────────────────────
+
+
+def _get(doc, path):
+    value = doc
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _expr(doc, e):
+    if isinstance(e, str) and e.startswith("$"):
+        return _get(doc, e[1:])
+    if isinstance(e, list):
+        return [_expr(doc, v) for v in e]
+    if not isinstance(e, dict):
+        return e
+    if len(e) == 1 and next(iter(e)).startswith("$"):
+        op, arg = next(iter(e.items()))
+        if op == "$cond":
+            cond, then, other = arg
+            return _expr(doc, then) if _expr(doc, cond) else _expr(doc, other)
+        if op == "$dateTrunc":
+            return day_start(_expr(doc, arg["date"]))
+        if op == "$toString":
+            return str(_expr(doc, arg))
+        if op == "$type":
+            value = _expr(doc, arg)
+            return "date" if isinstance(value, datetime) else ("missing" if value is None else type(value).__name__)
+        if op == "$not":
+            return not _expr(doc, arg[0])
+        args = _expr(doc, arg)
+        if op == "$eq":
+            return args[0] == args[1]
+        if op == "$gte":
+            return args[0] is not None and args[0] >= args[1]
+        if op == "$in":
+            return args[0] in args[1]
+        if op == "$and":
+            return all(args)
+        if op == "$or":
+            return any(args)
+        if op == "$subtract":
+            return int((args[0] - args[1]) / timedelta(milliseconds=1))
+        raise NotImplementedError(op)
+    return {k: _expr(doc, v) for k, v in e.items()}
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, q) for q in cond):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            for op, arg in cond.items():
+                ok = {
+                    "$gte": lambda: value is not None and value >= arg,
+                    "$gt": lambda: value is not None and value > arg,
+                    "$lt": lambda: value is not None and value < arg,
+                    "$in": lambda: value in arg,
+                    "$nin": lambda: value not in arg,
+                    "$type": lambda: arg == "date" and isinstance(value, datetime),
+                }[op]()
+                if not ok:
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _group(docs, spec):
+    groups = {}
+    for doc in docs:
+        key = _expr(doc, spec["_id"])
+        acc = groups.setdefault(repr(key), {"_id": key})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, arg), = accumulator.items()
+            value = _expr(doc, arg)
+            if op == "$sum":
+                acc[field] = acc.get(field, 0) + (value or 0)
+            elif value is not None and (acc.get(field) is None or value > acc[field]):
+                acc[field] = value
+            else:
+                acc.setdefault(field, None)
+    return list(groups.values())
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs if length is None else self.docs[:length]
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Collection:
+    def __init__(self):
+        self.docs = []
+
+    def aggregate(self, pipeline, **kwargs):
+        docs = [dict(d) for d in self.docs]
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if _matches(d, arg)]
+            elif op == "$group":
+                docs = _group(docs, arg)
+            elif op == "$sort":
+                for field, direction in reversed(list(arg.items())):
+                    docs.sort(key=lambda d: d.get(field) or 0, reverse=direction < 0)
+        return _Cursor(docs)
+
+    def find(self, query):
+        return _Cursor([dict(d) for d in self.docs if _matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((d for d in self.docs if _matches(d, query)), None)
+
+    async def insert_many(self, docs):
+        self.docs.extend(docs)
+
+    async def replace_one(self, query, doc, upsert=False):
+        await self.delete_one(query)
+        self.docs.append(doc)
+
+    async def delete_one(self, query):
+        doc = await self.find_one(query)
+        if doc is not None:
+            self.docs.remove(doc)
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+
+    async def update_one(self, query, update, upsert=False):
+        doc = await self.find_one(query)
+        if doc is None:
+            doc = dict(query)
+            self.docs.append(doc)
+        doc.update(update["$set"])
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            await self.replace_one(op._filter, op._doc, upsert=op._upsert)
+
+
+class _DB:
+    def __init__(self):
+        self._cols = {}
+
+    def __getattr__(self, name):
+        return self[name]
+
+    def __getitem__(self, name):
+        return self._cols.setdefault(name, _Collection())
+
+
+def _bucket(db, kind, agency_id, hotel_id, when):
+    bucket_id = _bucket_id(kind, ORG, agency_id, hotel_id, day_start(when))
+    return next((d for d in db.agency_hotel_match_stats.docs if d["_id"] == bucket_id), None)
+
+
+# ── Incremental maintenance ───────────────────────────────────
+
+
+@pytest.mark.anyio
+async def test_refresh_bucket_recomputes_from_source_rows():
+    db = _DB()
+    day = datetime(2026, 3, 5, 9, tzinfo=timezone.utc)
+    base = {"organization_id": ORG, "agency_id": "ag_1", "hotel_id": "ho_1"}
+    await db.bookings.insert_many([
+        {**base, "_id": "b1", "status": "confirmed", "created_at": day, "confirmed_at": day + timedelta(hours=2)},
+        {**base, "_id": "b2", "status": "cancelled", "cancel_reason": "PRICE_CHANGED", "created_at": day + timedelta(hours=3)},
+        {**base, "_id": "b3", "status": "cancelled", "created_at": day + timedelta(hours=4)},
+        {**base, "_id": "b4", "status": "pending", "created_at": day + timedelta(days=1)},
+    ])
+
+    await refresh_bucket(db, KIND_BOOKINGS, ORG, "ag_1", "ho_1", day)
+    doc = _bucket(db, KIND_BOOKINGS, "ag_1", "ho_1", day)
+    assert (doc["total"], doc["confirmed"], doc["cancelled"], doc["pending"]) == (3, 1, 2, 0)
+    assert (doc["operational_cancelled"], doc["behavioral_cancelled"]) == (1, 1)
+    assert (doc["approval_count"], doc["approval_ms_sum"]) == (1, 2 * 3600 * 1000)
+    assert doc["last_booking_at"] == day + timedelta(hours=4)
+
+    # Recomputing, not incrementing: a status change is reflected exactly once.
+    db.bookings.docs[2]["status"] = "confirmed"
+    await refresh_bucket(db, KIND_BOOKINGS, ORG, "ag_1", "ho_1", day)
+    await refresh_bucket(db, KIND_BOOKINGS, ORG, "ag_1", "ho_1", day)
+    doc = _bucket(db, KIND_BOOKINGS, "ag_1", "ho_1", day)
+    assert (doc["total"], doc["confirmed"], doc["cancelled"]) == (3, 2, 1)
+    assert len(db.agency_hotel_match_stats.docs) == 1
+
+    # A bucket whose source rows are gone is dropped.
+    db.bookings.docs = db.bookings.docs[3:]
+    await refresh_bucket(db, KIND_BOOKINGS, ORG, "ag_1", "ho_1", day)
+    assert _bucket(db, KIND_BOOKINGS, "ag_1", "ho_1", day) is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("stored_as_object_id", [False, True])
+async def test_refresh_for_booking_finds_id_and_fans_out_to_outcomes(stored_as_object_id):
+    db = _DB()
+    oid = ObjectId()
+    created = datetime(2026, 3, 5, 9, tzinfo=timezone.utc)
+    checkin = datetime(2026, 3, 20, tzinfo=timezone.utc)
+    await db.bookings.insert_many([{
+        "_id": oid if stored_as_object_id else str(oid),
+        "organization_id": ORG,
+        "agency_id": "ag_1",
+        "hotel_id": "ho_1",
+        "status": "confirmed",
+        "created_at": created,
+    }])
+    await db.booking_outcomes.insert_many([{
+        "organization_id": ORG,
+        "booking_id": str(oid),
+        "agency_id": "ag_1",
+        "hotel_id": "ho_1",
+        "final_outcome": "no_show",
+        "verified": True,
+        "checkin_date": checkin,
+        "created_at": checkin + timedelta(days=1),
+    }])
+
+    assert await refresh_match_stats_for_booking(db, ORG, str(oid)) is True
+
+    assert _bucket(db, KIND_BOOKINGS, "ag_1", "ho_1", created)["confirmed"] == 1
+    checkin_bucket = _bucket(db, KIND_OUTCOMES_CHECKIN, "ag_1", "ho_1", checkin)
+    assert (checkin_bucket["outcomes_total"], checkin_bucket["no_show"]) == (1, 1)
+    created_bucket = _bucket(db, KIND_OUTCOMES_CREATED, "ag_1", "ho_1", checkin + timedelta(days=1))
+    assert (created_bucket["verified_total"], created_bucket["verified_no_show"]) == (1, 1)
+
+
+@pytest.mark.anyio
+async def test_refresh_for_unknown_or_foreign_booking_is_a_noop():
+    db = _DB()
+    await db.bookings.insert_many([{"_id": "b1", "organization_id": "org_2", "agency_id": "ag_1", "hotel_id": "ho_1",
+                                    "created_at": datetime(2026, 3, 5, tzinfo=timezone.utc)}])
+
+    assert await refresh_match_stats_for_booking(db, ORG, "b1") is False
+    assert await refresh_match_stats_for_booking(db, ORG, "missing") is False
+    assert db.agency_hotel_match_stats.docs == []
+
+
+# ── Read-side parity ──────────────────────────────────────────
+
+
+def _seed_matches_fixture(db, now):
+    def booking(_id, agency_id, days_ago, status, **extra):
+        created = now - timedelta(days=days_ago)
+        return {"_id": _id, "organization_id": ORG, "agency_id": agency_id, "hotel_id": "ho_1",
+                "status": status, "created_at": created, **extra}
+
+    def outcome(booking_id, agency_id, final, checkin_days_ago, created_days_ago, verified=True):
+        return {"organization_id": ORG, "booking_id": booking_id, "agency_id": agency_id, "hotel_id": "ho_1",
+                "final_outcome": final, "verified": verified,
+                "checkin_date": now - timedelta(days=checkin_days_ago),
+                "created_at": now - timedelta(days=created_days_ago)}
+
+    db.bookings.docs = [
+        booking("b1", "ag_1", 1, "confirmed", confirmed_at=now - timedelta(days=1) + timedelta(hours=2)),
+        booking("b2", "ag_1", 2, "cancelled", cancel_reason="PRICE_CHANGED"),
+        booking("b3", "ag_1", 3, "cancelled", cancelled_by="agency"),
+        booking("b4", "ag_1", 10, "pending"),
+        booking("b5", "ag_1", 40, "confirmed"),
+        booking("b6", "ag_2", 2, "cancelled", cancelled_by="system"),
+        booking("b7", "ag_2", 20, "confirmed"),
+        booking("b8", "ag_2", 4, "cancelled"),
+    ]
+    db.booking_outcomes.docs = [
+        outcome("b1", "ag_1", "no_show", 1, 1),
+        outcome("b3", "ag_1", "arrived", 3, 2, verified=False),
+        outcome("b6", "ag_2", "arrived", 2, 5),
+        outcome("b7", "ag_2", "no_show", 15, 15),
+    ]
+    db.agencies.docs = [{"_id": "ag_1", "organization_id": ORG, "name": "Acenta 1"},
+                        {"_id": "ag_2", "organization_id": ORG, "name": "Acenta 2"}]
+    db.hotels.docs = [{"_id": "ho_1", "organization_id": ORG, "name": "Otel 1"}]
+
+
+async def _list(db):
+    response = await list_matches(
+        days=30, min_total=1, include_action=False, only_high_risk=False,
+        sort="high_risk_first", include_reasons=True, db=db, user={"organization_id": ORG},
+    )
+    return [item.model_dump() for item in response["items"]]
+
+
+@pytest.mark.anyio
+async def test_projection_matches_list_equals_live_aggregates():
+    db = _DB()
+    _seed_matches_fixture(db, now_utc())
+
+    legacy = await _list(db)
+    await rebuild_match_stats(db, ORG)
+    projected = await _list(db)
+
+    assert [i["id"] for i in legacy] == ["ag_1__ho_1", "ag_2__ho_1"]
+    assert legacy[0]["total_bookings"] == 4 and legacy[0]["repeat_cancelled_operational_7"] == 1
+    assert legacy[0]["repeat_no_show_7"] == 1 and legacy[1]["verified_bookings_30d"] == 2
+    assert projected == legacy
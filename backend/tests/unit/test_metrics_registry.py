@@ -0,0 +1,83 @@
+"""Fixed-bucket metrics registry unit tests.
+
+Covers:
+- Log-scale bucket placement (le semantics) and quantile estimates
+- Request durations recorded per route template, errors per status
+- Series cap collapses new label sets into one overflow series
+- Multi-process merge of worker snapshots and Prometheus text rendering
+"""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from app.infrastructure import metrics_registry as mr
+from app.infrastructure.observability import get_metrics_summary, observe_histogram
+from app.services.prometheus_metrics_service import record_request_duration
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry(monkeypatch):
+    mr.registry.reset()
+    monkeypatch.delenv("METRICS_MULTIPROC_DIR", raising=False)
+    yield
+    mr.registry.reset()
+
+
+def test_bucket_placement_and_quantiles():
+    hist = mr.Histogram((1.0, 2.0, 4.0))
+    for v in (0.5, 1.0, 1.5, 3.0, 9.0):
+        hist.observe(v)
+    assert list(hist.counts) == [2, 1, 1, 1]  # 1.0 lands in le="1"
+    assert hist.count == 5 and hist.sum == pytest.approx(15.0)
+
+    counts = [0, 100, 0, 0]
+    assert 1.0 <= mr.quantile((1.0, 2.0, 4.0), counts, 0.95) <= 2.0
+
+
+def test_request_durations_use_route_template_and_constant_storage():
+    for i in range(20_000):
+        record_request_duration("GET", f"/api/bookings/{i:032d}", 200, 12.0, route="/api/bookings/{booking_id}")
+    record_request_duration("GET", "/api/bookings/x", 500, 30.0, route="/api/bookings/{booking_id}")
+
+    hist = mr.registry.histograms[
+        ("http_request_duration_seconds", (("method", "GET"), ("route", "/api/bookings/{booking_id}")))
+    ]
+    assert hist.count == 20_001
+    assert len(mr.registry.histograms) == 1
+    assert mr.registry.counters[("http_errors_total", (("status", "500"),))] == 1
+
+
+def test_series_cap_collapses_into_overflow(monkeypatch):
+    monkeypatch.setattr(mr, "MAX_SERIES", 3)
+    for i in range(10):
+        mr.registry.inc("events_total", labels={"id": str(i)})
+    assert len(mr.registry.counters) == 4
+    assert mr.registry.counters[("events_total", mr._OVERFLOW_LABELS)] == 7
+
+
+def test_workers_merge_and_render(tmp_path, monkeypatch):
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+
+    # A sibling worker's snapshot on disk.
+    mr.registry.observe("db_query_duration_seconds", 0.003, {"op": "find"})
+    mr.registry.inc("jobs_completed_total", 2)
+    mr.flush_snapshot()
+    (tmp_path / f"{os.getpid()}.json").rename(tmp_path / "99999.json")
+
+    # This worker's live state.
+    mr.registry.reset()
+    observe_histogram("db_query_duration_seconds", 0.003, {"op": "find"})
+    mr.registry.inc("jobs_completed_total", 1)
+
+    text = mr.render_prometheus()
+    assert "# TYPE jobs_completed_total counter" in text
+    assert "jobs_completed_total 3" in text
+    assert 'db_query_duration_seconds_bucket{op="find",le="0.004"} 2' in text
+    assert 'db_query_duration_seconds_bucket{op="find",le="+Inf"} 2' in text
+    assert 'db_query_duration_seconds_count{op="find"} 2' in text
+    assert text.count("# TYPE db_query_duration_seconds histogram") == 1
+
+    summary = get_metrics_summary()
+    assert summary["histograms"]['db_query_duration_seconds{op="find"}']["count"] == 2
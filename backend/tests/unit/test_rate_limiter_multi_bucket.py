@@ -0,0 +1,135 @@
+"""Multi-bucket rate limit check unit tests (Redis-free).
+
+Covers:
+- All applicable buckets go to Redis in one EVALSHA
+- All-or-nothing: a bucket denial reports its tier and consumes no other bucket
+- Lease mode serves requests from a local lease and never exceeds the global bucket
+- Small tiers are never leased
+- Redis outages raise RateLimiterUnavailable; middleware falls back per bucket
+"""
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from app.infrastructure import rate_limiter as rl
+
+
+class _FakeRedis:
+    """Python model of MULTI_BUCKET_LUA over an in-memory hash store."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.evalsha_calls = 0
+
+    async def script_load(self, script):
+        return "sha-multi" if script == rl.MULTI_BUCKET_LUA else "sha-single"
+
+    async def evalsha(self, sha, numkeys, *rest):
+        self.evalsha_calls += 1
+        keys, args = rest[:numkeys], rest[numkeys:]
+        now = float(args[0])
+        state, denied, retry_after = [], 0, 0
+        for i, key in enumerate(keys):
+            capacity, rate, requested, minimum = (float(a) for a in args[1 + 4 * i:5 + 4 * i])
+            tokens, last = self.buckets.get(key, (capacity, now))
+            refilled = math.floor(max(0, now - last) * rate)
+            tokens = min(capacity, tokens + refilled)
+            if refilled > 0:
+                last = now
+            if not denied and tokens < minimum:
+                denied, retry_after = i + 1, math.ceil((minimum - tokens) / rate * 1000)
+            state.append((key, tokens, last, requested))
+        out = [0 if denied else 1, denied, retry_after]
+        for key, tokens, last, requested in state:
+            granted = 0 if denied else min(tokens, requested)
+            self.buckets[key] = (tokens - granted, last)
+            out += [int(tokens - granted), int(granted)]
+        return out
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _FakeRedis()
+
+    async def _redis():
+        return fake
+
+    monkeypatch.setattr("app.infrastructure.redis_client.get_async_redis", _redis)
+    monkeypatch.setattr(rl, "_multi_lua_sha", None)
+    monkeypatch.setattr(rl, "_leases", {})
+    return fake
+
+
+@pytest.mark.anyio
+async def test_all_buckets_checked_in_one_call(redis):
+    buckets = [("1.2.3.4", "auth_login", None), ("1.2.3.4", "api_global", None), ("org1", "tenant_global", "pro")]
+    result = await rl.check_rate_limits(buckets)
+
+    assert result.allowed and redis.evalsha_calls == 1
+    assert result.remaining == rl.RATE_TIERS["auth_login"]["capacity"] - 1
+    assert redis.buckets["rl:tenant_global:org1"][0] == rl._scaled_config("tenant_global", "pro")["capacity"] - 1
+
+
+@pytest.mark.anyio
+async def test_denial_is_all_or_nothing(redis):
+    login = [("ip", "auth_login", None), ("ip", "api_global", None)]
+    for _ in range(rl.RATE_TIERS["auth_login"]["capacity"]):
+        assert (await rl.check_rate_limits(login)).allowed
+    global_before = redis.buckets["rl:api_global:ip"][0]
+
+    denied = await rl.check_rate_limits(login)
+    assert not denied.allowed
+    assert denied.tier == "auth_login" and denied.remaining == 0
+    assert denied.retry_after_ms > 0
+    assert redis.buckets["rl:api_global:ip"][0] == global_before
+
+
+@pytest.mark.anyio
+async def test_lease_mode_absorbs_bursts_without_exceeding_global(redis, monkeypatch):
+    monkeypatch.setattr(rl, "LEASE_FRACTION", 0.1)
+    bucket = [("ip", "api_global", None)]
+    capacity = rl.RATE_TIERS["api_global"]["capacity"]
+
+    allowed = 0
+    for _ in range(capacity + 50):
+        if (await rl.check_rate_limits(bucket, lease_mode=True)).allowed:
+            allowed += 1
+
+    assert allowed <= capacity
+    assert allowed >= capacity - int(capacity * 0.1)
+    # One Redis call per lease of 20 tokens, not one per request.
+    assert redis.evalsha_calls < capacity // 10 + 60
+
+
+@pytest.mark.anyio
+async def test_small_tiers_are_never_leased(redis):
+    bucket = [("ip", "auth_login", None)]
+    for _ in range(3):
+        await rl.check_rate_limits(bucket, lease_mode=True)
+    assert redis.evalsha_calls == 3
+    assert rl._leases == {}
+
+
+@pytest.mark.anyio
+async def test_outage_raises_and_middleware_falls_back_per_bucket(monkeypatch):
+    from app.middleware.rate_limit_middleware import RateLimitMiddleware
+
+    async def _broken():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr("app.infrastructure.redis_client.get_async_redis", _broken)
+    with pytest.raises(rl.RateLimiterUnavailable):
+        await rl.check_rate_limits([("ip", "api_global", None)])
+
+    checked = []
+
+    async def _mongo(self, key, tier, plan_slug=None):
+        checked.append(tier)
+        return rl.RateLimitResult(allowed=tier != "auth_login", remaining=0, retry_after_ms=1000)
+
+    monkeypatch.setattr(RateLimitMiddleware, "_check_mongo_fallback", _mongo)
+    mw = RateLimitMiddleware(app=None)
+    result = await mw._check_redis_rate_limits([("ip", "auth_login", None), ("ip", "api_global", None)])
+    assert not result.allowed and checked == ["auth_login"]
@@ -0,0 +1,155 @@
+"""Streaming reconciliation engine unit tests (DB-free).
+
+Covers:
+- Batched booking→invoice and invoice→sync-job joins (no per-row lookups)
+- Bulk mismatch writes across several batches
+- Incremental runs resuming from the stored high-water mark
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.accounting import reconciliation_service as recon
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$gte" in cond and (value is None or value < cond["$gte"]):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def __aiter__(self):
+        self._it = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return dict(next(self._it))
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Collection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.find_calls = 0
+        self.insert_many_calls = 0
+
+    def find(self, query, projection=None):
+        self.find_calls += 1
+        return _Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def find_one(self, query, *args, **kwargs):
+        return next((d for d in self.docs if _matches(d, query)), None)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        self.insert_many_calls += 1
+        self.docs.extend(docs)
+
+    async def update_one(self, flt, update, upsert=False):
+        doc = await self.find_one(flt)
+        if doc is None and upsert:
+            doc = dict(flt)
+            self.docs.append(doc)
+        if doc is not None:
+            doc.update(update.get("$set", {}))
+
+    def aggregate(self, pipeline, **kwargs):
+        return _Cursor([])
+
+
+class _DB:
+    def __init__(self, **collections):
+        self._cols = collections
+
+    def __getattr__(self, name):
+        return self[name]
+
+    def __getitem__(self, name):
+        return self._cols.setdefault(name, _Collection())
+
+
+@pytest.fixture
+def db(monkeypatch):
+    now = datetime.now(timezone.utc)
+    bookings = [
+        {"_id": f"b{i}", "organization_id": "t1", "status": "confirmed", "total_price": 100, "created_at": now}
+        for i in range(7)
+    ]
+    invoices = [
+        {"invoice_id": "inv1", "booking_id": "b0", "tenant_id": "t1", "status": "issued", "grand_total": 100, "created_at": now},
+        {"invoice_id": "inv2", "booking_id": "b1", "tenant_id": "t1", "status": "synced", "grand_total": 250, "created_at": now},
+    ]
+    sync_jobs = [{"invoice_id": "inv2", "tenant_id": "t1", "status": "synced", "created_at": now}]
+    fake = _DB(
+        bookings=_Collection(bookings),
+        invoices=_Collection(invoices),
+        accounting_sync_jobs=_Collection(sync_jobs),
+    )
+
+    async def _get_db():
+        return fake
+
+    async def _noop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(recon, "get_db", _get_db)
+    monkeypatch.setattr(recon, "_generate_ops_items", _noop)
+    monkeypatch.setattr(recon, "_generate_alerts", _noop)
+    monkeypatch.setattr(recon, "JOIN_BATCH_SIZE", 3)
+    monkeypatch.setattr(recon, "ITEM_WRITE_BATCH", 2)
+    return fake
+
+
+@pytest.mark.anyio
+async def test_run_streams_batches_and_writes_items_in_bulk(db):
+    result = await recon.run_reconciliation("t1", run_type=recon.RUN_FULL)
+
+    assert result["status"] == "completed"
+    stats = result["stats"]
+    # b2..b6 have no invoice, b1 differs in amount, inv1 has no sync job.
+    assert stats["by_type"] == {
+        recon.MISMATCH_MISSING_INVOICE: 5,
+        recon.MISMATCH_AMOUNT: 1,
+        recon.MISMATCH_MISSING_SYNC: 1,
+    }
+    assert result["mismatch_count"] == 7
+    # 7 bookings in batches of 3 → 3 invoice lookups (not 7).
+    assert db.invoices.find_calls == 3 + 1
+    assert db.reconciliation_items.insert_many_calls == 4
+    assert db.reconciliation_state.docs[0]["tenant_id"] == "t1"
+
+
+@pytest.mark.anyio
+async def test_incremental_run_resumes_from_high_water_mark(db):
+    future = datetime.now(timezone.utc) + timedelta(hours=1)
+    db.reconciliation_state.docs.append({"tenant_id": "t1", "high_water_mark": future})
+
+    result = await recon.run_reconciliation("t1", run_type=recon.RUN_INCREMENTAL, lookback_hours=2)
+
+    assert result["mismatch_count"] == 0
+    run = db.reconciliation_runs.docs[0]
+    assert run["since"] == future - recon.HWM_OVERLAP
+    assert db.reconciliation_state.docs[0]["high_water_mark"] < future
@@ -0,0 +1,213 @@
+"""Revenue daily cube unit tests (DB-free).
+
+Covers:
+- Booking and search events fold into one cell per day × dimension set
+- Supplier / agency / GMV / destination analytics answer from the cube
+- Forecast history buckets cube days into six 30-day windows
+- Rebuild replaces cells from source rows and drops stale ones
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.suppliers import revenue_analytics, revenue_cube, revenue_forecasting
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        value = doc.get(field)
+        if isinstance(cond, dict):
+            for op, arg in cond.items():
+                if op == "$gte" and not (value is not None and value >= arg):
+                    return False
+                if op == "$lt" and not (value is not None and value < arg):
+                    return False
+                if op == "$gt" and not (value is not None and value > arg):
+                    return False
+                if op == "$ne" and value == arg:
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _DeleteResult:
+    def __init__(self, n):
+        self.deleted_count = n
+
+
+class _Cube:
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            doc = self.docs[query["_id"]] = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+        doc.update(update.get("$set", {}))
+        for k, v in update.get("$inc", {}).items():
+            doc[k] = doc.get(k, 0) + v
+        for k, v in update.get("$min", {}).items():
+            doc[k] = v if doc.get(k) is None else min(doc[k], v)
+        for k, v in update.get("$max", {}).items():
+            doc[k] = v if doc.get(k) is None else max(doc[k], v)
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            self.docs[op._filter["_id"]] = {"_id": op._filter["_id"], **op._doc}
+
+    async def delete_many(self, query):
+        stale = [k for k, d in self.docs.items() if _matches(d, query)]
+        for k in stale:
+            del self.docs[k]
+        return _DeleteResult(len(stale))
+
+    def aggregate(self, pipeline, **kwargs):
+        match, group = pipeline[0]["$match"], pipeline[1]["$group"]
+        out = {}
+        for doc in self.docs.values():
+            if not _matches(doc, match):
+                continue
+            key_spec = group["_id"]
+            key = {k: doc.get(v[1:]) for k, v in key_spec.items()} if key_spec else None
+            row = out.setdefault(repr(key), {"_id": key})
+            for name, acc in group.items():
+                if name == "_id":
+                    continue
+                (op, src), = acc.items()
+                value = doc.get(src[1:])
+                if op == "$sum":
+                    row[name] = row.get(name, 0) + (value or 0)
+                elif value is not None:
+                    pick = min if op == "$min" else max
+                    row[name] = value if row.get(name) is None else pick(row[name], value)
+        return _Cursor(list(out.values()))
+
+
+class _Source:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def aggregate(self, pipeline, **kwargs):
+        return _Cursor(self.rows)
+
+
+class _DB(dict):
+    def __init__(self):
+        super().__init__()
+        self[revenue_cube.CUBE_COLLECTION] = _Cube()
+
+    @property
+    def cube(self):
+        return self[revenue_cube.CUBE_COLLECTION]
+
+
+def _booking(org, supplier, price, *, days_ago=0, destination="Antalya", fallback=False, markup=10.0):
+    created = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {
+        "organization_id": org,
+        "supplier_code": supplier,
+        "product_type": "hotel",
+        "destination": destination,
+        "status": "confirmed",
+        "confirmed_price": price,
+        "sell_price": price + markup,
+        "platform_markup": markup,
+        "currency": "TRY",
+        "fallback_used": fallback,
+        "created_at": created.isoformat(),
+    }
+
+
+@pytest.mark.anyio
+async def test_events_fold_into_cells_and_analytics_read_the_cube():
+    db = _DB()
+    await revenue_cube.record_booking(db, _booking("org1", "ratehawk", 100.0))
+    await revenue_cube.record_booking(db, _booking("org1", "ratehawk", 300.0, fallback=True))
+    await revenue_cube.record_booking(db, _booking("org2", "paximum", 600.0, destination="Bodrum"))
+    for _ in range(3):
+        await revenue_cube.record_search(db, "org1", "hotel", "Antalya")
+
+    # org1/ratehawk/Antalya bookings share one cell; searches get their own.
+    assert len(db.cube.docs) == 3
+    cell = next(d for d in db.cube.docs.values() if d["supplier_code"] == "ratehawk")
+    assert (cell["bookings"], cell["gmv"], cell["min_price"], cell["max_price"]) == (2, 400.0, 100.0, 300.0)
+
+    suppliers = await revenue_analytics.get_supplier_revenue_analytics(db, days=30)
+    assert [s["supplier_code"] for s in suppliers] == ["paximum", "ratehawk"]
+    ratehawk = suppliers[1]
+    assert ratehawk["total_bookings"] == 2 and ratehawk["avg_booking_value"] == 200.0
+    assert ratehawk["fallback_count"] == 1 and ratehawk["currencies"] == ["TRY"]
+    assert ratehawk["revenue_share_pct"] == 40.0
+
+    agencies = await revenue_analytics.get_agency_revenue_analytics(db, days=30)
+    assert agencies[0]["organization_id"] == "org2"
+    assert agencies[1]["preferred_suppliers"] == [{"supplier": "ratehawk", "count": 2}]
+
+    gmv = await revenue_analytics.get_gmv_summary(db, days=30)
+    assert gmv["gmv"] == 1000.0 and gmv["total_bookings"] == 3
+    assert gmv["platform_revenue"] == 30.0
+    assert (gmv["min_booking"], gmv["max_booking"]) == (100.0, 600.0)
+    assert (gmv["unique_agencies"], gmv["unique_suppliers"]) == (2, 2)
+
+    destinations = await revenue_analytics.get_destination_revenue(db, days=30)
+    assert destinations[0] == {"destination": "Antalya", "search_count": 3, "bookings": 2, "revenue": 400.0}
+
+
+@pytest.mark.anyio
+async def test_window_excludes_old_days_and_forecast_buckets_months():
+    db = _DB()
+    await revenue_cube.record_booking(db, _booking("org1", "ratehawk", 100.0))
+    await revenue_cube.record_booking(db, _booking("org1", "ratehawk", 200.0, days_ago=45))
+    await revenue_cube.record_booking(db, _booking("org1", "ratehawk", 400.0, days_ago=170))
+
+    gmv = await revenue_analytics.get_gmv_summary(db, days=30)
+    assert gmv["gmv"] == 100.0
+
+    forecast = await revenue_forecasting.get_revenue_forecast(db, forecast_months=2, refresh=True)
+    history = {m["month_offset"]: (m["revenue"], m["bookings"]) for m in forecast["historical"]}
+    assert history == {-6: (400.0, 1), -5: (0, 0), -4: (0, 0), -3: (0, 0), -2: (200.0, 1), -1: (100.0, 1)}
+    assert forecast["agency_trends"][0]["revenue_prev"] == 200.0
+    assert forecast["supplier_projections"][0]["revenue_30d"] == 100.0
+
+
+@pytest.mark.anyio
+async def test_rebuild_replaces_cells_and_drops_stale():
+    db = _DB()
+    today = datetime.now(timezone.utc).date().isoformat()
+    await revenue_cube.record_booking(db, _booking("org1", "ghost", 50.0))
+    db.cube.docs[next(iter(db.cube.docs))]["updated_at"] = datetime.now(timezone.utc) - timedelta(hours=1)
+
+    dims = {"day": today, "organization_id": "org1", "supplier_code": "ratehawk",
+            "destination": "Antalya", "product_type": "hotel", "currency": "TRY"}
+    db["unified_bookings"] = _Source([{"_id": dims, "bookings": 2, "confirmed": 2, "gmv": 300.0,
+                                       "markup": 20.0, "min_price": 100.0, "max_price": 200.0}])
+    db["search_analytics"] = _Source([{"_id": {**dims, "supplier_code": "", "currency": ""}, "searches": 4}])
+
+    result = await revenue_cube.rebuild_cube(db, since=today)
+    assert result["cells_written"] == 2 and result["cells_deleted"] == 1
+
+    cell = db.cube.docs[revenue_cube.cell_id(dims)]
+    assert (cell["bookings"], cell["gmv"], cell["searches"], cell["max_price"]) == (2, 300.0, 0, 200.0)
+    destinations = await revenue_analytics.get_destination_revenue(db, days=0)
+    assert destinations == [{"destination": "Antalya", "search_count": 4, "bookings": 2, "revenue": 300.0}]
@@ -0,0 +1,299 @@
+"""Room-night occupancy ledger unit tests (DB-free).
+
+Covers:
+- Rebuild from bookings/blocks and per-night min-reduce for a stay
+- Idempotent re-apply on booking state changes (room move, cancellation)
+- compute_availability reading the ledger instead of scanning bookings
+- Lifecycle events refresh the ledger; the booking event writer does not need to
+- Periodic reconcile picks up direct booking writes and room block changes
+- A ledger that missed its reconcile passes is not trusted
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from app.services import hotel_availability
+from app.services import room_night_occupancy as ledger
+
+ORG = "org1"
+HOTEL = "h1"
+
+
+def _get(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, q) for q in cond):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$gte" in cond and (value is None or value < cond["$gte"]):
+                return False
+            if "$lt" in cond and (value is None or value >= cond["$lt"]):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _apply(doc, update):
+    for path, value in update.get("$set", {}).items():
+        *parents, leaf = path.split(".")
+        target = doc
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    for path in update.get("$unset", {}):
+        *parents, leaf = path.split(".")
+        target = doc
+        for part in parents:
+            target = target.get(part, {})
+        target.pop(leaf, None)
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    async def to_list(self, n=None):
+        return self._docs
+
+    def __aiter__(self):
+        self._it = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Collection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.find_calls = 0
+
+    def find(self, query, projection=None):
+        self.find_calls += 1
+        return _Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((d for d in self.docs if _matches(d, query)), None)
+
+    async def count_documents(self, query):
+        raise AssertionError("ledger path must not count bookings")
+
+    async def insert_many(self, docs, ordered=True):
+        self.docs.extend(docs)
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+
+    async def delete_one(self, query):
+        doc = await self.find_one(query)
+        if doc is not None:
+            self.docs.remove(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = await self.find_one(query)
+        if doc is None and upsert:
+            doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            doc.update(update.get("$setOnInsert", {}))
+            self.docs.append(doc)
+        if doc is not None:
+            _apply(doc, update)
+
+    async def update_many(self, query, update):
+        for doc in [d for d in self.docs if _matches(d, query)]:
+            _apply(doc, update)
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+
+class _DB:
+    def __init__(self, **collections):
+        self._cols = collections
+
+    def __getattr__(self, name):
+        return self[name]
+
+    def __getitem__(self, name):
+        return self._cols.setdefault(name, _Collection())
+
+
+def _booking(bid, room_id, check_in, check_out, status="confirmed", channel=None, rate_type=None):
+    doc = {
+        "_id": bid, "organization_id": ORG, "hotel_id": HOTEL, "room_id": room_id, "status": status,
+        "stay": {"check_in": check_in, "check_out": check_out},
+    }
+    if channel:
+        doc["channel"] = channel
+        doc["rate_snapshot"] = {"room_type_id": f"rt_{rate_type}"}
+    return doc
+
+
+@pytest.fixture
+def db(monkeypatch):
+    rooms = [
+        {"_id": f"r{i}", "tenant_id": HOTEL, "organization_id": ORG, "active": True,
+         "room_type": "standard", "base_price": 100}
+        for i in range(1, 4)
+    ]
+    fake = _DB(
+        hotels=_Collection([{"_id": HOTEL, "organization_id": ORG}]),
+        rooms=_Collection(rooms),
+        bookings=_Collection([
+            # r1 night 1, r2 night 2: never more than one room taken per night.
+            _booking("b1", "r1", "2026-05-01", "2026-05-02"),
+            _booking("b2", "r2", "2026-05-02", "2026-05-03", channel="agency_extranet", rate_type="standard"),
+            _booking("b3", "r3", "2026-05-01", "2026-05-03", status="cancelled"),
+        ]),
+        room_blocks=_Collection([
+            {"_id": "k1", "tenant_id": HOTEL, "organization_id": ORG, "room_id": "r3",
+             "status": "active", "type": "maintenance", "start_date": "2026-05-02", "end_date": "2026-05-03"},
+        ]),
+    )
+
+    async def _get_db():
+        return fake
+
+    monkeypatch.setattr(hotel_availability, "get_db", _get_db)
+    return fake
+
+
+@pytest.mark.anyio
+async def test_rebuild_and_read_stay_reduce_per_night(db):
+    summary = await ledger.rebuild_hotel(db, ORG, HOTEL)
+    assert summary["bookings"] == 2 and summary["blocks"] == 1
+
+    stay = await ledger.read_stay(db, ORG, HOTEL, "2026-05-01", "2026-05-03")
+    standard = stay["standard"]
+    assert standard["occupied"] == {"r1", "r2"}
+    assert standard["blocked"] == {"r3"}
+    # Night 2 has r2 booked + r3 blocked.
+    assert standard["max_unavailable"] == 2
+    assert standard["max_channel_sold"]["agency_extranet"] == 1
+
+
+@pytest.mark.anyio
+async def test_apply_booking_is_idempotent_across_state_changes(db):
+    await ledger.rebuild_hotel(db, ORG, HOTEL)
+    b1 = db.bookings.docs[0]
+
+    b1["room_id"] = "r2"
+    assert await ledger.apply_booking(db, b1) == 1
+    assert await ledger.apply_booking(db, b1) == 1
+    night1 = await ledger.read_stay(db, ORG, HOTEL, "2026-05-01", "2026-05-02")
+    assert night1["standard"]["occupied"] == {"r2"}
+
+    b1["status"] = "cancelled"
+    assert await ledger.apply_booking(db, b1) == 0
+    night1 = await ledger.read_stay(db, ORG, HOTEL, "2026-05-01", "2026-05-02")
+    assert night1["standard"]["occupied"] == set()
+    assert await db.room_night_occupancy_sources.find_one({"_id": "booking:b1"}) is None
+
+
+@pytest.mark.anyio
+async def test_compute_availability_uses_ledger_when_built(db):
+    legacy = await hotel_availability.compute_availability(HOTEL, "2026-05-01", "2026-05-03", ORG)
+    # Legacy path unions rooms over the whole stay: r1, r2 and r3 all count.
+    assert legacy["standard"]["available_rooms"] == 0
+
+    await ledger.rebuild_hotel(db, ORG, HOTEL)
+    db.bookings.find_calls = 0
+    result = await hotel_availability.compute_availability(HOTEL, "2026-05-01", "2026-05-03", ORG)
+
+    assert db.bookings.find_calls == 0
+    standard = result["standard"]
+    assert standard["total_rooms"] == 3
+    assert standard["available_rooms"] == 1
+    assert sorted(standard["occupied_room_ids"]) == ["r1", "r2"]
+    assert standard["blocked_room_ids"] == ["r3"]
+
+
+@pytest.mark.anyio
+async def test_channel_allocation_reads_sold_count_from_ledger(db):
+    await ledger.rebuild_hotel(db, ORG, HOTEL)
+    db.channel_allocations.docs.append({
+        "tenant_id": HOTEL, "organization_id": ORG, "channel": "agency_extranet", "is_active": True,
+        "room_type": "standard", "start_date": "2026-05-01", "end_date": "2026-05-31", "allotment": 1,
+    })
+
+    result = await hotel_availability.compute_availability(HOTEL, "2026-05-01", "2026-05-03", ORG)
+
+    assert result["standard"]["allocation_limit"] == 1
+    assert result["standard"]["available_rooms"] == 0
+
+
+@pytest.mark.anyio
+async def test_lifecycle_hook_refreshes_ledger(db):
+    from bson import ObjectId
+
+    from app.services.booking_lifecycle import BookingLifecycleService
+
+    await ledger.rebuild_hotel(db, ORG, HOTEL)
+    oid = ObjectId()
+    db.bookings.docs.append(_booking(oid, "r3", "2026-05-01", "2026-05-02"))
+
+    await BookingLifecycleService(db).run_hooks(organization_id=ORG, booking_id=str(oid), event="BOOKING_CONFIRMED")
+    night1 = await ledger.read_stay(db, ORG, HOTEL, "2026-05-01", "2026-05-02")
+    assert night1["standard"]["occupied"] == {"r1", "r3"}
+
+
+@pytest.mark.anyio
+async def test_reconcile_applies_direct_writes_and_blocks(db):
+    await ledger.rebuild_hotel(db, ORG, HOTEL)
+
+    # Writers outside the lifecycle/outbox path (ops cancel, supplier state ...).
+    b1 = db.bookings.docs[0]
+    b1.update(status="CANCELLED", updated_at=ledger.now_utc())
+    db.room_blocks.docs = [{"_id": "k2", "tenant_id": HOTEL, "organization_id": ORG, "room_id": "r1",
+                            "status": "active", "type": "out_of_order",
+                            "start_date": "2026-05-01", "end_date": "2026-05-02"}]
+
+    summary = await ledger.reconcile_hotel(db, ORG, HOTEL)
+    assert summary == {"bookings": 1, "blocks": 2}  # k2 added, k1 removed
+    stay = await ledger.read_stay(db, ORG, HOTEL, "2026-05-01", "2026-05-03")
+    assert stay["standard"]["occupied"] == {"r2"}
+    assert stay["standard"]["blocked"] == {"r1"}
+
+    # Nothing changed since: bookings outside the overlap window and blocks are skipped.
+    state = await db.room_night_occupancy_state.find_one({"_id": f"{ORG}:{HOTEL}"})
+    state["reconciled_at"] -= timedelta(hours=1)
+    b1["updated_at"] -= timedelta(hours=2)
+    assert await ledger.reconcile_hotel(db, ORG, HOTEL) == {"bookings": 0, "blocks": 0}
+    assert (await ledger.reconcile_all(db))["hotels"] == 1
+    assert await ledger.reconcile_hotel(db, ORG, "no-ledger") is None
+
+
+@pytest.mark.anyio
+async def test_stale_ledger_falls_back_to_sources(db):
+    await ledger.rebuild_hotel(db, ORG, HOTEL)
+    state = await db.room_night_occupancy_state.find_one({"_id": f"{ORG}:{HOTEL}"})
+    lag = timedelta(seconds=ledger.LEDGER_MAX_LAG_SECONDS + 60)
+    state["built_at"] -= lag
+    state["reconciled_at"] -= lag
+
+    assert await ledger.ledger_horizon(db, ORG, HOTEL) is None
+    assert await ledger.ledger_horizon(db, ORG, HOTEL, fresh_only=False) == state["horizon_end"]
+    db.bookings.find_calls = 0
+    await hotel_availability.compute_availability(HOTEL, "2026-05-01", "2026-05-03", ORG)
+    assert db.bookings.find_calls > 0
+
+    await ledger.reconcile_all(db)
+    assert await ledger.ledger_horizon(db, ORG, HOTEL) == state["horizon_end"]
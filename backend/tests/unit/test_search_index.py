@@ -0,0 +1,154 @@
+"""Search token index unit tests (DB-free).
+
+Covers:
+- Turkish-aware folding (İ/I/ı/ş/ğ ...) on both sides
+- Edge-prefix token generation incl. nested contacts and phone variants
+- Filter shape with the legacy fallback for untokenized documents
+- Relevance ranking
+- Hotel writers (admin create, portfolio sheet rename) keep tokens current
+- Booking writers (sheet reservation import) write tokens on insert and update
+"""
+from __future__ import annotations
+
+import pytest
+
+from app.services.search_index import (
+    SEARCH_TOKENS_FIELD,
+    apply_search,
+    build_search_tokens,
+    fold_text,
+    query_terms,
+    rank_by_relevance,
+    search_filter,
+)
+
+
+def test_fold_text_handles_turkish_letters():
+    assert fold_text("İSTANBUL Işıklı Şeker Ağaç Ünlü Göl Çay") == "istanbul isikli seker agac unlu gol cay"
+
+
+def test_tokens_cover_prefixes_contacts_and_phone_variants():
+    doc = {
+        "name": "Ayşe Yılmaz",
+        "contacts": [
+            {"type": "email", "value": "ayse@example.com"},
+            {"type": "phone", "value": "905321234567"},
+        ],
+    }
+    tokens = set(build_search_tokens(doc, "customers"))
+
+    assert {"ay", "ayse", "yi", "yilmaz", "example"} <= tokens
+    assert "a" not in tokens
+    assert "5321234567" in tokens
+    assert "532" in tokens
+
+
+def test_query_terms_match_document_tokens_regardless_of_case_and_accents():
+    tokens = set(build_search_tokens({"name": "Şükrü Öztürk"}, "customers"))
+    terms = query_terms("SUKRU ÖZT")
+    assert terms == ["sukru", "ozt"]
+    assert set(terms) <= tokens
+
+
+def test_search_filter_keeps_regex_fallback_for_untokenized_docs():
+    flt = search_filter("ali veli", "customers")
+    token_branch, legacy_branch = flt["$or"]
+    assert token_branch == {SEARCH_TOKENS_FIELD: {"$all": ["ali", "veli"]}}
+    assert legacy_branch[SEARCH_TOKENS_FIELD] == {"$exists": False}
+    assert {"name": {"$regex": "ali\\ veli", "$options": "i"}} in legacy_branch["$or"]
+
+    assert search_filter("   ", "customers") is None
+    assert "$or" in search_filter("a", "customers")
+
+
+def test_apply_search_does_not_clobber_existing_or():
+    base = {"organization_id": "o1", "$or": [{"state": "x"}, {"status": "x"}]}
+    combined = apply_search(base, "pnr123", "bookings")
+    assert combined["$and"][0] is base
+
+
+def test_rank_by_relevance_prefers_exact_primary_field_match():
+    docs = [
+        {"name": "Otel Antalya Palace", "city": "Antalya"},
+        {"name": "Antalya", "city": "Antalya"},
+        {"name": "Kemer Resort", "city": "Antalya"},
+    ]
+    ranked = rank_by_relevance(docs, "antalya", "hotels")
+    assert ranked[0]["name"] == "Antalya"
+    assert ranked[-1]["name"] == "Kemer Resort"
+
+
+class _Hotels:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if d["_id"] == query["_id"]), None)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        for doc in self.docs:
+            if doc["_id"] == query.get("_id"):
+                doc.update(update["$set"])
+
+
+class _DB:
+    def __init__(self, hotels):
+        self.hotels = _Hotels(hotels)
+        self.hotel_inventory_snapshots = _Hotels([])
+
+
+@pytest.mark.anyio
+async def test_portfolio_rename_refreshes_hotel_tokens():
+    from app.services.hotel_portfolio_sync_service import upsert_inventory_rows
+
+    hotel = {"_id": "h1", "name": "Eski Otel", "city": "Muğla", "country": "TR"}
+    hotel[SEARCH_TOKENS_FIELD] = build_search_tokens(hotel, "hotels")
+    db = _DB([hotel])
+
+    upserts, errors, _ = await upsert_inventory_rows(db, "t1", "h1", [{"hotel_name": "Yeni Saray"}])
+    assert (upserts, errors) == (1, 0)
+    tokens = set(hotel[SEARCH_TOKENS_FIELD])
+    assert {"yeni", "saray", "mugla"} <= tokens and "eski" not in tokens
+
+
+@pytest.mark.anyio
+async def test_admin_create_hotel_writes_tokens(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.modules.system.routers import admin
+
+    db = _DB([])
+
+    async def _get_db():
+        return db
+
+    monkeypatch.setattr(admin, "get_db", _get_db)
+    payload = SimpleNamespace(model_dump=lambda: {"name": "Işık Otel", "city": "İzmir", "country": "TR"})
+    await admin.create_hotel(payload, user={"organization_id": "org1", "email": "a@example.com"})
+    assert {"isik", "izmir"} <= set(db.hotels.docs[0][SEARCH_TOKENS_FIELD])
+
+
+@pytest.mark.anyio
+async def test_sheet_reservation_import_writes_booking_tokens():
+    from types import SimpleNamespace
+
+    from app.services.google_sheet_schema_service import get_reservation_writeback_headers
+    from app.services.sheet_reservation_import_service import import_sheet_reservations
+
+    db = SimpleNamespace(bookings=_Hotels([]), sheet_row_fingerprints=_Hotels([]))
+    headers = get_reservation_writeback_headers()
+    values = {
+        "Kayit Tipi": "sheet_reservation",
+        "Kayit ID": "R-42",
+        "Misafir Ad Soyad": "Ayşe Yılmaz",
+        "Giris Tarihi": "2026-07-01",
+        "Cikis Tarihi": "2026-07-03",
+    }
+    connection = {"_id": "c1", "tenant_id": "t1", "hotel_id": "h1", "organization_id": "org1", "hotel_name": "Deniz Otel"}
+
+    summary = await import_sheet_reservations(db, connection, headers=headers, rows=[[values.get(h, "") for h in headers]])
+    assert summary["created"] == 1
+    assert {"ayse", "yilmaz", "r", "42", "deniz"} <= set(db.bookings.docs[0][SEARCH_TOKENS_FIELD])
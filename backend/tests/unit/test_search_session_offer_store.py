@@ -0,0 +1,185 @@
+"""Search-session offer store unit tests (DB- and Redis-free).
+
+Covers:
+- Blob codec round-trips with and without msgpack/zstd
+- Sessions keep only metadata in MongoDB; offers/overlays come from Redis per token
+- Fallback to the single-document layout when Redis is unavailable
+- Expired Redis offers make the session look expired
+- Redis read errors degrade to "not found" instead of raising
+"""
+from __future__ import annotations
+
+import pytest
+
+from app.services.offers import offer_store
+from app.services.offers import search_session_service as sss
+
+ORG = "org1"
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def hset(self, key, mapping):
+        self._ops.append(lambda: self._redis.hashes.setdefault(key, {}).update(
+            {k.encode(): v for k, v in mapping.items()}
+        ))
+
+    def expireat(self, key, when):
+        self._ops.append(lambda: self._redis.expiry.__setitem__(key, when))
+
+    async def execute(self):
+        for op in self._ops:
+            op()
+
+
+class _BinaryRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.expiry = {}
+        self.hget_calls = 0
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    async def hget(self, key, field):
+        self.hget_calls += 1
+        return self.hashes.get(key, {}).get(field.encode())
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+
+class _Sessions:
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if all(doc.get(k) == v for k, v in query.items()):
+                if projection:
+                    return {k: v for k, v in doc.items() if k in projection or k == "_id"}
+                return dict(doc)
+        return None
+
+
+class _DB:
+    def __init__(self):
+        self.search_sessions = _Sessions()
+
+
+def _offers(n):
+    return [
+        {
+            "offer_token": f"tok{i}", "supplier_code": "mock", "supplier_offer_id": f"s{i}",
+            "hotel": {"name": f"Otel {i}", "city": "Antalya"}, "price": {"amount": 100.0 + i, "currency": "EUR"},
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _BinaryRedis()
+
+    async def _redis():
+        return fake
+
+    monkeypatch.setattr(offer_store, "_redis", _redis)
+    monkeypatch.delenv("SEARCH_SESSION_OFFER_STORE", raising=False)
+    return fake
+
+
+@pytest.mark.parametrize("has_msgpack", [True, False])
+def test_codec_round_trip_with_and_without_optional_wheels(monkeypatch, has_msgpack):
+    if not has_msgpack:
+        monkeypatch.setattr(offer_store, "msgpack", None)
+    monkeypatch.setattr(offer_store, "zstandard", None)
+
+    big = {"items": _offers(50)}
+    blob = offer_store.encode(big)
+    assert blob[1:2] == b"d"  # compressed (zlib fallback)
+    assert offer_store.decode(blob) == big
+
+    small = offer_store.encode({"a": 1})
+    assert small[1:2] == b"n"
+    assert offer_store.decode(small) == {"a": 1}
+
+
+@pytest.mark.anyio
+async def test_session_keeps_only_metadata_in_mongo(redis):
+    db = _DB()
+    offers = _offers(5)
+    overlay = {"tok3": {"final_amount": 120.0, "currency": "EUR"}}
+
+    session = await sss.create_search_session(
+        db, organization_id=ORG, tenant_id="t1", query={"destination": "AYT"},
+        offers=offers, pricing_overlay_index=overlay,
+    )
+    sid = session["session_id"]
+
+    meta = db.search_sessions.docs[0]
+    assert meta["offer_store"] == "redis" and meta["offer_count"] == 5
+    assert "offers" not in meta and "pricing_overlay_index" not in meta
+    assert redis.expiry[offer_store.session_key(sid)] == session["expires_at"]
+
+    found = await sss.find_offer_in_session(db, organization_id=ORG, session_id=sid, offer_token="tok2")
+    assert found == offers[2]
+    assert redis.hget_calls == 1
+    assert await sss.find_offer_in_session(db, organization_id=ORG, session_id=sid, offer_token="nope") is None
+    assert await sss.find_offer_in_session(db, organization_id="other", session_id=sid, offer_token="tok2") is None
+
+    full = await sss.get_search_session(db, organization_id=ORG, session_id=sid)
+    assert [o["offer_token"] for o in full["offers"]] == [o["offer_token"] for o in offers]
+    assert full["pricing_overlay_index"] == overlay
+    assert await sss.get_offer_overlay(db, organization_id=ORG, session_id=sid, offer_token="tok3") == overlay["tok3"]
+
+    # Offers expired from Redis: the session is gone too.
+    redis.hashes.clear()
+    assert await sss.get_search_session(db, organization_id=ORG, session_id=sid) is None
+
+
+@pytest.mark.anyio
+async def test_falls_back_to_single_document_without_redis(monkeypatch):
+    async def _no_redis():
+        return None
+
+    monkeypatch.setattr(offer_store, "_redis", _no_redis)
+    db = _DB()
+    offers = _offers(3)
+
+    session = await sss.create_search_session(
+        db, organization_id=ORG, tenant_id=None, query={}, offers=offers,
+        pricing_overlay_index={"tok1": {"final_amount": 1.0}},
+    )
+    sid = session["session_id"]
+
+    meta = db.search_sessions.docs[0]
+    assert meta["offer_store"] == "mongo" and len(meta["offers"]) == 3
+    assert await sss.find_offer_in_session(db, organization_id=ORG, session_id=sid, offer_token="tok1") == offers[1]
+    assert await sss.get_offer_overlay(db, organization_id=ORG, session_id=sid, offer_token="tok1") == {"final_amount": 1.0}
+
+
+@pytest.mark.anyio
+async def test_redis_read_errors_return_empty(redis, monkeypatch):
+    await offer_store.put_offers("s1", _offers(2), expires_at=None, pricing_overlay_index={"tok0": {"a": 1}})
+
+    async def _down(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(redis, "hget", _down)
+    monkeypatch.setattr(redis, "hgetall", _down)
+    assert await offer_store.get_offer("s1", "tok0") is None
+    assert await offer_store.get_overlay("s1", "tok0") is None
+    assert await offer_store.get_all("s1") is None
@@ -0,0 +1,83 @@
+"""Sheet sync batched delta engine unit tests (DB-free).
+
+Covers:
+- In-memory fingerprint diff (changed / unchanged / deleted rows)
+- Deletion detection scoped to the connection's sheet + worksheet
+- Hotel upserts merged per (name, city) and written via bulk_write
+"""
+from __future__ import annotations
+
+import pytest
+
+from app.services.sheet_sync_service import (
+    diff_fingerprints,
+    fingerprint_row,
+    make_row_key,
+    upsert_hotels_bulk,
+)
+
+
+def _row(num: int, name: str, city: str = "Antalya", **extra):
+    return {"_row_number": num, "name": name, "city": city, **extra}
+
+
+def test_diff_skips_unchanged_and_detects_changes():
+    unchanged = _row(2, "Otel A")
+    modified = _row(3, "Otel B", price="100")
+    existing = {
+        make_row_key("s1", "Sheet1", 2): fingerprint_row(unchanged),
+        make_row_key("s1", "Sheet1", 3): fingerprint_row(_row(3, "Otel B", price="90")),
+    }
+    new_row = _row(4, "Otel C")
+
+    changed, new_fps, deleted = diff_fingerprints(existing, "s1", "Sheet1", [unchanged, modified, new_row])
+
+    assert [r["_row_number"] for r in changed] == [3, 4]
+    assert set(new_fps) == {make_row_key("s1", "Sheet1", 3), make_row_key("s1", "Sheet1", 4)}
+    assert deleted == []
+
+
+def test_diff_detects_deleted_rows_only_for_same_worksheet():
+    existing = {
+        make_row_key("s1", "Sheet1", 2): "fp-a",
+        make_row_key("s1", "Sheet1", 9): "fp-removed",
+        make_row_key("s1", "Other", 9): "fp-other-tab",
+    }
+    _, _, deleted = diff_fingerprints(existing, "s1", "Sheet1", [_row(2, "Otel A")])
+    assert deleted == [make_row_key("s1", "Sheet1", 9)]
+
+
+class _FakeHotels:
+    def __init__(self):
+        self.calls = []
+
+    async def bulk_write(self, ops, ordered=True):
+        self.calls.append(ops)
+
+
+class _FakeDB:
+    def __init__(self):
+        self.hotels = _FakeHotels()
+
+
+@pytest.mark.anyio
+async def test_upsert_hotels_bulk_merges_duplicates_and_reports_missing_fields():
+    db = _FakeDB()
+    rows = [
+        _row(2, "Otel A", price="100"),
+        _row(3, "Otel A", stars="5"),
+        _row(4, "", city="Izmir"),
+        _row(5, "Otel B"),
+    ]
+
+    upserts, err_count, errors = await upsert_hotels_bulk(db, "org_1", rows)
+
+    assert upserts == 3
+    assert err_count == 1
+    assert errors[0]["row_number"] == 4
+    assert len(db.hotels.calls) == 1
+    ops = db.hotels.calls[0]
+    assert len(ops) == 2
+    first_update = ops[0]._doc["$set"]
+    assert first_update["base_price"] == 100.0
+    assert first_update["stars"] == 5
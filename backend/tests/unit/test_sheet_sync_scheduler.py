@@ -0,0 +1,50 @@
+"""Sheet sync scheduler unit tests (DB-free).
+
+Covers:
+- Staleness ordering of tenants/connections
+- LocalTokenBucket pacing and drain behaviour
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.infrastructure.rate_limiter import LocalTokenBucket
+from app.services.sheet_sync_scheduler import order_by_staleness
+
+
+def test_order_by_staleness_groups_per_tenant_and_puts_never_synced_first():
+    now = datetime.now(timezone.utc)
+    conns = [
+        {"_id": "a1", "tenant_id": "t_a", "last_sync_at": now - timedelta(minutes=1)},
+        {"_id": "b1", "tenant_id": "t_b", "last_sync_at": now - timedelta(minutes=30)},
+        {"_id": "a2", "tenant_id": "t_a", "last_sync_at": None},
+        {"_id": "c1", "tenant_id": "t_c", "last_sync_at": now - timedelta(minutes=10)},
+    ]
+
+    ordered = order_by_staleness(conns)
+
+    assert [tenant for tenant, _ in ordered] == ["t_a", "t_b", "t_c"]
+    assert [c["_id"] for c in ordered[0][1]] == ["a2", "a1"]
+
+
+def test_local_token_bucket_try_acquire_respects_capacity():
+    bucket = LocalTokenBucket(capacity=2, refill_rate=0.001)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+@pytest.mark.anyio
+async def test_local_token_bucket_acquire_waits_for_refill():
+    bucket = LocalTokenBucket(capacity=1, refill_rate=50.0)
+    assert await bucket.acquire() == 0.0
+    waited = await bucket.acquire()
+    assert waited > 0
+
+
+def test_local_token_bucket_drain_empties_tokens():
+    bucket = LocalTokenBucket(capacity=5, refill_rate=0.001)
+    bucket.drain()
+    assert not bucket.try_acquire()
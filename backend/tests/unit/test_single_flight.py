@@ -0,0 +1,181 @@
+"""Single-flight cache coalescing unit tests (in-memory Redis fake).
+
+Covers:
+- Concurrent misses compute once per process; counters record coalesced callers
+- Cross-pod lock: a pod that loses the lock waits for the leader's value
+- Stale-while-revalidate with a single background refresh
+- XFetch early-refresh decision and endpoint_cache compatibility
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.services import cache_metrics as cm
+from app.services import endpoint_cache, redis_cache
+from app.services import single_flight as sf
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(redis_cache, "_client", lambda: fake)
+
+    async def _miss(*args, **kwargs):
+        return None
+
+    async def _noop(*args, **kwargs):
+        return True
+
+    from app.services import cache_service
+    monkeypatch.setattr(cache_service, "cache_get", _miss)
+    monkeypatch.setattr(cache_service, "cache_set", _noop)
+    cm.reset()
+    return fake
+
+
+def _counter(name):
+    return cm.get_snapshot()["counters"].get(name, 0)
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_compute_once(redis):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"n": calls}
+
+    results = await asyncio.gather(*(
+        redis_cache.multilayer_cached("hot", compute, redis_ttl=60) for _ in range(20)
+    ))
+
+    assert calls == 1
+    assert all(r == {"n": 1} for r in results)
+    assert _counter("singleflight_leaders") == 1
+    assert _counter("singleflight_coalesced") == 19
+    assert cm.get_snapshot()["single_flight"]["inflight"] == 0
+    # Lock released, value stored in an envelope.
+    assert not any(k.startswith(sf.LOCK_PREFIX) for k in redis.data)
+    assert sf.unwrap(await redis_cache.redis_get("hot"))[1] is not None
+
+
+@pytest.mark.anyio
+async def test_leader_failure_propagates_and_frees_key(redis):
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    results = await asyncio.gather(
+        *(redis_cache.multilayer_cached("k", boom) for _ in range(3)), return_exceptions=True,
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    assert await redis_cache.multilayer_cached("k", lambda: {"ok": True}) == {"ok": True}
+
+
+@pytest.mark.anyio
+async def test_other_pod_holding_lock_is_awaited(redis, monkeypatch):
+    monkeypatch.setattr(sf, "LOCK_POLL_SECONDS", 0.001)
+    redis.data[sf.LOCK_PREFIX + redis_cache._make_key("remote")] = "other-pod"
+
+    async def leader_on_other_pod():
+        await asyncio.sleep(0.01)
+        await redis_cache.redis_set("remote", sf.wrap({"from": "pod-b"}, 60), 60)
+
+    async def compute():
+        raise AssertionError("must not recompute while another pod holds the lock")
+
+    result, _ = await asyncio.gather(
+        redis_cache.multilayer_cached("remote", compute), leader_on_other_pod(),
+    )
+
+    assert result == {"from": "pod-b"}
+    assert _counter("singleflight_remote_coalesced") == 1
+
+
+@pytest.mark.anyio
+async def test_stale_entry_is_served_while_one_refresh_runs(redis):
+    await redis_cache.redis_set("s", sf.wrap({"v": "old"}, -1), 600)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"v": "new"}
+
+    results = await asyncio.gather(*(
+        redis_cache.multilayer_cached("s", compute) for _ in range(10)
+    ))
+    assert all(r == {"v": "old"} for r in results)
+
+    await asyncio.gather(*list(sf._background))
+    assert calls == 1
+    assert await redis_cache.multilayer_cached("s", compute) == {"v": "new"}
+    assert _counter("stale_serve_count") == 10
+
+
+def test_xfetch_refreshes_earlier_for_expensive_keys():
+    now = 1000.0
+    cheap = sf.wrap("x", 10, compute_seconds=0.01, now=now)
+    costly = sf.wrap("x", 10, compute_seconds=5.0, now=now)
+    # U = 1 - 0.9 → -ln(U) ≈ 2.3: cheap gap 0.02s, costly gap ~11.5s.
+    assert not sf.should_refresh_early(cheap, now=now + 5, rand=lambda: 0.9)
+    assert sf.should_refresh_early(costly, now=now + 5, rand=lambda: 0.9)
+    assert not sf.should_refresh_early(sf.unwrap({"plain": 1})[1], now=now)
+
+
+@pytest.mark.anyio
+async def test_endpoint_cache_coalesces_and_treats_expired_as_miss(redis):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"items": [calls]}
+
+    hit, ck = await endpoint_cache.try_cache_get("pub_search", "org1", {"page": 1})
+    assert hit is None
+    results = await asyncio.gather(*(endpoint_cache.coalesced_compute(ck, compute) for _ in range(5)))
+    assert calls == 1 and all(r == {"items": [1]} for r in results)
+
+    hit, _ = await endpoint_cache.try_cache_get("pub_search", "org1", {"page": 1})
+    assert hit == {"items": [1]}
+
+    # Past its TTL: a plain read misses, a read with refresh serves it stale.
+    redis.data[redis_cache._make_key(ck)] = json.dumps(sf.wrap({"items": [1]}, -1, now=time.time()))
+    assert (await endpoint_cache.try_cache_get("pub_search", "org1", {"page": 1}))[0] is None
+    hit, _ = await endpoint_cache.try_cache_get("pub_search", "org1", {"page": 1}, refresh=compute)
+    assert hit == {"items": [1]}
+    await asyncio.gather(*list(sf._background))
+    assert calls == 2
@@ -0,0 +1,127 @@
+"""Pooled supplier HTTP client unit tests (no network).
+
+Covers:
+- Paximum/TourVisio clients built per request share one pooled client per credential
+- The per-account token bucket paces bursts and is drained by a 429
+- Large request bodies are gzipped when enabled; gzip responses are decoded
+- Latency histograms are recorded per supplier/operation/status class
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import time
+
+import httpx
+import pytest
+
+from app.infrastructure.metrics_registry import registry as metrics
+from app.services.paximum import PaximumClient
+from app.services.suppliers.http_pool import PooledSupplierClient, SupplierClientPool
+from app.services.suppliers.registry import registry
+from app.services.tourvisio import TourVisioClient
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fresh = SupplierClientPool()
+    monkeypatch.setattr(registry, "clients", fresh)
+    metrics.reset()
+    return fresh
+
+
+def _histograms(name):
+    return [key for key in metrics.snapshot()["histograms"] if name in str(key)]
+
+
+@pytest.mark.anyio
+async def test_paximum_clients_share_pooled_connection(pool):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"body": {"hotels": []}})
+
+    first = PaximumClient(base_url="https://pax.test/", token="tok-a")
+    second = PaximumClient(base_url="https://pax.test", token="tok-a")
+    other = PaximumClient(base_url="https://pax.test", token="tok-b")
+    assert first._http is second._http and first._http is not other._http
+    first._http.transport = httpx.MockTransport(handler)
+
+    await first.hotel_details("42")
+    http_client = first._http._http()
+    await second.check_availability("OF-1")
+    assert first._http._http() is http_client  # same keep-alive pool for both calls
+    assert first._http.requests == 2
+
+    assert seen[0].headers["Authorization"] == "Bearer tok-a"
+    assert "gzip" in seen[0].headers["Accept-Encoding"]
+    assert json.loads(seen[1].content) == {"offerId": "OF-1"}
+    assert {s["account"] for s in pool.stats()} == {first._http.account, other._http.account}
+    assert "tok-a" not in json.dumps(pool.stats())
+
+    assert any("/v1/search/hoteldetails" in str(key) and "2xx" in str(key)
+               for key in _histograms("supplier_http_request_seconds"))
+    await pool.aclose()
+    assert pool.stats() == []
+
+
+@pytest.mark.anyio
+async def test_token_bucket_paces_and_drains_on_429():
+    statuses = iter([200, 200, 429, 200])
+    client = PooledSupplierClient("paximum", "acct", rate=20.0, burst=2,
+                                  transport=httpx.MockTransport(lambda r: httpx.Response(next(statuses))))
+
+    started = time.monotonic()
+    for _ in range(3):
+        await client.request_json("POST", "https://pax.test/x", {}, headers={}, timeout=5, operation="/x")
+    assert time.monotonic() - started >= 0.04  # third call waited for a refill
+    assert client.bucket.tokens < 1  # 429 drained the bucket
+
+    await client.request_json("POST", "https://pax.test/x", {}, headers={}, timeout=5, operation="/x")
+    assert _histograms("supplier_rate_limit_wait_seconds")
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_gzip_request_and_response():
+    received = {}
+
+    def handler(request):
+        received["encoding"] = request.headers.get("Content-Encoding")
+        received["body"] = json.loads(gzip.decompress(request.content))
+        payload = gzip.compress(json.dumps({"ok": True}).encode())
+        return httpx.Response(200, content=payload, headers={"Content-Encoding": "gzip"})
+
+    client = PooledSupplierClient("paximum", "acct", rate=100, burst=10, gzip_requests=True,
+                                  transport=httpx.MockTransport(handler))
+    body = {"destinations": [{"type": "city", "id": str(i)} for i in range(100)]}
+    resp = await client.request_json("POST", "https://pax.test/s", body, headers={}, timeout=5, operation="/s")
+    assert received == {"encoding": "gzip", "body": body}
+    assert resp.json() == {"ok": True}
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_tourvisio_login_and_retry_use_pooled_client(pool):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        data = json.loads(request.content)
+        if request.url.path.endswith("/login"):
+            return httpx.Response(200, json={"header": {"success": True},
+                                             "body": {"token": f"T{len(calls)}", "expiresOn": "2099-01-01T00:00:00Z"}})
+        if data["header"]["token"] == "T1":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"header": {"success": True}, "body": {"rates": [1]}})
+
+    cli = TourVisioClient(base_url="https://tv.test", agency="AG", user="u", password="p")
+    cli.clear_token()
+    cli._http.transport = httpx.MockTransport(handler)
+
+    assert await cli.get_exchange_rates() == {"rates": [1]}
+    assert [p.rsplit("/", 1)[-1] for p in calls] == ["login", "exchangerates", "login", "exchangerates"]
+    assert cli._http.requests == 4 and len(pool.stats()) == 1
+    TourVisioClient.clear_all_cached_tokens()
+    await pool.aclose()
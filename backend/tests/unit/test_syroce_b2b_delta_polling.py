@@ -0,0 +1,158 @@
+"""DB-free unit tests for incremental Syroce PMS B2B ARI polling.
+
+Covers:
+- Only changed rows are written, in one bulk_write per cycle
+- Unchanged windows are skipped without touching the local table
+- Per-window cadence backs off while quiet and resets on change
+- Windows not yet due are not polled unless ``force`` is set
+- Stale LWW duplicate-key errors are dropped; other write errors surface
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.services.syroce_b2b import client as client_mod
+from app.services.syroce_b2b import polling
+
+pytestmark = pytest.mark.anyio
+
+BASE = 300
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Coll:
+    def __init__(self):
+        self.docs, self.writes, self.error = {}, [], None
+
+    def find(self, query, projection=None):
+        ids = query["_id"]["$in"]
+        return _Cursor([self.docs[i] for i in ids if i in self.docs])
+
+    async def bulk_write(self, ops, ordered=True):
+        if self.error:
+            raise self.error
+        self.writes.append(ops)
+        for op in ops:
+            doc = self.docs.setdefault(op._filter["_id"], {"_id": op._filter["_id"]})
+            doc.update(op._doc["$set"])
+            for key, value in op._doc.get("$inc", {}).items():
+                doc[key] = doc.get(key, 0) + value
+
+
+class _DB:
+    def __init__(self):
+        self.colls = {}
+
+    def __getitem__(self, name):
+        return self.colls.setdefault(name, _Coll())
+
+
+class _PMS:
+    def __init__(self):
+        self.calls = 0
+        self.rooms = {"DBL": {"room_type": "DBL", "available_rooms": 5, "base_price": 100},
+                      "SGL": {"room_type": "SGL", "available_rooms": 2, "base_price": 80}}
+
+    async def get_availability(self, *, check_in, check_out, room_type=None):
+        self.calls += 1
+        return {"room_types": [dict(r) for r in self.rooms.values()]}
+
+    async def get_rates(self, *, start_date, end_date, room_type=None):
+        return {"rates": [{"room_type": "DBL", "amount": 100}]}
+
+
+@pytest.fixture
+def env(monkeypatch):
+    db, pms = _DB(), _PMS()
+
+    async def _get_db():
+        return db
+
+    async def _settings():
+        return {"poll_horizon_days": 7, "poll_interval_seconds": BASE, "poll_room_types": []}
+
+    async def _agency():
+        return "agency-1"
+
+    async def _load(cls, **kwargs):
+        return pms
+
+    monkeypatch.setattr(polling, "get_db", _get_db)
+    monkeypatch.setattr(polling.store, "get_poll_settings", _settings)
+    monkeypatch.setattr(polling.store, "get_agency_id", _agency)
+    monkeypatch.setattr(client_mod.SyroceB2BClient, "load", classmethod(_load))
+    return db, pms
+
+
+async def test_only_changed_rows_are_written(env):
+    db, pms = env
+    local = db[polling.LOCAL_COLLECTION]
+
+    first = await polling.sync_once()
+    assert (first["written"], first["polled"]) == (2, 1)
+    assert len(local.writes) == 1 and len(local.writes[0]) == 2
+    assert all(op._upsert for op in local.writes[0])
+
+    again = await polling.sync_once(force=True)
+    assert (again["written"], again["unchanged"], again["polled"]) == (0, 0, 1)
+    assert len(local.writes) == 1  # unchanged window: no reads or writes of rows
+
+    pms.rooms["SGL"]["available_rooms"] = 1
+    changed = await polling.sync_once(force=True)
+    assert (changed["written"], changed["unchanged"]) == (1, 1)
+    assert [op._filter["_id"].split("|")[0] for op in local.writes[-1]] == ["SGL"]
+    assert local.docs[local.writes[-1][0]._filter["_id"]]["available_rooms"] == 1
+
+
+async def test_cadence_adapts_per_window(env):
+    db, pms = env
+    state = db[polling.STATE_COLLECTION].docs
+
+    await polling.sync_once()
+    assert state["*"]["interval_s"] == BASE
+    intervals = []
+    for _ in range(4):
+        await polling.sync_once(force=True)
+        intervals.append(state["*"]["interval_s"])
+    assert intervals == [BASE * 2, BASE * 4, BASE * 4, BASE * 4]
+
+    pms.rooms["DBL"]["base_price"] = 120
+    summary = await polling.sync_once(force=True)
+    assert state["*"]["interval_s"] == BASE and summary["next_poll_in"] == pytest.approx(BASE, abs=1)
+    assert state["*"]["changes"] == 2 and state["*"]["polls"] == 6
+
+    calls = pms.calls
+    skipped = await polling.sync_once()
+    assert (skipped["polled"], skipped["skipped"], pms.calls) == (0, 1, calls)
+
+    state["*"]["next_poll_at"] -= timedelta(seconds=BASE + 1)
+    assert (await polling.sync_once())["polled"] == 1
+
+
+async def test_stale_writes_dropped_other_errors_raised(env):
+    db, pms = env
+    local = db[polling.LOCAL_COLLECTION]
+    local.error = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}]})
+    assert (await polling.sync_once())["written"] == 1
+
+    pms.rooms["DBL"]["available_rooms"] = 0
+    local.error = BulkWriteError({"writeErrors": [{"index": 0, "code": 121}]})
+    with pytest.raises(BulkWriteError):
+        await polling.sync_once(force=True)